@@ -0,0 +1,111 @@
+"""
+Benchmark command history search and loading.
+
+Fills a CommandHistory with --entries generated commands (written to a
+history file in a temporary directory), then compares typing a reverse
+search query one key at a time and stepping to older matches:
+
+    list scan   what a plain list of commands allows: for each step, walk
+                the list from the newest command back with ``in``
+    history     CommandHistory.search(): str.rfind over the search buffer
+
+Also reports how long reading the history file takes (the GUI does this
+on the connection worker) and its peak memory, measured with tracemalloc in
+a second load as tracing slows it down.
+
+Usage:
+    python benchmarks/bench_command_history.py [--entries 100000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_history import CommandHistory, ReverseSearch
+
+WORDS = ["ls", "-la", "cd", "git", "status", "log", "docker", "ps", "kubectl", "get", "pods", "tail", "-f",
+         "/var/log/syslog", "grep", "error", "systemctl", "restart", "nginx", "journalctl", "-u", "sudo"]
+
+QUERIES = ["nginx", "kubectl get", "no such command"]
+
+
+def make_commands(count: int):
+    rng = random.Random(42)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) + f" {i}" for i in range(count)]
+
+
+def list_scan(commands, query: str, steps: int):
+    """Type ``query`` a key at a time, then step to ``steps`` older matches, scanning the list."""
+    match = None
+    for end in range(1, len(query) + 1):
+        part = query[:end]
+        match = next((i for i in range(len(commands) - 1, -1, -1) if part in commands[i]), None)
+    for _ in range(steps):
+        if match is None:
+            break
+        match = next((i for i in range(match - 1, -1, -1) if query in commands[i]), None)
+    return match
+
+
+def history_search(history: CommandHistory, query: str, steps: int):
+    search = ReverseSearch(history)
+    for end in range(1, len(query) + 1):
+        search.update(query[:end])
+    for _ in range(steps):
+        search.older()
+    return search.command
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000, help="commands in the history")
+    parser.add_argument("--steps", type=int, default=20, help="Ctrl+R presses after typing each query")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-history-")
+    path = os.path.join(workdir, "user@host_22.history")
+    try:
+        commands = make_commands(args.entries)
+        history = CommandHistory(path, max_entries=args.entries)
+        add, _ = timed(lambda: [history.add(command) for command in commands])
+        history.close()
+        print(f"{args.entries} commands, history file {os.path.getsize(path) / 1e6:.1f} MB, "
+              f"added in {add / 1000:.1f}s ({add * 1000 / args.entries:.0f} us each)")
+
+        loaded = CommandHistory(path, max_entries=args.entries)
+        load, _ = timed(loaded.load)
+        first, _ = timed(lambda: loaded.search("x"))  # Builds the search buffer
+        traced = CommandHistory(path, max_entries=args.entries)
+        tracemalloc.start()
+        traced.load()
+        traced.search("x")
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"load {load:.0f} ms, first search {first:.0f} ms, peak memory {peak:.1f} MB\n")
+
+        print(f"{'query':<18} {'list scan':>11} {'history':>11}")
+        for query in QUERIES:
+            scan, expected = timed(lambda: list_scan(commands, query, args.steps))
+            search, found = timed(lambda: history_search(loaded, query, args.steps))
+            print(f"{query!r:<18} {scan:8.1f} ms {search:8.2f} ms")
+            if expected is not None and commands[expected] != found:
+                raise AssertionError(f"{query!r}: searches disagree")
+        loaded.close()
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
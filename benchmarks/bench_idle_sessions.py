@@ -0,0 +1,108 @@
+"""
+Benchmark idle CPU use as the number of open sessions grows.
+
+Compares the shared ChannelReactor with the old one-thread-per-channel
+polling reader (recv_ready() + sleep(0.1)). Every session is idle, so the
+ideal is flat CPU no matter how many sessions are open.
+
+Usage:
+    python benchmarks/bench_idle_sessions.py [--seconds 3] [--counts 1,10,25,50,100]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from channel_reactor import ChannelReactor
+
+
+class IdleChannel:
+    """Stand-in for an idle paramiko Channel: a readable fd that never fires."""
+
+    def __init__(self):
+        self._recv_sock, self._send_sock = socket.socketpair()
+        self.closed = False
+        self.eof_received = False
+
+    def fileno(self) -> int:
+        return self._recv_sock.fileno()
+
+    def recv_ready(self) -> bool:
+        return False
+
+    def recv(self, size: int) -> bytes:
+        return b""
+
+    def exit_status_ready(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.closed = True
+        self._recv_sock.close()
+        self._send_sock.close()
+
+
+def measure(seconds: float) -> float:
+    """Return process CPU time consumed over a wall-clock window, as a percentage."""
+    cpu_start = time.process_time()
+    time.sleep(seconds)
+    return (time.process_time() - cpu_start) / seconds * 100
+
+
+def bench_reactor(count: int, seconds: float) -> float:
+    reactor = ChannelReactor()
+    reactor.start()
+    channels = [IdleChannel() for _ in range(count)]
+    for i, channel in enumerate(channels):
+        reactor.register(f"session-{i}", channel, lambda name, data: None)
+    try:
+        return measure(seconds)
+    finally:
+        reactor.stop()
+        for channel in channels:
+            channel.close()
+
+
+def bench_polling(count: int, seconds: float) -> float:
+    stop = threading.Event()
+    channels = [IdleChannel() for _ in range(count)]
+
+    def poll(channel):
+        while not stop.is_set():
+            if channel.recv_ready():
+                channel.recv(4096)
+            time.sleep(0.1)
+
+    threads = [threading.Thread(target=poll, args=(c,), daemon=True) for c in channels]
+    for thread in threads:
+        thread.start()
+    try:
+        return measure(seconds)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        for channel in channels:
+            channel.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0, help="measurement window per run")
+    parser.add_argument("--counts", default="1,10,25,50,100", help="comma-separated session counts")
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.counts.split(",")]
+    print(f"{'sessions':>8}  {'reactor cpu%':>12}  {'polling cpu%':>12}  {'polling threads':>15}")
+    for count in counts:
+        reactor_cpu = bench_reactor(count, args.seconds)
+        polling_cpu = bench_polling(count, args.seconds)
+        print(f"{count:>8}  {reactor_cpu:>12.2f}  {polling_cpu:>12.2f}  {count:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark the overhead of the port-forward relay against a local echo server.
+
+An in-process paramiko server answers direct-tcpip channels by connecting
+to a local echo server (its side relayed by a ForwardRelay as well); the
+client side is a PortForwarder with a local (-L) forward. Each measurement
+runs once straight to the echo server and once through the forward:
+
+    throughput   one connection streaming --mb megabytes, echoed back
+    latency      --pings round trips of a 64-byte message (median and p99)
+    fan-out      --connections connections each doing --rounds round trips,
+                 with the process thread count sampled while they are open
+
+Both ends of the SSH connection live in this process and share the GIL, so
+absolute forwarded numbers understate what a real remote server reaches;
+compare runs of this script with each other.
+
+Usage:
+    python benchmarks/bench_port_forward.py [--mb 64] [--pings 2000]
+        [--connections 200] [--rounds 20]
+"""
+import argparse
+import os
+import selectors
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import paramiko
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from port_forwarding import CONNECT_WORKERS, ForwardRelay, ForwardSpec, PortForwarder
+
+MESSAGE = b"x" * 64
+
+
+def start_echo_server() -> int:
+    """Selector-based echo server on a free loopback port; returns the port."""
+    listener = socket.create_server(("127.0.0.1", 0), backlog=1024)
+    listener.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+
+    def run() -> None:
+        while True:
+            for key, _ in selector.select():
+                if key.fileobj is listener:
+                    conn, _ = listener.accept()
+                    conn.setblocking(True)
+                    selector.register(conn, selectors.EVENT_READ)
+                    continue
+                try:
+                    data = key.fileobj.recv(262144)
+                except OSError:
+                    data = b""
+                if data:
+                    key.fileobj.sendall(data)
+                else:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+
+    threading.Thread(target=run, name="echo", daemon=True).start()
+    return listener.getsockname()[1]
+
+
+class StubServer(paramiko.ServerInterface):
+    def __init__(self):
+        self.destinations = {}
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        self.destinations[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+
+def connect() -> paramiko.Transport:
+    """Return a client transport to an in-process server that forwards direct-tcpip channels."""
+    # Loopback TCP rather than a socketpair: both transports write from their reader
+    # threads, and a small socketpair buffer can fill in both directions at once
+    listener = socket.create_server(("127.0.0.1", 0))
+    client_sock = socket.create_connection(listener.getsockname())
+    server_sock, _ = listener.accept()
+    listener.close()
+    server = paramiko.Transport(server_sock)
+    server.add_server_key(paramiko.RSAKey.generate(2048))
+    stub = StubServer()
+    server.start_server(event=threading.Event(), server=stub)
+    server_relay = ForwardRelay()
+
+    def accept_loop() -> None:
+        while server.is_active():
+            channel = server.accept(1)
+            if channel is not None:
+                sock = socket.create_connection(stub.destinations.pop(channel.get_id()))
+                server_relay.add_pipe(sock, channel)
+
+    threading.Thread(target=accept_loop, name="stub-accept", daemon=True).start()
+    client = paramiko.Transport(client_sock)
+    client.connect(username="bench", password="bench")
+    return client
+
+
+def recv_exact(sock: socket.socket, count: int) -> None:
+    while count:
+        data = sock.recv(min(count, 262144))
+        if not data:
+            raise ConnectionError("connection closed")
+        count -= len(data)
+
+
+def throughput(port: int, megabytes: int) -> float:
+    total = megabytes * 1024 * 1024
+    block = b"\0" * 65536
+    sock = socket.create_connection(("127.0.0.1", port))
+
+    def send() -> None:
+        for _ in range(total // len(block)):
+            sock.sendall(block)
+
+    start = time.perf_counter()
+    sender = threading.Thread(target=send)
+    sender.start()
+    recv_exact(sock, total)
+    sender.join()
+    elapsed = time.perf_counter() - start
+    sock.close()
+    return total / 1e6 / elapsed
+
+
+def latency(port: int, pings: int):
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    samples = []
+    for _ in range(pings):
+        start = time.perf_counter()
+        sock.sendall(MESSAGE)
+        recv_exact(sock, len(MESSAGE))
+        samples.append(time.perf_counter() - start)
+    sock.close()
+    samples.sort()
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def fan_out(port: int, connections: int, rounds: int):
+    socks = [socket.create_connection(("127.0.0.1", port)) for _ in range(connections)]
+    threads = threading.active_count()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for sock in socks:
+            sock.sendall(MESSAGE)
+        for sock in socks:
+            recv_exact(sock, len(MESSAGE))
+        threads = max(threads, threading.active_count())
+    elapsed = time.perf_counter() - start
+    for sock in socks:
+        sock.close()
+    return connections * rounds / elapsed, threads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=64, help="megabytes streamed in the throughput test")
+    parser.add_argument("--pings", type=int, default=2000, help="round trips in the latency test")
+    parser.add_argument("--connections", type=int, default=200, help="connections open at once in the fan-out test")
+    parser.add_argument("--rounds", type=int, default=20, help="round trips per connection in the fan-out test")
+    args = parser.parse_args()
+
+    echo_port = start_echo_server()
+    transport = connect()
+    relay = ForwardRelay()
+    forwarder = PortForwarder(transport, relay, label="bench")
+    spec = forwarder.start(ForwardSpec.parse(f"L 0:127.0.0.1:{echo_port}"))
+    baseline_threads = threading.active_count()
+
+    print(f"{'path':<10} {'throughput':>12} {'latency p50':>12} {'p99':>9} {'fan-out':>14} {'threads':>8}")
+    for name, port in (("direct", echo_port), ("forwarded", spec.bind_port)):
+        rate = throughput(port, args.mb)
+        median, p99 = latency(port, args.pings)
+        round_trips, threads = fan_out(port, args.connections, args.rounds)
+        print(f"{name:<10} {rate:8.1f} MB/s {median:9.0f} us {p99:6.0f} us {round_trips:8.0f} rt/s "
+              f"{threads:8d}")
+
+    print(f"\nthreads before the fan-out: {baseline_threads} "
+          f"(relay: 1 I/O thread + up to {CONNECT_WORKERS} setup workers)")
+    forwarder.close()
+    transport.close()
+    relay.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark connecting many sessions that sit behind one bastion.
+
+Two in-process SSH servers listen on loopback: a bastion that answers
+direct-tcpip channels (relayed with a ForwardRelay) and a target that only
+authenticates. --latency-ms is added to the client-bastion link, the
+bastion and target being close to each other as in a data centre.
+--sessions sessions, each with its own login on the target, connect
+through the bastion with --parallel connection workers:
+
+    shared     one TransportPool for all of them, as the GUI and CLI use it
+    separate   a new pool per session, so every session repeats the bastion
+               handshake (what a jump host without reuse costs)
+
+For each mode it prints the wall time and how many handshakes each server
+completed.
+
+Usage:
+    python benchmarks/bench_proxy_jump.py [--sessions 50] [--parallel 16] [--latency-ms 20]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import paramiko
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_sftp_transfer import latency_relay
+from port_forwarding import ForwardRelay
+from ssh_connection import ModernSSHClient
+from transport_pool import TransportPool
+
+HOST_KEY = paramiko.RSAKey.generate(2048)
+
+
+class StubServer(paramiko.ServerInterface):
+    def __init__(self, server: "BenchServer"):
+        self.server = server
+        self.destinations = {}
+
+    def check_auth_password(self, username, password):
+        with self.server.lock:
+            self.server.handshakes += 1
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        self.destinations[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+
+class BenchServer:
+    """SSH server on a loopback port; tunnels direct-tcpip channels when ``relay`` is given."""
+
+    def __init__(self, relay: ForwardRelay = None, latency: float = 0.0):
+        self.relay = relay
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.handshakes = 0
+        self.transports = []
+        self.listener = socket.create_server(("127.0.0.1", 0), backlog=256)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            if self.latency:
+                sock = latency_relay(sock, self.latency)
+            transport = paramiko.Transport(sock)
+            transport.add_server_key(HOST_KEY)
+            stub = StubServer(self)
+            transport.start_server(event=threading.Event(), server=stub)
+            self.transports.append(transport)
+            threading.Thread(target=self._serve, args=(transport, stub), daemon=True).start()
+
+    def _serve(self, transport: paramiko.Transport, stub: StubServer) -> None:
+        channels = []  # Keep accepted channels referenced while they are open
+        while transport.is_active():
+            channel = transport.accept(1)
+            if channel is None:
+                continue
+            channels.append(channel)
+            if self.relay is not None and channel.get_id() in stub.destinations:
+                sock = socket.create_connection(stub.destinations.pop(channel.get_id()))
+                self.relay.add_pipe(sock, channel)
+
+    def reset(self) -> None:
+        for transport in self.transports:
+            transport.close()
+        self.transports.clear()
+        self.handshakes = 0
+
+
+def run(mode: str, bastion: BenchServer, target: BenchServer, sessions: int, parallel: int):
+    jump = {"host": "127.0.0.1", "port": bastion.port, "username": "jump", "password": "bench",
+            "key_file": None, "connect_timeout": 10.0, "auth_timeout": 30.0}
+    shared_pool = TransportPool(idle_timeout=0)
+    pools = []
+
+    def connect(index: int) -> ModernSSHClient:
+        pool = shared_pool if mode == "shared" else TransportPool(idle_timeout=0)
+        pools.append(pool)
+        client = ModernSSHClient()
+        client.connect_pooled(pool, hostname="127.0.0.1", port=target.port, username=f"user{index}",
+                              password="bench", jump_hosts=[jump], timeout=10,
+                              look_for_keys=False, allow_agent=False)
+        return client
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        clients = list(executor.map(connect, range(sessions)))
+    elapsed = time.perf_counter() - start
+    result = (elapsed, bastion.handshakes, target.handshakes)
+
+    for client in clients:
+        client.close()
+    for pool in set(pools):
+        pool.close_all()
+    bastion.reset()
+    target.reset()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="sessions behind the bastion")
+    parser.add_argument("--parallel", type=int, default=16, help="connection workers")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="added one-way latency to the bastion")
+    args = parser.parse_args()
+
+    relay = ForwardRelay()
+    bastion = BenchServer(relay, args.latency_ms / 1000)
+    target = BenchServer()
+
+    print(f"{args.sessions} sessions behind one bastion, {args.parallel} workers, "
+          f"{args.latency_ms:g} ms each way to the bastion")
+    print(f"{'mode':<10} {'wall time':>10} {'per session':>12} {'bastion handshakes':>19} {'target handshakes':>18}")
+    for mode in ("separate", "shared"):
+        elapsed, bastion_handshakes, target_handshakes = run(mode, bastion, target, args.sessions, args.parallel)
+        print(f"{mode:<10} {elapsed:9.2f}s {elapsed / args.sessions * 1000:9.1f} ms "
+              f"{bastion_handshakes:19d} {target_handshakes:18d}")
+    relay.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark cold start and edits with a large session inventory in SQLite.
+
+Writes --sessions sessions (encrypted passwords, tags) to a sessions.json in
+a temporary directory, migrates it into a SessionDatabase as the GUI does on
+its first start, and compares:
+
+    cold start    SessionStore.load() of the JSON file against
+                  SessionDatabase.load() plus reading the --visible records
+                  the sidebar shows
+    search index  building the sidebar search index: from every record for
+                  the JSON store, from summaries() of the indexed columns
+                  for the database (the GUI does this in the background
+                  after startup)
+    edit one      one session changed, then written (JSON store vs database)
+    tag lookup    names carrying one tag, scanning records vs the tag index
+
+Usage:
+    python benchmarks/bench_session_db.py [--sessions 50000] [--visible 25]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_session_search import make_sessions
+from session_db import SessionDatabase
+from session_index import SessionIndex
+from session_store import SessionStore, encrypt_session, make_fernet, session_tags, write_sessions
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50000, help="sessions in the inventory")
+    parser.add_argument("--visible", type=int, default=25, help="rows the sidebar shows")
+    args = parser.parse_args()
+
+    from cryptography.fernet import Fernet
+    fernet = make_fernet(Fernet.generate_key())
+    workdir = tempfile.mkdtemp(prefix="bench-db-")
+    json_file = os.path.join(workdir, "sessions.json")
+    database_file = os.path.join(workdir, "sessions.db")
+    try:
+        sessions = make_sessions(args.sessions)
+        for session in sessions.values():
+            session["password"] = "secret"
+        stored = {name: encrypt_session(session, fernet) for name, session in sessions.items()}
+        write_sessions(json_file, stored)
+        print(f"{args.sessions} sessions, sessions.json {os.path.getsize(json_file) / 1e6:.1f} MB")
+
+        json_store = SessionStore(json_file, fernet)
+        json_load, _ = timed(json_store.load)
+
+        migrate, _ = timed(SessionDatabase(database_file, fernet, json_file=json_file).load)
+        database = SessionDatabase(database_file, fernet)
+
+        def cold_start():
+            database.load()
+            return [database[name] for name in list(database)[:args.visible]]
+
+        database_load, shown = timed(cold_start)
+        print(f"one-time migration {migrate:.0f} ms, sessions.db {os.path.getsize(database_file) / 1e6:.1f} MB\n")
+
+        print(f"{'':<14} {'json store':>11} {'database':>11}")
+        print(f"{'cold start':<14} {json_load:8.0f} ms {database_load:8.0f} ms   "
+              f"({len(shown)} of {len(database)} records read)")
+
+        json_search, _ = timed(lambda: SessionIndex(json_store))
+        database_search, _ = timed(lambda: SessionIndex(database.summaries()))
+        print(f"{'search index':<14} {json_search:8.0f} ms {database_search:8.0f} ms")
+
+        name = list(sessions)[args.sessions // 2]
+        json_store[name] = dict(json_store[name], host="edited.example.com")
+        json_edit, _ = timed(json_store.flush)
+        database[name] = dict(database[name], host="edited.example.com")
+        database_edit, _ = timed(database.flush)
+        print(f"{'edit one':<14} {json_edit:8.0f} ms {database_edit:8.1f} ms")
+
+        json_tag, expected = timed(lambda: [n for n, s in json_store.items() if "staging" in session_tags(s)])
+        database_tag, found = timed(lambda: database.names_with_tag("staging"))
+        print(f"{'tag lookup':<14} {json_tag:8.0f} ms {database_tag:8.1f} ms   ({len(found)} sessions)")
+        if found != expected:
+            raise AssertionError("tag lookups disagree")
+        database.close()
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
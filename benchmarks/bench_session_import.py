@@ -0,0 +1,150 @@
+"""
+Benchmark importing a large host inventory.
+
+Writes --hosts hosts as a JSON export, a CMDB-style CSV and an OpenSSH
+config in a temporary directory, then imports each into an empty
+SessionDatabase:
+
+    old         what Import Sessions did before, for the JSON file only:
+                json.load the whole file, update the sessions and save,
+                all on the calling (UI) thread
+    streaming   iter_sessions() + import_entries() on a worker thread, as
+                the GUI runs it now
+
+While an import runs, the main thread ticks every 16 ms like the Tk event
+loop; the longest gap between ticks is what the UI would freeze for. Peak
+memory is measured with tracemalloc in a second run of each import, as
+tracing slows it down.
+
+Usage:
+    python benchmarks/bench_session_import.py [--hosts 20000]
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_session_search import make_sessions
+from session_db import SessionDatabase
+from session_import import import_entries, iter_sessions
+from session_store import make_fernet
+
+FRAME = 0.016
+
+
+def write_inputs(workdir: str, count: int):
+    sessions = make_sessions(count)
+    for session in sessions.values():
+        session["password"] = "secret"
+    paths = {"json": os.path.join(workdir, "export.json"), "csv": os.path.join(workdir, "cmdb.csv"),
+             "ssh_config": os.path.join(workdir, "config")}
+    with open(paths["json"], "w") as f:
+        json.dump(sessions, f, indent=4)
+    with open(paths["csv"], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "IP Address", "SSH Port", "Login", "Groups", "Owner"])
+        for name, session in sessions.items():
+            writer.writerow([name, session["host"], 22, session["username"], ";".join(session["tags"]), "ops"])
+    with open(paths["ssh_config"], "w") as f:
+        f.write("Host *\n    ServerAliveInterval 30\n\n")
+        for name, session in sessions.items():
+            f.write(f"Host {name}\n    HostName {session['host']}\n    User {session['username']}\n\n")
+    return paths
+
+
+def run_import(run, on_worker: bool):
+    """Run an import; returns (seconds, longest main-thread stall in ms, result)."""
+    start = time.perf_counter()
+    if not on_worker:
+        result = run()
+        elapsed = time.perf_counter() - start
+        stall = elapsed
+    else:
+        outcome = []
+        worker = threading.Thread(target=lambda: outcome.append(run()))
+        worker.start()
+        stall = 0.0
+        last = time.perf_counter()
+        while worker.is_alive():
+            time.sleep(FRAME)
+            now = time.perf_counter()
+            stall = max(stall, now - last - FRAME)
+            last = now
+        worker.join()
+        elapsed = time.perf_counter() - start
+        result = outcome[0]
+    return elapsed, stall * 1000, result
+
+
+def measure(make_run, on_worker: bool):
+    """Time a fresh import, then trace the memory of another; returns (seconds, peak MB, stall ms, result)."""
+    elapsed, stall, result = run_import(make_run("timed"), on_worker)
+    run = make_run("traced")
+    tracemalloc.start()
+    run_import(run, on_worker)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak, stall, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=20000, help="hosts in each input file")
+    args = parser.parse_args()
+
+    from cryptography.fernet import Fernet
+    fernet = make_fernet(Fernet.generate_key())
+    workdir = tempfile.mkdtemp(prefix="bench-import-")
+    try:
+        paths = write_inputs(workdir, args.hosts)
+        print(f"{args.hosts} hosts; export.json {os.path.getsize(paths['json']) / 1e6:.1f} MB")
+        print(f"{'input':<12} {'mode':<10} {'time':>8} {'peak memory':>12} {'UI stall':>10}  result")
+
+        stores = []
+
+        def fresh_store(label: str) -> SessionDatabase:
+            store = SessionDatabase(os.path.join(workdir, f"{label}.db"), fernet)
+            store.load()
+            stores.append(store)
+            return store
+
+        def old_import(label: str):
+            store = fresh_store(f"old-{label}")
+
+            def run():
+                with open(paths["json"]) as f:
+                    imported_sessions = json.load(f)
+                store.update(imported_sessions)
+                store.flush()
+                return f"{len(imported_sessions)} sessions"
+            return run
+
+        elapsed, peak, stall, result = measure(old_import, on_worker=False)
+        print(f"{'json':<12} {'old':<10} {elapsed:7.2f}s {peak:9.1f} MB {stall:7.0f} ms  {result}")
+
+        for fmt, path in paths.items():
+            def streaming_import(label: str):
+                store = fresh_store(f"{fmt}-{label}")
+                return lambda: import_entries(store, iter_sessions(path), path)
+
+            elapsed, peak, stall, report = measure(streaming_import, on_worker=True)
+            print(f"{fmt:<12} {'streaming':<10} {elapsed:7.2f}s {peak:9.1f} MB {stall:7.0f} ms  "
+                  f"{report.added} added, {report.invalid} invalid")
+            if len(stores[-1]) != args.hosts:
+                raise AssertionError(f"{fmt}: {len(stores[-1])} sessions imported")
+        for store in stores:
+            store.close()
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
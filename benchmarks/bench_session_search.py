@@ -0,0 +1,114 @@
+"""
+Benchmark sidebar search over a large session inventory.
+
+Builds --sessions synthetic sessions (names, hosts, users and tags in the
+shape of an imported fleet) and replays queries one keystroke at a time, as
+the search box delivers them. Each keystroke is timed with the linear scan
+the sidebar used before and with SessionIndex; the budget is one 60 Hz frame
+(16 ms) per keystroke. Also reports the index build time and the cost of
+re-syncing after one session changed.
+
+Widget updates are not included; they need a display.
+
+Usage:
+    python benchmarks/bench_session_search.py [--sessions 10000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_index import SessionIndex
+from session_store import session_tags
+
+QUERIES = ["web", "prod-db", "10.20.3", "deploy", "tag:staging", "tag:prod api", "eu-west db-0", "zz-missing", "a"]
+ROLES = ["web", "api", "db", "cache", "queue", "worker", "lb", "search", "batch", "mon"]
+ENVIRONMENTS = ["prod", "staging", "dev", "qa"]
+REGIONS = ["eu-west", "eu-central", "us-east", "us-west", "ap-south"]
+USERS = ["deploy", "ubuntu", "admin", "ec2-user", "ops", "root"]
+
+
+def make_sessions(count: int):
+    rng = random.Random(1)
+    sessions = {}
+    for i in range(count):
+        role, environment, region = rng.choice(ROLES), rng.choice(ENVIRONMENTS), rng.choice(REGIONS)
+        name = f"{environment}-{role}-{i:05d}"
+        sessions[name] = {
+            "host": rng.choice([f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                                f"{role}{i}.{region}.example.com"]),
+            "port": 22,
+            "username": rng.choice(USERS),
+            "tags": [environment, role, region],
+        }
+    return sessions
+
+
+def linear_search(sessions, query: str):
+    """The previous sidebar filter: every term checked against every session."""
+    results = []
+    for name, session in sessions.items():
+        for term in query.lower().split():
+            tags = session_tags(session)
+            if term.startswith("tag:"):
+                if term[4:] not in tags:
+                    break
+            elif not (term in name.lower() or term in str(session.get("host", "")).lower() or
+                      term in str(session.get("username", "")).lower() or any(term in tag for tag in tags)):
+                break
+        else:
+            results.append(name)
+    return results
+
+
+def keystrokes(query: str):
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return (statistics.mean(samples) * 1000, samples[int(len(samples) * 0.99)] * 1000, samples[-1] * 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10000, help="sessions in the inventory")
+    args = parser.parse_args()
+
+    sessions = make_sessions(args.sessions)
+    start = time.perf_counter()
+    index = SessionIndex(sessions)
+    build = time.perf_counter() - start
+
+    linear, indexed = [], []
+    for query in QUERIES:
+        for text in keystrokes(query):
+            start = time.perf_counter()
+            expected = linear_search(sessions, text)
+            linear.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            found = index.search(text)
+            indexed.append(time.perf_counter() - start)
+            if set(found) != set(expected):
+                raise AssertionError(f"index and scan disagree on {text!r}")
+
+    name = next(iter(sessions))
+    sessions[name] = dict(sessions[name], host="renamed.example.com")
+    start = time.perf_counter()
+    index.sync(sessions)
+    resync = time.perf_counter() - start
+
+    print(f"{args.sessions} sessions, {len(linear)} keystrokes over {len(QUERIES)} queries")
+    print(f"{'search':<8} {'mean':>9} {'p99':>9} {'max':>9}")
+    for label, samples in (("linear", linear), ("index", indexed)):
+        mean, p99, worst = summarize(samples)
+        print(f"{label:<8} {mean:6.2f} ms {p99:6.2f} ms {worst:6.2f} ms")
+    print(f"\nindex build {build * 1000:.0f} ms, re-sync after one edit {resync * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark saving sessions after small edits to a large inventory.
+
+Creates --sessions sessions with passwords in a temporary directory and
+compares the old save (encrypt every password, rewrite the file) with
+SessionStore, which encrypts a password once when it is assigned, serializes
+only changed records and writes atomically:
+
+    add one     a new session is added to the full store, then saved
+    edit one    one session's tags are edited in place, then saved
+    burst       --burst edits in a row, each followed by save(), as the
+                GUI does; counts how many times the file is written
+    load        the old load (decrypt every password) against store.load(),
+                which leaves them encrypted, then one connect-time lookup
+
+Usage:
+    python benchmarks/bench_session_store.py [--sessions 10000] [--burst 50]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import session_store
+from session_store import SessionStore, decrypt_sessions, encrypt_sessions, make_fernet, read_sessions
+
+
+def make_sessions(count: int):
+    return {
+        f"host-{i:05d}": {"host": f"10.0.{i // 256}.{i % 256}", "port": 22, "username": "deploy",
+                          "password": f"secret-{i}", "ssh_key_path": "", "tags": ["fleet"]}
+        for i in range(count)
+    }
+
+
+def old_save(session_file: str, sessions, fernet) -> None:
+    """What save_sessions did before: encrypt everything and rewrite the file in place."""
+    with open(session_file, "w") as f:
+        json.dump(encrypt_sessions(sessions, fernet), f, indent=4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10000, help="sessions in the store")
+    parser.add_argument("--burst", type=int, default=50, help="edits saved in quick succession")
+    args = parser.parse_args()
+
+    from cryptography.fernet import Fernet
+    fernet = make_fernet(Fernet.generate_key())
+    workdir = tempfile.mkdtemp(prefix="bench-store-")
+    session_file = os.path.join(workdir, "sessions.json")
+    try:
+        sessions = make_sessions(args.sessions)
+        start = time.perf_counter()
+        old_save(session_file, sessions, fernet)
+        old_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decrypt_sessions(read_sessions(session_file), fernet)
+        old_load_seconds = time.perf_counter() - start
+
+        store = SessionStore(session_file, fernet, delay=0.2)
+        start = time.perf_counter()
+        store.load()
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        store.password("host-00042")
+        reveal_seconds = time.perf_counter() - start
+
+        print(f"{args.sessions} sessions, {os.path.getsize(session_file) / 1e6:.1f} MB")
+        print(f"{'save':<22} {'time':>9} {'encrypted':>10} {'serialized':>11}")
+        print(f"{'old: every save':<22} {old_seconds * 1000:6.0f} ms {args.sessions:10d} {args.sessions:11d}")
+
+        start = time.perf_counter()
+        store["new-host"] = {"host": "10.9.9.9", "port": 22, "username": "deploy", "password": "pw"}
+        store.flush()
+        print(f"{'store: add one':<22} {(time.perf_counter() - start) * 1000:6.0f} ms "
+              f"{store.encryptions:10d} {store.last_written:11d}")
+
+        store["host-00042"]["tags"].append("edited")
+        start = time.perf_counter()
+        store.flush()
+        print(f"{'store: edit one':<22} {(time.perf_counter() - start) * 1000:6.0f} ms "
+              f"{store.encryptions - 1:10d} {store.last_written:11d}")
+
+        writes = []
+        write_atomic = session_store.write_atomic
+        session_store.write_atomic = lambda path, data: (writes.append(path), write_atomic(path, data))
+        try:
+            for i in range(args.burst):
+                store[f"host-{i:05d}"]["port"] = 2222
+                store.save()
+            time.sleep(store.delay + 0.5)
+        finally:
+            session_store.write_atomic = write_atomic
+        print(f"\nburst of {args.burst} edits and saves: {len(writes)} file write(s), "
+              f"{store.last_written} records serialized")
+        print(f"\n{'load':<22} {'time':>9} {'decrypted':>10}")
+        print(f"{'old: decrypt all':<22} {old_load_seconds * 1000:6.0f} ms {args.sessions:10d}")
+        print(f"{'store: load':<22} {load_seconds * 1000:6.0f} ms {0:10d}")
+        print(f"{'store: one password':<22} {reveal_seconds * 1000:6.2f} ms {len(store.secrets):10d}")
+
+        reloaded = SessionStore(session_file, fernet)
+        reloaded.load()
+        if (reloaded["host-00042"]["tags"] != ["fleet", "edited"] or reloaded["host-00001"]["port"] != 2222
+                or reloaded.password("host-00042") != "secret-42"):
+            raise AssertionError("reloaded sessions do not match what was saved")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark recording a noisy session's output to disk.
+
+Feeds --megabytes of terminal output (colored log lines) in --chunk byte
+reads, paced at --rate MB/s like a channel reader, into each recorder:
+
+    log file        a buffered file written on the reader thread
+    gzip inline     a gzip file written on the reader thread
+    transcript      TranscriptSink in each format and compression: the
+                    reader only queues, a writer thread encodes, compresses
+                    and writes
+
+and reports the time spent inside write() on the reader thread (what a
+recorder slows the session down by), the time close() takes to drain the
+rest, the file size and any output dropped because the writer fell behind.
+
+Usage:
+    python benchmarks/bench_session_transcript.py [--megabytes 64] [--rate 100] [--chunk 16384]
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_sinks import OutputSink
+from session_transcript import GZIP_LEVEL, TranscriptSink, zstd_available
+
+
+class InlineFileSink(OutputSink):
+    """Write through a large buffer on the reader thread, for comparison."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab", buffering=65536)
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class InlineGzipSink(OutputSink):
+    """Compress on the reader thread, for comparison."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def make_output(size: int) -> bytes:
+    lines = []
+    total = 0
+    number = 0
+    while total < size:
+        line = (f"\x1b[32m2026-10-17T07:{number // 60 % 60:02d}:{number % 60:02d}Z\x1b[0m INFO "
+                f"worker-{number % 16} handled request {number} in {number % 997 / 10:.1f} ms "
+                f"path=/api/v1/items/{number * 7919 % 100000} status=200\r\n").encode()
+        lines.append(line)
+        total += len(line)
+        number += 1
+    return b"".join(lines)[:size]
+
+
+def feed(sink: OutputSink, output: bytes, chunk: int, rate: float):
+    """Write the output in chunks at ``rate`` MB/s (0 = as fast as possible); returns (write s, close s)."""
+    in_write = 0.0
+    started = time.perf_counter()
+    view = memoryview(output)
+    for offset in range(0, len(output), chunk):
+        start = time.perf_counter()
+        sink.write(view[offset:offset + chunk])
+        in_write += time.perf_counter() - start
+        if rate:
+            ahead = (offset + chunk) / (rate * 1e6) - (time.perf_counter() - started)
+            if ahead > 0.001:
+                time.sleep(ahead)
+    start = time.perf_counter()
+    sink.close()
+    return in_write, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=64, help="output to record")
+    parser.add_argument("--rate", type=float, default=100, help="output rate in MB/s, 0 for unpaced")
+    parser.add_argument("--chunk", type=int, default=16384, help="bytes per channel read")
+    args = parser.parse_args()
+
+    output = make_output(int(args.megabytes * 1e6))
+    workdir = tempfile.mkdtemp(prefix="bench-transcript-")
+    try:
+        recorders = [
+            ("log file", lambda: InlineFileSink(os.path.join(workdir, "plain.log"))),
+            ("gzip inline", lambda: InlineGzipSink(os.path.join(workdir, "inline.log.gz"))),
+        ]
+        compressions = ["none", "gzip"] + (["zstd"] if zstd_available() else [])
+        for fmt in ("raw", "asciicast"):
+            for compression in compressions:
+                recorders.append((f"{fmt} {compression}", lambda fmt=fmt, compression=compression: TranscriptSink(
+                    workdir, f"{fmt}-{compression}", fmt, compression, max_bytes=0)))
+
+        print(f"{args.megabytes:.0f} MB in {args.chunk} byte reads at "
+              f"{f'{args.rate:.0f} MB/s' if args.rate else 'full speed'}"
+              f"{'' if zstd_available() else ' (zstd: zstandard not installed)'}")
+        print(f"{'recorder':<20} {'in write()':>11} {'per MB':>9} {'close':>9} {'file':>9}  dropped")
+        for label, make in recorders:
+            sink = make()
+            in_write, closing = feed(sink, output, args.chunk, args.rate)
+            paths = getattr(sink, "paths", None) or [sink.path]
+            size = sum(os.path.getsize(path) for path in paths)
+            dropped = getattr(sink, "dropped", 0)
+            print(f"{label:<20} {in_write * 1000:8.0f} ms {in_write * 1000 / args.megabytes:6.2f} ms "
+                  f"{closing * 1000:6.0f} ms {size / 1e6:6.1f} MB  {dropped / 1e6:.1f} MB")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
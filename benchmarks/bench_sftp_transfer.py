@@ -0,0 +1,279 @@
+"""
+Benchmark SFTP transfer throughput in MB/s against a local stand-in server.
+
+A paramiko SFTP server serving a temporary directory runs in-process on a
+socket pair, optionally behind a relay that adds round-trip latency so the
+effect of pipelining is visible as it would be on a real network. Each
+case uploads and then downloads the same data:
+
+    large   one big file
+    small   many small files
+
+and compares a naive client (one file at a time, every request waits for
+its reply) with TransferManager at 1 and --parallel workers.
+
+Usage:
+    python benchmarks/bench_sftp_transfer.py [--large-mb 64] [--small-count 400]
+        [--small-kb 16] [--latency-ms 0] [--parallel 4]
+"""
+import argparse
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import paramiko
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sftp_transfer import TransferManager
+
+
+class StubServer(paramiko.ServerInterface):
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+class StubSFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class StubSFTPServer(paramiko.SFTPServerInterface):
+    """Serves files below ROOT, enough of the protocol for the benchmark."""
+
+    ROOT = None
+
+    def _local(self, path):
+        return os.path.join(self.ROOT, self.canonicalize(path).lstrip("/"))
+
+    def list_folder(self, path):
+        local = self._local(path)
+        try:
+            return [
+                paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(local, name)), name)
+                for name in os.listdir(local)
+            ]
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._local(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        local = self._local(path)
+        try:
+            fd = os.open(local, flags, 0o644)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        if flags & os.O_WRONLY:
+            mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            mode = "rb"
+        handle = StubSFTPHandle(flags)
+        handle.filename = local
+        handle.readfile = handle.writefile = os.fdopen(fd, mode)
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(self._local(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        try:
+            os.rename(self._local(oldpath), self._local(newpath))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    posix_rename = rename
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._local(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+
+def latency_relay(sock: socket.socket, latency: float) -> socket.socket:
+    """Return a socket whose traffic reaches ``sock`` after ``latency`` seconds in each direction."""
+    outer, inner = socket.socketpair()
+
+    def pump(src, dst):
+        pending = []
+        lock = threading.Condition()
+
+        def sender():
+            while True:
+                with lock:
+                    while not pending:
+                        lock.wait()
+                    due, data = pending.pop(0)
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                if not data:
+                    return
+                try:
+                    dst.sendall(data)
+                except OSError:
+                    return  # The other side closed at the end of a run
+
+        threading.Thread(target=sender, daemon=True).start()
+        while True:
+            try:
+                data = src.recv(65536)
+            except OSError:
+                data = b""
+            with lock:
+                pending.append((time.monotonic() + latency, data))
+                lock.notify()
+            if not data:
+                return
+
+    threading.Thread(target=pump, args=(inner, sock), daemon=True).start()
+    threading.Thread(target=pump, args=(sock, inner), daemon=True).start()
+    return outer
+
+
+def connect(root: str, latency: float):
+    """Start a server transport on a socket pair and connect to it. Returns (client, server)."""
+    StubSFTPServer.ROOT = root
+    server_sock, client_sock = socket.socketpair()
+    if latency:
+        client_sock = latency_relay(client_sock, latency)
+
+    server = paramiko.Transport(server_sock)
+    server.add_server_key(paramiko.RSAKey.generate(2048))
+    server.set_subsystem_handler("sftp", paramiko.SFTPServer, StubSFTPServer)
+    # With an event, start_server() returns at once and negotiates in the background
+    server.start_server(event=threading.Event(), server=StubServer())
+
+    client = paramiko.Transport(client_sock)
+    client.connect(username="bench", password="bench")
+    return client, server
+
+
+def naive_copy(sftp, files, upload: bool) -> None:
+    """Baseline: one file at a time, each 32 KiB request waits for its reply."""
+    for local_path, remote_path in files:
+        if upload:
+            with open(local_path, "rb") as local, sftp.open(remote_path, "wb") as remote:
+                while True:
+                    data = local.read(32768)
+                    if not data:
+                        break
+                    remote.write(data)
+        else:
+            with sftp.open(remote_path, "rb") as remote, open(local_path, "wb") as local:
+                while True:
+                    data = remote.read(32768)
+                    if not data:
+                        break
+                    local.write(data)
+
+
+def manager_copy(transport, files, upload: bool, parallel: int) -> None:
+    manager = TransferManager(lambda: paramiko.SFTPClient.from_transport(transport), max_parallel=parallel)
+    sftp = paramiko.SFTPClient.from_transport(transport)
+    jobs = []
+    for local_path, remote_path in files:
+        if upload:
+            jobs += manager.upload(local_path, remote_path, resume=False)
+        else:
+            jobs += manager.download(remote_path, local_path, resume=False, sftp=sftp)
+    while any(job.active for job in jobs):
+        time.sleep(0.005)
+    sftp.close()
+    manager.close()
+    failed = [job for job in jobs if job.error]
+    if failed:
+        raise RuntimeError(f"{len(failed)} transfers failed, first: {failed[0].error}")
+
+
+def make_case(workdir: str, name: str, count: int, size: int):
+    source = os.path.join(workdir, f"{name}-src")
+    os.makedirs(source)
+    files = []
+    for i in range(count):
+        path = os.path.join(source, f"f{i:05d}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        files.append(path)
+    return files
+
+
+def run_case(name, files, total_bytes, server_root, workdir, latency, parallel):
+    variants = [("naive", None), ("manager x1", 1), (f"manager x{parallel}", parallel)]
+    for label, workers in variants:
+        transport, server = connect(server_root, latency)
+        remote_dir = f"/{name}-{label.replace(' ', '')}"
+        download_dir = os.path.join(workdir, f"{name}-{label.replace(' ', '')}-down")
+        os.makedirs(download_dir)
+        sftp = paramiko.SFTPClient.from_transport(transport)
+        sftp.mkdir(remote_dir)
+        up = [(path, f"{remote_dir}/{os.path.basename(path)}") for path in files]
+        down = [(os.path.join(download_dir, os.path.basename(path)), remote) for path, remote in up]
+
+        results = []
+        for direction, pairs in (("upload", up), ("download", down)):
+            start = time.perf_counter()
+            if workers is None:
+                naive_copy(sftp, pairs, direction == "upload")
+            else:
+                manager_copy(transport, pairs, direction == "upload", workers)
+            results.append(total_bytes / 1e6 / (time.perf_counter() - start))
+        # Close both ends; a server left running logs the reset of its socket to stderr
+        sftp.close()
+        transport.close()
+        server.close()
+        print(f"{name:<7} {label:<12} upload {results[0]:8.1f} MB/s   download {results[1]:8.1f} MB/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--large-mb", type=int, default=64, help="size of the large file")
+    parser.add_argument("--small-count", type=int, default=400, help="number of small files")
+    parser.add_argument("--small-kb", type=int, default=16, help="size of each small file")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added one-way latency")
+    parser.add_argument("--parallel", type=int, default=4, help="workers for the parallel run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-sftp-")
+    try:
+        server_root = os.path.join(workdir, "server")
+        os.makedirs(server_root)
+        latency = args.latency_ms / 1000
+        print(f"latency {args.latency_ms:g} ms each way")
+
+        large = make_case(workdir, "large", 1, args.large_mb * 1024 * 1024)
+        run_case("large", large, args.large_mb * 1024 * 1024, server_root, workdir, latency, args.parallel)
+
+        small = make_case(workdir, "small", args.small_count, args.small_kb * 1024)
+        run_case("small", small, args.small_count * args.small_kb * 1024, server_root, workdir, latency, args.parallel)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark cold-start cost of the command-line, library and GUI entry points.
+
+Each mode runs in a fresh interpreter. Wall time is the median of --runs
+process launches; import time is the sum of the "self" column reported by
+`python -X importtime`, with the heaviest direct dependencies of the
+entry module listed so a regression can be traced to the module that
+caused it.
+
+Modes:
+    cli list   `main.py list` against a temporary sessions.json
+    cli exec   imports needed before `main.py exec` opens a connection
+    library    `import ssh_connection` for scripts using the client API
+    gui        `import gui_app` (the window itself is not created)
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--top 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def modes(data_dir: str):
+    return [
+        ("cli list", [os.path.join(REPO_DIR, "main.py"), "--data-dir", data_dir, "list"]),
+        ("cli exec", ["-c", "import cli, ssh_connection, transport_pool"]),
+        ("library", ["-c", "import ssh_connection"]),
+        ("gui", ["-c", "import gui_app"]),
+    ]
+
+
+def wall_time(args, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=REPO_DIR, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def import_profile(args):
+    """Return total import time in microseconds and the entry modules' direct imports by cumulative time."""
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=REPO_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    total = 0
+    direct = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        # Nesting is shown by indentation; one level deep means imported by an entry module
+        if name.startswith("  ") and not name.startswith("    "):
+            direct.append((int(cumulative_us), name.strip()))
+    direct.sort(reverse=True)
+    return total, direct
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="process launches per mode")
+    parser.add_argument("--top", type=int, default=5, help="heaviest dependencies to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        sessions = {
+            f"host{i}": {"host": f"10.0.0.{i}", "port": "22", "username": "admin", "password": "", "tags": ["bench"]}
+            for i in range(50)
+        }
+        with open(os.path.join(data_dir, "sessions.json"), "w") as f:
+            json.dump(sessions, f)
+
+        print(f"{'mode':<10} {'wall (median)':>14} {'imports':>10}   heaviest imports")
+        for name, mode_args in modes(data_dir):
+            wall = wall_time(mode_args, args.runs)
+            total, direct = import_profile(mode_args)
+            heaviest = ", ".join(f"{module} {us / 1000:.1f}ms" for us, module in direct[:args.top])
+            print(f"{name:<10} {wall * 1000:11.1f} ms {total / 1000:7.1f} ms   {heaviest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark TerminalScreen parser throughput in MB/s.
+
+Built-in captures reproduce the escape-sequence mix of common programs
+(coloured `ls`, a `top` refresh loop, a `vim` editing session and a plain
+log tail). Real recordings can be added with --capture: any file of raw
+terminal output, e.g. produced by `script -q out.raw`.
+
+Usage:
+    python benchmarks/bench_terminal_parser.py [--size-mb 4] [--chunk 32768] [--capture FILE ...]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from terminal_screen import TerminalScreen
+
+
+def capture_ls_color(size: int) -> str:
+    rng = random.Random(1)
+    colours = ["01;34", "01;32", "01;36", "00", "40;33;01", "01;35"]
+    parts = []
+    total = 0
+    while total < size:
+        name = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz_.-") for _ in range(rng.randint(4, 18)))
+        entry = f"\x1b[0m\x1b[{rng.choice(colours)}m{name}\x1b[0m  "
+        if rng.random() < 0.2:
+            entry += "\r\n"
+        parts.append(entry)
+        total += len(entry)
+    return "".join(parts)
+
+
+def capture_top(size: int) -> str:
+    rng = random.Random(2)
+    parts = []
+    total = 0
+    while total < size:
+        frame = ["\x1b[H\x1b[?25l"]
+        frame.append(f"top - 12:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} up 3 days,  load average: 0.{rng.randint(0, 99)}\x1b[K\r\n")
+        frame.append("\x1b[7m    PID USER      PR  NI    VIRT    RES  %CPU  %MEM COMMAND          \x1b[m\x1b[K\r\n")
+        for row in range(3, 24):
+            frame.append(
+                f"\x1b[{row};1H\x1b[m{rng.randint(1, 99999):>7} root      20   0 {rng.randint(1000, 999999):>7} "
+                f"{rng.randint(100, 99999):>6} \x1b[1m{rng.random() * 100:5.1f}\x1b[m {rng.random() * 10:5.1f} proc{row}\x1b[K"
+            )
+        frame.append("\x1b[J\x1b[?25h")
+        chunk = "".join(frame)
+        parts.append(chunk)
+        total += len(chunk)
+    return "".join(parts)
+
+
+def capture_vim(size: int) -> str:
+    rng = random.Random(3)
+    parts = ["\x1b[?1049h\x1b[22;0;0t\x1b[H\x1b[2J\x1b[1;23r"]
+    total = len(parts[0])
+    while total < size:
+        op = rng.random()
+        if op < 0.4:
+            chunk = f"\x1b[{rng.randint(1, 23)};{rng.randint(1, 70)}H\x1b[38;5;{rng.randint(0, 255)}m" + "x" * rng.randint(1, 10) + "\x1b[m"
+        elif op < 0.6:
+            chunk = f"\x1b[{rng.randint(1, 23)};1H\x1b[{rng.randint(1, 3)}L"
+        elif op < 0.8:
+            chunk = f"\x1b[{rng.randint(1, 23)};1H\x1b[{rng.randint(1, 3)}M"
+        elif op < 0.9:
+            chunk = "\x1b[1;1H\x1bM" + "~" + "\x1b[K"
+        else:
+            chunk = f"\x1b[24;1H\x1b[1m-- INSERT --\x1b[m\x1b[24;63H{rng.randint(1, 999)},{rng.randint(1, 80)}\x1b[K"
+        parts.append(chunk)
+        total += len(chunk)
+    parts.append("\x1b[?1049l")
+    return "".join(parts)
+
+
+def capture_log(size: int) -> str:
+    rng = random.Random(4)
+    levels = ["INFO", "DEBUG", "WARN", "ERROR"]
+    parts = []
+    total = 0
+    while total < size:
+        line = f"2024-05-0{rng.randint(1, 9)} 10:{rng.randint(0, 59):02d} {rng.choice(levels)} worker[{rng.randint(1, 64)}]: processed request id={rng.getrandbits(64):x}\r\n"
+        parts.append(line)
+        total += len(line)
+    return "".join(parts)
+
+
+def run(name: str, data: str, chunk: int) -> None:
+    screen = TerminalScreen(columns=80, rows=24)
+    encoded_size = len(data.encode("utf-8"))
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk):
+        screen.feed(data[offset:offset + chunk])
+        screen.take_updates()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<20} {encoded_size / 1e6:8.2f} MB  {elapsed:7.3f} s  {encoded_size / 1e6 / elapsed:8.2f} MB/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=4.0, help="size of each built-in capture")
+    parser.add_argument("--chunk", type=int, default=32768, help="characters fed per call, like one channel read")
+    parser.add_argument("--capture", action="append", default=[], help="raw terminal recording to replay")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1e6)
+    captures = [
+        ("ls --color", capture_ls_color(size)),
+        ("top", capture_top(size)),
+        ("vim", capture_vim(size)),
+        ("log tail", capture_log(size)),
+    ]
+    for path in args.capture:
+        with open(path, "rb") as f:
+            captures.append((os.path.basename(path), f.read().decode("utf-8", errors="replace")))
+
+    for name, data in captures:
+        run(name, data, args.chunk)
+
+
+if __name__ == "__main__":
+    main()
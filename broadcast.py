@@ -0,0 +1,309 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from channel_reactor import ChannelReactor
+
+# Output kept per host; anything beyond is dropped and the result is flagged as truncated
+BROADCAST_OUTPUT_LIMIT = 1024 * 1024
+
+# Channels opened concurrently; each open is one network round trip
+BROADCAST_OPEN_WORKERS = 32
+
+
+class BroadcastResult:
+    """Outcome of a broadcast command on one session."""
+
+    def __init__(self, session_name: str):
+        self.session_name = session_name
+        self.started = time.monotonic()
+        self.duration: Optional[float] = None
+        self.exit_status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.truncated = False
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    def append(self, data: bytes) -> None:
+        room = BROADCAST_OUTPUT_LIMIT - self._size
+        if room <= 0:
+            self.truncated = True
+            return
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+
+    @property
+    def output(self) -> str:
+        return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.exit_status == 0
+
+    def status_text(self) -> str:
+        if self.error:
+            return self.error
+        return f"exit {self.exit_status}"
+
+
+class Broadcast:
+    """
+    Run one command on many connected sessions at once.
+
+    Exec channels are opened on each session's existing transport by a small
+    worker pool, then watched by a dedicated ChannelReactor, so hundreds of
+    hosts cost one I/O thread rather than one thread per host. stderr is
+    merged into stdout, as it would be on a terminal.
+    """
+
+    def __init__(self, command: str, transports: Dict[str, object], timeout: float = 60.0,
+                 on_result: Optional[Callable[[BroadcastResult], None]] = None,
+                 on_complete: Optional[Callable[["Broadcast"], None]] = None):
+        """
+        Args:
+            command (str): Command line to execute on every session
+            transports (Dict[str, object]): Session name -> connected paramiko Transport
+            timeout (float): Seconds before unfinished commands are abandoned
+            on_result: Called from a worker thread as each host finishes
+            on_complete: Called from a worker thread once every host has finished
+        """
+        self.logger = logging.getLogger(__name__)
+        self.command = command
+        self.transports = dict(transports)
+        self.timeout = timeout
+        self.on_result = on_result
+        self.on_complete = on_complete
+
+        self.results: Dict[str, BroadcastResult] = {
+            name: BroadcastResult(name) for name in self.transports
+        }
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._pending = set(self.transports)
+        self._channels: Dict[str, object] = {}
+        self._reactor = ChannelReactor()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(BROADCAST_OPEN_WORKERS, len(self.transports))),
+            thread_name_prefix="broadcast"
+        )
+        self._timer: Optional[threading.Timer] = None
+
+    def start(self) -> "Broadcast":
+        """Open a channel on every session and start collecting output."""
+        if not self.transports:
+            self._complete()
+            return self
+        self._reactor.start()
+        self._timer = threading.Timer(self.timeout, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+        for name, transport in self.transports.items():
+            self._executor.submit(self._open, name, transport)
+        return self
+
+    def cancel(self) -> None:
+        """Abandon every command that has not finished yet."""
+        self._abandon("Cancelled")
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def _open(self, session_name: str, transport) -> None:
+        """Open an exec channel and hand it to the reactor. Runs on the worker pool."""
+        result = self.results[session_name]
+        try:
+            channel = transport.open_session(timeout=self.timeout)
+            channel.set_combine_stderr(True)
+            with self._lock:
+                if session_name not in self._pending:
+                    channel.close()
+                    return
+                self._channels[session_name] = channel
+            channel.exec_command(self.command)
+            self._reactor.register(session_name, channel, self._on_data, self._on_close)
+        except Exception as e:
+            self.logger.error(f"Broadcast to {session_name} failed: {e}")
+            result.error = f"Error: {e}"
+            channel = self._channels.get(session_name)
+            if channel is not None:
+                channel.close()
+            self._finish(session_name)
+
+    def _on_data(self, session_name: str, data: bytes) -> None:
+        self.results[session_name].append(data)
+
+    def _on_close(self, session_name: str) -> None:
+        # Waiting for the exit status must not block the reactor thread
+        self._executor.submit(self._collect_exit_status, session_name)
+
+    def _collect_exit_status(self, session_name: str) -> None:
+        channel = self._channels.get(session_name)
+        result = self.results[session_name]
+        if channel is not None:
+            # The exit-status message can trail the EOF slightly
+            if channel.status_event.wait(5.0):
+                result.exit_status = channel.exit_status
+            elif result.error is None:
+                result.error = "No exit status"
+            channel.close()
+        self._finish(session_name)
+
+    def _expire(self) -> None:
+        self._abandon(f"Timed out after {self.timeout:g}s")
+
+    def _abandon(self, reason: str) -> None:
+        with self._lock:
+            remaining = list(self._pending)
+        for name in remaining:
+            self._reactor.unregister(name)
+            channel = self._channels.get(name)
+            if channel is not None:
+                channel.close()
+            if self.results[name].error is None:
+                self.results[name].error = reason
+            self._finish(name)
+
+    def _finish(self, session_name: str) -> None:
+        """Record a host as finished exactly once and complete the broadcast after the last one."""
+        with self._lock:
+            if session_name not in self._pending:
+                return
+            self._pending.discard(session_name)
+            last = not self._pending
+
+        result = self.results[session_name]
+        result.duration = time.monotonic() - result.started
+        if self.on_result:
+            try:
+                self.on_result(result)
+            except Exception as e:
+                self.logger.error(f"Error in broadcast result callback: {e}")
+        if last:
+            self._complete()
+
+    def _complete(self) -> None:
+        self.finished = time.monotonic()
+        if self._timer:
+            self._timer.cancel()
+        self._reactor.stop()
+        self._executor.shutdown(wait=False)
+        if self.on_complete:
+            try:
+                self.on_complete(self)
+            except Exception as e:
+                self.logger.error(f"Error in broadcast completion callback: {e}")
+
+    def report(self) -> str:
+        """Render the results as a grouped, dshbak -c style report."""
+        return format_report(self)
+
+
+def natural_key(name: str) -> list:
+    """Sort key that orders ``web2`` before ``web10``."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def fold_names(names: List[str]) -> str:
+    """
+    Collapse host names that differ only in a trailing number into ranges.
+
+    ``["web1", "web2", "web3", "web7", "db"]`` becomes ``"db,web[1-3,7]"``.
+    """
+    groups: Dict[Tuple[str, int], List[int]] = {}
+    plain = []
+    for name in names:
+        match = re.match(r"^(.*?)(\d+)$", name)
+        if match:
+            prefix, digits = match.groups()
+            # Zero-padded numbers only fold with numbers of the same width
+            width = len(digits) if digits.startswith("0") else 0
+            groups.setdefault((prefix, width), []).append(int(digits))
+        else:
+            plain.append(name)
+
+    # Unpadded numbers of the right length belong to a padded group with the same prefix
+    for prefix, width in [key for key in groups if key[1]]:
+        unpadded = groups.get((prefix, 0), [])
+        groups[(prefix, width)].extend(n for n in unpadded if len(str(n)) == width)
+        if unpadded:
+            groups[(prefix, 0)] = [n for n in unpadded if len(str(n)) != width]
+            if not groups[(prefix, 0)]:
+                del groups[(prefix, 0)]
+
+    parts = list(plain)
+    for (prefix, width), numbers in groups.items():
+        numbers = sorted(set(numbers))
+        if len(numbers) == 1:
+            parts.append(f"{prefix}{numbers[0]:0{width}d}")
+            continue
+        ranges = []
+        start = prev = numbers[0]
+        for number in numbers[1:] + [None]:
+            if number is not None and number == prev + 1:
+                prev = number
+                continue
+            ranges.append(f"{start:0{width}d}" if start == prev else f"{start:0{width}d}-{prev:0{width}d}")
+            if number is not None:
+                start = prev = number
+        parts.append(f"{prefix}[{','.join(ranges)}]")
+    return ",".join(sorted(parts))
+
+
+def group_results(results: List[BroadcastResult]) -> List[Tuple[str, List[str]]]:
+    """Group hosts with byte-identical output, largest group first."""
+    groups: Dict[str, List[str]] = {}
+    for result in results:
+        if result.error and not result.output:
+            continue
+        groups.setdefault(result.output, []).append(result.session_name)
+    return sorted(groups.items(), key=lambda item: (-len(item[1]), natural_key(item[1][0])))
+
+
+def format_report(broadcast: Broadcast) -> str:
+    """Summary line, grouped output and a per-host status table."""
+    results = list(broadcast.results.values())
+    ok = sum(1 for r in results if r.ok)
+    errors = sum(1 for r in results if r.error)
+    elapsed = (broadcast.finished or time.monotonic()) - broadcast.started
+    lines = [
+        f"$ {broadcast.command}",
+        f"{len(results)} hosts: {ok} succeeded, {len(results) - ok - errors} non-zero exit, "
+        f"{errors} failed in {elapsed:.1f}s",
+        ""
+    ]
+
+    for output, names in group_results(results):
+        header = f"{fold_names(names)} ({len(names)})"
+        lines.append("-" * min(len(header), 78))
+        lines.append(header)
+        lines.append("-" * min(len(header), 78))
+        lines.append(output.rstrip("\n") if output.strip() else "(no output)")
+        lines.append("")
+
+    by_status: Dict[str, List[str]] = {}
+    for result in results:
+        by_status.setdefault(result.status_text(), []).append(result.session_name)
+    lines.append("Status:")
+    for status, names in sorted(by_status.items()):
+        lines.append(f"  {status}: {fold_names(names)}")
+    lines.append("")
+
+    lines.append("Per host:")
+    name_width = max((len(r.session_name) for r in results), default=0)
+    status_width = max((len(r.status_text()) for r in results), default=0)
+    for result in sorted(results, key=lambda r: natural_key(r.session_name)):
+        duration = f"{result.duration:.2f}s" if result.duration is not None else "-"
+        truncated = " (output truncated)" if result.truncated else ""
+        lines.append(
+            f"  {result.session_name:<{name_width}}  {result.status_text():<{status_width}}  {duration:>8}{truncated}"
+        )
+    return "\n".join(lines)
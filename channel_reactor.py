@@ -0,0 +1,200 @@
+import logging
+import selectors
+import socket
+import threading
+from typing import Callable, Dict, Optional
+
+# Maximum bytes requested from a channel per recv() call
+CHANNEL_READ_SIZE = 32768
+
+# Upper bound on bytes drained from one channel per wakeup, so a fast producer cannot starve the others
+CHANNEL_DRAIN_LIMIT = 1024 * 1024
+
+
+class _ChannelEntry:
+    """Bookkeeping for a single channel watched by the reactor."""
+
+    __slots__ = ("session_name", "channel", "fd", "on_data", "on_close", "closed")
+
+    def __init__(self, session_name: str, channel, fd: int,
+                 on_data: Callable[[str, bytes], None],
+                 on_close: Optional[Callable[[str], None]]):
+        self.session_name = session_name
+        self.channel = channel
+        self.fd = fd
+        self.on_data = on_data
+        self.on_close = on_close
+        self.closed = False
+
+
+class ChannelReactor:
+    """
+    Single I/O thread that multiplexes every open SSH channel.
+
+    Each paramiko ``Channel`` exposes a ``fileno()`` that becomes readable when
+    data arrives or the channel closes, so one selector can watch any number of
+    sessions. The thread sleeps in ``select()`` while every session is idle and
+    dispatches ``on_data(session_name, data)`` with everything drained from a
+    channel in one wakeup.
+    """
+
+    def __init__(self, read_size: int = CHANNEL_READ_SIZE, drain_limit: int = CHANNEL_DRAIN_LIMIT):
+        self.logger = logging.getLogger(__name__)
+        self.read_size = read_size
+        self.drain_limit = drain_limit
+
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _ChannelEntry] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Self-pipe used to interrupt select() when channels are added or removed
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, None)
+
+    def start(self) -> None:
+        """Start the reactor thread if it is not already running."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="ChannelReactor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reactor thread and forget every registered channel."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            for entry in self._entries.values():
+                entry.closed = True
+                self._unregister_fd(entry.fd)
+            self._entries.clear()
+        self._wakeup()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def register(self, session_name: str, channel,
+                 on_data: Callable[[str, bytes], None],
+                 on_close: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Start watching a channel on behalf of a session.
+
+        Args:
+            session_name (str): Key used when dispatching callbacks
+            channel: paramiko Channel (or any object with the same read interface)
+            on_data: Called from the reactor thread with the drained bytes
+            on_close: Called from the reactor thread once the remote side closes
+        """
+        self.unregister(session_name)
+        fd = channel.fileno()
+        entry = _ChannelEntry(session_name, channel, fd, on_data, on_close)
+        with self._lock:
+            self._entries[session_name] = entry
+            self._selector.register(fd, selectors.EVENT_READ, entry)
+        self._wakeup()
+        self.logger.debug(f"Reactor watching channel for {session_name}")
+
+    def unregister(self, session_name: str) -> None:
+        """Stop watching a session's channel. Call this before closing the channel."""
+        with self._lock:
+            entry = self._entries.pop(session_name, None)
+            if entry is None:
+                return
+            entry.closed = True
+            self._unregister_fd(entry.fd)
+        self._wakeup()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _unregister_fd(self, fd: int) -> None:
+        """Remove a descriptor from the selector. Caller holds the lock."""
+        try:
+            self._selector.unregister(fd)
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_send.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # A wakeup is already pending
+
+    def _drain_wakeup(self) -> None:
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self) -> None:
+        """Reactor loop: sleep until any channel is readable, then service the ready ones."""
+        while self._running:
+            try:
+                events = self._selector.select()
+            except (OSError, ValueError) as e:
+                # A descriptor was closed underneath us; drop it on the next pass
+                self.logger.warning(f"Reactor select failed: {e}")
+                self._prune_closed()
+                continue
+
+            for key, _ in events:
+                entry = key.data
+                if entry is None:
+                    self._drain_wakeup()
+                elif not entry.closed:
+                    self._service(entry)
+
+    def _service(self, entry: _ChannelEntry) -> None:
+        """Drain one ready channel and dispatch its output or its close."""
+        channel = entry.channel
+        try:
+            chunks = []
+            pending = 0
+            while pending < self.drain_limit and channel.recv_ready():
+                data = channel.recv(self.read_size)
+                if not data:
+                    break
+                chunks.append(data)
+                pending += len(data)
+
+            if chunks:
+                # A single read is handed over as-is; only multi-read wakeups are joined
+                entry.on_data(entry.session_name, chunks[0] if len(chunks) == 1 else b"".join(chunks))
+            elif channel.closed or channel.eof_received or channel.exit_status_ready():
+                self._close_entry(entry)
+
+        except Exception as e:
+            self.logger.error(f"Error servicing channel for {entry.session_name}: {e}")
+            self._close_entry(entry)
+
+    def _close_entry(self, entry: _ChannelEntry) -> None:
+        with self._lock:
+            if self._entries.get(entry.session_name) is entry:
+                del self._entries[entry.session_name]
+            if entry.closed:
+                return
+            entry.closed = True
+            self._unregister_fd(entry.fd)
+
+        self.logger.info(f"Channel closed for {entry.session_name}")
+        if entry.on_close:
+            try:
+                entry.on_close(entry.session_name)
+            except Exception as e:
+                self.logger.error(f"Error in close callback for {entry.session_name}: {e}")
+
+    def _prune_closed(self) -> None:
+        """Drop entries whose channel has gone away without an orderly close."""
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            if getattr(entry.channel, "closed", False):
+                self._close_entry(entry)
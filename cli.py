@@ -0,0 +1,397 @@
+import argparse
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from typing import List
+
+from session_store import load_preferences, load_saved_sessions, select_sessions, session_tags
+
+# Sessions, key and preferences live next to the application, as for the GUI
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def list_sessions(args: argparse.Namespace) -> int:
+    """Print saved sessions. Passwords are never decrypted for this."""
+    sessions = load_saved_sessions(args.data_dir, decrypt=False)
+    try:
+        names = select_sessions(sessions, args.session, args.tag, args.all or not (args.session or args.tag))
+    except KeyError as e:
+        print(f"error: {e.args[0]}", file=sys.stderr)
+        return 2
+
+    if args.names_only:
+        for name in names:
+            print(name)
+        return 0
+
+    width = max((len(name) for name in names), default=0)
+    for name in names:
+        session = sessions[name]
+        target = f"{session.get('username', '')}@{session.get('host', '')}:{session.get('port') or 22}"
+        tags = ",".join(session_tags(session))
+        print(f"{name:<{width}}  {target}" + (f"  [{tags}]" if tags else ""))
+    return 0
+
+
+def connect_session(pool, session, preferences, sessions=None):
+    """Open a pooled ModernSSHClient for a saved session record, through its jump hosts if it has any."""
+    from ssh_connection import ModernSSHClient, connection_params, jump_host_params
+
+    params = connection_params(session, preferences)
+    jump_hosts = jump_host_params(session, sessions or {}, lambda record: connection_params(record, preferences))
+    client = ModernSSHClient()
+    try:
+        client.connect_pooled(
+            pool,
+            hostname=params["host"],
+            username=params["username"],
+            password=params["password"],
+            key_filename=params["key_file"],
+            port=params["port"],
+            jump_hosts=jump_hosts,
+            timeout=params["connect_timeout"],
+            banner_timeout=params["connect_timeout"],
+            auth_timeout=params["auth_timeout"]
+        )
+    except Exception:
+        client.close()
+        raise
+    return client
+
+
+def make_printer(targets: List[str], no_prefix: bool):
+    """Return emit(session_name, stream_name, line), which prints one line prefixed by its session."""
+    print_lock = threading.Lock()
+    width = max(len(name) for name in targets)
+
+    def emit(session_name: str, stream_name: str, line: str) -> None:
+        out = sys.stderr if stream_name == "stderr" else sys.stdout
+        prefix = "" if no_prefix else f"{session_name:<{width}}: "
+        with print_lock:
+            out.write(f"{prefix}{line}\n")
+            out.flush()
+
+    return emit
+
+
+def select_targets(args: argparse.Namespace, sessions) -> List[str]:
+    """Resolve the selection options; prints an error and returns [] if nothing usable was selected."""
+    try:
+        targets = select_sessions(sessions, args.session, args.tag, args.all)
+    except KeyError as e:
+        print(f"error: {e.args[0]}", file=sys.stderr)
+        return []
+    if not targets:
+        print("error: no sessions selected (use --session, --tag or --all)", file=sys.stderr)
+    return targets
+
+
+def run_exec_command(args: argparse.Namespace) -> int:
+    """
+    Run one command on the selected saved sessions and print prefixed output.
+
+    Returns:
+        int: Highest remote exit status, or 255 if any host failed to connect or timed out
+    """
+    # The connection layer pulls in paramiko; only load it when a command actually runs
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from ssh_connection import CommandTimeout
+    from transport_pool import TransportPool
+
+    sessions = load_saved_sessions(args.data_dir)
+    preferences = load_preferences(args.data_dir)
+    targets = select_targets(args, sessions)
+    if not targets:
+        return 2
+
+    command = " ".join(args.remote_command)
+    pool = TransportPool(idle_timeout=0)
+    emit = make_printer(targets, args.no_prefix)
+
+    def run_on(session_name: str) -> int:
+        client = connect_session(pool, sessions[session_name], preferences, sessions)
+        try:
+            with client.stream_command(command, timeout=args.timeout) as stream:
+                for stream_name, line in stream.lines():
+                    emit(session_name, stream_name, line)
+                return stream.wait()
+        finally:
+            client.close()
+
+    status = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel), thread_name_prefix="ssh-exec") as executor:
+        futures = {executor.submit(run_on, name): name for name in targets}
+        for future in as_completed(futures):
+            session_name = futures[future]
+            try:
+                exit_status = future.result()
+            except CommandTimeout as e:
+                emit(session_name, "stderr", f"error: {e}")
+                exit_status = 255
+            except Exception as e:
+                emit(session_name, "stderr", f"error: {type(e).__name__}: {e}")
+                exit_status = 255
+            else:
+                if exit_status != 0:
+                    emit(session_name, "stderr", f"exited with status {exit_status}")
+            status = max(status, exit_status if exit_status >= 0 else 255)
+
+    pool.close_all()
+    return status
+
+
+def run_sync_command(args: argparse.Namespace) -> int:
+    """
+    Make a remote directory on every selected session match a local directory.
+
+    Returns:
+        int: 0 if every host is in sync, 1 if some transfers failed, 255 if a host could not be synced
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from sftp_sync import apply_plan, plan_sync, wait_for
+    from sftp_transfer import BandwidthLimit, TransferManager, format_bytes
+    from transport_pool import TransportPool
+
+    if not os.path.isdir(args.local_dir):
+        print(f"error: not a directory: {args.local_dir}", file=sys.stderr)
+        return 2
+    sessions = load_saved_sessions(args.data_dir)
+    preferences = load_preferences(args.data_dir)
+    targets = select_targets(args, sessions)
+    if not targets:
+        return 2
+
+    pool = TransportPool(idle_timeout=0)
+    emit = make_printer(targets, args.no_prefix)
+    # One limit for the whole run, however many hosts and workers share it
+    bandwidth_limit = BandwidthLimit(args.bwlimit * 1024) if args.bwlimit else None
+
+    def sync_to(session_name: str) -> int:
+        client = connect_session(pool, sessions[session_name], preferences, sessions)
+        try:
+            sftp = client.open_sftp()
+            try:
+                plan = plan_sync(client, sftp, args.local_dir, args.remote_dir,
+                                 checksum=args.checksum, delete=args.delete)
+                for message in plan.skipped:
+                    emit(session_name, "stderr", f"skipped: {message}")
+                if args.dry_run:
+                    for action in plan.actions:
+                        emit(session_name, "stdout", str(action))
+                    emit(session_name, "stdout", f"dry run: {plan.summary()}")
+                    return 0
+
+                started = time.monotonic()
+                manager = TransferManager(client.open_sftp, max_parallel=args.jobs, bandwidth_limit=bandwidth_limit)
+                try:
+                    jobs = apply_plan(plan, sftp, manager)
+                    ok = wait_for(jobs)
+                finally:
+                    manager.close()
+            finally:
+                sftp.close()
+
+            for job in jobs:
+                if job.error:
+                    emit(session_name, "stderr", f"failed: {job.remote_path}: {job.error}")
+            for message in plan.errors:
+                emit(session_name, "stderr", f"not deleted: {message}")
+            sent = sum(job.transferred - job.resumed_from for job in jobs)
+            emit(session_name, "stdout",
+                 f"synced: {plan.summary()}; sent {format_bytes(sent)} in {time.monotonic() - started:.1f}s "
+                 f"(scan {plan.scan_seconds:.1f}s)")
+            return 0 if ok and not plan.errors else 1
+        finally:
+            client.close()
+
+    status = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel), thread_name_prefix="ssh-sync") as executor:
+        futures = {executor.submit(sync_to, name): name for name in targets}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                emit(futures[future], "stderr", f"error: {type(e).__name__}: {e}")
+                result = 255
+            status = max(status, result)
+
+    pool.close_all()
+    return status
+
+
+def run_forward_command(args: argparse.Namespace) -> int:
+    """
+    Start the saved port forwards of the selected sessions, plus any given on
+    the command line, and keep them open until interrupted.
+
+    Returns:
+        int: 0 after Ctrl+C, 1 if some forwards could not start, 255 if a connection failed or dropped
+    """
+    from port_forwarding import ForwardRelay, ForwardSpec, session_forwards
+    from transport_pool import TransportPool
+
+    sessions = load_saved_sessions(args.data_dir)
+    preferences = load_preferences(args.data_dir)
+    targets = select_targets(args, sessions)
+    if not targets:
+        return 2
+    extra = [f"{kind} {value}" for kind, values in (("L", args.local), ("R", args.remote), ("D", args.dynamic))
+             for value in values]
+    try:
+        for entry in extra:
+            ForwardSpec.parse(entry)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    pool = TransportPool(idle_timeout=0)
+    relay = ForwardRelay()
+    emit = make_printer(targets, args.no_prefix)
+    clients = []
+    status = 0
+    try:
+        for session_name in targets:
+            try:
+                specs = session_forwards(sessions[session_name]) + [ForwardSpec.parse(entry) for entry in extra]
+                if not specs:
+                    emit(session_name, "stderr", "no port forwards configured")
+                    status = max(status, 1)
+                    continue
+                client = connect_session(pool, sessions[session_name], preferences, sessions)
+            except Exception as e:
+                emit(session_name, "stderr", f"error: {type(e).__name__}: {e}")
+                status = 255
+                continue
+            clients.append((session_name, client))
+            for spec, error in client.start_forwards(specs, relay, label=session_name):
+                emit(session_name, "stderr", f"failed: {spec}: {error}")
+                status = max(status, 1)
+            for spec in client.forwarder.forwards if client.forwarder else []:
+                emit(session_name, "stdout", f"forwarding {spec.describe()}")
+
+        if not any(client.forwarder and client.forwarder.forwards for _, client in clients):
+            return max(status, 1)
+        print("Press Ctrl+C to stop forwarding", file=sys.stderr)
+        try:
+            while True:
+                for session_name, client in clients:
+                    transport = client.get_transport()
+                    if transport is None or not transport.is_active():
+                        emit(session_name, "stderr", "connection lost")
+                        return 255
+                time.sleep(1)
+        except KeyboardInterrupt:
+            return status
+    finally:
+        for _, client in clients:
+            client.close()
+        relay.stop()
+        pool.close_all()
+
+
+def run_replay_command(args: argparse.Namespace) -> int:
+    """
+    Play recorded session transcripts to the terminal with their original timing.
+
+    Returns:
+        int: 0 when done or interrupted, 1 if a file could not be read
+    """
+    from session_transcript import replay
+
+    try:
+        for path in args.files:
+            replay(path, sys.stdout, speed=args.speed, max_idle=args.max_idle)
+    except KeyboardInterrupt:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"\nerror: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def positive_float(text: str) -> float:
+    """argparse type for a finite number greater than 0."""
+    try:
+        value = float(text)
+    except ValueError:
+        value = math.nan
+    if not (0 < value < math.inf):
+        raise argparse.ArgumentTypeError(f"invalid value '{text}': expected a number greater than 0")
+    return value
+
+
+def add_selection_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("-s", "--session", action="append", default=[], help="session name (repeatable)")
+    parser.add_argument("-t", "--tag", action="append", default=[], help="sessions with this tag (repeatable)")
+    parser.add_argument("-a", "--all", action="store_true", help="all saved sessions")
+
+
+def run_cli(argv: List[str]) -> int:
+    """Parse command-line arguments and run a headless command. Tk is never imported."""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="SSH Client. Run without arguments to start the graphical client."
+    )
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory holding sessions.json and encryption.key")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="list saved sessions")
+    add_selection_arguments(list_parser)
+    list_parser.add_argument("-1", "--names-only", action="store_true", help="print only session names")
+
+    exec_parser = subparsers.add_parser("exec", help="run a command on saved sessions without the GUI")
+    add_selection_arguments(exec_parser)
+    exec_parser.add_argument("--timeout", type=float, default=None, help="seconds each command may run")
+    exec_parser.add_argument("-p", "--parallel", type=int, default=16, help="hosts to run on at once")
+    exec_parser.add_argument("--no-prefix", action="store_true", help="do not prefix output lines with the session name")
+    exec_parser.add_argument("remote_command", nargs=argparse.REMAINDER, help="command to run")
+
+    sync_parser = subparsers.add_parser("sync", help="upload only what changed in a directory tree")
+    add_selection_arguments(sync_parser)
+    sync_parser.add_argument("-c", "--checksum", action="store_true",
+                             help="compare files of equal size by SHA-256 instead of modification time")
+    sync_parser.add_argument("-n", "--dry-run", action="store_true", help="list the changes without making them")
+    sync_parser.add_argument("--delete", action="store_true", help="delete remote files that do not exist locally")
+    sync_parser.add_argument("--bwlimit", type=int, default=0, help="total bandwidth limit in KiB/s")
+    sync_parser.add_argument("-j", "--jobs", type=int, default=4, help="files transferred at once per host")
+    sync_parser.add_argument("-p", "--parallel", type=int, default=8, help="hosts synced at once")
+    sync_parser.add_argument("--no-prefix", action="store_true", help="do not prefix output lines with the session name")
+    sync_parser.add_argument("local_dir", help="local source directory")
+    sync_parser.add_argument("remote_dir", help="remote destination directory")
+
+    forward_parser = subparsers.add_parser("forward", help="run the port forwards of saved sessions until Ctrl+C")
+    add_selection_arguments(forward_parser)
+    forward_parser.add_argument("-L", dest="local", action="append", default=[], metavar="[BIND:]PORT:HOST:HOSTPORT",
+                                help="extra local forward (repeatable)")
+    forward_parser.add_argument("-R", dest="remote", action="append", default=[], metavar="[BIND:]PORT:HOST:HOSTPORT",
+                                help="extra remote forward (repeatable)")
+    forward_parser.add_argument("-D", dest="dynamic", action="append", default=[], metavar="[BIND:]PORT",
+                                help="extra SOCKS proxy (repeatable)")
+    forward_parser.add_argument("--no-prefix", action="store_true", help="do not prefix output lines with the session name")
+
+    replay_parser = subparsers.add_parser("replay", help="play recorded session transcripts (.cast, .cast.gz, .cast.zst)")
+    replay_parser.add_argument("--speed", type=positive_float, default=1.0, help="playback speed factor")
+    replay_parser.add_argument("--max-idle", type=float, default=None, metavar="SECONDS",
+                               help="shorten pauses longer than this")
+    replay_parser.add_argument("files", nargs="+", help="transcript files, played in order")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(name)s: %(message)s')
+
+    if args.command == "list":
+        return list_sessions(args)
+    if args.command == "sync":
+        return run_sync_command(args)
+    if args.command == "forward":
+        return run_forward_command(args)
+    if args.command == "replay":
+        return run_replay_command(args)
+
+    if args.remote_command and args.remote_command[0] == "--":
+        args.remote_command = args.remote_command[1:]
+    if not args.remote_command:
+        exec_parser.error("no command given")
+    return run_exec_command(args)
@@ -0,0 +1,354 @@
+import logging
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from session_store import write_atomic
+
+HISTORY_DIRNAME = "history"
+
+# Commands kept per host unless the "history_size" preference says otherwise
+DEFAULT_HISTORY_SIZE = 10000
+
+# Slack allowed before superseded entries are dropped from memory or from the history file
+COMPACT_SLACK = 256
+
+# Ends every command in the search buffer; cannot be typed, so no match spans two commands
+SEPARATOR = "\0"
+
+logger = logging.getLogger(__name__)
+
+
+def history_key(session: Dict[str, Any]) -> str:
+    """Host a session's history belongs to: ``user@host:port``."""
+    return f"{session.get('username') or ''}@{session.get('host') or ''}:{int(session.get('port') or 22)}"
+
+
+def _escape(command: str) -> str:
+    return command.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _unescape(line: str) -> str:
+    if "\\" not in line:
+        return line
+    return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), line)
+
+
+class CommandHistory:
+    """
+    Command history of one host, kept on disk and searchable.
+
+    Commands are deduplicated: running a command again moves it to the
+    newest position. At most ``max_entries`` are kept, oldest dropped first.
+    Each new command is appended to the history file straight away; the
+    file is rewritten without superseded lines once they outnumber the kept
+    commands.
+
+    Entries have positions that only grow, so navigation and search work on
+    positions; superseded entries leave gaps that are compacted away as the
+    history grows. For search, the commands are also kept as one string in
+    position order, with an ``array`` of the offset where each position
+    starts: a reverse search is a ``str.rfind`` over that buffer, and the
+    offsets map a hit back to its command. The index costs a few bytes per
+    command on top of the text and is extended, not rebuilt, as commands
+    are added.
+
+    The file is read on first use, which can be done on a worker thread
+    with load(); all methods are thread-safe.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_HISTORY_SIZE):
+        """
+        Args:
+            path (str, optional): History file; None keeps the history in memory only
+            max_entries (int): Commands to keep
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._commands: List[Optional[str]] = []   # By position; None where superseded or dropped
+        self._positions: Dict[str, int] = {}       # Command -> its current position
+        self._text = ""                            # Commands up to len(_offsets), each ending in SEPARATOR
+        self._offsets = array("I")                 # Position -> where its command starts in _text
+        self._oldest = 0                           # No live entry before this position
+        self._file_lines = 0
+        self._file = None
+        self._loaded = path is None
+        self._lock = threading.RLock()
+
+    def load(self) -> None:
+        """Read the history file if that has not been done yet."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        self._add(_unescape(line.rstrip("\n")))
+                        self._file_lines += 1
+            except OSError as e:
+                logger.error(f"Error reading command history {self.path}: {e}")
+            self._compact()
+            if self._file_lines > len(self._positions) + COMPACT_SLACK:
+                self._rewrite()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.load()
+            return len(self._positions)
+
+    def commands(self) -> List[str]:
+        """All kept commands, oldest first."""
+        with self._lock:
+            self.load()
+            return [command for command in self._commands[self._oldest:] if command is not None]
+
+    @property
+    def end(self) -> int:
+        """Position just after the newest command, where navigation starts."""
+        with self._lock:
+            self.load()
+            return len(self._commands)
+
+    def add(self, command: str) -> None:
+        """Record a command that was run, moving it to the newest position if it is already known."""
+        if not command.strip():
+            return
+        with self._lock:
+            self.load()
+            if self._commands and self._commands[-1] == command:
+                return
+            self._add(command)
+            self._append_to_file(command)
+            if len(self._commands) > 2 * len(self._positions) + COMPACT_SLACK:
+                self._compact()
+
+    def older(self, position: int) -> Optional[Tuple[int, str]]:
+        """Newest command before ``position``, with its position, or None."""
+        with self._lock:
+            self.load()
+            for index in range(min(position, len(self._commands)) - 1, self._oldest - 1, -1):
+                if self._commands[index] is not None:
+                    return index, self._commands[index]
+            return None
+
+    def newer(self, position: int) -> Optional[Tuple[int, str]]:
+        """Oldest command after ``position``, with its position, or None at the end."""
+        with self._lock:
+            self.load()
+            for index in range(max(position + 1, self._oldest), len(self._commands)):
+                if self._commands[index] is not None:
+                    return index, self._commands[index]
+            return None
+
+    def search(self, query: str, before: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """
+        Newest command containing ``query`` (case-sensitive, as in a shell).
+
+        Args:
+            query (str): Text to look for
+            before (int, optional): Only consider positions before this one,
+                e.g. the previous match to find the next older one
+
+        Returns:
+            Tuple of position and command, or None if nothing matches
+        """
+        if not query or SEPARATOR in query:
+            return None
+        with self._lock:
+            self.load()
+            self._extend_index()
+            before = len(self._commands) if before is None else min(before, len(self._commands))
+            if before <= self._oldest:
+                return None
+            start = self._offsets[self._oldest]
+            end = self._offsets[before] if before < len(self._offsets) else len(self._text)
+            while True:
+                offset = self._text.rfind(query, start, end)
+                if offset < 0:
+                    return None
+                position = bisect_right(self._offsets, offset) - 1
+                command = self._commands[position]
+                if command is not None:
+                    return position, command
+                end = self._offsets[position]  # Superseded; keep looking before it
+
+    def clear(self) -> None:
+        """Forget every command and delete the history file."""
+        with self._lock:
+            self._commands = []
+            self._positions = {}
+            self._text = ""
+            self._offsets = array("I")
+            self._oldest = 0
+            self._loaded = True
+            self._close_file()
+            self._file_lines = 0
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_file()
+
+    def _add(self, command: str) -> None:
+        previous = self._positions.pop(command, None)
+        if previous is not None:
+            self._commands[previous] = None
+        self._positions[command] = len(self._commands)
+        self._commands.append(command)
+
+        # Drop the oldest commands beyond the limit
+        while len(self._positions) > self.max_entries:
+            oldest = self._commands[self._oldest]
+            if oldest is not None:
+                del self._positions[oldest]
+                self._commands[self._oldest] = None
+            self._oldest += 1
+
+    def _extend_index(self) -> None:
+        """Add the commands added since the last search to the search buffer."""
+        indexed = len(self._offsets)
+        if indexed == len(self._commands):
+            return
+        # Superseded commands keep their place so that offsets stay in step with positions
+        added = [command or "" for command in self._commands[indexed:]]
+        offset = len(self._text)
+        for command in added:
+            self._offsets.append(offset)
+            offset += len(command) + 1
+        self._text += SEPARATOR.join(added) + SEPARATOR
+
+    def _compact(self) -> None:
+        """Renumber the kept commands without gaps; the search buffer is rebuilt on the next search."""
+        commands = [command for command in self._commands[self._oldest:] if command is not None]
+        if len(commands) == len(self._commands):
+            return
+        self._commands = commands
+        self._positions = {command: position for position, command in enumerate(commands)}
+        self._text = ""
+        self._offsets = array("I")
+        self._oldest = 0
+
+    def _append_to_file(self, command: str) -> None:
+        if self.path is None:
+            return
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(_escape(command) + "\n")
+            self._file.flush()
+            self._file_lines += 1
+            if self._file_lines > 2 * len(self._positions) + COMPACT_SLACK:
+                self._rewrite()
+        except OSError as e:
+            logger.error(f"Error writing command history {self.path}: {e}")
+
+    def _rewrite(self) -> None:
+        """Replace the history file with the kept commands only."""
+        self._close_file()
+        try:
+            commands = self.commands()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            write_atomic(self.path, "".join(_escape(command) + "\n" for command in commands))
+            self._file_lines = len(commands)
+        except OSError as e:
+            logger.error(f"Error compacting command history {self.path}: {e}")
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ReverseSearch:
+    """
+    State of one incremental reverse search (Ctrl+R) through a CommandHistory.
+
+    Typing more keeps searching from the current match, as a shell does;
+    ``older()`` moves on to the next older match. When nothing matches, the
+    last match is kept and ``failing`` is set.
+    """
+
+    def __init__(self, history: CommandHistory):
+        self.history = history
+        self.query = ""
+        self.match: Optional[Tuple[int, str]] = None
+        self.failing = False
+
+    @property
+    def command(self) -> Optional[str]:
+        return self.match[1] if self.match else None
+
+    def update(self, query: str) -> Optional[str]:
+        """Search for a new query text; returns the matching command."""
+        extended = query.startswith(self.query)
+        if extended and self.failing:
+            # Nothing contains the shorter query, so nothing contains this one either
+            self.query = query
+            return self.command
+        extended = extended and self.match is not None
+        self.query = query
+        if not query:
+            self.match, self.failing = None, False
+            return None
+        found = self.history.search(query, self.match[0] + 1 if extended else None)
+        self.failing = found is None
+        if found is not None:
+            self.match = found
+        return self.command
+
+    def older(self) -> Optional[str]:
+        """Move to the next older command matching the current query."""
+        if not self.query or self.failing:
+            return self.command
+        found = self.history.search(self.query, self.match[0] if self.match else None)
+        self.failing = found is None
+        if found is not None:
+            self.match = found
+        return self.command
+
+
+class HistoryStore:
+    """Command histories of the hosts used in this run, one file per host in ``directory``."""
+
+    def __init__(self, directory: str, max_entries: int = DEFAULT_HISTORY_SIZE):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._histories: Dict[str, CommandHistory] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9@._-]", "_", key) + ".history")
+
+    def open(self, key: str) -> CommandHistory:
+        """
+        The history of a host (see history_key()); sessions to the same host
+        share it. The file is read on first use or by load().
+        """
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                history = self._histories[key] = CommandHistory(self.path_for(key), self.max_entries)
+            return history
+
+    def clear_all(self) -> None:
+        """Forget the history of every host, including hosts not used in this run."""
+        with self._lock:
+            for history in self._histories.values():
+                history.clear()
+            if os.path.isdir(self.directory):
+                for filename in os.listdir(self.directory):
+                    if filename.endswith(".history"):
+                        os.remove(os.path.join(self.directory, filename))
+
+    def close_all(self) -> None:
+        with self._lock:
+            for history in self._histories.values():
+                history.close()
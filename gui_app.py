@@ -0,0 +1,4094 @@
+import os
+import posixpath
+import stat
+import sys
+import json
+import logging
+import math
+import paramiko
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import tkinter as tk
+from tkinter import messagebox, ttk, filedialog, simpledialog
+import tkinter.font as tkfont
+import customtkinter as ctk
+import re
+import platform
+import copy
+import time
+import socket
+import threading
+import ctypes
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from broadcast import Broadcast
+from channel_reactor import ChannelReactor
+from command_history import HISTORY_DIRNAME, CommandHistory, HistoryStore, ReverseSearch, history_key
+from terminal_screen import TerminalScreen
+from transport_pool import TransportPool
+from output_sinks import LocalMirrorSink, preserve_stdout
+from port_forwarding import ForwardRelay, ForwardSpec, session_forwards
+from sftp_transfer import TransferManager, format_bytes, format_eta
+from session_db import SessionDatabase
+from session_import import ImportReport, import_entries, iter_sessions
+from session_index import SessionIndex
+from virtual_list import VirtualList
+from session_store import (
+    DATABASE_FILENAME,
+    KEY_FILENAME,
+    decrypt_value,
+    encrypt_value,
+    get_or_create_key,
+    make_fernet,
+    session_tags
+)
+from session_transcript import COMPRESSIONS, FORMATS, TRANSCRIPT_DIRNAME, TranscriptSink, zstd_available
+from ssh_connection import ModernSSHClient, connection_params, jump_host_params, parse_jump_host, parse_timeout
+
+# Spacing of the rows in the session list, in pixels
+SESSION_ROW_HEIGHT = 34
+
+
+class ConnectionCancelled(Exception):
+    """Raised on a connection worker when the user cancelled the attempt."""
+
+class PendingConnection:
+    """Handle for a connection attempt running on the connection worker pool."""
+
+    def __init__(self, session_name: str, host: str, port: int):
+        self.session_name = session_name
+        self.host = host
+        self.port = port
+        self.started = time.monotonic()
+        self.cancelled = threading.Event()
+        self.client: Optional[ModernSSHClient] = None
+        self.future = None
+        self.batch: Optional["BulkConnectBatch"] = None
+        self.forwards: List[ForwardSpec] = []    # Port forwards to start once connected
+        self.history: Optional[CommandHistory] = None  # Read on the worker while connecting
+        self.forward_errors: List[Tuple[ForwardSpec, Exception]] = []
+
+    def elapsed(self) -> float:
+        """Seconds since the attempt started."""
+        return time.monotonic() - self.started
+
+    def cancel(self) -> None:
+        """Flag the attempt as cancelled and abort a handshake in progress."""
+        self.cancelled.set()
+        client = self.client
+        if client:
+            client.close()
+
+class BulkConnectBatch:
+    """Collects per-host outcomes while a group of sessions connects in parallel."""
+
+    def __init__(self, label: str, session_names: List[str]):
+        self.label = label
+        self.session_names = list(session_names)
+        self.started = time.monotonic()
+        # session name -> (connected, seconds taken, error message)
+        self.results: Dict[str, Tuple[bool, float, str]] = {}
+
+    def record(self, session_name: str, connected: bool, elapsed: float, error: str = "") -> None:
+        self.results[session_name] = (connected, elapsed, error)
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) >= len(self.session_names)
+
+    def failed(self) -> List[str]:
+        """Names of the sessions that did not connect, in the original order."""
+        return [name for name in self.session_names if name in self.results and not self.results[name][0]]
+
+    def summary(self) -> str:
+        """Plain-text report: failures first, then successes by connection time."""
+        connected = sorted(
+            (name for name, result in self.results.items() if result[0]),
+            key=lambda name: self.results[name][1]
+        )
+        failed = self.failed()
+        lines = [
+            f"{self.label}: {len(connected)} connected, {len(failed)} failed "
+            f"in {time.monotonic() - self.started:.1f}s",
+            ""
+        ]
+        for name in failed:
+            _, elapsed, error = self.results[name]
+            lines.append(f"FAILED  {name} ({elapsed:.2f}s): {error}")
+        for name in connected:
+            lines.append(f"OK      {name} ({self.results[name][1]:.2f}s)")
+        return "\n".join(lines)
+
+class TerminalRenderScheduler:
+    """
+    Render terminal screen models into their Text widgets at most once per frame.
+
+    Each widget holds the session's scrollback followed by the rows of its
+    TerminalScreen. Sessions are marked dirty from any thread; on the next
+    frame the scheduler appends the lines that scrolled off the screen and
+    rewrites only the rows that changed, on the Tk main thread.
+    """
+
+    def __init__(self, root, get_widget, get_screen, frame_interval_ms: int = 16,
+                 scrollback_lines: int = 10000):
+        """
+        Args:
+            root: Tk root used to schedule flushes on the main thread
+            get_widget: Callable returning the tk.Text widget for a session, or None
+            get_screen: Callable returning the TerminalScreen for a session, or None
+            frame_interval_ms (int): Minimum time between two flushes (16 ms is ~60 Hz)
+            scrollback_lines (int): Lines kept in each terminal widget, 0 for unlimited
+        """
+        self.root = root
+        self.get_widget = get_widget
+        self.get_screen = get_screen
+        self.frame_interval_ms = frame_interval_ms
+        self.scrollback_lines = scrollback_lines
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self._flush_scheduled = False
+        self._last_flush = 0.0
+        # First widget line of each session's screen region, and its height in rows
+        self._screen_top: Dict[str, int] = {}
+        self._screen_rows: Dict[str, int] = {}
+
+    def submit(self, session_name: str) -> None:
+        """Mark a session's screen as changed and make sure a flush is scheduled."""
+        with self._lock:
+            self._pending.add(session_name)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+            elapsed_ms = (time.monotonic() - self._last_flush) * 1000
+        delay = max(0, int(self.frame_interval_ms - elapsed_ms))
+        self.root.after(delay, self._flush)
+
+    def discard(self, session_name: str) -> None:
+        """Forget a session's pending updates and widget layout."""
+        with self._lock:
+            self._pending.discard(session_name)
+        self._screen_top.pop(session_name, None)
+        self._screen_rows.pop(session_name, None)
+
+    def clear_history(self, session_name: str) -> None:
+        """Delete the scrollback above a session's screen region. Runs on the Tk main thread."""
+        terminal_widget = self.get_widget(session_name)
+        top = self._screen_top.get(session_name)
+        if not terminal_widget:
+            return
+        terminal_widget.config(state=tk.NORMAL)
+        if top is None:
+            terminal_widget.delete("1.0", tk.END)
+        elif top > 1:
+            terminal_widget.delete("1.0", f"{top}.0")
+            self._screen_top[session_name] = 1
+        terminal_widget.config(state=tk.DISABLED)
+
+    def _flush(self) -> None:
+        """Apply pending screen updates, one pass per session. Runs on the Tk main thread."""
+        with self._lock:
+            pending = self._pending
+            self._pending = set()
+            self._flush_scheduled = False
+            self._last_flush = time.monotonic()
+
+        for session_name in pending:
+            terminal_widget = self.get_widget(session_name)
+            screen = self.get_screen(session_name)
+            if not terminal_widget or not screen:
+                continue
+            try:
+                self._render(session_name, terminal_widget, screen)
+            except Exception as e:
+                self.logger.error(f"Error rendering terminal output for {session_name}: {e}")
+
+    def _render(self, session_name: str, terminal_widget, screen: TerminalScreen) -> None:
+        top = self._screen_top.get(session_name)
+        full = top is None or self._screen_rows.get(session_name) != screen.rows
+        update = screen.take_updates(full=full)
+        if update is None:
+            return
+
+        # Only follow the output if the user has not scrolled back
+        at_bottom = terminal_widget.yview()[1] >= 1.0
+        terminal_widget.config(state=tk.NORMAL)
+
+        if top is None:
+            # Start the screen region on a fresh line after any existing content
+            if terminal_widget.index("end-1c") != "1.0":
+                terminal_widget.insert(tk.END, "\n")
+            top = int(terminal_widget.index("end-1c").split(".")[0])
+
+        if update.scrolled_lines:
+            terminal_widget.insert(f"{top}.0", "\n".join(update.scrolled_lines) + "\n")
+            top += len(update.scrolled_lines)
+
+        if len(update.dirty_rows) == update.rows:
+            terminal_widget.delete(f"{top}.0", "end-1c")
+            terminal_widget.insert(f"{top}.0", "\n".join(update.dirty_rows[row] for row in range(update.rows)))
+        else:
+            for row, text in update.dirty_rows.items():
+                line = top + row
+                terminal_widget.delete(f"{line}.0", f"{line}.end")
+                terminal_widget.insert(f"{line}.0", text)
+
+        top -= self._trim_scrollback(terminal_widget, top - 1)
+        terminal_widget.config(state=tk.DISABLED)
+        if at_bottom:
+            terminal_widget.see(tk.END)
+
+        self._screen_top[session_name] = top
+        self._screen_rows[session_name] = update.rows
+
+    def _trim_scrollback(self, terminal_widget, history_lines: int) -> int:
+        """
+        Drop the oldest scrollback lines once a widget exceeds its limit.
+        
+        Lines are removed in batches of a tenth of the limit, so the delete cost
+        is paid once per batch rather than on every flush.
+        
+        Returns:
+            int: Number of lines removed
+        """
+        limit = self.scrollback_lines
+        if limit <= 0:
+            return 0
+        batch = max(limit // 10, 100)
+        if history_lines <= limit + batch:
+            return 0
+        excess = history_lines - limit
+        terminal_widget.delete("1.0", f"{excess + 1}.0")
+        return excess
+
+class ModernSSHClientApp:
+    def __init__(self, root: ctk.CTk) -> None:
+        """Initialize the SSH client."""
+        # Initialize logging first
+        self.setup_logging()
+        self.logger = logging.getLogger(__name__)
+        
+        # Get the directory where the script is located
+        self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        
+        # Set absolute paths for configuration files in the project directory
+        self.preferences_file = os.path.join(self.script_dir, "preferences.json")
+        self.session_file = os.path.join(self.script_dir, "sessions.json")  # Migrated into the database
+        self.session_database = os.path.join(self.script_dir, DATABASE_FILENAME)
+        
+        self.root = root
+        self.root.title("Modern SSH Client")
+        self.root.geometry("1200x800")
+        self.root.minsize(800, 600)
+        
+        # Initialize encryption key
+        self.encryption_key = self.get_or_create_key()
+        self.fernet = make_fernet(self.encryption_key)
+        
+        # Initialize preferences with defaults
+        self.preferences = {
+            "theme": "dark",
+            "terminal_font_family": "Monospace",
+            "terminal_font_size": 10,
+            "scrollback_lines": 10000,
+            "session_logging": False,
+            "local_mirror": False,
+            "local_mirror_path": "",
+            "session_log_format": "asciicast",
+            "session_log_compression": "none",
+            "session_log_max_mb": 64,
+            "session_log_rotate_minutes": 0,
+            "connect_timeout": 10,
+            "auth_timeout": 30,
+            "max_parallel_connections": 32,
+            "transport_idle_timeout": 300,
+            "max_parallel_transfers": 4,
+            "history_size": 10000
+        }
+        
+        # Initialize themes
+        self.themes = {
+            "dark": {
+                "bg": "#2B2B2B",
+                "fg": "#FFFFFF",
+                "button": "#404040",
+                "button_hover": "#4A4A4A",
+                "entry": "#404040",
+                "terminal_bg": "#1E1E1E",
+                "terminal_fg": "#FFFFFF"
+            },
+            "light": {
+                "bg": "#F0F0F0",
+                "fg": "#000000",
+                "button": "#E0E0E0",
+                "button_hover": "#D0D0D0",
+                "entry": "#FFFFFF",
+                "terminal_bg": "#FFFFFF",
+                "terminal_fg": "#000000"
+            }
+        }
+        
+        # Load configuration first
+        self.load_preferences()
+        
+        # Set initial theme from preferences or default
+        self.current_theme = self.preferences.get('theme', 'dark')
+        ctk.set_appearance_mode(self.current_theme)
+        
+        # Initialize all dictionaries and variables
+        self.sessions = {}
+        self.ssh_clients = {}
+        self.terminal_frames = {}
+        self.terminal_outputs = {}  # Dictionary to store terminal output widgets
+        self.command_inputs = {}    # Dictionary to store command input widgets
+        self.session_index = SessionIndex()  # Search index over self.sessions, synced when a search needs it
+        self.session_index_stale = True
+        self.command_history = {}   # Session name -> CommandHistory of its host
+        self.history_position = {}  # Session name -> position shown in the input, None for the draft
+        self.history_drafts = {}    # Text typed before navigating the history
+        self.history_searches = {}  # Reverse searches (Ctrl+R) in progress
+        self.active_channels = {}
+        self.search_var = tk.StringVar()
+        self.clear_buttons = {}     # Dictionary to store clear buttons
+        self.command_running = {}   # Dictionary to track if command is running
+        self._resize_jobs = {}      # Pending debounced terminal resizes
+        self.terminal_button_frames = {}  # Button bar at the top of each terminal tab
+        self.session_transcripts = {}     # Transcript recorders of connected sessions, told about resizes
+        self.pending_connections = {}     # Connection attempts still running on the worker pool
+        self.connection_progress = {}     # Progress widgets shown while connecting
+        
+        # Command history per host, kept across runs
+        self.command_histories = HistoryStore(
+            os.path.join(self.script_dir, HISTORY_DIRNAME),
+            self.preferences.get("history_size", 10000)
+        )
+        
+        # Worker pool for TCP connect, key exchange and authentication
+        self.connect_executor = ThreadPoolExecutor(
+            max_workers=self.preferences.get("max_parallel_connections", 32),
+            thread_name_prefix="ssh-connect"
+        )
+        
+        # Batches terminal output into at most one widget update per frame
+        self.render_scheduler = TerminalRenderScheduler(
+            self.root,
+            self.terminal_outputs.get,
+            self._get_terminal_screen,
+            scrollback_lines=self.preferences.get("scrollback_lines", 10000)
+        )
+        
+        # Single I/O thread that reads every open channel
+        self.channel_reactor = ChannelReactor()
+        self.channel_reactor.start()
+        
+        # Authenticated transports shared by sessions to the same host and user
+        self.transport_pool = TransportPool(
+            idle_timeout=self.preferences.get("transport_idle_timeout", 300)
+        )
+        
+        # Broadcast command currently running, if any
+        self.active_broadcast: Optional[Broadcast] = None
+        
+        # Single I/O thread relaying every port-forwarded connection; starts with the first forward
+        self.forward_relay = ForwardRelay()
+        
+        # Session imports run one at a time on their own thread, so a long import never
+        # holds up connection attempts; active_import cancels the running one, if any
+        self.import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-import")
+        self.active_import: Optional[threading.Event] = None
+        self.import_future = None
+        
+        # SFTP transfer queue and file browser window of each session
+        self.transfer_managers: Dict[str, TransferManager] = {}
+        self.sftp_panels = {}
+        self._transfer_status_job = None
+        
+        # Load configuration
+        self.load_sessions()
+        
+        # Initialize UI components
+        self.setup_ui()
+        self.bind_shortcuts()
+        
+        self.logger.info("Application initialized successfully")
+
+    def setup_logging(self) -> None:
+        """Set up logging configuration."""
+        try:
+            # Create formatters
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                                       datefmt='%Y-%m-%d %H:%M:%S')
+
+            # Create file handlers
+            file_handler = logging.FileHandler('ssh_client.log')
+            file_handler.setLevel(logging.INFO)
+            file_handler.setFormatter(formatter)
+
+            paramiko_handler = logging.FileHandler('ssh_client_paramiko.log')
+            paramiko_handler.setLevel(logging.WARNING)  # Set to WARNING to reduce noise
+            paramiko_handler.setFormatter(formatter)
+
+            # Configure root logger
+            root_logger = logging.getLogger()
+            root_logger.setLevel(logging.INFO)
+            # Remove all existing handlers
+            for handler in root_logger.handlers[:]:
+                root_logger.removeHandler(handler)
+            root_logger.addHandler(file_handler)
+
+            # Configure paramiko logger
+            paramiko_logger = logging.getLogger("paramiko")
+            paramiko_logger.setLevel(logging.WARNING)
+            # Remove any existing handlers
+            for handler in paramiko_logger.handlers[:]:
+                paramiko_logger.removeHandler(handler)
+            paramiko_logger.addHandler(paramiko_handler)
+            paramiko_logger.propagate = False  # Prevent propagation to root logger
+
+        except Exception as e:
+            # Create a file handler for the default logger to avoid console output
+            try:
+                default_logger = logging.getLogger("setup")
+                default_logger.setLevel(logging.ERROR)
+                error_handler = logging.FileHandler('ssh_client_error.log')
+                error_handler.setFormatter(formatter)
+                default_logger.addHandler(error_handler)
+                default_logger.error(f"Error setting up logging: {e}")
+            except:
+                pass  # Suppress any errors during error logging
+
+    def load_preferences(self) -> None:
+        """Load preferences from file."""
+        try:
+            if os.path.exists(self.preferences_file):
+                with open(self.preferences_file, 'r') as f:
+                    self.preferences.update(json.load(f))
+                self.logger.info("Preferences loaded successfully")
+        except Exception as e:
+            self.logger.error(f"Error loading preferences: {e}")
+
+    def save_preferences(self, force_update: bool = False):
+        """
+        Save preferences to file with optional forced update.
+        
+        Args:
+            force_update (bool): Force update even if preferences haven't changed
+        """
+        try:
+            # Prevent recursive calls
+            if hasattr(self, '_preferences_saving'):
+                return
+            
+            self._preferences_saving = True
+            
+            # Validate preferences before saving
+            if not hasattr(self, 'preferences') or not isinstance(self.preferences, dict):
+                self.preferences = {}
+            
+            # Ensure default values
+            default_preferences = {
+                "theme": "dark",
+                "terminal_font_family": "Monospace",
+                "terminal_font_size": 10,
+                "scrollback_lines": 10000,
+                "session_logging": False,
+                "local_mirror": False,
+                "local_mirror_path": "",
+                "session_log_format": "asciicast",
+                "session_log_compression": "none",
+                "session_log_max_mb": 64,
+                "session_log_rotate_minutes": 0,
+                "connect_timeout": 10,
+                "auth_timeout": 30,
+                "max_parallel_connections": 32,
+                "transport_idle_timeout": 300,
+                "max_parallel_transfers": 4,
+                "history_size": 10000
+            }
+            
+            # Update preferences with defaults if missing
+            for key, value in default_preferences.items():
+                if key not in self.preferences:
+                    self.preferences[key] = value
+            
+            # Ensure preferences directory exists
+            os.makedirs(os.path.dirname(self.preferences_file), exist_ok=True)
+            
+            # Save preferences
+            with open(self.preferences_file, 'w') as f:
+                json.dump(self.preferences, f, indent=4)
+            
+            self.logger.info("Preferences saved successfully")
+        
+        except Exception as e:
+            error_msg = f"Error saving preferences: {e}"
+            self.logger.error(error_msg)
+            messagebox.showerror("Preferences Error", error_msg)
+        
+        finally:
+            # Always clear the saving flag
+            if hasattr(self, '_preferences_saving'):
+                delattr(self, '_preferences_saving')
+
+    def load_sessions(self) -> None:
+        """Load saved sessions from file."""
+        try:
+            if os.path.exists(self.session_file):
+                with open(self.session_file, 'r') as f:
+                    self.sessions = json.load(f)
+                self.logger.info("Sessions loaded successfully")
+        except Exception as e:
+            self.logger.error(f"Error loading sessions: {e}")
+
+    def save_sessions(self) -> None:
+        """Save sessions to file."""
+        try:
+            with open(self.session_file, 'w') as f:
+                json.dump(self.sessions, f, indent=4)
+            self.logger.info("Sessions saved successfully")
+        except Exception as e:
+            self.logger.error(f"Error saving sessions: {e}")
+
+    def setup_ui(self):
+        """Set up the main UI components."""
+        # Create menu and status bars
+        self.create_menu_bar()
+        self.create_status_bar()
+        
+        # Create main UI components
+        self.create_main_ui()
+        
+        # Update session list
+        self.update_session_list()
+
+    def create_menu_bar(self) -> None:
+        """Create the menu bar."""
+        self.menubar = tk.Menu(self.root)
+        self.root.configure(menu=self.menubar)  # Changed from config to configure
+        
+        # File menu
+        file_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="New Session", command=self.new_session_dialog)
+        file_menu.add_command(label="Import Sessions", command=self.import_sessions)
+        file_menu.add_command(label="Export Sessions", command=self.export_sessions)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.on_closing)  # Changed to on_closing
+
+        # Edit menu
+        edit_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Preferences", command=self.show_preferences)
+
+        # View menu
+        view_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="View", menu=view_menu)
+
+        # Theme submenu
+        theme_menu = tk.Menu(view_menu, tearoff=0)
+        view_menu.add_cascade(label="Theme", menu=theme_menu)
+        theme_menu.add_command(label="Dark Mode", command=lambda: self.apply_theme("dark"))
+        theme_menu.add_command(label="Light Mode", command=lambda: self.apply_theme("light"))
+
+        # Help menu
+        help_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="About", command=self.show_about)
+        help_menu.add_command(label="Documentation", command=self.show_documentation)
+        help_menu.add_command(label="Keyboard Shortcuts", command=self.show_shortcuts)
+
+    def create_status_bar(self) -> None:
+        """Create the status bar."""
+        self.status_frame = ctk.CTkFrame(self.root, height=25)
+        self.status_frame.pack(side="bottom", fill="x")
+        
+        self.status_label = ctk.CTkLabel(
+            self.status_frame,
+            text="Ready",
+            anchor="w",
+            font=("Helvetica", 12)
+        )
+        self.status_label.pack(side="left", padx=10)
+        
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ctk.CTkProgressBar(self.status_frame)
+        self.progress_bar.pack(side="right", padx=5)
+        self.progress_bar.set(0)
+
+    def update_status(self, message: str) -> None:
+        """Update the status bar message."""
+        self.status_label.configure(text=message)
+        self.root.update_idletasks()
+
+    def create_main_ui(self) -> None:
+        """Create the main user interface."""
+        # Create main container
+        self.main_container = ctk.CTkFrame(self.root)
+        self.main_container.pack(fill="both", expand=True)
+
+        # Create left sidebar for sessions
+        self.create_session_sidebar()
+
+        # Create right panel for terminals
+        self.right_panel = ctk.CTkFrame(self.main_container)
+        self.right_panel.pack(side="right", fill="both", expand=True)
+
+        # Create tab view for terminals
+        self.tab_view = ctk.CTkTabview(self.right_panel)
+        self.tab_view.pack(fill="both", expand=True, padx=5, pady=5)
+
+        # Create welcome tab
+        self.create_welcome_tab()
+
+    def new_session_dialog(self) -> None:
+        """Show dialog for creating a new session with SSH key selection."""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("New Session")
+
+        ctk.CTkLabel(dialog, text="Session Name:").grid(row=0, column=0, padx=10, pady=5)
+        session_name_entry = ctk.CTkEntry(dialog)
+        session_name_entry.grid(row=0, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Host:").grid(row=1, column=0, padx=10, pady=5)
+        host_entry = ctk.CTkEntry(dialog)
+        host_entry.grid(row=1, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Port:").grid(row=2, column=0, padx=10, pady=5)
+        port_entry = ctk.CTkEntry(dialog)
+        port_entry.insert(0, "22")  # Default port
+        port_entry.grid(row=2, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Username:").grid(row=3, column=0, padx=10, pady=5)
+        username_entry = ctk.CTkEntry(dialog)
+        username_entry.grid(row=3, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Password:").grid(row=4, column=0, padx=10, pady=5)
+        password_entry = ctk.CTkEntry(dialog, show="*")
+        password_entry.grid(row=4, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="SSH Key:").grid(row=5, column=0, padx=10, pady=5)
+        ssh_key_entry = ctk.CTkEntry(dialog)
+        ssh_key_entry.grid(row=5, column=1, padx=10, pady=5)
+
+        def browse_ssh_key():
+            key_path = filedialog.askopenfilename(title="Select SSH Key", filetypes=[("SSH Key Files", "*.pem *.ppk *.key"), ("All Files", "*.*")])
+            if key_path:
+                ssh_key_entry.delete(0, tk.END)
+                ssh_key_entry.insert(0, key_path)
+
+        browse_button = ctk.CTkButton(dialog, text="Browse", command=browse_ssh_key)
+        browse_button.grid(row=5, column=2, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Timeouts (s):").grid(row=6, column=0, padx=10, pady=5)
+        timeout_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        timeout_frame.grid(row=6, column=1, padx=10, pady=5)
+        connect_timeout_entry = ctk.CTkEntry(timeout_frame, width=68, placeholder_text="connect")
+        connect_timeout_entry.pack(side="left", padx=(0, 4))
+        auth_timeout_entry = ctk.CTkEntry(timeout_frame, width=68, placeholder_text="auth")
+        auth_timeout_entry.pack(side="left")
+
+        ctk.CTkLabel(dialog, text="Tags:").grid(row=7, column=0, padx=10, pady=5)
+        tags_entry = ctk.CTkEntry(dialog, placeholder_text="comma separated, e.g. prod, web")
+        tags_entry.grid(row=7, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Forwards:").grid(row=8, column=0, padx=10, pady=5)
+        forwards_entry = ctk.CTkEntry(dialog, placeholder_text="e.g. L 8080:db:5432, D 1080")
+        forwards_entry.grid(row=8, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(dialog, text="Jump hosts:").grid(row=9, column=0, padx=10, pady=5)
+        proxy_jump_entry = ctk.CTkEntry(dialog, placeholder_text="session or user@host:port, ...")
+        proxy_jump_entry.grid(row=9, column=1, padx=10, pady=5)
+
+        def save_session():
+            forwards = [entry.strip() for entry in forwards_entry.get().split(",") if entry.strip()]
+            proxy_jump = [hop.strip() for hop in proxy_jump_entry.get().split(",") if hop.strip()]
+            try:
+                for forward in forwards:
+                    ForwardSpec.parse(forward)
+                for hop in proxy_jump:
+                    if hop not in self.sessions:
+                        parse_jump_host(hop)
+                timeouts = {"connect_timeout": parse_timeout(connect_timeout_entry.get(), "connect"),
+                            "auth_timeout": parse_timeout(auth_timeout_entry.get(), "auth")}
+            except ValueError as e:
+                messagebox.showerror("Invalid Input", str(e), parent=dialog)
+                return
+            session_name = session_name_entry.get()
+            host = host_entry.get()
+            port = port_entry.get()
+            username = username_entry.get()
+            password = password_entry.get()
+            ssh_key_path = ssh_key_entry.get()
+            # Save the session details including the SSH key path
+            session = {
+                "host": host,
+                "port": port,
+                "username": username,
+                "password": password,  # Store password securely
+                "ssh_key_path": ssh_key_path
+            }
+            # Optional per-host timeouts; empty fields fall back to the preferences
+            for key, timeout in timeouts.items():
+                if timeout is not None:
+                    session[key] = timeout
+            tags = [tag.strip() for tag in tags_entry.get().split(",") if tag.strip()]
+            if tags:
+                session["tags"] = tags
+            if forwards:
+                session["forwards"] = forwards
+            if proxy_jump:
+                session["proxy_jump"] = proxy_jump
+            self.sessions[session_name] = session
+            self.save_sessions()
+            self.update_session_list()
+            dialog.destroy()
+
+        save_button = ctk.CTkButton(dialog, text="Save", command=save_session)
+        save_button.grid(row=10, column=0, columnspan=3, pady=10)
+
+        dialog.transient(self.root)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+
+    def create_terminal_tab(self, session_name: str):
+        """
+        Create a new terminal tab for a specific SSH session.
+        
+        Args:
+            session_name (str): Name of the SSH session
+        """
+        try:
+            # Create a new tab in the tab view
+            terminal_frame = self.tab_view.add(session_name)
+            
+            # Configure frame layout
+            terminal_frame.grid_columnconfigure(0, weight=1)
+            terminal_frame.grid_rowconfigure(1, weight=1)  # Row 1 is for terminal output
+            
+            # Create button frame at the top (row 0)
+            button_frame = ctk.CTkFrame(terminal_frame)
+            button_frame.grid(row=0, column=0, columnspan=2, sticky='ew', padx=5, pady=5)
+            self.terminal_button_frames[session_name] = button_frame
+            
+            # Create a frame for right-aligned buttons
+            right_buttons = ctk.CTkFrame(button_frame)
+            right_buttons.pack(side="right", fill="y")
+            
+            # Add Files button for the SFTP panel
+            files_btn = ctk.CTkButton(
+                right_buttons,
+                text="Files",
+                command=lambda: self.show_sftp_panel(session_name),
+                width=80
+            )
+            files_btn.pack(side="left", padx=5)
+            
+            # Add Clear History button
+            self._last_clear_click = 0
+            def debounced_clear():
+                if self.command_running.get(session_name, False):
+                    return  # Don't clear if command is running
+                current_time = time.time()
+                if current_time - self._last_clear_click > 0.5:  # 500ms debounce
+                    self._last_clear_click = current_time
+                    self.clear_terminal_history(session_name)
+            
+            clear_btn = ctk.CTkButton(
+                right_buttons,
+                text="Clear History",
+                command=debounced_clear,
+                width=100
+            )
+            clear_btn.pack(side="left", padx=5)
+            self.clear_buttons[session_name] = clear_btn  # Store reference to clear button
+            
+            # Initialize command running state
+            self.command_running[session_name] = False
+
+            # Add Disconnect button
+            disconnect_btn = ctk.CTkButton(
+                right_buttons,
+                text="Disconnect",
+                command=lambda: self.disconnect_session(session_name),
+                width=100
+            )
+            disconnect_btn.pack(side="left", padx=5)
+            
+            # Create terminal output text widget (row 1)
+            terminal_output = tk.Text(
+                terminal_frame,
+                wrap=tk.WORD,
+                font=(
+                    self.preferences.get("terminal_font_family", "Monospace"),
+                    self.preferences.get("terminal_font_size", 10)
+                ),
+                bg=self.themes[self.current_theme]["terminal_bg"],
+                fg=self.themes[self.current_theme]["terminal_fg"],
+                insertbackground=self.themes[self.current_theme]["fg"]
+            )
+            terminal_output.grid(row=1, column=0, sticky='nsew', padx=5, pady=5)
+            
+            # Add scrollbar
+            scrollbar = ttk.Scrollbar(
+                terminal_frame,
+                orient=tk.VERTICAL,
+                command=terminal_output.yview
+            )
+            scrollbar.grid(row=1, column=1, sticky='ns')
+            terminal_output.configure(yscrollcommand=scrollbar.set)
+            
+            # Configure tags for styling
+            terminal_output.tag_configure('command', foreground='cyan', font=('Monospace', 10, 'bold'))
+            terminal_output.tag_configure('error', foreground='red', font=('Monospace', 10, 'bold'))
+            terminal_output.tag_configure('success', foreground='green')
+            
+            # Create command input widget (row 2)
+            command_input = ctk.CTkEntry(
+                terminal_frame,
+                placeholder_text="Enter command...",
+                height=30
+            )
+            command_input.grid(row=2, column=0, columnspan=2, sticky='ew', padx=5, pady=5)
+            
+            # Bind enter key to send command
+            command_input.bind('<Return>', lambda event, name=session_name: self.send_command(name))
+            
+            # Bind Up and Down arrow keys for command history
+            command_input.bind('<Up>', lambda event, name=session_name: self.history_up(name))
+            command_input.bind('<Down>', lambda event, name=session_name: self.history_down(name))
+            command_input.bind('<Control-r>', lambda event, name=session_name: self.start_history_search(name))
+            
+            # Keep the screen model and remote PTY sized to the widget
+            terminal_output.bind('<Configure>', lambda event, name=session_name: self._schedule_terminal_resize(name))
+            
+            # Store references
+            self.terminal_outputs[session_name] = terminal_output
+            self.command_inputs[session_name] = command_input
+            
+            # Initialize command history; the file is read while connecting
+            self.command_history[session_name] = self.command_histories.open(history_key(self.sessions[session_name]))
+            self.history_position[session_name] = None
+            
+            self.logger.debug(f"Terminal tab created for {session_name}")
+            
+        except Exception as e:
+            self.logger.error(f"Error creating terminal tab for {session_name}: {str(e)}")
+            messagebox.showerror("Error", f"Failed to create terminal tab: {str(e)}")
+
+    def clear_terminal_history(self, session_name: str) -> None:
+        """Clear only the terminal output display, keeping command history intact."""
+        try:
+            # Verify the session name is valid and a terminal output exists
+            if session_name and session_name in self.terminal_outputs:
+                terminal = self.terminal_outputs[session_name]
+                
+                # Ensure the terminal is a Text widget and can be modified
+                if isinstance(terminal, tk.Text):
+                    # Drop the scrollback, keeping the live screen rows
+                    self.render_scheduler.clear_history(session_name)
+                    
+                    self.logger.info(f"Terminal output cleared for session: {session_name}")
+        except Exception as e:
+            self.logger.error(f"Error clearing terminal output: {str(e)}")
+            messagebox.showerror("Error", f"Failed to clear terminal output: {str(e)}")
+
+    def create_session_sidebar(self):
+        """Create the session sidebar."""
+        # Create left panel with dynamic width
+        self.left_panel = ctk.CTkFrame(self.main_container)
+        self.left_panel.pack(side="left", fill="y", padx=5, pady=5)
+
+        # Configure grid weights for dynamic resizing
+        self.left_panel.grid_columnconfigure(0, weight=1)
+        
+        # Create header frame with dynamic width
+        header_frame = ctk.CTkFrame(self.left_panel)
+        header_frame.pack(fill="x", padx=5, pady=5)
+        
+        # Configure header frame grid
+        header_frame.grid_columnconfigure(0, weight=1)  # Title takes remaining space
+        header_frame.grid_columnconfigure(1, weight=0)  # Add button fixed width
+        header_frame.grid_columnconfigure(2, weight=0)  # Connect-all button fixed width
+        
+        # Add title with left alignment
+        title_label = ctk.CTkLabel(
+            header_frame,
+            text="Sessions",
+            font=("Helvetica", 16, "bold"),
+            anchor="w"
+        )
+        title_label.grid(row=0, column=0, sticky="w", padx=5)
+        
+        # Add new session button
+        add_button = ctk.CTkButton(
+            header_frame,
+            text="+",
+            width=30,
+            height=30,
+            command=self.new_session_dialog,
+            font=("Helvetica", 16, "bold")
+        )
+        add_button.grid(row=0, column=1, padx=5)
+        
+        # Connect every session currently shown by the filter
+        connect_all_button = ctk.CTkButton(
+            header_frame,
+            text="▶▶",
+            width=30,
+            height=30,
+            command=self.connect_filtered_sessions,
+            font=("Helvetica", 12, "bold")
+        )
+        connect_all_button.grid(row=0, column=2, padx=(0, 5))
+        
+        # Create search frame
+        search_frame = ctk.CTkFrame(self.left_panel)
+        search_frame.pack(fill="x", padx=5, pady=5)
+        
+        # Configure search frame grid
+        search_frame.grid_columnconfigure(0, weight=1)
+        
+        # Add search entry with dynamic width
+        self.search_entry = ctk.CTkEntry(
+            search_frame,
+            placeholder_text="Search sessions or tag:name...",
+            textvariable=self.search_var
+        )
+        self.search_entry.pack(fill="x", padx=5, pady=5)
+        self.search_var.trace("w", self.filter_sessions)
+        
+        # Create the session list; only the rows in view have widgets, recycled while scrolling
+        self.session_list = VirtualList(
+            self.left_panel,
+            row_height=SESSION_ROW_HEIGHT,
+            create_row=self.create_session_row,
+            bind_row=self.bind_session_row,
+            width=250  # Default width
+        )
+        self.session_list.pack(fill="both", expand=True, padx=5, pady=5)
+
+    def filter_sessions(self, *args) -> None:
+        """Filter sessions based on search text."""
+        try:
+            search_text = self.search_var.get().lower()
+            
+            # Show only the matching rows; row widgets are reused
+            self.session_list.set_items(self.filtered_session_names())
+            
+            self.logger.debug(f"Filtered sessions with query: {search_text}")
+            
+        except Exception as e:
+            self.logger.error(f"Error filtering sessions: {str(e)}")
+            self.update_status("Error filtering sessions")
+
+    @staticmethod
+    def _session_tags(session: Dict[str, Any]) -> List[str]:
+        """Return a session's tags as a list of lowercase strings."""
+        return session_tags(session)
+
+    def filtered_session_names(self) -> List[str]:
+        """
+        Names of the sessions matching the sidebar search, in display order.
+
+        Plain words match the session name, host, username or a tag;
+        ``tag:<name>`` only matches sessions carrying that exact tag.
+        """
+        query = self.search_var.get()
+        if not query.strip():
+            return list(self.sessions)  # Names only; records are read as rows are shown
+        if self.session_index_stale:
+            # Re-index only the sessions that changed, from the indexed columns
+            self.session_index.sync(self.sessions.summaries())
+            self.session_index_stale = False
+        return self.session_index.search(query)
+
+    def create_session_row(self, parent) -> ctk.CTkFrame:
+        """
+        Create one recyclable row of the session list.
+
+        The buttons act on whichever session the row currently shows, which
+        bind_session_row() sets as ``session_frame.session_name``.
+        """
+        try:
+            # Create frame for the session button and its controls
+            session_frame = ctk.CTkFrame(
+                parent,
+                fg_color="transparent"
+            )
+            session_frame.session_name = None
+            
+            # Configure grid weights for dynamic resizing
+            session_frame.grid_columnconfigure(0, weight=1)  # Main button takes most space
+            session_frame.grid_columnconfigure(1, weight=0)  # Edit button fixed width
+            session_frame.grid_columnconfigure(2, weight=0)  # Delete button fixed width
+            
+            # Create the main session button
+            button = ctk.CTkButton(
+                session_frame,
+                text="",
+                command=lambda row=session_frame: self.connect_to_session(row.session_name),
+                anchor="w"  # Align text to the left
+            )
+            button.grid(row=0, column=0, sticky="ew", padx=(5, 5))
+            session_frame.session_button = button
+            
+            # Add edit button with fixed width
+            edit_btn = ctk.CTkButton(
+                session_frame,
+                text="Edit",
+                command=lambda row=session_frame: self.edit_session(row.session_name),
+                width=40
+            )
+            edit_btn.grid(row=0, column=1, padx=2)
+            
+            # Add delete button with fixed width and compact design
+            delete_btn = ctk.CTkButton(
+                session_frame,
+                text="✖",
+                command=lambda row=session_frame: self.delete_session(row.session_name),
+                width=30,
+                height=30,
+                fg_color="red",
+                hover_color="darkred",
+                text_color="white",
+                font=("Helvetica", 12, "bold")
+            )
+            delete_btn.grid(row=0, column=2, padx=(2, 5))
+            return session_frame
+            
+        except Exception as e:
+            self.logger.error(f"Error creating session row: {str(e)}")
+            messagebox.showerror("Error", f"Failed to create session row: {str(e)}")
+            raise
+
+    def bind_session_row(self, session_frame: ctk.CTkFrame, session_name: str) -> None:
+        """Point a session list row at a session."""
+        session_frame.session_name = session_name
+        session_frame.session_button.configure(text=session_name)
+
+    def connect_to_session(self, session_name: str, batch: Optional[BulkConnectBatch] = None):
+        """
+        Start an SSH connection for a session on the connection worker pool.
+
+        TCP connect, key exchange and authentication run off the Tk main thread;
+        the terminal tab shows progress and can cancel the attempt. Sessions
+        connected as part of a bulk batch get their tab only once connected.
+
+        Args:
+            session_name (str): Name of the SSH session to connect to
+            batch (BulkConnectBatch, optional): Bulk connect this attempt reports to
+        """
+        try:
+            # Retrieve session details
+            session = self.sessions.get(session_name)
+            if not session:
+                messagebox.showerror("Error", f"Session {session_name} not found")
+                return
+
+            # Ignore repeated clicks while a handshake is already running
+            if session_name in self.pending_connections:
+                self.tab_view.set(session_name)
+                return
+
+            # Create terminal tab if it doesn't exist
+            if batch is None and session_name not in self.terminal_outputs:
+                self.create_terminal_tab(session_name)
+                self.logger.info(f"Terminal tab created for session: {session_name}")
+
+            # Extract connection parameters
+            params = self._connection_params(session)
+
+            # Validate required parameters
+            if not all([params["host"], params["username"]]):
+                if batch is not None:
+                    batch.record(session_name, False, 0.0, "Incomplete session configuration")
+                    self._bulk_connect_progress(batch)
+                    return
+                messagebox.showerror("Error", "Incomplete session configuration")
+                return
+
+            pending = PendingConnection(session_name, params["host"], params["port"])
+            pending.batch = batch
+            pending.forwards = session_forwards(session)
+            pending.history = self.command_histories.open(history_key(session))
+            params["jump_hosts"] = jump_host_params(session, self.sessions, self._connection_params)
+            self.pending_connections[session_name] = pending
+            if batch is None:
+                self._show_connection_progress(pending)
+
+            pending.future = self.connect_executor.submit(self._perform_connection, pending, params)
+            pending.future.add_done_callback(
+                lambda future: self.root.after(0, lambda: self._finish_connection(pending))
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error connecting to session {session_name}: {e}")
+            if batch is not None:
+                batch.record(session_name, False, 0.0, f"Connection setup failed: {str(e)}")
+                self._bulk_connect_progress(batch)
+                return
+            messagebox.showerror("Error", f"Connection setup failed: {str(e)}")
+
+    def _connection_params(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Build connection parameters from a session record, applying default timeouts."""
+        # Stored passwords stay encrypted until a connection needs them
+        password = self.sessions.secrets.reveal(session.get('password'))
+
+        params = connection_params(session, self.preferences)
+        params["password"] = password or None
+        return params
+
+    def _perform_connection(self, pending: PendingConnection, params: Dict[str, Any]):
+        """Connect, authenticate and open a shell. Runs on the connection worker pool."""
+        ssh_client = ModernSSHClient()
+        pending.client = ssh_client
+        if pending.cancelled.is_set():
+            raise ConnectionCancelled(pending.session_name)
+
+        # Read the host's command history here rather than on the Tk main thread
+        if pending.history is not None:
+            pending.history.load()
+
+        ssh_client.connect_pooled(
+            self.transport_pool,
+            hostname=params["host"],
+            username=params["username"],
+            password=params["password"],
+            key_filename=params["key_file"],
+            port=params["port"],
+            jump_hosts=params["jump_hosts"],
+            timeout=params["connect_timeout"],
+            banner_timeout=params["connect_timeout"],
+            auth_timeout=params["auth_timeout"]
+        )
+        if pending.cancelled.is_set():
+            raise ConnectionCancelled(pending.session_name)
+
+        # Open channel; kept on the client so that close() also closes it, e.g. when the connect is cancelled
+        channel = ssh_client.invoke_shell()
+        channel.settimeout(0.1)
+        ssh_client.channel = channel
+        
+        # Start port forwards; one that cannot start does not fail the connection
+        if pending.forwards:
+            pending.forward_errors = ssh_client.start_forwards(
+                pending.forwards, self.forward_relay, label=pending.session_name
+            )
+        return ssh_client, channel
+
+    def _finish_connection(self, pending: PendingConnection) -> None:
+        """Install a finished connection or report its failure. Runs on the Tk main thread."""
+        session_name = pending.session_name
+        if self.pending_connections.get(session_name) is pending:
+            del self.pending_connections[session_name]
+        self._hide_connection_progress(session_name)
+
+        if pending.cancelled.is_set():
+            if pending.client:
+                pending.client.close()
+            self.logger.info(f"Connection to {session_name} cancelled")
+            if pending.batch is not None:
+                pending.batch.record(session_name, False, pending.elapsed(), "Cancelled")
+                self._bulk_connect_progress(pending.batch)
+            return
+
+        error_message = None
+        try:
+            ssh_client, channel = pending.future.result()
+
+        except paramiko.AuthenticationException as auth_error:
+            error_message = f"Authentication failed: {str(auth_error)}"
+
+        except paramiko.SSHException as ssh_error:
+            error_message = f"SSH connection error: {str(ssh_error)}"
+
+        except socket.error as socket_error:
+            error_message = f"Network error: {str(socket_error)}"
+
+        except Exception as unexpected_error:
+            error_message = f"Unexpected connection error: {str(unexpected_error)}"
+
+        if error_message:
+            if pending.client:
+                pending.client.close()
+            if pending.batch is not None:
+                # Bulk connects report every failure in one summary
+                self.logger.error(f"Connection error for {session_name}: {error_message}")
+                pending.batch.record(session_name, False, pending.elapsed(), error_message)
+                self._bulk_connect_progress(pending.batch)
+            else:
+                self._handle_connection_error(session_name, error_message)
+            return
+
+        # Store SSH client and channel
+        self.ssh_clients[session_name] = ssh_client
+        self.active_channels[session_name] = channel
+
+        # Log successful connection
+        self.logger.info(
+            f"Connected to {session_name} (version {ssh_client.get_transport().remote_version}) "
+            f"in {pending.elapsed():.2f}s" + (" on a reused transport" if ssh_client.reused_transport else "")
+        )
+
+        # Handle connection success
+        self._handle_connection_success(session_name)
+        self._report_port_forwards(session_name, ssh_client, pending)
+        if pending.batch is not None:
+            pending.batch.record(session_name, True, pending.elapsed())
+            self._bulk_connect_progress(pending.batch)
+
+    def _report_port_forwards(self, session_name: str, ssh_client: ModernSSHClient,
+                              pending: PendingConnection) -> None:
+        """Show which port forwards are running and warn about those that failed."""
+        forwarder = ssh_client.forwarder
+        if forwarder and forwarder.forwards:
+            self.update_status(
+                f"{session_name}: forwarding " + ", ".join(spec.describe() for spec in forwarder.forwards)
+            )
+        if pending.forward_errors and pending.batch is None:
+            messagebox.showwarning(
+                "Port Forwarding",
+                f"Some port forwards for {session_name} could not be started:\n\n" +
+                "\n".join(f"{spec}: {error}" for spec, error in pending.forward_errors)
+            )
+
+    def connect_filtered_sessions(self) -> None:
+        """Connect every session currently shown in the sidebar."""
+        query = self.search_var.get().strip()
+        label = f"Connect '{query}'" if query else "Connect all"
+        self.connect_sessions(self.filtered_session_names(), label)
+
+    def connect_tag_dialog(self) -> None:
+        """Ask for a tag and connect every session carrying it."""
+        tags = self.sessions.tags()
+        prompt = "Tag to connect:"
+        if tags:
+            prompt += f"\n\nKnown tags: {', '.join(tags)}"
+        tag = simpledialog.askstring("Connect Tag", prompt, parent=self.root)
+        if not tag or not tag.strip():
+            return
+        tag = tag.strip().lower()
+        session_names = self.sessions.names_with_tag(tag)
+        if not session_names:
+            messagebox.showinfo("Connect Tag", f"No sessions are tagged '{tag}'.")
+            return
+        self.connect_sessions(session_names, f"Connect tag '{tag}'")
+
+    def connect_sessions(self, session_names: List[str], label: str = "Bulk connect") -> Optional[BulkConnectBatch]:
+        """
+        Connect a group of sessions in parallel through the connection worker pool.
+
+        Sessions that are already connected or connecting are skipped. Tabs open
+        as each handshake completes, and one summary lists per-host timings and
+        failures once every attempt has finished.
+
+        Args:
+            session_names (List[str]): Sessions to connect
+            label (str): Title used in the status bar and the summary
+
+        Returns:
+            BulkConnectBatch, or None if there was nothing to connect
+        """
+        names = [
+            name for name in session_names
+            if name in self.sessions
+            and name not in self.ssh_clients
+            and name not in self.pending_connections
+        ]
+        if not names:
+            self.update_status("No disconnected sessions to connect")
+            return None
+
+        batch = BulkConnectBatch(label, names)
+        self.logger.info(f"{label}: connecting {len(names)} sessions")
+        self.update_status(f"{label}: connecting {len(names)} sessions...")
+        for name in names:
+            self.connect_to_session(name, batch=batch)
+        return batch
+
+    def _bulk_connect_progress(self, batch: BulkConnectBatch) -> None:
+        """Update the status bar for a bulk connect and show the summary when it completes."""
+        if not batch.done:
+            self.update_status(f"{batch.label}: {len(batch.results)}/{len(batch.session_names)} finished")
+            return
+
+        failed = batch.failed()
+        self.update_status(
+            f"{batch.label}: {len(batch.session_names) - len(failed)} connected, {len(failed)} failed"
+        )
+        self.logger.info(batch.summary())
+        self._show_bulk_connect_summary(batch)
+
+    def _show_bulk_connect_summary(self, batch: BulkConnectBatch) -> None:
+        """Show per-host results of a bulk connect, with an option to retry the failures."""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title(batch.label)
+        dialog.geometry("600x400")
+
+        summary_text = ctk.CTkTextbox(dialog, wrap="none")
+        summary_text.pack(fill="both", expand=True, padx=10, pady=10)
+        summary_text.insert("1.0", batch.summary())
+        summary_text.configure(state="disabled")
+
+        button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        button_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        failed = batch.failed()
+        if failed:
+            def retry_failed():
+                dialog.destroy()
+                self.connect_sessions(failed, f"{batch.label} (retry)")
+
+            ctk.CTkButton(button_frame, text=f"Retry {len(failed)} Failed", command=retry_failed).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Close", command=dialog.destroy).pack(side="right", padx=5)
+
+    def cancel_connection(self, session_name: str) -> None:
+        """Abandon a running connection attempt and close its tab."""
+        pending = self.pending_connections.pop(session_name, None)
+        if not pending:
+            return
+        pending.cancel()
+        self._hide_connection_progress(session_name)
+        self.update_status(f"Connection to {session_name} cancelled")
+        self.close_specific_tab(session_name)
+
+    def _show_connection_progress(self, pending: PendingConnection) -> None:
+        """Show a progress line with a Cancel button at the top of the session's tab."""
+        session_name = pending.session_name
+        button_frame = self.terminal_button_frames.get(session_name)
+        if not button_frame:
+            return
+
+        progress_frame = ctk.CTkFrame(button_frame, fg_color="transparent")
+        progress_frame.pack(side="left", padx=5)
+
+        progress_label = ctk.CTkLabel(progress_frame, text="", anchor="w")
+        progress_label.pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            progress_frame,
+            text="Cancel",
+            command=lambda: self.cancel_connection(session_name),
+            width=70
+        ).pack(side="left", padx=5)
+
+        self.connection_progress[session_name] = progress_frame
+
+        def tick():
+            if self.pending_connections.get(session_name) is not pending:
+                return
+            progress_label.configure(text=f"Connecting to {pending.host}:{pending.port}... {pending.elapsed():.0f}s")
+            self.root.after(500, tick)
+
+        tick()
+        self.update_status(f"Connecting to {session_name}...")
+
+    def _hide_connection_progress(self, session_name: str) -> None:
+        """Remove the connection progress line from a session's tab."""
+        progress_frame = self.connection_progress.pop(session_name, None)
+        if progress_frame:
+            try:
+                progress_frame.destroy()
+            except Exception:
+                pass
+
+    def _handle_connection_success(self, session_name: str) -> None:
+        """
+        Handle successful SSH connection with comprehensive setup.
+        
+        Args:
+            session_name (str): Name of the SSH session
+        """
+        try:
+            # Retrieve SSH client and channel from active sessions
+            ssh_client = self.ssh_clients.get(session_name)
+            channel = self.active_channels.get(session_name)
+            
+            # Validate SSH client and channel
+            if not ssh_client or not channel:
+                raise ValueError(f"No active SSH client or channel for session: {session_name}")
+            
+            # Create terminal tab if it doesn't exist
+            if session_name not in self.terminal_outputs:
+                self.create_terminal_tab(session_name)
+                self.logger.info(f"Terminal tab created for session: {session_name}")
+
+            # Update status
+            self.update_status(f"Connected to {session_name}")
+            
+            # Wire the session's output sinks before any data is read
+            self._attach_output_sinks(session_name, ssh_client)
+            
+            # Hand the channel to the shared I/O reactor
+            self.channel_reactor.register(
+                session_name,
+                channel,
+                self._on_channel_data,
+                self._on_channel_closed
+            )
+            self._schedule_terminal_resize(session_name)
+            
+            # Log successful connection details
+            transport = ssh_client.get_transport()
+            if transport:
+                self.logger.info(f"Connection details: {transport.get_remote_server_key()}")
+        
+        except Exception as e:
+            self.logger.error(f"Error handling connection success for {session_name}: {e}")
+            messagebox.showerror("Error", f"Connection setup failed: {str(e)}")
+            
+            # Cleanup in case of failure
+            if session_name in self.ssh_clients:
+                del self.ssh_clients[session_name]
+            if session_name in self.active_channels:
+                del self.active_channels[session_name]
+
+    def _handle_connection_error(self, session_name: str, error_message: str) -> None:
+        """Show connection error dialog with retry and edit options."""
+        # Log the error
+        self.logger.error(f"Connection error for {session_name}: {error_message}")
+        
+        # Show error dialog with retry and edit options
+        retry = messagebox.askretrycancel(
+            "Connection Failed", 
+            f"{error_message}\n\nDo you want to retry?"
+        )
+        
+        if retry:
+            # Retry the connection
+            self.connect_to_session(session_name)
+        else:
+            # Close the session tab without further action
+            self.close_specific_tab(session_name)
+
+    def close(self) -> None:
+        """Close the SSH connection and channel."""
+        if self.channel:
+            self.channel.close()
+        self.client.close()
+
+    def _attach_output_sinks(self, session_name: str, ssh_client: ModernSSHClient) -> None:
+        """Connect the terminal sink to the renderer and add the optional sinks enabled in preferences."""
+        ssh_client.terminal_sink.on_update = lambda: self._update_terminal(session_name)
+        
+        if self.preferences.get("session_logging", False):
+            log_dir = self.preferences.get("session_log_dir") or os.path.join(self.script_dir, TRANSCRIPT_DIRNAME)
+            compression = self.preferences.get("session_log_compression", "none")
+            if compression == "zstd" and not zstd_available():
+                self.logger.warning("zstd compression needs the zstandard package; using gzip for session logs")
+                compression = "gzip"
+            transcript = TranscriptSink(
+                log_dir,
+                re.sub(r'[^\w.-]+', '_', session_name),
+                fmt=self.preferences.get("session_log_format", "asciicast"),
+                compression=compression,
+                size=(ssh_client.screen.columns, ssh_client.screen.rows),
+                title=session_name,
+                max_bytes=int(self.preferences.get("session_log_max_mb", 64)) * 1024 * 1024,
+                max_age=float(self.preferences.get("session_log_rotate_minutes", 0)) * 60
+            )
+            ssh_client.output.add(transcript)
+            self.session_transcripts[session_name] = transcript
+            self.logger.info(f"Recording output of {session_name} to {log_dir}")
+        
+        if self.preferences.get("local_mirror", False):
+            try:
+                ssh_client.output.add(LocalMirrorSink(path=self.preferences.get("local_mirror_path") or None))
+            except OSError as e:
+                self.logger.error(f"Cannot mirror output of {session_name}: {e}")
+
+    def _on_channel_data(self, session_name: str, data: bytes) -> None:
+        """Reactor callback: deliver output drained from a session's channel to its sinks."""
+        client = self.ssh_clients.get(session_name)
+        if not client:
+            self.logger.error(f"No SSH client found for session: {session_name}")
+            return
+
+        # The terminal sink schedules a redraw on the next frame
+        client._process_terminal_output(data)
+
+    def _on_channel_closed(self, session_name: str) -> None:
+        """Reactor callback: the remote side closed a session's channel."""
+        self.root.after(0, lambda: self.update_status(f"Connection to {session_name} closed"))
+
+    def _update_terminal(self, session_name: str):
+        """
+        Schedule a redraw of a session's terminal; it is rendered on the next frame.
+        
+        Args:
+            session_name (str): Name of the SSH session
+        """
+        try:
+            self.render_scheduler.submit(session_name)
+        except Exception as e:
+            self.logger.error(f"Error updating terminal for {session_name}: {e}")
+
+    def _get_terminal_screen(self, session_name: str) -> Optional[TerminalScreen]:
+        """Return the screen model of a connected session, if any."""
+        client = self.ssh_clients.get(session_name)
+        return client.screen if client else None
+
+    def _resize_terminal(self, session_name: str) -> None:
+        """Match the session's screen model and remote PTY to the terminal widget size."""
+        try:
+            self._resize_jobs.pop(session_name, None)
+            terminal_widget = self.terminal_outputs.get(session_name)
+            screen = self._get_terminal_screen(session_name)
+            if not terminal_widget or not screen:
+                return
+            
+            font = tkfont.Font(font=terminal_widget.cget("font"))
+            inner_width = terminal_widget.winfo_width() - 2 * (int(terminal_widget.cget("padx")) + int(terminal_widget.cget("borderwidth")) + 1)
+            inner_height = terminal_widget.winfo_height() - 2 * (int(terminal_widget.cget("pady")) + int(terminal_widget.cget("borderwidth")) + 1)
+            columns = max(20, inner_width // max(1, font.measure("0")))
+            rows = max(5, inner_height // max(1, font.metrics("linespace")))
+            if (columns, rows) == (screen.columns, screen.rows):
+                return
+            
+            screen.resize(columns, rows)
+            transcript = self.session_transcripts.get(session_name)
+            if transcript:
+                transcript.resize(columns, rows)
+            channel = self.active_channels.get(session_name)
+            if channel and not channel.closed:
+                channel.resize_pty(width=columns, height=rows)
+            self._update_terminal(session_name)
+        except Exception as e:
+            self.logger.error(f"Error resizing terminal for {session_name}: {e}")
+
+    def _schedule_terminal_resize(self, session_name: str) -> None:
+        """Debounce widget <Configure> events into a single resize."""
+        job = self._resize_jobs.pop(session_name, None)
+        if job:
+            self.root.after_cancel(job)
+        self._resize_jobs[session_name] = self.root.after(100, lambda: self._resize_terminal(session_name))
+
+    def send_command(self, session_name: str) -> None:
+        """
+        Execute a command in the SSH session with enhanced terminal handling.
+        
+        Args:
+            session_name (str): Name of the SSH session
+        """
+        try:
+            if session_name in self.command_inputs and session_name in self.active_channels:
+                command_input = self.command_inputs[session_name]
+                command = command_input.get().strip()
+                
+                if not command:
+                    return
+                    
+                channel = self.active_channels[session_name]
+                
+                # Set command running state and disable clear button
+                self.command_running[session_name] = True
+                if session_name in self.clear_buttons:
+                    self.clear_buttons[session_name].configure(state="disabled")
+                
+                # Detailed logging for command tracking
+                self.logger.info(f"Sending command: {command}")
+                
+                # Send command
+                channel.send(command + "\n")
+                
+                # Add to command history; it is appended to the host's history file
+                history = self.command_history.get(session_name)
+                if history is not None:
+                    history.add(command)
+                
+                # Navigation starts from the newest command again
+                self.history_position[session_name] = None
+                self.history_drafts.pop(session_name, None)
+                
+                # Clear input
+                command_input.delete(0, tk.END)
+                
+        except Exception as e:
+            self.logger.error(f"Error sending command: {str(e)}")
+            messagebox.showerror("Error", f"Failed to send command: {str(e)}")
+            
+        finally:
+            # Reset command running state and enable clear button after a short delay
+            def enable_clear_button():
+                self.command_running[session_name] = False
+                if session_name in self.clear_buttons:
+                    self.clear_buttons[session_name].configure(state="normal")
+            
+            # Schedule the button enable after 1 second
+            self.root.after(1000, enable_clear_button)
+
+    def show_broadcast_dialog(self) -> None:
+        """Send one command to several connected sessions and show the grouped results."""
+        try:
+            connected = [
+                name for name, client in self.ssh_clients.items()
+                if client.get_transport() and client.get_transport().is_active()
+            ]
+            if not connected:
+                messagebox.showinfo("Broadcast Command", "No connected sessions.")
+                return
+
+            dialog = ctk.CTkToplevel(self.root)
+            dialog.title("Broadcast Command")
+            dialog.geometry("800x600")
+            dialog.grid_columnconfigure(1, weight=1)
+            dialog.grid_rowconfigure(1, weight=1)
+
+            # Command line and timeout
+            top_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+            top_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=(10, 5))
+            top_frame.grid_columnconfigure(0, weight=1)
+
+            command_entry = ctk.CTkEntry(top_frame, placeholder_text="Command to run on the selected sessions")
+            command_entry.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+            timeout_entry = ctk.CTkEntry(top_frame, width=60)
+            timeout_entry.insert(0, "60")
+            timeout_entry.grid(row=0, column=1, padx=5)
+            ctk.CTkLabel(top_frame, text="s timeout").grid(row=0, column=2, padx=(0, 5))
+
+            # Session selection
+            select_frame = ctk.CTkScrollableFrame(dialog, width=180, label_text="Sessions")
+            select_frame.grid(row=1, column=0, sticky="ns", padx=(10, 5), pady=5)
+            selected = {}
+            for name in sorted(connected):
+                selected[name] = tk.BooleanVar(value=True)
+                ctk.CTkCheckBox(select_frame, text=name, variable=selected[name]).pack(anchor="w", pady=2)
+
+            # Grouped results
+            results_text = ctk.CTkTextbox(dialog, wrap="none", font=(
+                self.preferences.get("terminal_font_family", "Monospace"),
+                self.preferences.get("terminal_font_size", 10)
+            ))
+            results_text.grid(row=1, column=1, sticky="nsew", padx=(5, 10), pady=5)
+
+            bottom_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+            bottom_frame.grid(row=2, column=0, columnspan=2, sticky="ew", padx=10, pady=(5, 10))
+            progress_label = ctk.CTkLabel(bottom_frame, text="", anchor="w")
+            progress_label.pack(side="left", padx=5)
+
+            def show_text(text: str) -> None:
+                results_text.configure(state="normal")
+                results_text.delete("1.0", tk.END)
+                results_text.insert("1.0", text)
+                results_text.configure(state="disabled")
+
+            def set_all(value: bool) -> None:
+                for var in selected.values():
+                    var.set(value)
+
+            def refresh_progress(broadcast: Broadcast) -> None:
+                # Coalesces the per-host callbacks into one label update per frame
+                broadcast.progress_scheduled = False
+                if dialog.winfo_exists() and not broadcast.done:
+                    finished = sum(1 for r in broadcast.results.values() if r.duration is not None)
+                    progress_label.configure(text=f"{finished}/{len(broadcast.results)} finished...")
+
+            def on_result(broadcast: Broadcast) -> None:
+                if not getattr(broadcast, "progress_scheduled", False):
+                    broadcast.progress_scheduled = True
+                    self.root.after(16, lambda: refresh_progress(broadcast))
+
+            def on_complete(broadcast: Broadcast) -> None:
+                if self.active_broadcast is broadcast:
+                    self.active_broadcast = None
+                if not dialog.winfo_exists():
+                    return
+                show_text(broadcast.report())
+                failed = sum(1 for r in broadcast.results.values() if not r.ok)
+                progress_label.configure(text=f"Finished: {len(broadcast.results) - failed} ok, {failed} failed or non-zero")
+                run_button.configure(state="normal")
+                cancel_button.configure(state="disabled")
+                self.update_status(f"Broadcast finished on {len(broadcast.results)} sessions")
+
+            def run_broadcast() -> None:
+                command = command_entry.get().strip()
+                if not command:
+                    return
+                if self.active_broadcast and not self.active_broadcast.done:
+                    messagebox.showinfo("Broadcast Command", "A broadcast is already running.", parent=dialog)
+                    return
+                try:
+                    timeout = parse_timeout(timeout_entry.get(), "broadcast")
+                    if timeout is None:
+                        raise ValueError("Enter the broadcast timeout in seconds")
+                except ValueError as e:
+                    messagebox.showerror("Invalid Input", str(e), parent=dialog)
+                    return
+
+                transports = {
+                    name: self.ssh_clients[name].get_transport()
+                    for name, var in selected.items()
+                    if var.get() and name in self.ssh_clients and self.ssh_clients[name].get_transport()
+                }
+                if not transports:
+                    messagebox.showinfo("Broadcast Command", "Select at least one connected session.", parent=dialog)
+                    return
+
+                self.logger.info(f"Broadcasting to {len(transports)} sessions: {command}")
+                show_text("")
+                progress_label.configure(text=f"0/{len(transports)} finished...")
+                run_button.configure(state="disabled")
+                cancel_button.configure(state="normal")
+
+                broadcast = Broadcast(command, transports, timeout=timeout)
+                # Callbacks arrive on worker threads; hand them to the Tk thread
+                broadcast.on_result = lambda result: self.root.after(0, lambda: on_result(broadcast))
+                broadcast.on_complete = lambda b: self.root.after(0, lambda: on_complete(b))
+                self.active_broadcast = broadcast
+                broadcast.start()
+
+            def cancel_broadcast() -> None:
+                if self.active_broadcast:
+                    self.active_broadcast.cancel()
+
+            ctk.CTkButton(bottom_frame, text="All", width=50, command=lambda: set_all(True)).pack(side="right", padx=5)
+            ctk.CTkButton(bottom_frame, text="None", width=50, command=lambda: set_all(False)).pack(side="right", padx=5)
+            cancel_button = ctk.CTkButton(bottom_frame, text="Cancel", width=80, command=cancel_broadcast, state="disabled")
+            cancel_button.pack(side="right", padx=5)
+            run_button = ctk.CTkButton(bottom_frame, text="Run", width=80, command=run_broadcast)
+            run_button.pack(side="right", padx=5)
+
+            command_entry.bind('<Return>', lambda event: run_broadcast())
+            command_entry.focus_set()
+            dialog.transient(self.root)
+
+        except Exception as e:
+            self.logger.error(f"Error opening broadcast dialog: {e}")
+            messagebox.showerror("Error", f"Failed to open broadcast dialog: {str(e)}")
+
+    def show_sftp_panel(self, session_name: str) -> None:
+        """Open the file browser and transfer queue of a connected session."""
+        try:
+            client = self.ssh_clients.get(session_name)
+            if not client or not client.get_transport() or not client.get_transport().is_active():
+                messagebox.showinfo("Files", f"{session_name} is not connected.")
+                return
+            
+            panel = self.sftp_panels.get(session_name)
+            if panel and panel.winfo_exists():
+                panel.deiconify()
+                panel.lift()
+                return
+            
+            manager = self._get_transfer_manager(session_name)
+            
+            dialog = ctk.CTkToplevel(self.root)
+            dialog.title(f"Files - {session_name}")
+            dialog.geometry("850x650")
+            dialog.grid_columnconfigure(0, weight=1)
+            dialog.grid_rowconfigure(1, weight=3)
+            dialog.grid_rowconfigure(3, weight=1)
+            self.sftp_panels[session_name] = dialog
+            
+            # Browsing uses its own SFTP channel; transfers run on the manager's workers
+            browser = {"path": ".", "sftp": None}
+            browser_lock = threading.Lock()
+            
+            # Path bar
+            path_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+            path_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 5))
+            path_frame.grid_columnconfigure(1, weight=1)
+            
+            path_entry = ctk.CTkEntry(path_frame)
+            path_entry.grid(row=0, column=1, sticky="ew", padx=5)
+            
+            # Remote listing
+            list_frame = ctk.CTkFrame(dialog)
+            list_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
+            list_frame.grid_columnconfigure(0, weight=1)
+            list_frame.grid_rowconfigure(0, weight=1)
+            
+            listing = ttk.Treeview(list_frame, columns=("size", "modified"), selectmode="extended")
+            listing.heading("#0", text="Name", anchor="w")
+            listing.heading("size", text="Size", anchor="e")
+            listing.heading("modified", text="Modified", anchor="w")
+            listing.column("size", width=100, anchor="e", stretch=False)
+            listing.column("modified", width=150, stretch=False)
+            listing.grid(row=0, column=0, sticky="nsew")
+            listing_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=listing.yview)
+            listing_scrollbar.grid(row=0, column=1, sticky="ns")
+            listing.configure(yscrollcommand=listing_scrollbar.set)
+            
+            # Actions on the selection
+            action_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+            action_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=5)
+            listing_label = ctk.CTkLabel(action_frame, text="", anchor="w")
+            listing_label.pack(side="left", padx=5)
+            
+            # Transfer queue
+            queue_frame = ctk.CTkFrame(dialog)
+            queue_frame.grid(row=3, column=0, sticky="nsew", padx=10, pady=5)
+            queue_frame.grid_columnconfigure(0, weight=1)
+            queue_frame.grid_rowconfigure(0, weight=1)
+            
+            transfers = ttk.Treeview(queue_frame, columns=("direction", "size", "progress", "rate", "state"),
+                                     selectmode="extended")
+            transfers.heading("#0", text="File", anchor="w")
+            for column, title, width in (("direction", "Direction", 80), ("size", "Size", 90),
+                                         ("progress", "Progress", 70), ("rate", "Rate", 90),
+                                         ("state", "State", 160)):
+                transfers.heading(column, text=title, anchor="w")
+                transfers.column(column, width=width, stretch=column == "state")
+            transfers.grid(row=0, column=0, sticky="nsew")
+            transfers_scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=transfers.yview)
+            transfers_scrollbar.grid(row=0, column=1, sticky="ns")
+            transfers.configure(yscrollcommand=transfers_scrollbar.set)
+            transfer_rows = {}  # id(job) -> job shown in the queue
+            
+            bottom_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+            bottom_frame.grid(row=4, column=0, sticky="ew", padx=10, pady=(5, 10))
+            
+            def list_remote(path: str):
+                # Runs on a worker thread; every call is a network round trip
+                with browser_lock:
+                    if browser["sftp"] is None:
+                        browser["sftp"] = client.open_sftp()
+                    path = browser["sftp"].normalize(path)
+                    return path, browser["sftp"].listdir_attr(path)
+            
+            def show_listing(future) -> None:
+                if not dialog.winfo_exists():
+                    return
+                try:
+                    path, entries = future.result()
+                except Exception as e:
+                    listing_label.configure(text=f"Error: {e}")
+                    return
+                browser["path"] = path
+                path_entry.delete(0, tk.END)
+                path_entry.insert(0, path)
+                listing.delete(*listing.get_children())
+                # Directories first, then files, each alphabetically
+                entries.sort(key=lambda entry: (not stat.S_ISDIR(entry.st_mode or 0), entry.filename.lower()))
+                for entry in entries:
+                    is_dir = stat.S_ISDIR(entry.st_mode or 0)
+                    modified = datetime.fromtimestamp(entry.st_mtime).strftime("%Y-%m-%d %H:%M") if entry.st_mtime else ""
+                    listing.insert(
+                        "", "end", iid=entry.filename,
+                        text=entry.filename + ("/" if is_dir else ""),
+                        values=("" if is_dir else format_bytes(entry.st_size or 0), modified),
+                        tags=("dir",) if is_dir else ()
+                    )
+                listing_label.configure(text=f"{len(entries)} entries")
+            
+            def load(path: str) -> None:
+                listing_label.configure(text="Loading...")
+                future = self.connect_executor.submit(list_remote, path)
+                future.add_done_callback(lambda f: self.root.after(0, lambda: show_listing(f)))
+            
+            def open_selected(event=None) -> None:
+                for name in listing.selection():
+                    if "dir" in listing.item(name, "tags"):
+                        load(posixpath.join(browser["path"], name))
+                        return
+            
+            def queue_in_background(description: str, queue_jobs) -> None:
+                # Remote directories are listed while queueing, so keep it off the Tk thread
+                def done(future) -> None:
+                    error = future.exception()
+                    if error:
+                        self.logger.error(f"Error queueing {description}: {error}")
+                        self.root.after(0, lambda: messagebox.showerror(
+                            "Transfer Error", f"Failed to queue {description}: {error}", parent=dialog))
+                self.connect_executor.submit(queue_jobs).add_done_callback(done)
+            
+            def download_selected() -> None:
+                names = listing.selection()
+                if not names:
+                    return
+                target_dir = filedialog.askdirectory(title="Download to", parent=dialog)
+                if not target_dir:
+                    return
+                for name in names:
+                    remote_path = posixpath.join(browser["path"], name)
+                    local_path = os.path.join(target_dir, name)
+                    queue_in_background(remote_path, lambda r=remote_path, l=local_path: manager.download(r, l))
+            
+            def upload_paths(paths) -> None:
+                remote_dir = browser["path"]
+                for path in paths:
+                    remote_path = posixpath.join(remote_dir, os.path.basename(path.rstrip(os.sep)))
+                    queue_in_background(path, lambda l=path, r=remote_path: manager.upload(l, r))
+            
+            def upload_files() -> None:
+                upload_paths(filedialog.askopenfilenames(title="Upload files", parent=dialog))
+            
+            def upload_folder() -> None:
+                folder = filedialog.askdirectory(title="Upload folder", parent=dialog)
+                if folder:
+                    upload_paths([folder])
+            
+            def cancel_selected() -> None:
+                for iid in transfers.selection():
+                    job = transfer_rows.get(iid)
+                    if job:
+                        job.cancel()
+            
+            def clear_finished() -> None:
+                manager.clear_finished()
+                refresh_transfers()
+            
+            def refresh_transfers() -> None:
+                jobs = manager.jobs()
+                current = {str(id(job)): job for job in jobs}
+                for iid in list(transfer_rows):
+                    if iid not in current:
+                        transfers.delete(iid)
+                        del transfer_rows[iid]
+                finished_uploads = False
+                for iid, job in current.items():
+                    percent = f"{job.transferred * 100 // job.size}%" if job.size else ""
+                    rate = f"{format_bytes(job.bytes_per_second())}/s" if job.started else ""
+                    state = f"{job.state}: {job.error}" if job.error else job.state
+                    values = (job.direction, format_bytes(job.size or 0), percent, rate, state)
+                    if iid in transfer_rows:
+                        if transfers.item(iid, "values") != values:
+                            if job.direction == "upload" and job.state == "done":
+                                finished_uploads = True
+                            transfers.item(iid, values=values)
+                    else:
+                        transfers.insert("", "end", iid=iid, text=job.name, values=values)
+                        transfer_rows[iid] = job
+                # New files arrived in the directory being shown
+                if finished_uploads:
+                    load(browser["path"])
+            
+            def refresh_loop() -> None:
+                if dialog.winfo_exists():
+                    refresh_transfers()
+                    dialog.after(500, refresh_loop)
+            
+            def on_destroy(event) -> None:
+                if event.widget is not dialog:
+                    return
+                if self.sftp_panels.get(session_name) is dialog:
+                    del self.sftp_panels[session_name]
+                if browser["sftp"] is not None:
+                    browser["sftp"].close()
+            
+            # Path bar buttons
+            ctk.CTkButton(path_frame, text="Up", width=50,
+                          command=lambda: load(posixpath.dirname(browser["path"].rstrip("/")) or "/")).grid(row=0, column=0)
+            ctk.CTkButton(path_frame, text="Refresh", width=80,
+                          command=lambda: load(path_entry.get().strip() or ".")).grid(row=0, column=2, padx=(5, 0))
+            path_entry.bind('<Return>', lambda event: load(path_entry.get().strip() or "."))
+            listing.bind('<Double-1>', open_selected)
+            listing.bind('<Return>', open_selected)
+            
+            # Selection and queue buttons
+            ctk.CTkButton(action_frame, text="Upload Folder", width=110, command=upload_folder).pack(side="right", padx=5)
+            ctk.CTkButton(action_frame, text="Upload Files", width=100, command=upload_files).pack(side="right", padx=5)
+            ctk.CTkButton(action_frame, text="Download", width=100, command=download_selected).pack(side="right", padx=5)
+            ctk.CTkButton(bottom_frame, text="Clear Finished", width=110, command=clear_finished).pack(side="right", padx=5)
+            ctk.CTkButton(bottom_frame, text="Cancel Selected", width=120, command=cancel_selected).pack(side="right", padx=5)
+            
+            dialog.bind('<Destroy>', on_destroy)
+            dialog.transient(self.root)
+            load(".")
+            refresh_loop()
+            
+        except Exception as e:
+            self.logger.error(f"Error opening file panel for {session_name}: {e}")
+            messagebox.showerror("Error", f"Failed to open file panel: {str(e)}")
+
+    def _get_transfer_manager(self, session_name: str) -> TransferManager:
+        """Return the session's transfer queue, creating it on first use."""
+        manager = self.transfer_managers.get(session_name)
+        if manager is None:
+            # Workers open SFTP channels on the session's existing transport
+            manager = TransferManager(
+                self.ssh_clients[session_name].open_sftp,
+                max_parallel=self.preferences.get("max_parallel_transfers", 4),
+                on_change=self._on_transfer_change
+            )
+            self.transfer_managers[session_name] = manager
+        return manager
+
+    def _on_transfer_change(self, job) -> None:
+        """Called on transfer worker threads whenever a job changes state."""
+        if self._transfer_status_job is None:
+            self.root.after(0, self._schedule_transfer_status)
+
+    def _schedule_transfer_status(self) -> None:
+        if self._transfer_status_job is None:
+            self._transfer_status_job = self.root.after(500, self._update_transfer_status)
+
+    def _update_transfer_status(self) -> None:
+        """Show combined throughput and ETA of all transfers in the status bar."""
+        self._transfer_status_job = None
+        try:
+            snapshots = [manager.snapshot() for manager in self.transfer_managers.values()]
+            running = sum(s.running for s in snapshots)
+            queued = sum(s.queued for s in snapshots)
+            if not running and not queued:
+                done = sum(s.done for s in snapshots)
+                failed = sum(s.failed for s in snapshots)
+                self.progress_bar.set(0)
+                self.update_status(f"Transfers finished: {done} done, {failed} failed")
+                return
+            
+            rate = sum(s.bytes_per_second for s in snapshots)
+            remaining = sum(s.remaining_bytes for s in snapshots)
+            total = sum(s.total_bytes for s in snapshots)
+            transferred = sum(s.transferred_bytes for s in snapshots)
+            eta = remaining / rate if rate > 0 else None
+            self.status_label.configure(
+                text=f"Transfers: {running} running, {queued} queued - "
+                     f"{format_bytes(rate)}/s, ETA {format_eta(eta)}"
+            )
+            self.progress_bar.set(transferred / total if total else 0)
+            self._schedule_transfer_status()
+        except Exception as e:
+            self.logger.error(f"Error updating transfer status: {e}")
+
+    def history_up(self, session_name: str, event=None) -> str:
+        """Navigate up through command history."""
+        try:
+            history = self.command_history.get(session_name)
+            command_input = self.command_inputs.get(session_name)
+            if history is None or not command_input:
+                return "break"
+            
+            # Keep what was typed so that navigating back down restores it
+            current_pos = self.history_position.get(session_name)
+            if current_pos is None:
+                current_pos = history.end
+                self.history_drafts[session_name] = command_input.get()
+            
+            # Move up in history if possible
+            found = history.older(current_pos)
+            if found is None:
+                self.logger.debug(f"No older command in history for session: {session_name}")
+                return "break"
+            self.history_position[session_name], command = found
+            
+            # Update command input with historical command
+            command_input.delete(0, tk.END)
+            command_input.insert(0, command)
+            
+            return "break"  # Prevent default handling
+            
+        except Exception as e:
+            self.logger.error(f"Error navigating command history up: {e}")
+            return "break"
+
+    def history_down(self, session_name: str, event=None) -> str:
+        """Navigate down through command history."""
+        try:
+            history = self.command_history.get(session_name)
+            command_input = self.command_inputs.get(session_name)
+            if history is None or not command_input:
+                return "break"
+            
+            # Already at the draft
+            current_pos = self.history_position.get(session_name)
+            if current_pos is None:
+                return "break"
+            
+            # Move down in history, or back to the draft past the newest command
+            found = history.newer(current_pos)
+            if found is None:
+                self.history_position[session_name] = None
+                command = self.history_drafts.pop(session_name, "")
+            else:
+                self.history_position[session_name], command = found
+            
+            command_input.delete(0, tk.END)
+            command_input.insert(0, command)
+            
+            return "break"  # Prevent default handling
+            
+        except Exception as e:
+            self.logger.error(f"Error navigating command history down: {e}")
+            return "break"
+
+    def start_history_search(self, session_name: str, event=None) -> str:
+        """
+        Start a reverse search through the command history (Ctrl+R), or move
+        to the next older match if one is in progress.
+        
+        A search bar opens below the command input; each key searches again
+        and shows the match in the command input. Return keeps the match for
+        editing, Escape restores what was typed before.
+        """
+        try:
+            history = self.command_history.get(session_name)
+            command_input = self.command_inputs.get(session_name)
+            if history is None or not command_input:
+                return "break"
+            
+            state = self.history_searches.get(session_name)
+            if state is not None:
+                self._show_history_match(session_name, state["search"].older())
+                return "break"
+            
+            # Create the search bar (row 3 of the terminal tab)
+            search_frame = ctk.CTkFrame(command_input.master)
+            search_frame.grid(row=3, column=0, columnspan=2, sticky='ew', padx=5, pady=(0, 5))
+            search_label = ctk.CTkLabel(search_frame, text="(reverse-i-search)")
+            search_label.pack(side="left", padx=5)
+            search_entry = ctk.CTkEntry(search_frame, height=28)
+            search_entry.pack(side="left", fill="x", expand=True, padx=5)
+            
+            self.history_searches[session_name] = {
+                "search": ReverseSearch(history),
+                "frame": search_frame,
+                "label": search_label,
+                "draft": command_input.get()
+            }
+            
+            search_entry.bind('<KeyRelease>', lambda event, name=session_name: self._update_history_search(name, event))
+            search_entry.bind('<Control-r>', lambda event, name=session_name: self.start_history_search(name))
+            search_entry.bind('<Return>', lambda event, name=session_name: self.finish_history_search(name, True))
+            search_entry.bind('<Escape>', lambda event, name=session_name: self.finish_history_search(name, False))
+            search_entry.focus_set()
+            return "break"
+            
+        except Exception as e:
+            self.logger.error(f"Error starting history search: {e}")
+            return "break"
+
+    def _update_history_search(self, session_name: str, event) -> None:
+        """Search again when the query text changed."""
+        state = self.history_searches.get(session_name)
+        if state is None:
+            return
+        query = event.widget.get()
+        if query != state["search"].query:
+            self._show_history_match(session_name, state["search"].update(query))
+
+    def _show_history_match(self, session_name: str, command: Optional[str]) -> None:
+        state = self.history_searches[session_name]
+        state["label"].configure(
+            text="(failing reverse-i-search)" if state["search"].failing else "(reverse-i-search)"
+        )
+        command_input = self.command_inputs.get(session_name)
+        if command_input is not None:
+            command_input.delete(0, tk.END)
+            command_input.insert(0, command if command is not None else state["draft"])
+
+    def finish_history_search(self, session_name: str, accept: bool) -> str:
+        """Close the search bar, keeping the match (accept) or restoring the typed text."""
+        state = self.history_searches.pop(session_name, None)
+        if state is None:
+            return "break"
+        try:
+            state["frame"].destroy()
+            command_input = self.command_inputs.get(session_name)
+            if command_input is None:
+                return "break"
+            match = state["search"].match
+            if accept and match is not None:
+                # Up and Down continue from the match, as in a shell
+                self.history_drafts[session_name] = state["draft"]
+                self.history_position[session_name] = match[0]
+            else:
+                command_input.delete(0, tk.END)
+                command_input.insert(0, state["draft"])
+            command_input.focus_set()
+        except Exception as e:
+            self.logger.error(f"Error finishing history search: {e}")
+        return "break"
+
+    def disconnect_session(self, session_name: str) -> None:
+        """Disconnect an SSH session."""
+        try:
+            # Abandon a handshake that is still running
+            pending = self.pending_connections.pop(session_name, None)
+            if pending:
+                pending.cancel()
+                self._hide_connection_progress(session_name)
+            
+            # Stop the reactor watching the channel before it is closed
+            self.channel_reactor.unregister(session_name)
+            self.render_scheduler.discard(session_name)
+            self.session_transcripts.pop(session_name, None)  # Closed with the client's output sinks
+            
+            # Stop file transfers before the transport goes back to the pool
+            panel = self.sftp_panels.pop(session_name, None)
+            if panel and panel.winfo_exists():
+                panel.destroy()
+            manager = self.transfer_managers.pop(session_name, None)
+            if manager:
+                manager.close()
+            
+            if session_name in self.ssh_clients:
+                self.ssh_clients[session_name].close()
+                del self.ssh_clients[session_name]
+            
+            if session_name in self.active_channels:
+                self.active_channels[session_name].close()
+                del self.active_channels[session_name]
+
+            # Clean up terminal resources
+            if session_name in self.terminal_outputs:
+                del self.terminal_outputs[session_name]
+            if session_name in self.command_inputs:
+                del self.command_inputs[session_name]
+            self.terminal_button_frames.pop(session_name, None)
+            if session_name in self.command_history:
+                del self.command_history[session_name]
+            if session_name in self.history_position:
+                del self.history_position[session_name]
+            self.history_drafts.pop(session_name, None)
+            self.history_searches.pop(session_name, None)
+
+            # Remove the tab
+            if hasattr(self.tab_view, "_name_list") and session_name in self.tab_view._name_list:
+                self.tab_view.delete(session_name)
+                
+                # If no tabs left except welcome, switch to welcome
+                remaining_tabs = [tab for tab in self.tab_view._name_list if tab != "Welcome"]
+                if not remaining_tabs:
+                    self.tab_view.set("Welcome")
+
+            self.logger.info(f"Session {session_name} disconnected successfully")
+            self.update_status(f"Disconnected from {session_name}")
+
+        except Exception as e:
+            self.logger.error(f"Error disconnecting session {session_name}: {str(e)}")
+            self.update_status(f"Error disconnecting from {session_name}")
+
+    def save_sessions(self):
+        """Save sessions to a JSON file."""
+        try:
+            with open(self.session_file, 'w') as f:
+                json.dump(self.sessions, f, indent=4)
+            self.update_status("Sessions saved")
+        except Exception as e:
+            logging.error(f"Error saving sessions: {e}")
+            self.update_status("Error saving sessions")
+
+    def import_sessions(self) -> None:
+        """
+        Import sessions from a JSON export, a CSV file or an OpenSSH config.
+
+        The file is read, validated and written in batches on a worker thread
+        while the status bar shows progress; a report of duplicates, conflicts
+        and invalid entries is shown at the end.
+        """
+        try:
+            if self.active_import is not None:
+                messagebox.showinfo("Import Sessions", "An import is already running.")
+                return
+
+            file_path = filedialog.askopenfilename(
+                title="Import Sessions", 
+                filetypes=[
+                    ("JSON files", "*.json"),
+                    ("CSV files", "*.csv"),
+                    ("OpenSSH config", "config *.conf"),
+                    ("All files", "*.*")
+                ]
+            )
+            
+            if not file_path:
+                return  # User cancelled
+            
+            # Replace removes sessions missing from the file once everything is imported
+            replace = messagebox.askyesno(
+                "Confirm",
+                "Replace existing sessions?\n\n"
+                "No merges the file into your sessions, overwriting sessions with the same name."
+            )
+            
+            source = os.path.basename(file_path)
+            cancel = threading.Event()
+            self.active_import = cancel
+            self.update_status(f"Importing sessions from {source}...")
+            
+            def progress(report: ImportReport) -> None:
+                count = report.imported
+                self.root.after(0, lambda: self.update_status(f"Importing {source}: {count} sessions..."))
+            
+            def finished(f) -> None:
+                try:
+                    self.root.after(0, lambda: self._finish_import(f))
+                except Exception:
+                    pass  # The window is already gone
+            
+            self.import_future = self.import_executor.submit(
+                import_entries, self.sessions, iter_sessions(file_path), file_path,
+                replace=replace, progress=progress, cancel=cancel
+            )
+            self.import_future.add_done_callback(finished)
+            
+        except Exception as e:
+            self.active_import = None
+            self.import_future = None
+            logging.error(f"Import failed: {e}")
+            messagebox.showerror("Error", f"Failed to import sessions: {e}")
+
+    def _finish_import(self, future) -> None:
+        """Show the outcome of a background import and refresh the session list."""
+        if future is not self.import_future:
+            return  # The window is closing
+        self.active_import = None
+        self.import_future = None
+        try:
+            report = future.result()
+        except Exception as e:
+            logging.error(f"Import failed: {e}")
+            self.update_session_list()  # Batches written before the error are kept
+            messagebox.showerror("Error", f"Failed to import sessions: {e}")
+            return
+        
+        # Update the sessions list
+        self.update_session_list()
+        self.update_status(report.summary().splitlines()[0])
+        if report.problems or report.cancelled:
+            messagebox.showinfo("Import Sessions", report.summary())
+
+    def export_sessions(self) -> None:
+        """Export sessions to a JSON file."""
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json")],
+                title="Export Sessions"
+            )
+            
+            if not file_path:
+                return  # User cancelled
+            
+            # Exports carry plaintext passwords, as they always have
+            with open(file_path, 'w') as f:
+                json.dump({name: self.sessions.plaintext_record(name) for name in self.sessions}, f, indent=4)
+            
+            self.update_status(f"Exported {len(self.sessions)} sessions")
+            
+        except Exception as e:
+            logging.error(f"Export failed: {e}")
+            messagebox.showerror("Error", f"Failed to export sessions: {e}")
+
+    def update_session_list(self) -> None:
+        """Update the session list in the UI."""
+        try:
+            # The search index catches up on the next search
+            self.session_index_stale = True
+
+            # Filter sessions based on search
+            filtered_sessions = self.filtered_session_names()
+            self.session_list.set_items(filtered_sessions)
+
+            self.logger.debug(f"Session list updated with {len(filtered_sessions)} sessions")
+            
+        except Exception as e:
+            self.logger.error(f"Error updating session list: {e}")
+
+    def bind_shortcuts(self) -> None:
+        """Bind keyboard shortcuts."""
+        try:
+            # Debug logging for command inputs
+            self.logger.debug(f"Command Inputs: {list(self.command_inputs.keys())}")
+            
+            shortcuts = self.preferences.get("shortcuts", {})
+            
+            # Session navigation shortcuts
+            self.root.bind('<Control-Tab>', self.next_tab)
+            self.root.bind('<Control-Shift-Tab>', self.prev_tab)
+            self.root.bind('<Control-w>', lambda e: self.close_current_tab())
+            
+            # New session and search shortcuts
+            self.root.bind('<Control-n>', lambda e: self.new_session_dialog())
+            self.root.bind('<Control-f>', self.focus_search)
+            
+            # Fullscreen shortcut
+            self.root.bind('<F11>', self.toggle_fullscreen)
+            
+            # Terminal command history shortcuts
+            for session_name, command_input in list(self.command_inputs.items()):
+                try:
+                    # Unbind existing bindings first to prevent multiple bindings
+                    command_input.unbind('<Up>')
+                    command_input.unbind('<Down>')
+                    command_input.unbind('<Control-r>')
+                except Exception as unbind_error:
+                    self.logger.warning(f"Error unbinding keys for {session_name}: {unbind_error}")
+                
+                # Bind with lambda to capture current session_name
+                # Use event-driven binding with explicit event parameter
+                command_input.bind('<Up>', lambda event, s=session_name: self.history_up(s, event))
+                command_input.bind('<Down>', lambda event, s=session_name: self.history_down(s, event))
+                command_input.bind('<Control-r>', lambda event, s=session_name: self.start_history_search(s, event))
+                
+                # Additional logging to verify binding
+                self.logger.debug(f"Bound history navigation for session: {session_name}")
+                self.logger.debug(f"Command input for {session_name}: {command_input}")
+            
+            self.logger.info("Shortcuts bound successfully")
+            
+        except Exception as e:
+            self.logger.error(f"Error binding shortcuts: {str(e)}")
+            messagebox.showerror("Error", "Failed to bind shortcuts")
+
+    def next_tab(self, event=None) -> None:
+        """Switch to next tab."""
+        if not hasattr(self, 'tab_view'):
+            return
+        tabs = self.tab_view.tabs()
+        if not tabs:
+            return
+        current = self.tab_view.select()
+        idx = tabs.index(current)
+        next_idx = (idx + 1) % len(tabs)
+        self.tab_view.select(tabs[next_idx])
+
+    def prev_tab(self, event=None) -> None:
+        """Switch to previous tab."""
+        if not hasattr(self, 'tab_view'):
+            return
+        tabs = self.tab_view.tabs()
+        if not tabs:
+            return
+        current = self.tab_view.select()
+        idx = tabs.index(current)
+        prev_idx = (idx - 1) % len(tabs)
+        self.tab_view.select(tabs[prev_idx])
+
+    def focus_search(self, event=None) -> None:
+        """Focus the search entry."""
+        self.search_var.set("")  # Clear existing search
+        self.search_entry.focus_set()
+
+    def toggle_fullscreen(self, event=None) -> None:
+        """Toggle fullscreen mode."""
+        try:
+            # Check current fullscreen state
+            is_fullscreen = self.root.attributes('-fullscreen')
+            
+            # Toggle fullscreen
+            self.root.attributes('-fullscreen', not is_fullscreen)
+            
+            # Update status bar
+            status_msg = "Fullscreen Enabled" if not is_fullscreen else "Fullscreen Disabled"
+            self.update_status(status_msg)
+            
+            # Log the action
+            self.logger.info(status_msg)
+        except Exception as e:
+            # Log any errors that occur during fullscreen toggle
+            self.logger.error(f"Error toggling fullscreen: {e}")
+            self.update_status("Failed to toggle fullscreen")
+
+    def auto_save(self) -> None:
+        """Auto-save sessions periodically."""
+        self.save_sessions()
+        self.root.after(300000, self.auto_save)  # Schedule next auto-save
+
+    def duplicate_session(self, session_name: str) -> None:
+        """Duplicate an existing session."""
+        if session_name in self.sessions:
+            new_name = f"{session_name} (copy)"
+            i = 1
+            while new_name in self.sessions:
+                new_name = f"{session_name} (copy {i})"
+                i += 1
+            self.sessions[new_name] = copy.deepcopy(self.sessions[session_name])
+            self.update_session_tree()
+
+    def export_session(self, session_name: str) -> None:
+        """Export session configuration."""
+        if session_name in self.sessions:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json")],
+                initialfile=f"{session_name}.json"
+            )
+            if file_path:
+                with open(file_path, 'w') as f:
+                    json.dump(self.sessions.plaintext_record(session_name), f, indent=4)
+
+    def import_session(self) -> None:
+        """Import session configuration."""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if file_path:
+            with open(file_path, 'r') as f:
+                session_data = json.load(f)
+                session_name = os.path.splitext(os.path.basename(file_path))[0]
+                if session_name in self.sessions:
+                    i = 1
+                    while f"{session_name}_{i}" in self.sessions:
+                        i += 1
+                    session_name = f"{session_name}_{i}"
+                self.sessions[session_name] = session_data
+                self.update_session_tree()
+
+    def create_welcome_tab(self):
+        """Create the welcome tab."""
+        try:
+            # Create welcome tab
+            welcome_frame = self.tab_view.add("Welcome")
+            
+            # Welcome message
+            welcome_label = ctk.CTkLabel(
+                welcome_frame,
+                text="Welcome to Modern SSH Client",
+                font=("Helvetica", 24, "bold")
+            )
+            welcome_label.pack(pady=20)
+            
+            # Quick start guide
+            guide_text = """
+            Quick Start Guide:
+            
+            1. Create a new session using the '+' button or Ctrl+N
+            2. Enter your connection details
+            3. Click 'Save' to store the session
+            4. Click on the session name to connect
+            
+            Use the search bar above to quickly find your sessions.
+            """
+            
+            guide_label = ctk.CTkLabel(
+                welcome_frame,
+                text=guide_text,
+                justify="left",
+                font=("Helvetica", 12)
+            )
+            guide_label.pack(pady=10, padx=20)
+            
+            # Recent sessions section
+            recent_frame = ctk.CTkFrame(welcome_frame)
+            recent_frame.pack(fill="x", padx=20, pady=10)
+            
+            recent_label = ctk.CTkLabel(
+                recent_frame,
+                text="Recent Sessions:",
+                font=("Helvetica", 16, "bold")
+            )
+            recent_label.pack(anchor="w", pady=5)
+            
+            # Display recent sessions (if any)
+            recent_sessions = list(self.sessions.keys())[-5:]  # Get last 5 sessions
+            if recent_sessions:
+                for session in recent_sessions:
+                    session_btn = ctk.CTkButton(
+                        recent_frame,
+                        text=session,
+                        command=lambda s=session: self.connect_to_session(s)
+                    )
+                    session_btn.pack(fill="x", pady=2)
+            else:
+                no_sessions_label = ctk.CTkLabel(
+                    recent_frame,
+                    text="No recent sessions",
+                    font=("Helvetica", 12)
+                )
+                no_sessions_label.pack(pady=5)
+
+            self.logger.debug("Welcome tab created successfully")
+        except Exception as e:
+            self.logger.error(f"Error creating welcome tab: {str(e)}")
+            messagebox.showerror("Error", f"Failed to create welcome tab: {str(e)}")
+
+    def on_closing(self):
+        """Handle application closing."""
+        try:
+            # Stop a running import before its next batch, and let the batch it is
+            # writing finish before the database closes
+            if self.import_future is not None:
+                future, self.import_future = self.import_future, None
+                self.active_import.set()
+                while not wait([future], timeout=0.05).done:
+                    self.root.update()  # Serve the status updates the import posts meanwhile
+            self.import_executor.shutdown(wait=False)
+            
+            # Write sessions before closing, including changes still waiting for the timer
+            try:
+                self.sessions.close()
+            except Exception as save_error:
+                self.logger.error(f"Error saving sessions: {save_error}")
+            
+            # Save configuration
+            self.save_preferences()
+            
+            # Abandon connection attempts still in progress
+            for pending in list(self.pending_connections.values()):
+                pending.cancel()
+            self.pending_connections.clear()
+            self.connect_executor.shutdown(wait=False, cancel_futures=True)
+            
+            # Abandon a running broadcast before its transports go away
+            if self.active_broadcast:
+                self.active_broadcast.on_complete = None
+                self.active_broadcast.cancel()
+            
+            # Close all SSH connections
+            for session_name in list(self.ssh_clients.keys()):
+                self.disconnect_session(session_name)
+            
+            # Stop the I/O threads and close transports kept for reuse
+            self.channel_reactor.stop()
+            self.forward_relay.stop()
+            self.transport_pool.close_all()
+            self.command_histories.close_all()
+            
+            # Destroy the window
+            self.root.destroy()
+            
+        except Exception as e:
+            logging.error(f"Error during closing: {e}")
+            self.root.destroy()  # Ensure window closes even if there's an error
+
+    def clear_history(self) -> None:
+        """Clear the command history for all sessions, including the history files."""
+        try:
+            self.command_histories.clear_all()
+        except OSError as e:
+            self.logger.error(f"Error clearing command history: {e}")
+            messagebox.showerror("Error", f"Failed to clear command history: {str(e)}")
+            return
+        self.history_position = {name: None for name in self.history_position}
+        self.history_drafts.clear()
+        messagebox.showinfo("Info", "Command history has been cleared.")
+
+    def update_terminal_font(self, font_size: int) -> None:
+        """
+        Safely update the font size for terminal and text-based widgets.
+        
+        Args:
+            font_size (int): Font size to set, must be between 8 and 24
+        """
+        try:
+            # Validate font size
+            if not 8 <= font_size <= 24:
+                raise ValueError("Font size must be between 8 and 24")
+            
+            # Prevent recursive calls and ensure initialization
+            if (hasattr(self, '_font_update_in_progress') or 
+                not hasattr(self, 'terminal_outputs') or 
+                not hasattr(self, 'tab_view')):
+                return
+            
+            self._font_update_in_progress = True
+            
+            # Determine font family
+            font_family = self.preferences.get("terminal_font_family", "Monospace")
+            
+            # Prepare font configuration
+            font_config = (font_family, font_size)
+            
+            # Update terminal outputs with minimal recursion risk
+            for session_name, terminal_widget in list(self.terminal_outputs.items()):
+                try:
+                    # Use direct configuration to minimize event triggers
+                    if hasattr(terminal_widget, 'configure'):
+                        terminal_widget.configure(font=font_config)
+                except Exception as e:
+                    self.logger.warning(f"Could not update font for terminal {session_name}: {e}")
+            
+            # Update text widgets in tab view with careful traversal
+            if hasattr(self, 'tab_view'):
+                try:
+                    for tab in self.tab_view.winfo_children():
+                        for child in tab.winfo_children():
+                            if isinstance(child, (tk.Text, ctk.CTkTextbox, ctk.CTkEntry)):
+                                try:
+                                    child.configure(font=font_config)
+                                except Exception as inner_e:
+                                    self.logger.warning(f"Could not update font for {child}: {inner_e}")
+                except Exception as e:
+                    self.logger.warning(f"Error traversing tab view for font update: {e}")
+            
+            # Update preferences
+            self.preferences["terminal_font_size"] = font_size
+            
+            # Save preferences without triggering recursive updates
+            try:
+                with open(self.preferences_file, 'w') as f:
+                    json.dump(self.preferences, f, indent=4)
+                self.logger.info(f"Updated terminal font to {font_size}")
+            except Exception as e:
+                self.logger.error(f"Could not save font preferences: {e}")
+        
+        except Exception as e:
+            error_msg = f"Font update failed: {e}"
+            self.logger.error(error_msg)
+            messagebox.showerror("Font Update Error", error_msg)
+        
+        finally:
+            # Always clear the update flag
+            if hasattr(self, '_font_update_in_progress'):
+                delattr(self, '_font_update_in_progress')
+
+    def manage_shortcuts(self) -> None:
+        """Show keyboard shortcuts management dialog."""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Keyboard Shortcuts")
+        dialog.geometry("500x400")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # Create main frame
+        main_frame = ctk.CTkFrame(dialog)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        # Create treeview for shortcuts
+        columns = ("Action", "Shortcut")
+        tree = ttk.Treeview(main_frame, columns=columns, show="headings")
+        
+        # Configure columns
+        tree.heading("Action", text="Action")
+        tree.heading("Shortcut", text="Shortcut")
+        tree.column("Action", width=200)
+        tree.column("Shortcut", width=200)
+        
+        # Add scrollbar
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Pack tree and scrollbar
+        tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        # Configure grid weights
+        main_frame.grid_columnconfigure(0, weight=1)
+        main_frame.grid_rowconfigure(0, weight=1)
+        
+        # Default shortcuts
+        default_shortcuts = {
+            "New Session": "<Control-t>",
+            "Focus Search": "<Control-f>",
+            "Toggle Fullscreen": "F11",
+            "Connect Session": "<Return>",
+            "Disconnect Session": "<Control-d>",
+            "Clear Terminal": "<Control-l>"
+        }
+        
+        # Load custom shortcuts from config
+        shortcuts = self.config.get("shortcuts", default_shortcuts)
+        
+        # Populate treeview
+        for action, shortcut in shortcuts.items():
+            tree.insert("", tk.END, values=(action, shortcut))
+        
+        def edit_shortcut():
+            """Edit the selected shortcut."""
+            selected = tree.selection()
+            if not selected:
+                return
+                
+            item = selected[0]
+            action = tree.item(item)["values"][0]
+            
+            # Create edit dialog
+            edit_dialog = tk.Toplevel(dialog)
+            edit_dialog.title(f"Edit Shortcut - {action}")
+            edit_dialog.geometry("300x150")
+            edit_dialog.transient(dialog)
+            edit_dialog.grab_set()
+            
+            # Create and pack widgets
+            ctk.CTkLabel(edit_dialog, text="Press new shortcut:").pack(pady=10)
+            shortcut_var = tk.StringVar(value=shortcuts[action])
+            shortcut_entry = ctk.CTkEntry(edit_dialog, textvariable=shortcut_var, state="readonly")
+            shortcut_entry.pack(pady=5, padx=10, fill=tk.X)
+            
+            def on_key(event):
+                """Handle key press event."""
+                if event.keysym in ("Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"):
+                    return
+                    
+                modifiers = []
+                if event.state & 0x4:
+                    modifiers.append("Control")
+                if event.state & 0x1:
+                    modifiers.append("Shift")
+                if event.state & 0x8:
+                    modifiers.append("Alt")
+                    
+                key = event.keysym
+                if key == "plus":
+                    key = "plus"
+                elif key == "minus":
+                    key = "minus"
+                elif len(key) == 1:
+                    key = key.lower()
+                    
+                shortcut = "<" + "-".join(modifiers + [key]) + ">" if modifiers else key
+                shortcut_var.set(shortcut)
+                
+            shortcut_entry.bind("<KeyPress>", on_key)
+            
+            def save_shortcut():
+                """Save the new shortcut."""
+                new_shortcut = shortcut_var.get()
+                shortcuts[action] = new_shortcut
+                tree.item(item, values=(action, new_shortcut))
+                edit_dialog.destroy()
+                
+            # Buttons
+            button_frame = ctk.CTkFrame(edit_dialog)
+            button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=10)
+            ctk.CTkButton(button_frame, text="Save", command=save_shortcut).pack(side=tk.RIGHT, padx=5)
+            ctk.CTkButton(button_frame, text="Cancel", command=edit_dialog.destroy).pack(side=tk.RIGHT, padx=5)
+            
+            shortcut_entry.focus_set()
+            
+        def reset_defaults():
+            """Reset shortcuts to defaults."""
+            if messagebox.askyesno("Reset Shortcuts", "Reset all shortcuts to default values?"):
+                # Replace all existing shortcuts
+                tree.delete(*tree.get_children())
+                shortcuts.clear()
+                shortcuts.update(default_shortcuts)
+                for action, shortcut in default_shortcuts.items():
+                    tree.insert("", tk.END, values=(action, shortcut))
+        
+        # Buttons
+        button_frame = ctk.CTkFrame(dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="Edit",
+            command=edit_shortcut
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="Reset to Defaults",
+            command=reset_defaults
+        ).pack(side=tk.LEFT, padx=5)
+        
+        def save_shortcuts():
+            """Save shortcuts to config."""
+            try:
+                self.config["shortcuts"] = shortcuts
+                self.save_config()
+                self.create_shortcuts()  # Recreate shortcuts with new bindings
+                dialog.destroy()
+                self.update_status("Shortcuts saved")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error saving shortcuts: {str(e)}")
+        
+        ctk.CTkButton(
+            button_frame,
+            text="Save",
+            command=save_shortcuts
+        ).pack(side=tk.RIGHT, padx=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="Cancel",
+            command=dialog.destroy
+        ).pack(side=tk.RIGHT, padx=5)
+
+    def on_entry_focus(self, entry_widget, focused):
+        """Handle focus events for entry widgets."""
+        if focused:
+            entry_widget.configure(border_color=("gray75", "gray30"))
+        else:
+            entry_widget.configure(border_color=("gray70", "gray25"))
+
+    def cycle_history(self, session_name: str, direction: str) -> None:
+        """Cycle through command history."""
+        if direction == "up":
+            self.history_up(session_name)
+        elif direction == "down":
+            self.history_down(session_name)
+
+    def edit_session(self, session_name):
+        """Edit the selected SSH session."""
+        if session_name not in self.sessions:
+            messagebox.showerror("Error", "Session not found")
+            return
+
+        session = self.sessions[session_name]
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title(f"Edit Session: {session_name}")
+        dialog.geometry("450x510")  # Set a fixed size for better layout
+
+        # Create a main frame with padding
+        main_frame = ctk.CTkFrame(dialog)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        # Session Name
+        ctk.CTkLabel(main_frame, text="Session Name:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        session_name_entry = ctk.CTkEntry(main_frame, width=200)
+        session_name_entry.insert(0, session_name)
+        session_name_entry.grid(row=0, column=1, columnspan=2, padx=10, pady=5, sticky="ew")
+
+        # Host
+        ctk.CTkLabel(main_frame, text="Host:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        host_entry = ctk.CTkEntry(main_frame, width=200)
+        host_entry.insert(0, session.get("host", ""))
+        host_entry.grid(row=1, column=1, columnspan=2, padx=10, pady=5, sticky="ew")
+
+        # Port
+        ctk.CTkLabel(main_frame, text="Port:").grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        port_entry = ctk.CTkEntry(main_frame, width=200)
+        port_entry.insert(0, str(session.get("port", 22)))
+        port_entry.grid(row=2, column=1, columnspan=2, padx=10, pady=5, sticky="ew")
+
+        # Username
+        ctk.CTkLabel(main_frame, text="Username:").grid(row=3, column=0, padx=10, pady=5, sticky="w")
+        username_entry = ctk.CTkEntry(main_frame, width=200)
+        username_entry.insert(0, session.get("username", ""))
+        username_entry.grid(row=3, column=1, columnspan=2, padx=10, pady=5, sticky="ew")
+
+        # Password
+        ctk.CTkLabel(main_frame, text="Password:").grid(row=4, column=0, padx=10, pady=5, sticky="w")
+        password_entry = ctk.CTkEntry(main_frame, show="*", width=200)
+        if session.get("password"):
+            try:
+                decrypted_password = self.decrypt_data(session["password"])
+                password_entry.insert(0, decrypted_password)
+            except Exception as e:
+                self.logger.error(f"Failed to decrypt password: {e}")
+        password_entry.grid(row=4, column=1, columnspan=2, padx=10, pady=5, sticky="ew")
+
+        # SSH Key
+        ctk.CTkLabel(main_frame, text="SSH Key:").grid(row=5, column=0, padx=10, pady=5, sticky="w")
+        ssh_key_entry = ctk.CTkEntry(main_frame, width=200)
+        if session.get("key_file"):
+            ssh_key_entry.insert(0, session["key_file"])
+        ssh_key_entry.grid(row=5, column=1, padx=10, pady=5, sticky="ew")
+
+        def browse_ssh_key():
+            key_path = filedialog.askopenfilename(
+                title="Select SSH Key",
+                filetypes=[("All Files", "*.*")]
+            )
+            if key_path:
+                ssh_key_entry.delete(0, tk.END)
+                ssh_key_entry.insert(0, key_path)
+
+        browse_button = ctk.CTkButton(main_frame, text="Browse", command=browse_ssh_key, width=70)
+        browse_button.grid(row=5, column=2, padx=5, pady=5)
+
+        ctk.CTkLabel(main_frame, text="Timeouts (s):").grid(row=6, column=0, padx=5, pady=5, sticky="e")
+        timeout_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        timeout_frame.grid(row=6, column=1, padx=5, pady=5, sticky="w")
+        connect_timeout_entry = ctk.CTkEntry(timeout_frame, width=68, placeholder_text="connect")
+        connect_timeout_entry.pack(side="left", padx=(0, 4))
+        auth_timeout_entry = ctk.CTkEntry(timeout_frame, width=68, placeholder_text="auth")
+        auth_timeout_entry.pack(side="left")
+        if session.get("connect_timeout"):
+            connect_timeout_entry.insert(0, str(session["connect_timeout"]))
+        if session.get("auth_timeout"):
+            auth_timeout_entry.insert(0, str(session["auth_timeout"]))
+
+        ctk.CTkLabel(main_frame, text="Tags:").grid(row=7, column=0, padx=5, pady=5, sticky="e")
+        tags_entry = ctk.CTkEntry(main_frame, placeholder_text="comma separated, e.g. prod, web")
+        tags_entry.grid(row=7, column=1, padx=5, pady=5, sticky="ew")
+        tags = session.get("tags") or []
+        tags_entry.insert(0, tags if isinstance(tags, str) else ", ".join(tags))
+
+        ctk.CTkLabel(main_frame, text="Forwards:").grid(row=8, column=0, padx=5, pady=5, sticky="e")
+        forwards_entry = ctk.CTkEntry(main_frame, placeholder_text="e.g. L 8080:db:5432, D 1080")
+        forwards_entry.grid(row=8, column=1, padx=5, pady=5, sticky="ew")
+        forwards = session.get("forwards") or []
+        forwards_entry.insert(0, forwards if isinstance(forwards, str) else ", ".join(forwards))
+
+        ctk.CTkLabel(main_frame, text="Jump hosts:").grid(row=9, column=0, padx=5, pady=5, sticky="e")
+        proxy_jump_entry = ctk.CTkEntry(main_frame, placeholder_text="session or user@host:port, ...")
+        proxy_jump_entry.grid(row=9, column=1, padx=5, pady=5, sticky="ew")
+        proxy_jump = session.get("proxy_jump") or []
+        proxy_jump_entry.insert(0, proxy_jump if isinstance(proxy_jump, str) else ", ".join(proxy_jump))
+
+        def save_session():
+            try:
+                # Validate inputs
+                new_session_name = session_name_entry.get()
+                host = host_entry.get()
+                port = port_entry.get()
+                username = username_entry.get()
+                password = password_entry.get()
+                ssh_key_path = ssh_key_entry.get()
+                # Keep fields this dialog does not edit
+                updated_session = dict(session)
+                updated_session.update({
+                    "host": host,
+                    "port": port,
+                    "username": username,
+                    "password": password,  # Store password securely
+                    "ssh_key_path": ssh_key_path
+                })
+                # Optional per-host timeouts; empty fields fall back to the preferences
+                for key, name, entry in (("connect_timeout", "connect", connect_timeout_entry),
+                                         ("auth_timeout", "auth", auth_timeout_entry)):
+                    timeout = parse_timeout(entry.get(), name)  # Raises ValueError with a readable message
+                    if timeout is not None:
+                        updated_session[key] = timeout
+                    else:
+                        updated_session.pop(key, None)
+                tags = [tag.strip() for tag in tags_entry.get().split(",") if tag.strip()]
+                if tags:
+                    updated_session["tags"] = tags
+                else:
+                    updated_session.pop("tags", None)
+                forwards = [entry.strip() for entry in forwards_entry.get().split(",") if entry.strip()]
+                for forward in forwards:
+                    ForwardSpec.parse(forward)  # Raises ValueError with a readable message
+                if forwards:
+                    updated_session["forwards"] = forwards
+                else:
+                    updated_session.pop("forwards", None)
+                proxy_jump = [hop.strip() for hop in proxy_jump_entry.get().split(",") if hop.strip()]
+                for hop in proxy_jump:
+                    if hop not in self.sessions:
+                        parse_jump_host(hop)
+                if proxy_jump:
+                    updated_session["proxy_jump"] = proxy_jump
+                else:
+                    updated_session.pop("proxy_jump", None)
+                if new_session_name != session_name:
+                    self.sessions.pop(session_name, None)
+                self.sessions[new_session_name] = updated_session
+                self.save_sessions()
+                self.update_session_list()
+                dialog.destroy()
+
+            except ValueError as e:
+                messagebox.showerror("Invalid Input", str(e), parent=dialog)
+            except Exception as e:
+                self.logger.error(f"Error saving session: {e}")
+                messagebox.showerror("Error", f"Failed to save session: {str(e)}")
+
+        save_button = ctk.CTkButton(main_frame, text="Save", command=save_session)
+        save_button.grid(row=10, column=0, columnspan=3, pady=10)
+
+        dialog.transient(self.root)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+
+    def delete_session(self, session_name: str) -> None:
+        """
+        Delete a session completely, including its connection, credentials, and UI elements.
+        
+        Args:
+            session_name (str): Name of the session to delete
+        """
+        try:
+            # First, disconnect the session if it's active
+            if session_name in self.ssh_clients:
+                try:
+                    self.disconnect_session(session_name)
+                except Exception as disconnect_error:
+                    self.logger.warning(f"Error disconnecting session {session_name}: {disconnect_error}")
+            
+            # Remove SSH client if exists
+            if session_name in self.ssh_clients:
+                del self.ssh_clients[session_name]
+            
+            # Remove terminal frame and output if exists
+            if session_name in self.terminal_frames:
+                try:
+                    self.terminal_frames[session_name].destroy()
+                    del self.terminal_frames[session_name]
+                except Exception as frame_error:
+                    self.logger.warning(f"Error removing terminal frame for {session_name}: {frame_error}")
+            
+            # Remove terminal output widget
+            if session_name in self.terminal_outputs:
+                del self.terminal_outputs[session_name]
+            
+            # Remove command input widget
+            if session_name in self.command_inputs:
+                del self.command_inputs[session_name]
+            
+            # Remove session from sessions dictionary
+            if session_name in self.sessions:
+                del self.sessions[session_name]
+            
+            # Remove command history for this session
+            if session_name in self.command_history:
+                del self.command_history[session_name]
+            
+            # Remove active channel if exists
+            if session_name in self.active_channels:
+                self.channel_reactor.unregister(session_name)
+                del self.active_channels[session_name]
+
+            # Save updated sessions
+            self.save_sessions()
+            
+            # Update session list in UI
+            self.update_session_list()
+            
+            # Log the deletion
+            self.logger.info(f"Session {session_name} deleted successfully")
+            
+            # Show a notification to the user
+            self.update_status(f"Session '{session_name}' deleted successfully")
+        
+        except Exception as e:
+            self.logger.error(f"Error deleting session {session_name}: {e}")
+            messagebox.showerror("Error", f"Failed to delete session '{session_name}'. Please check the logs.")
+
+    def close_specific_tab(self, tab_name: str) -> None:
+        """Close a specific tab by name."""
+        try:
+            # Try to remove the tab using CustomTkinter method
+            self.tab_view.delete(tab_name)
+        except Exception:
+            # Fallback: try to find and remove the tab
+            try:
+                # Get the list of tab names from the segmented button
+                tab_names = self.tab_view._segmented_button._buttons.keys()
+                
+                # Find and remove the matching tab
+                for name in tab_names:
+                    if name.lower() == tab_name.lower():
+                        self.tab_view.delete(name)
+                        break
+            except Exception as e:
+                self.logger.error(f"Error closing tab {tab_name}: {e}")
+        
+        # Clean up associated resources
+        if tab_name in self.ssh_clients:
+            self.disconnect_session(tab_name)
+        
+        # Remove other associated resources
+        self.channel_reactor.unregister(tab_name)
+        self.ssh_clients.pop(tab_name, None)
+        self.active_channels.pop(tab_name, None)
+        self.terminal_frames.pop(tab_name, None)
+        self.terminal_outputs.pop(tab_name, None)
+        self.command_inputs.pop(tab_name, None)
+        self.terminal_button_frames.pop(tab_name, None)
+        
+        # Try to remove from segmented button if possible
+        try:
+            self.tab_view._segmented_button.delete(tab_name)
+        except Exception:
+            pass
+
+    def create_menu_bar(self):
+        """Create the menu bar."""
+        self.menu_bar = tk.Menu(self.root)
+        self.root.configure(menu=self.menu_bar)  # Changed from config to configure
+        
+        # File menu
+        file_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="New Session", command=self.new_session_dialog)
+        file_menu.add_command(label="Connect Filtered Sessions", command=self.connect_filtered_sessions)
+        file_menu.add_command(label="Connect Tag...", command=self.connect_tag_dialog)
+        file_menu.add_command(label="Broadcast Command...", command=self.show_broadcast_dialog)
+        file_menu.add_separator()
+        file_menu.add_command(label="Import Sessions", command=self.import_sessions)
+        file_menu.add_command(label="Export Sessions", command=self.export_sessions)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.on_closing)  # Changed to on_closing
+
+        # Edit menu
+        edit_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Preferences", command=self.show_preferences)
+
+        # View menu
+        view_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="View", menu=view_menu)
+
+        # Theme submenu
+        theme_menu = tk.Menu(view_menu, tearoff=0)
+        view_menu.add_cascade(label="Theme", menu=theme_menu)
+        theme_menu.add_command(label="Dark Mode", command=lambda: self.apply_theme("dark"))
+        theme_menu.add_command(label="Light Mode", command=lambda: self.apply_theme("light"))
+
+        # Help menu
+        help_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="About", command=self.show_about)
+        help_menu.add_command(label="Documentation", command=self.show_documentation)
+        help_menu.add_command(label="Keyboard Shortcuts", command=self.show_shortcuts)
+
+    def connect_ssh(self, session_name, host, username, password=None, key_filename=None, port=22):
+        """
+        Connect to SSH server with improved error handling and logging.
+        
+        Args:
+            session_name (str): Name of the session for tracking
+            host (str): SSH server hostname or IP address
+            username (str): Username for authentication
+            password (str, optional): Password for authentication
+            key_filename (str, optional): Path to private key file
+            port (int, optional): SSH server port. Defaults to 22.
+        
+        Returns:
+            paramiko.SSHClient: Connected SSH client or None if connection fails
+        """
+        try:
+            # Validate input parameters
+            if not host or not username:
+                raise ValueError("Host and username are required")
+
+            client = self.ssh_clients.get(session_name)
+            if not client:
+                raise ValueError("SSH client not initialized")
+            
+            # Connect to the server
+            client.connect_ssh(
+                host=host, 
+                username=username, 
+                password=password, 
+                key_filename=key_filename, 
+                port=port
+            )
+
+            # Update UI in main thread
+            self.root.after(0, lambda: self._handle_connection_success(session_name))
+
+        except Exception as e:
+            self.logger.error(f"Connection error: {e}")
+            messagebox.showerror("Connection Error", str(e))
+            raise
+
+    def read_channel(self, session_name, channel):
+        """Read from the SSH channel."""
+        while channel.active:
+            try:
+                if channel.recv_ready():
+                    output = channel.recv(1024)
+                    self.root.after(0, lambda d=output: self.terminal_outputs[session_name].insert("end", d))
+            except Exception as e:
+                logging.error(f"Error reading from channel: {e}")
+                break
+
+    def show_log(self) -> None:
+        """Show the application's log file in a new window."""
+        try:
+            with open('ssh_client.log', 'r') as log_file:
+                log_content = log_file.read()
+
+            dialog = tk.Toplevel(self.root)
+            dialog.title("Log Viewer")
+            dialog.geometry("600x400")
+
+            text_widget = tk.Text(dialog, wrap=tk.WORD)
+            text_widget.insert("1.0", log_content)
+            text_widget.config(state="disabled")
+            text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        except FileNotFoundError:
+            messagebox.showerror("Error", "Log file not found.")
+        except Exception as e:
+            logging.error(f"Failed to show log: {e}")
+            messagebox.showerror("Error", f"Failed to show log: {e}")
+
+    def show_documentation(self):
+        """Show documentation window in an organized manner."""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Documentation")
+        dialog.geometry("700x600")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # Main container
+        main_frame = ctk.CTkFrame(dialog)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Title Section
+        title_frame = ctk.CTkFrame(main_frame)
+        title_frame.pack(fill="x", pady=(0, 20))
+        
+        title_label = ctk.CTkLabel(
+            title_frame, 
+            text="Documentation", 
+            font=("Helvetica", 24, "bold")
+        )
+        title_label.pack(pady=10)
+        
+        # Content Section
+        content_frame = ctk.CTkScrollableFrame(main_frame)
+        content_frame.pack(fill="both", expand=True)
+        
+        # Add mouse wheel event bindings
+        content_frame.bind("<MouseWheel>", lambda event: self._on_mousewheel(event, content_frame))
+        content_frame.bind("<Button-4>", lambda event: self._on_mousewheel(event, content_frame))
+        content_frame.bind("<Button-5>", lambda event: self._on_mousewheel(event, content_frame))
+        
+        sections = {
+            "Managing Sessions": [
+                "Create new sessions via File > New Session or Ctrl+N",
+                "Double-click a session to connect",
+                "Use the search bar to filter sessions (Ctrl+F)",
+                "Import/Export sessions for backup or sharing"
+            ],
+            "Terminal Features": [
+                "Multi-tab interface for multiple sessions",
+                "Command history navigation (Up/Down arrows)",
+                "Clear terminal output (Ctrl+L)",
+                "Copy/Paste support (Ctrl+C/Ctrl+V)",
+                "Customizable font size and family",
+                "Session-specific command history"
+            ],
+            "Security Features": [
+                "Encrypted password storage",
+                "SSH key authentication support",
+                "Auto-disconnect on timeout",
+                "Secure connection handling",
+                "Host key verification"
+            ],
+            "Interface Customization": [
+                "Dark/Light theme support",
+                "Adjustable terminal font size",
+                "Customizable keyboard shortcuts",
+                "Resizable interface",
+                "Session sidebar with search"
+            ],
+            "Additional Features": [
+                "Session import/export",
+                "Auto-save functionality",
+                "Connection status monitoring",
+                "Error logging and reporting",
+                "Cross-platform compatibility",
+                "ANSI escape sequence support"
+            ]
+        }
+        
+        for section, items in sections.items():
+            # Section header
+            ctk.CTkLabel(content_frame, text=section, font=("Helvetica", 16, "bold")).pack(anchor="w", pady=(10, 5))
+            
+            # Items
+            for item in items:
+                frame = ctk.CTkFrame(content_frame)
+                frame.pack(fill="x", pady=2)
+                ctk.CTkLabel(frame, text=item, font=("Helvetica", 12)).pack(anchor="w", padx=20)
+        
+        # Close button
+        ctk.CTkButton(main_frame, text="Close", command=dialog.destroy).pack(pady=(20, 0))
+
+    def open_github(self):
+        """Open the GitHub repository in default browser."""
+        import webbrowser
+        webbrowser.open("https://github.com/OwaisSafa/SSH-Client")
+
+    def show_about(self):
+        """Show about dialog with organized information."""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("About SSH Client")
+        dialog.geometry("500x600")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # Main container
+        main_frame = ctk.CTkFrame(dialog)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Title Section
+        title_frame = ctk.CTkFrame(main_frame)
+        title_frame.pack(fill="x", pady=(0, 20))
+        
+        title_label = ctk.CTkLabel(
+            title_frame, 
+            text="SSH Client", 
+            font=("Helvetica", 24, "bold")
+        )
+        title_label.pack(pady=10)
+        
+        version_label = ctk.CTkLabel(
+            title_frame,
+            text="Version 1.0.0",
+            font=("Helvetica", 12)
+        )
+        version_label.pack()
+        
+        # Description Section
+        desc_frame = ctk.CTkFrame(main_frame)
+        desc_frame.pack(fill="x", pady=(0, 20))
+        
+        desc_label = ctk.CTkLabel(
+            desc_frame,
+            text="A modern, feature-rich SSH client built with\nPython and CustomTkinter.",
+            font=("Helvetica", 12),
+            justify="center"
+        )
+        desc_label.pack(pady=10)
+        
+        # Features Section
+        features_frame = ctk.CTkFrame(main_frame)
+        features_frame.pack(fill="x", pady=(0, 20))
+        
+        features_title = ctk.CTkLabel(
+            features_frame,
+            text="Key Features",
+            font=("Helvetica", 14, "bold")
+        )
+        features_title.pack(pady=5)
+        
+        features = [
+            "🔐 Secure Password Storage",
+            "🖥️ Multiple SSH Sessions",
+            "📝 Session Management",
+            "🔄 Command History",
+            "🎨 Dark/Light Themes",
+            "🔑 SSH Key Support",
+            "⌨️ Keyboard Shortcuts",
+            "🔍 Session Search"
+        ]
+        
+        for feature in features:
+            feature_label = ctk.CTkLabel(
+                features_frame,
+                text=feature,
+                font=("Helvetica", 12)
+            )
+            feature_label.pack(pady=2)
+        
+        # Developer Section
+        dev_frame = ctk.CTkFrame(main_frame)
+        dev_frame.pack(fill="x", pady=(0, 20))
+        
+        dev_label = ctk.CTkLabel(
+            dev_frame,
+            text="Developed by Owais Safa",
+            font=("Helvetica", 12, "bold")
+        )
+        dev_label.pack(pady=5)
+        
+        # Links Section
+        links_frame = ctk.CTkFrame(main_frame)
+        links_frame.pack(fill="x")
+        
+        github_label = ctk.CTkLabel(
+            links_frame,
+            text="GitHub Repository",
+            font=("Helvetica", 12, "underline"),
+            text_color="blue",
+            cursor="hand2"
+        )
+        github_label.pack(pady=5)
+        github_label.bind("<Button-1>", lambda e: self.open_github())
+        
+        # Close button
+        # close_button = ctk.CTkButton(
+        #     main_frame,
+        #     text="Close",
+        #     command=dialog.destroy
+        # )
+        # close_button.pack(pady=(20, 0))
+        
+    def show_shortcuts(self):
+        """Show keyboard shortcuts dialog."""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Keyboard Shortcuts")
+        dialog.geometry("500x600")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # Main container
+        main_frame = ctk.CTkFrame(dialog)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Title Section
+        title_frame = ctk.CTkFrame(main_frame)
+        title_frame.pack(fill="x", pady=(0, 20))
+        
+        title_label = ctk.CTkLabel(
+            title_frame, 
+            text="Keyboard Shortcuts", 
+            font=("Helvetica", 24, "bold")
+        )
+        title_label.pack(pady=10)
+        
+        # Content Section
+        content_frame = ctk.CTkScrollableFrame(main_frame)
+        content_frame.pack(fill="both", expand=True)
+        
+        # Add mouse wheel event bindings
+        content_frame.bind("<MouseWheel>", lambda event: self._on_mousewheel(event, content_frame))
+        content_frame.bind("<Button-4>", lambda event: self._on_mousewheel(event, content_frame))
+        content_frame.bind("<Button-5>", lambda event: self._on_mousewheel(event, content_frame))
+        
+        categories = {
+            "Session Management": [
+                ("New Session", "<CTRL-N>"),
+                # ("Close Session", "<Control-w>"),
+                # ("Next Session", "<Control-Tab>"),
+                # ("Previous Session", "<Control-Shift-Tab>")
+            ],
+            "Navigation": [
+                ("Focus Search", "<CTRL-F>"),
+                ("Toggle Fullscreen", "F11"),
+                # ("Show Preferences", "<Control-comma>"),
+                # ("Show Documentation", "F1")
+            ],
+            "Terminal Controls": [
+                ("Clear Terminal", "<CTRL-L>"),
+                ("Copy Selection", "<CTRL-C>"),
+                ("Paste", "<Control-v>")
+            ],
+            "History": [
+                ("Previous Command", "Up"),
+                ("Next Command", "Down")
+            ]
+        }
+        
+        for category, shortcuts in categories.items():
+            # Category header
+            ctk.CTkLabel(content_frame, text=category, font=("Helvetica", 16, "bold")).pack(anchor="w", pady=(10, 5))
+            
+            # Shortcuts
+            for action, shortcut in shortcuts:
+                frame = ctk.CTkFrame(content_frame)
+                frame.pack(fill="x", pady=2)
+                ctk.CTkLabel(frame, text=action, font=("Helvetica", 12)).pack(side="left", padx=20)
+                ctk.CTkLabel(frame, text=shortcut, font=("Helvetica", 12, "bold")).pack(side="right", padx=20)
+        
+        # Close button
+        # ctk.CTkButton(main_frame, text="Close", command=dialog.destroy).pack(pady=(20, 0))
+
+    def _on_mousewheel(self, event, scrollable_frame):
+        """Handle mouse wheel scrolling for touchpads and mice."""
+        # Linux uses event.num, Windows/Mac use event.delta
+        if event.num == 5 or event.delta < 0:  # Scroll down
+            scrollable_frame.yview_scroll(3, "units")
+        if event.num == 4 or event.delta > 0:  # Scroll up
+            scrollable_frame.yview_scroll(-3, "units")
+        return "break"
+
+    def encrypt_data(self, data: str) -> str:
+        """Encrypt sensitive data using Fernet encryption."""
+        return encrypt_value(self.fernet, data)
+
+    def decrypt_data(self, encrypted_data: str) -> str:
+        """Decrypt sensitive data using Fernet decryption."""
+        return decrypt_value(self.fernet, encrypted_data)
+
+    def save_sessions(self):
+        """
+        Save sessions to the session database.
+
+        The write happens shortly afterwards on a background timer, so several
+        edits in a row go into one transaction; only changed sessions are written.
+        """
+        self.sessions.save()
+
+    def _on_sessions_saved(self, error: Optional[Exception]) -> None:
+        """Report a finished background save. Called on the store's writer thread."""
+        message = "Sessions saved" if error is None else "Error saving sessions"
+        try:
+            self.root.after(0, lambda: self.update_status(message))
+        except Exception:
+            pass  # The window is already gone
+
+    def load_sessions(self):
+        """
+        Open the session database, migrating sessions.json into it on first run.
+
+        Only session names are read here; records are read when used and
+        passwords are decrypted when connecting.
+        """
+        self.sessions = SessionDatabase(self.session_database, self.fernet, json_file=self.session_file,
+                                        on_saved=self._on_sessions_saved)
+        try:
+            self.sessions.load()
+        except Exception as e:
+            self.logger.error(f"Error loading sessions: {e}")
+            messagebox.showerror("Error", f"Failed to open the session database: {str(e)}\n\n"
+                                          "Sessions added now will not be saved.")
+            # Carry on with an empty in-memory database rather than a closed one
+            self.sessions.close()
+            self.sessions = SessionDatabase(":memory:", self.fernet, on_saved=self._on_sessions_saved)
+            self.sessions.load()
+
+        # Build the search index off the main thread so the first search does not wait for it
+        future = self.connect_executor.submit(lambda: SessionIndex(self.sessions.summaries()))
+        future.add_done_callback(lambda f: self.root.after(0, lambda: self._install_session_index(f)))
+
+    def _install_session_index(self, future) -> None:
+        """Use a search index built in the background, unless a search already built one."""
+        try:
+            index = future.result()
+        except Exception as e:
+            self.logger.error(f"Error indexing sessions: {e}")
+            return
+        if not len(self.session_index):
+            self.session_index = index
+            self.session_index_stale = True  # Catch up on edits made while it was built
+
+    def get_or_create_key(self) -> bytes:
+        """
+        Get or create an encryption key for secure data storage.
+        
+        Returns:
+            bytes: Encryption key for Fernet encryption
+        """
+        try:
+            return get_or_create_key(os.path.join(os.path.dirname(os.path.abspath(__file__)), KEY_FILENAME))
+        
+        except Exception as e:
+            self.logger.error(f"Failed to get/create encryption key: {e}")
+            # Fallback to generating a new key if all else fails
+            from cryptography.fernet import Fernet
+            return Fernet.generate_key()
+
+    def show_preferences(self):
+        """Show preferences dialog with improved styling and options."""
+        try:
+            dialog = ctk.CTkToplevel(self.root)
+            dialog.title("Preferences")
+            dialog.geometry("400x690")
+            
+            # Store original settings for cancellation
+            original_settings = {
+                "theme": self.preferences.get("theme", "dark"),
+                "terminal_font_size": self.preferences.get("terminal_font_size", 10),
+                "terminal_font_family": self.preferences.get("terminal_font_family", "Monospace")
+            }
+            
+            # Create main container with padding
+            container = ctk.CTkFrame(dialog)
+            container.pack(fill="both", expand=True, padx=20, pady=20)
+            
+            # Theme selection
+            theme_frame = ctk.CTkFrame(container)
+            theme_frame.pack(fill="x", pady=(0, 15))
+            
+            ctk.CTkLabel(theme_frame, text="Theme:").pack(side="left", padx=5)
+            theme_var = tk.StringVar(value=self.current_theme)
+            
+            def on_theme_change(*args):
+                new_theme = theme_var.get()
+                # Only apply theme temporarily without saving to preferences
+                if new_theme != self.current_theme:
+                    ctk.set_appearance_mode(new_theme)
+                    self.current_theme = new_theme
+                    # Update UI without saving to preferences
+                    theme_colors = self.themes[new_theme]
+                    if hasattr(self, 'terminal_outputs'):
+                        for terminal in self.terminal_outputs.values():
+                            if terminal:
+                                terminal.configure(
+                                    bg=theme_colors['terminal_bg'],
+                                    fg=theme_colors['terminal_fg'],
+                                    insertbackground=theme_colors['fg']
+                                )
+            
+            theme_var.trace_add("write", on_theme_change)
+            
+            theme_menu = ctk.CTkOptionMenu(
+                theme_frame,
+                values=["light", "dark"],
+                variable=theme_var
+            )
+            theme_menu.pack(side="left", padx=5)
+            
+            # Terminal Font Settings
+            font_frame = ctk.CTkFrame(container)
+            font_frame.pack(fill="x", pady=10)
+            
+            ctk.CTkLabel(font_frame, text="Terminal Font Size:").pack(anchor="w", padx=5, pady=2)
+            font_size_var = tk.IntVar(value=self.preferences.get("terminal_font_size", 10))
+            font_size_slider = ctk.CTkSlider(
+                font_frame, 
+                from_=8, 
+                to=24, 
+                number_of_steps=16,
+                variable=font_size_var
+            )
+            font_size_slider.pack(fill="x", padx=20, pady=(0, 10))
+            
+            # Font size label
+            size_label = ctk.CTkLabel(font_frame, text=f"Size: {font_size_var.get()}")
+            size_label.pack(anchor="w", padx=20)
+            
+            def update_size_label(*args):
+                size_label.configure(text=f"Size: {font_size_var.get()}")
+            
+            font_size_var.trace_add("write", update_size_label)
+            
+            ctk.CTkLabel(font_frame, text="Terminal Font Family:").pack(anchor="w", padx=5, pady=(10, 2))
+            font_family_var = tk.StringVar(value=self.preferences.get("terminal_font_family", "Monospace"))
+            
+            # Common monospace fonts
+            monospace_fonts = [
+                "Monospace",
+                "Courier",
+                "DejaVu Sans Mono",
+                "Liberation Mono",
+                "Ubuntu Mono",
+                "Consolas"
+            ]
+            
+            font_family_menu = ctk.CTkOptionMenu(
+                font_frame,
+                values=monospace_fonts,
+                variable=font_family_var
+            )
+            font_family_menu.pack(fill="x", padx=20, pady=2)
+            
+            # Scrollback limit
+            scrollback_frame = ctk.CTkFrame(container)
+            scrollback_frame.pack(fill="x", pady=(0, 10))
+            
+            ctk.CTkLabel(scrollback_frame, text="Scrollback Lines (0 = unlimited):").pack(side="left", padx=5)
+            scrollback_var = tk.StringVar(value=str(self.preferences.get("scrollback_lines", 10000)))
+            scrollback_entry = ctk.CTkEntry(scrollback_frame, textvariable=scrollback_var, width=90)
+            scrollback_entry.pack(side="right", padx=5)
+            
+            # Idle connection reuse
+            idle_frame = ctk.CTkFrame(container)
+            idle_frame.pack(fill="x", pady=(0, 10))
+            
+            ctk.CTkLabel(idle_frame, text="Keep idle connections for reuse (s):").pack(side="left", padx=5)
+            idle_timeout_var = tk.StringVar(value=str(self.preferences.get("transport_idle_timeout", 300)))
+            idle_timeout_entry = ctk.CTkEntry(idle_frame, textvariable=idle_timeout_var, width=90)
+            idle_timeout_entry.pack(side="right", padx=5)
+            
+            # Session output sinks (applied to new connections)
+            output_frame = ctk.CTkFrame(container)
+            output_frame.pack(fill="x", pady=(0, 10))
+            
+            session_logging_var = tk.BooleanVar(value=self.preferences.get("session_logging", False))
+            ctk.CTkCheckBox(
+                output_frame,
+                text="Log session output to files",
+                variable=session_logging_var
+            ).pack(anchor="w", padx=5, pady=2)
+            
+            log_options_frame = ctk.CTkFrame(output_frame)
+            log_options_frame.pack(fill="x", padx=20, pady=2)
+            
+            ctk.CTkLabel(log_options_frame, text="Format:").pack(side="left", padx=5)
+            log_format_var = tk.StringVar(value=self.preferences.get("session_log_format", "asciicast"))
+            ctk.CTkOptionMenu(log_options_frame, values=list(FORMATS), variable=log_format_var, width=110).pack(side="left", padx=5)
+            
+            ctk.CTkLabel(log_options_frame, text="Compression:").pack(side="left", padx=5)
+            log_compression_var = tk.StringVar(value=self.preferences.get("session_log_compression", "none"))
+            ctk.CTkOptionMenu(log_options_frame, values=list(COMPRESSIONS), variable=log_compression_var, width=90).pack(side="left", padx=5)
+            
+            log_rotation_frame = ctk.CTkFrame(output_frame)
+            log_rotation_frame.pack(fill="x", padx=20, pady=2)
+            
+            ctk.CTkLabel(log_rotation_frame, text="New file every (MB / minutes, 0 = never):").pack(side="left", padx=5)
+            log_rotate_minutes_var = tk.StringVar(value=str(self.preferences.get("session_log_rotate_minutes", 0)))
+            ctk.CTkEntry(log_rotation_frame, textvariable=log_rotate_minutes_var, width=60).pack(side="right", padx=5)
+            log_max_mb_var = tk.StringVar(value=str(self.preferences.get("session_log_max_mb", 64)))
+            ctk.CTkEntry(log_rotation_frame, textvariable=log_max_mb_var, width=60).pack(side="right", padx=5)
+            
+            local_mirror_var = tk.BooleanVar(value=self.preferences.get("local_mirror", False))
+            ctk.CTkCheckBox(
+                output_frame,
+                text="Mirror session output to local stdout",
+                variable=local_mirror_var
+            ).pack(anchor="w", padx=5, pady=2)
+            
+            # Preview
+            preview_frame = ctk.CTkFrame(container)
+            preview_frame.pack(fill="x", pady=15)
+            
+            ctk.CTkLabel(preview_frame, text="Preview:").pack(anchor="w", padx=5, pady=2)
+            preview_text = ctk.CTkTextbox(
+                preview_frame,
+                height=100,
+                wrap="word"
+            )
+            preview_text.pack(fill="x", padx=5, pady=5)
+            preview_text.insert("1.0", "ABCDEFGHIJKLMNOPQRSTUVWXYZ\n1234567890\n\nNote: Font changes will take effect in newly opened terminal tabs.")
+            preview_text.configure(state="disabled")
+            
+            def update_preview(*args):
+                try:
+                    size = font_size_var.get()
+                    family = font_family_var.get()
+                    preview_text.configure(font=(family, size))
+                except Exception as e:
+                    self.logger.error(f"Error updating preview: {e}")
+            
+            font_size_var.trace_add("write", update_preview)
+            font_family_var.trace_add("write", update_preview)
+            update_preview()
+            
+            # Buttons
+            button_frame = ctk.CTkFrame(container)
+            button_frame.pack(side="bottom", fill="x", pady=(20, 0))
+            
+            def save():
+                try:
+                    # Validate font size
+                    font_size = font_size_var.get()
+                    if not 8 <= font_size <= 24:
+                        messagebox.showerror("Error", "Font size must be between 8 and 24")
+                        return
+                    
+                    # Validate scrollback limit
+                    try:
+                        scrollback_lines = int(scrollback_var.get())
+                    except ValueError:
+                        scrollback_lines = -1
+                    if scrollback_lines < 0:
+                        messagebox.showerror("Error", "Scrollback lines must be a whole number, 0 or greater")
+                        return
+                    
+                    # Validate idle connection timeout
+                    try:
+                        idle_timeout = float(idle_timeout_var.get())
+                    except ValueError:
+                        idle_timeout = -1
+                    if not (math.isfinite(idle_timeout) and idle_timeout >= 0):
+                        messagebox.showerror("Error", "Idle connection time must be 0 or greater")
+                        return
+                    
+                    # Validate session log rotation
+                    try:
+                        log_max_mb = int(log_max_mb_var.get())
+                        log_rotate_minutes = float(log_rotate_minutes_var.get())
+                    except ValueError:
+                        log_max_mb = log_rotate_minutes = -1
+                    if log_max_mb < 0 or not (math.isfinite(log_rotate_minutes) and log_rotate_minutes >= 0):
+                        messagebox.showerror("Error", "Session log rotation sizes and times must be 0 or greater")
+                        return
+                    if log_compression_var.get() == "zstd" and not zstd_available():
+                        messagebox.showerror("Error", "zstd compression needs the zstandard package (pip install zstandard)")
+                        return
+                    
+                    # Save preferences
+                    self.preferences.update({
+                        "theme": theme_var.get(),
+                        "terminal_font_size": font_size,
+                        "terminal_font_family": font_family_var.get(),
+                        "scrollback_lines": scrollback_lines,
+                        "session_logging": session_logging_var.get(),
+                        "session_log_format": log_format_var.get(),
+                        "session_log_compression": log_compression_var.get(),
+                        "session_log_max_mb": log_max_mb,
+                        "session_log_rotate_minutes": log_rotate_minutes,
+                        "local_mirror": local_mirror_var.get(),
+                        "transport_idle_timeout": idle_timeout
+                    })
+                    self.save_preferences()
+                    self.render_scheduler.scrollback_lines = scrollback_lines
+                    self.transport_pool.idle_timeout = idle_timeout
+                    
+                    # Now apply theme permanently
+                    self.apply_theme(theme_var.get())
+                    
+                    # Update all terminal outputs with new font
+                    if hasattr(self, 'terminal_outputs'):
+                        for terminal in self.terminal_outputs.values():
+                            if terminal:
+                                terminal.configure(font=(font_family_var.get(), font_size))
+                    
+                    messagebox.showinfo("Success", "Preferences saved successfully")
+                    dialog.destroy()
+                    
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to save preferences: {str(e)}")
+            
+            def cancel():
+                # Restore all original settings
+                self.apply_theme(original_settings["theme"])
+                font_size_var.set(original_settings["terminal_font_size"])
+                font_family_var.set(original_settings["terminal_font_family"])
+                
+                # Update preview
+                update_preview()
+                
+                dialog.destroy()
+            
+            save_button = ctk.CTkButton(
+                button_frame,
+                text="Save",
+                command=save,
+                width=100
+            )
+            save_button.pack(side="right", padx=5)
+            
+            cancel_button = ctk.CTkButton(
+                button_frame,
+                text="Cancel",
+                command=cancel,
+                width=100
+            )
+            cancel_button.pack(side="right", padx=5)
+            
+            # Center the dialog
+            dialog.update_idletasks()
+            width = dialog.winfo_width()
+            height = dialog.winfo_height()
+            x = (dialog.winfo_screenwidth() // 2) - (width // 2)
+            y = (dialog.winfo_screenheight() // 2) - (height // 2)
+            dialog.geometry(f"{width}x{height}+{x}+{y}")
+            
+            dialog.transient(self.root)
+            dialog.grab_set()
+            dialog.focus_set()
+            
+        except Exception as e:
+            self.logger.error(f"Error showing preferences: {e}")
+            messagebox.showerror("Error", f"Could not show preferences: {str(e)}")
+
+    def _configure_scrollable_frame(self, content_frame, dialog):
+        """Configure advanced scrolling for touchpad and mouse wheel support."""
+        def _scroll_handler(event):
+            """Advanced scroll handler for multiple input methods."""
+            # Determine scroll direction and amount
+            if event.type == '4':  # ButtonPress (Linux)
+                if event.num == 4:  # Scroll up
+                    content_frame.yview_scroll(-3, "units")
+                elif event.num == 5:  # Scroll down
+                    content_frame.yview_scroll(3, "units")
+            elif event.type == '5':  # ButtonRelease (Linux)
+                return
+            elif event.type == '38':  # MouseWheel (Windows/Mac)
+                # Normalize scroll amount
+                amount = int(-1 * (event.delta / 40))
+                content_frame.yview_scroll(amount, "units")
+            
+            return "break"
+
+        # Bind multiple event types for cross-platform compatibility
+        content_frame.bind('<Button-4>', _scroll_handler)  # Linux scroll up
+        content_frame.bind('<Button-5>', _scroll_handler)  # Linux scroll down
+        content_frame.bind('<MouseWheel>', _scroll_handler)  # Windows/Mac
+        
+        # Ensure focus can be set to enable scrolling
+        content_frame.bind('<Enter>', lambda e: content_frame.focus_set())
+        
+        # Optional: Add trackpad-like smooth scrolling
+        dialog.bind('<2>', lambda e: content_frame.yview_moveto(0))  # Middle click reset
+        
+        return content_frame
+
+    def apply_theme(self, theme_name: str):
+        """
+        Apply the specified theme to the entire application with comprehensive updates.
+        
+        Args:
+            theme_name (str): Name of the theme to apply ('light' or 'dark')
+        """
+        try:
+            # Prevent multiple simultaneous theme updates
+            if hasattr(self, '_theme_update_in_progress'):
+                return
+            
+            # Set theme update flag
+            self._theme_update_in_progress = True
+            
+            # Validate theme
+            if theme_name not in ["light", "dark"]:
+                self.logger.warning(f"Invalid theme: {theme_name}")
+                return
+            
+            # Update theme in preferences and global CustomTkinter setting
+            self.preferences['theme'] = theme_name
+            self.current_theme = theme_name
+            ctk.set_appearance_mode(theme_name)
+            
+            theme_colors = self.themes[theme_name]
+            
+            # Update sidebar components
+            if hasattr(self, 'sidebar_frame'):
+                self.sidebar_frame.configure(fg_color=theme_colors['bg'])
+                
+                # Update search frame and its children
+                for child in self.sidebar_frame.winfo_children():
+                    if isinstance(child, ctk.CTkFrame):
+                        child.configure(fg_color=theme_colors['bg'])
+                        for subchild in child.winfo_children():
+                            if isinstance(subchild, ctk.CTkEntry):
+                                subchild.configure(
+                                    fg_color=theme_colors['entry'],
+                                    text_color=theme_colors['fg']
+                                )
+                            elif isinstance(subchild, ctk.CTkButton):
+                                subchild.configure(
+                                    fg_color=theme_colors['button'],
+                                    hover_color=theme_colors['button_hover'],
+                                    text_color=theme_colors['fg']
+                                )
+            
+            # Update session container and buttons
+            if hasattr(self, 'session_container'):
+                self.session_container.configure(fg_color=theme_colors['bg'])
+                for child in self.session_container.winfo_children():
+                    if isinstance(child, ctk.CTkFrame):
+                        child.configure(fg_color=theme_colors['bg'])
+                        for button in child.winfo_children():
+                            if isinstance(button, ctk.CTkButton):
+                                button.configure(
+                                    fg_color=theme_colors['button'],
+                                    hover_color=theme_colors['button_hover'],
+                                    text_color=theme_colors['fg']
+                                )
+            
+            # Update terminal outputs with proper attribute check
+            if hasattr(self, 'terminal_outputs') and self.terminal_outputs:
+                for session_name, terminal in self.terminal_outputs.items():
+                    try:
+                        if terminal and hasattr(terminal, 'configure'):
+                            terminal.configure(
+                                bg=theme_colors['terminal_bg'],
+                                fg=theme_colors['terminal_fg'],
+                                insertbackground=theme_colors['fg']
+                            )
+                    except Exception as e:
+                        self.logger.error(f"Error updating terminal for {session_name}: {e}")
+            
+            # Update command inputs with proper attribute check
+            if hasattr(self, 'command_inputs') and self.command_inputs:
+                for command_input in self.command_inputs.values():
+                    try:
+                        if command_input and hasattr(command_input, 'configure'):
+                            command_input.configure(
+                                fg_color=theme_colors['entry'],
+                                text_color=theme_colors['fg']
+                            )
+                    except Exception as e:
+                        self.logger.error(f"Error updating command input: {e}")
+            
+            # Force UI refresh
+            self.root.update_idletasks()
+            
+            # Save preferences
+            self.save_preferences()
+            
+            self.logger.info(f"Theme switched to {theme_name}")
+        
+        except Exception as e:
+            error_msg = f"Comprehensive theme update failed: {e}"
+            self.logger.error(error_msg)
+            messagebox.showerror("Theme Update Error", error_msg)
+        
+        finally:
+            # Always clear the theme update flag
+            if hasattr(self, '_theme_update_in_progress'):
+                delattr(self, '_theme_update_in_progress')
+
+def suppress_system_messages():
+    """
+    Suppress system messages and login information from being displayed.
+    This method uses ctypes to modify the file descriptors.
+    """
+    try:
+        # Keep the real stdout for mirroring session output, then redirect stdout and stderr to /dev/null
+        preserve_stdout()
+        libc = ctypes.CDLL('libc.so.6')
+        
+        # Open /dev/null
+        dev_null = os.open('/dev/null', os.O_WRONLY)
+        
+        # Redirect stdout and stderr
+        libc.dup2(dev_null, 1)  # stdout
+        libc.dup2(dev_null, 2)  # stderr
+        
+        # Close the original file descriptor
+        os.close(dev_null)
+    except Exception as e:
+        print(f"Could not suppress system messages: {e}")
+
+def run_gui():
+    """Create the main window and run the Tk event loop."""
+    # Suppress system messages before creating the application
+    suppress_system_messages()
+    
+    root = ctk.CTk()
+    
+    # Add CustomTkinter theme settings
+    ctk.set_appearance_mode("dark")  # Options: "dark", "light", or "system"
+    ctk.set_default_color_theme("blue")  # Built-in themes: "blue", "dark-blue", "green"
+    
+    app = ModernSSHClientApp(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    run_gui()
\ No newline at end of file
@@ -0,0 +1,203 @@
+import codecs
+import logging
+import os
+import threading
+from typing import BinaryIO, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Output queued for LocalMirrorSink beyond which new output is dropped, e.g. while the terminal is stopped
+MIRROR_MAX_PENDING = 8 * 1024 * 1024
+
+# Seconds close() waits for LocalMirrorSink to write what is queued
+MIRROR_CLOSE_TIMEOUT = 2.0
+
+
+class OutputSink:
+    """Destination for a session's raw channel output."""
+
+    def write(self, data: bytes) -> None:
+        """Consume a chunk of raw output (bytes or memoryview)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the sink."""
+
+
+class TerminalSink(OutputSink):
+    """
+    Decode output and feed it into a TerminalScreen for display in the GUI.
+
+    The incremental decoder keeps a multibyte character that is split across
+    two reads until its remaining bytes arrive, instead of emitting U+FFFD.
+    """
+
+    def __init__(self, screen, on_update: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            screen (TerminalScreen): Screen model to update
+            on_update: Called after the screen changed, e.g. to schedule a redraw
+        """
+        self.screen = screen
+        self.on_update = on_update
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def write(self, data: bytes) -> None:
+        text = self._decoder.decode(data)
+        if not text:
+            return
+        self.screen.feed(text)
+        if self.on_update:
+            self.on_update()
+
+
+# Duplicate of fd 1 taken before the GUI points stdout at /dev/null; see preserve_stdout()
+_original_stdout_fd: Optional[int] = None
+
+
+def preserve_stdout() -> None:
+    """Keep a duplicate of the process's stdout for LocalMirrorSink before fd 1 is redirected."""
+    global _original_stdout_fd
+    if _original_stdout_fd is None:
+        try:
+            _original_stdout_fd = os.dup(1)
+        except OSError:
+            pass
+
+
+class LocalMirrorSink(OutputSink):
+    """
+    Mirror raw session output to a local terminal or file.
+
+    By default this is the process's stdout as it was before the GUI
+    redirected fd 1 (see preserve_stdout()); ``path`` can name a file or a
+    tty such as /dev/pts/3 instead. write() only queues the chunk: a writer
+    thread writes everything queued at once, unbuffered, so a slow or
+    stopped terminal never blocks the thread reading the channel. Once
+    MIRROR_MAX_PENDING bytes are waiting, further output is dropped.
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None, path: Optional[str] = None):
+        """
+        Args:
+            stream: Binary stream to write to instead of stdout or ``path``
+            path (str, optional): File or terminal device to append to
+        """
+        self._owned: Optional[BinaryIO] = None
+        if stream is None:
+            if path:
+                stream = open(path, 'ab', buffering=0)
+            else:
+                fd = _original_stdout_fd if _original_stdout_fd is not None else 1
+                stream = open(fd, 'wb', buffering=0, closefd=False)
+            self._owned = stream
+        self._stream = stream
+        self.dropped = 0  # Bytes dropped because the stream fell behind or went away
+
+        self._queue: List[bytes] = []
+        self._queued_bytes = 0
+        self._closed = False
+        self._wakeup = threading.Condition()
+        self._writer = threading.Thread(target=self._run, name="local-mirror", daemon=True)
+        self._writer.start()
+
+    def write(self, data: bytes) -> None:
+        chunk = bytes(data)
+        with self._wakeup:
+            if self._closed or self._stream is None or self._queued_bytes > MIRROR_MAX_PENDING:
+                self.dropped += len(chunk)
+                return
+            self._queue.append(chunk)
+            self._queued_bytes += len(chunk)
+            self._wakeup.notify()
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread; gives up after MIRROR_CLOSE_TIMEOUT."""
+        with self._wakeup:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._writer.join(MIRROR_CLOSE_TIMEOUT)
+        if self.dropped:
+            logger.warning(f"Local mirror: {self.dropped} bytes dropped")
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                while not self._queue and not self._closed:
+                    self._wakeup.wait()
+                chunks, self._queue = self._queue, []
+                self._queued_bytes = 0
+                closing = self._closed
+            if chunks and self._stream is not None:
+                self._write_all(b"".join(chunks))
+            if closing:
+                break
+        if self._owned is not None:
+            try:
+                self._owned.close()
+            except OSError:
+                pass
+            self._owned = None
+
+    def _write_all(self, data: bytes) -> None:
+        try:
+            view = memoryview(data)
+            while view:
+                written = self._stream.write(view)
+                if not written:
+                    break
+                view = view[written:]
+        except (OSError, ValueError):
+            # Stream went away; stop mirroring
+            with self._wakeup:
+                self._stream = None
+                self.dropped += len(view)
+
+
+class OutputFanout(OutputSink):
+    """
+    Deliver a session's output to every attached sink.
+
+    Sinks are held in a tuple that is replaced, not mutated, when sinks are
+    added or removed, so writes from the reader thread never take a lock and
+    a session with only a terminal attached pays for exactly one sink.
+    """
+
+    def __init__(self, sinks: Iterable[OutputSink] = ()):
+        self.logger = logging.getLogger(__name__)
+        self._sinks = tuple(sinks)
+        self._lock = threading.Lock()
+
+    @property
+    def sinks(self) -> tuple:
+        return self._sinks
+
+    def add(self, sink: OutputSink) -> OutputSink:
+        """Attach a sink and return it."""
+        with self._lock:
+            self._sinks = self._sinks + (sink,)
+        return sink
+
+    def remove(self, sink: OutputSink) -> None:
+        """Detach and close a sink."""
+        with self._lock:
+            self._sinks = tuple(s for s in self._sinks if s is not sink)
+        sink.close()
+
+    def write(self, data: bytes) -> None:
+        for sink in self._sinks:
+            try:
+                sink.write(data)
+            except Exception as e:
+                self.logger.error(f"Output sink {type(sink).__name__} failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            sinks, self._sinks = self._sinks, ()
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                self.logger.error(f"Error closing output sink {type(sink).__name__}: {e}")
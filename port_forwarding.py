@@ -0,0 +1,729 @@
+import ipaddress
+import logging
+import selectors
+import socket
+import struct
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bytes requested per recv() from a socket or channel
+RELAY_READ_SIZE = 65536
+
+# Bytes buffered in one direction before the relay stops reading from that direction's source
+RELAY_HIGH_WATER = 1024 * 1024
+
+# Seconds between retries while a channel's send window is full (paramiko does not signal it)
+WINDOW_POLL_INTERVAL = 0.005
+
+# Threads that open channels, connect sockets and answer SOCKS handshakes
+CONNECT_WORKERS = 8
+
+# Seconds a SOCKS client may take to send its request
+SOCKS_TIMEOUT = 10.0
+
+DEFAULT_BIND_ADDRESS = "127.0.0.1"
+
+
+class ForwardSpec:
+    """
+    One port forward, written like the OpenSSH options without the dash:
+
+        L [bind_address:]port:host:hostport   local port -> host:hostport from the server
+        R [bind_address:]port:host:hostport   server port -> host:hostport from this machine
+        D [bind_address:]port                 local SOCKS4/5 proxy through the server
+    """
+
+    def __init__(self, kind: str, bind_port: int, dest_host: Optional[str] = None,
+                 dest_port: Optional[int] = None, bind_address: Optional[str] = None):
+        self.kind = kind
+        self.bind_port = bind_port
+        self.dest_host = dest_host
+        self.dest_port = dest_port
+        # Remote forwards bind to the server's loopback unless told otherwise, as OpenSSH does
+        self.bind_address = bind_address or ("localhost" if kind == "R" else DEFAULT_BIND_ADDRESS)
+
+    @classmethod
+    def parse(cls, text: str) -> "ForwardSpec":
+        """
+        Parse a forward such as ``L 8080:db:5432`` or ``D 1080``.
+
+        Raises:
+            ValueError: If the text is not a valid forward
+        """
+        parts = text.strip().split(None, 1)
+        kind = parts[0].lstrip("-").upper() if parts else ""
+        if len(parts) != 2 or kind not in ("L", "R", "D"):
+            raise ValueError(f"Invalid forward '{text}': expected L, R or D followed by ports")
+
+        try:
+            fields = _split_address_fields(parts[1].strip())
+            if kind == "D" and len(fields) in (1, 2):
+                bind_address = fields[0] if len(fields) == 2 else None
+                return cls(kind, _port(fields[-1]), bind_address=bind_address)
+            if kind in ("L", "R") and len(fields) in (3, 4):
+                bind_address = fields[0] if len(fields) == 4 else None
+                return cls(kind, _port(fields[-3]), fields[-2], _port(fields[-1]), bind_address)
+        except ValueError as e:
+            raise ValueError(f"Invalid forward '{text}': {e}") from None
+        raise ValueError(f"Invalid forward '{text}': wrong number of fields")
+
+    def describe(self) -> str:
+        """Human-readable direction of the forward, e.g. ``127.0.0.1:8080 -> db:5432``."""
+        bind = f"{self.bind_address}:{self.bind_port}"
+        if self.kind == "D":
+            return f"{bind} (SOCKS)"
+        if self.kind == "R":
+            return f"remote {bind} -> {self.dest_host}:{self.dest_port}"
+        return f"{bind} -> {self.dest_host}:{self.dest_port}"
+
+    def __str__(self) -> str:
+        fields = [_join_host(self.bind_address), str(self.bind_port)]
+        if self.kind != "D":
+            fields += [_join_host(self.dest_host), str(self.dest_port)]
+        return f"{self.kind} " + ":".join(fields)
+
+
+def _split_address_fields(text: str) -> List[str]:
+    """Split on colons, keeping bracketed IPv6 addresses such as ``[::1]`` together."""
+    fields = []
+    while text:
+        if text.startswith("["):
+            end = text.find("]")
+            if end < 0:
+                raise ValueError("missing ']' after an IPv6 address")
+            fields.append(text[1:end])
+            text = text[end + 1:].lstrip(":")
+        else:
+            field, _, text = text.partition(":")
+            fields.append(field)
+    return fields
+
+
+def _join_host(host: str) -> str:
+    return f"[{host}]" if ":" in host else host
+
+
+def _port(text: str) -> int:
+    port = int(text)
+    if not 0 <= port <= 65535:
+        raise ValueError(f"port {port} out of range")
+    return port
+
+
+def session_forwards(session: Dict[str, Any]) -> List[ForwardSpec]:
+    """
+    Return the forwards stored in a session record under ``"forwards"``.
+
+    Raises:
+        ValueError: If a stored forward is invalid
+    """
+    entries = session.get("forwards") or []
+    if isinstance(entries, str):
+        entries = entries.split(",")
+    return [ForwardSpec.parse(entry) for entry in entries if entry.strip()]
+
+
+class _Pipe:
+    """One relayed connection: a local socket and the SSH channel it is joined to."""
+
+    __slots__ = ("sock", "channel", "label", "on_close", "to_sock", "to_channel", "sock_eof", "channel_eof",
+                 "sock_shut", "channel_shut", "closed", "sent", "received")
+
+    def __init__(self, sock: socket.socket, channel, label: str, on_close):
+        self.sock = sock
+        self.channel = channel
+        self.label = label
+        self.on_close = on_close
+        self.to_sock = bytearray()      # Received from the channel, not yet written to the socket
+        self.to_channel = bytearray()   # Received from the socket, not yet sent on the channel
+        self.sock_eof = False
+        self.channel_eof = False
+        self.sock_shut = False
+        self.channel_shut = False
+        self.closed = False
+        self.sent = 0        # Bytes from the socket to the channel
+        self.received = 0    # Bytes from the channel to the socket
+
+
+class ForwardRelay:
+    """
+    Single I/O thread that copies bytes for every forwarded connection.
+
+    Sockets and channels are watched by one selector (a paramiko ``Channel``
+    has a ``fileno()`` that becomes readable when data or EOF arrives), so
+    hundreds of forwarded connections cost no extra threads. Each direction
+    buffers at most RELAY_HIGH_WATER bytes before the relay stops reading
+    from its source, which passes back-pressure through to the sender.
+    Blocking setup work - opening channels, connecting sockets, SOCKS
+    handshakes - runs on a small fixed worker pool.
+    """
+
+    def __init__(self, read_size: int = RELAY_READ_SIZE, high_water: int = RELAY_HIGH_WATER):
+        self.logger = logging.getLogger(__name__)
+        self.read_size = read_size
+        self.high_water = high_water
+
+        self._selector = selectors.DefaultSelector()
+        self._interest: Dict[int, int] = {}   # fd -> events currently registered
+        self._pipes: set = set()
+        self._waiting_window: set = set()     # Pipes with data for a channel whose send window is full
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._connector: Optional[ThreadPoolExecutor] = None
+        self.total_sent = 0
+        self.total_received = 0
+
+        # Self-pipe used to interrupt select() when work is handed to the relay thread
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, ("wakeup", None))
+
+    # -- lifecycle --------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the relay thread if it is not already running."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._connector = ThreadPoolExecutor(max_workers=CONNECT_WORKERS, thread_name_prefix="forward-connect")
+            self._thread = threading.Thread(target=self._run, name="ForwardRelay", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Close every relayed connection and listener and stop the thread."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            connector, self._connector = self._connector, None
+        self._wakeup()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        if connector:
+            connector.shutdown(wait=False, cancel_futures=True)
+        for pipe in list(self._pipes):
+            self._close_pipe(pipe)
+        for key in list(self._selector.get_map().values()):
+            kind, listener = key.data
+            if kind == "listener":
+                self._selector.unregister(key.fd)
+                listener[0].close()
+        self._interest.clear()
+
+    def __len__(self) -> int:
+        """Number of connections being relayed."""
+        return len(self._pipes)
+
+    # -- API (any thread) -------------------------------------------------
+
+    def call_soon(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on the relay thread."""
+        self._calls.append(callback)
+        self._wakeup()
+
+    def submit(self, work: Callable, *args):
+        """Run blocking setup work on the connector pool."""
+        self.start()
+        return self._connector.submit(work, *args)
+
+    def add_pipe(self, sock: socket.socket, channel, label: str = "",
+                 on_close: Optional[Callable[[_Pipe], None]] = None) -> _Pipe:
+        """Relay bytes between a connected socket and an open channel until both sides close."""
+        self.start()
+        sock.setblocking(False)
+        channel.setblocking(False)
+        pipe = _Pipe(sock, channel, label, on_close)
+        self.call_soon(lambda: self._add_pipe(pipe))
+        return pipe
+
+    def add_listener(self, sock: socket.socket, on_accept: Callable[[socket.socket, Tuple], None]) -> None:
+        """
+        Accept connections on a listening socket. ``on_accept(conn, address)`` runs on the
+        relay thread and must hand anything slow to submit().
+        """
+        self.start()
+        sock.setblocking(False)
+        self.call_soon(lambda: self._set_interest(sock.fileno(), selectors.EVENT_READ, ("listener", (sock, on_accept))))
+
+    def remove_listener(self, sock: socket.socket) -> None:
+        """Stop accepting on a listening socket and close it."""
+        def remove() -> None:
+            try:
+                self._set_interest(sock.fileno(), 0, None)
+            except (OSError, ValueError):
+                pass
+            sock.close()
+        if self._running:
+            self.call_soon(remove)
+        else:
+            sock.close()
+
+    def close_pipe(self, pipe: _Pipe) -> None:
+        self.call_soon(lambda: self._close_pipe(pipe))
+
+    # -- relay thread -----------------------------------------------------
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_send.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # A wakeup is already pending
+
+    def _run(self) -> None:
+        while self._running:
+            timeout = WINDOW_POLL_INTERVAL if self._waiting_window else None
+            try:
+                events = self._selector.select(timeout)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Relay select failed: {e}")
+                self._prune_closed()
+                continue
+
+            for key, mask in events:
+                kind, target = key.data
+                if kind == "wakeup":
+                    self._drain_wakeup()
+                elif kind == "listener":
+                    self._accept(*target)
+                else:
+                    self._service(target, kind, mask)
+
+            for pipe in list(self._waiting_window):
+                self._service(pipe, "window", 0)
+
+            while self._calls:
+                try:
+                    self._calls.popleft()()
+                except Exception as e:
+                    self.logger.error(f"Relay callback failed: {e}")
+
+    def _service(self, pipe: _Pipe, kind: str, mask: int) -> None:
+        """Move data for one ready side of a pipe; any error closes the pipe."""
+        if pipe.closed:
+            return
+        try:
+            if kind == "sock":
+                if mask & selectors.EVENT_WRITE:
+                    self._flush_sock(pipe)
+                if mask & selectors.EVENT_READ and not pipe.closed:
+                    self._read_sock(pipe)
+            elif kind == "channel":
+                self._read_channel(pipe)
+            else:
+                self._flush_channel(pipe)
+        except Exception as e:
+            self.logger.error(f"Relay error on {pipe.label or 'forwarded connection'}: {e}")
+            self._close_pipe(pipe)
+
+    def _drain_wakeup(self) -> None:
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _set_interest(self, fd: int, events: int, data) -> None:
+        """Register, modify or unregister a descriptor so the selector watches ``events``."""
+        current = self._interest.get(fd, 0)
+        if events == current:
+            return
+        if not events:
+            self._selector.unregister(fd)
+            del self._interest[fd]
+        elif not current:
+            self._selector.register(fd, events, data)
+            self._interest[fd] = events
+        else:
+            self._selector.modify(fd, events, data)
+            self._interest[fd] = events
+
+    def _accept(self, listener: socket.socket, on_accept) -> None:
+        for _ in range(64):  # Bounded so a connection flood cannot starve relayed traffic
+            try:
+                conn, address = listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.logger.error(f"Accept failed: {e}")
+                return
+            try:
+                on_accept(conn, address)
+            except Exception as e:
+                self.logger.error(f"Error handling forwarded connection from {address}: {e}")
+                conn.close()
+
+    def _add_pipe(self, pipe: _Pipe) -> None:
+        if not self._running:
+            self._close_pipe(pipe)
+            return
+        self._pipes.add(pipe)
+        self._update(pipe)
+        # Data may have reached the channel before it was watched
+        if pipe.channel.recv_ready() or pipe.channel.eof_received:
+            self._service(pipe, "channel", 0)
+
+    def _update(self, pipe: _Pipe) -> None:
+        """Watch each side for what it can usefully do now, and close the pipe once both sides are done."""
+        if pipe.closed:
+            return
+        if (pipe.sock_eof and pipe.channel_eof and not pipe.to_sock and not pipe.to_channel) or \
+                (pipe.channel.closed and not pipe.to_sock and not pipe.channel.recv_ready()):
+            self._close_pipe(pipe)
+            return
+
+        sock_events = 0
+        if not pipe.sock_eof and len(pipe.to_channel) < self.high_water:
+            sock_events |= selectors.EVENT_READ
+        if pipe.to_sock:
+            sock_events |= selectors.EVENT_WRITE
+        self._set_interest(pipe.sock.fileno(), sock_events, ("sock", pipe))
+
+        channel_events = selectors.EVENT_READ if not pipe.channel_eof and len(pipe.to_sock) < self.high_water else 0
+        self._set_interest(pipe.channel.fileno(), channel_events, ("channel", pipe))
+
+        if pipe.to_channel:
+            self._waiting_window.add(pipe)
+        else:
+            self._waiting_window.discard(pipe)
+
+    def _read_sock(self, pipe: _Pipe) -> None:
+        try:
+            data = pipe.sock.recv(self.read_size)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""  # Reset by the peer; treat as end of its data
+        if data:
+            pipe.to_channel += data
+            pipe.sent += len(data)
+            self.total_sent += len(data)
+        else:
+            pipe.sock_eof = True
+        self._flush_channel(pipe)
+
+    def _flush_channel(self, pipe: _Pipe) -> None:
+        channel = pipe.channel
+        while pipe.to_channel and channel.send_ready():
+            count = channel.send(bytes(pipe.to_channel[:self.read_size]))
+            if count <= 0:
+                self._close_pipe(pipe)  # The channel closed underneath us
+                return
+            del pipe.to_channel[:count]
+        if pipe.sock_eof and not pipe.to_channel and not pipe.channel_shut:
+            pipe.channel_shut = True
+            channel.shutdown_write()
+        self._update(pipe)
+
+    def _read_channel(self, pipe: _Pipe) -> None:
+        channel = pipe.channel
+        while channel.recv_ready() and len(pipe.to_sock) < self.high_water:
+            data = channel.recv(self.read_size)
+            if not data:
+                break
+            pipe.to_sock += data
+            pipe.received += len(data)
+            self.total_received += len(data)
+        if not channel.recv_ready() and (channel.eof_received or channel.closed):
+            pipe.channel_eof = True
+        self._flush_sock(pipe)
+
+    def _flush_sock(self, pipe: _Pipe) -> None:
+        if pipe.to_sock:
+            try:
+                count = pipe.sock.send(pipe.to_sock)
+            except (BlockingIOError, InterruptedError):
+                count = 0
+            except OSError:
+                self._close_pipe(pipe)
+                return
+            del pipe.to_sock[:count]
+        if pipe.channel_eof and not pipe.to_sock and not pipe.sock_shut:
+            pipe.sock_shut = True
+            try:
+                pipe.sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+        self._update(pipe)
+
+    def _close_pipe(self, pipe: _Pipe) -> None:
+        if pipe.closed:
+            return
+        pipe.closed = True
+        self._pipes.discard(pipe)
+        self._waiting_window.discard(pipe)
+        for fileobj in (pipe.sock, pipe.channel):
+            try:
+                self._set_interest(fileobj.fileno(), 0, None)
+            except (KeyError, ValueError, OSError):
+                pass
+            try:
+                fileobj.close()
+            except Exception:
+                pass
+        if pipe.on_close:
+            try:
+                pipe.on_close(pipe)
+            except Exception as e:
+                self.logger.error(f"Error in relay close callback: {e}")
+
+    def _prune_closed(self) -> None:
+        for pipe in list(self._pipes):
+            if pipe.sock.fileno() < 0 or pipe.channel.closed:
+                self._close_pipe(pipe)
+
+
+# Remote forwards are delivered through one handler per transport, so they are dispatched by port
+_remote_handlers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_remote_handlers_lock = threading.Lock()
+
+
+def _dispatch_remote(transport):
+    def handler(channel, origin, server) -> None:
+        with _remote_handlers_lock:
+            callback = _remote_handlers.get(transport, {}).get(server[1])
+        if callback is None:
+            channel.close()
+        else:
+            callback(channel, origin)
+    return handler
+
+
+class PortForwarder:
+    """The port forwards of one SSH connection, relayed by a shared ForwardRelay."""
+
+    def __init__(self, transport, relay: ForwardRelay, label: str = ""):
+        """
+        Args:
+            transport: Authenticated paramiko Transport to forward through
+            relay (ForwardRelay): Relay that copies the bytes (may be shared by many connections)
+            label (str): Name used in log messages, e.g. the session name
+        """
+        self.logger = logging.getLogger(__name__)
+        self.transport = transport
+        self.relay = relay
+        self.label = label
+        self.forwards: List[ForwardSpec] = []
+        self._listeners: Dict[int, socket.socket] = {}   # id(spec) -> listening socket
+        self._pipes: set = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self, spec: ForwardSpec) -> ForwardSpec:
+        """
+        Start a forward. Remote forwards wait for the server's reply, so call this off the UI thread.
+
+        Returns:
+            ForwardSpec: The spec, with bind_port filled in if port 0 was requested
+
+        Raises:
+            OSError: If a local port cannot be bound
+            paramiko.SSHException: If the server refuses a remote forward
+        """
+        if spec.kind == "R":
+            self._start_remote(spec)
+        else:
+            listener = socket.create_server((spec.bind_address, spec.bind_port), backlog=128)
+            spec.bind_port = listener.getsockname()[1]
+            with self._lock:
+                self._listeners[id(spec)] = listener
+            on_accept = self._accept_dynamic if spec.kind == "D" else \
+                (lambda conn, address: self._accept_local(spec, conn, address))
+            self.relay.add_listener(listener, on_accept)
+        self.forwards.append(spec)
+        self.logger.info(f"{self.label}: forwarding {spec.describe()}")
+        return spec
+
+    def stop(self, spec: ForwardSpec) -> None:
+        """Stop accepting new connections for a forward; open connections are left running."""
+        if spec.kind == "R":
+            with _remote_handlers_lock:
+                _remote_handlers.get(self.transport, {}).pop(spec.bind_port, None)
+            try:
+                # Not cancel_port_forward(): it drops the handler that the transport's other remote forwards use
+                self.transport.global_request("cancel-tcpip-forward", (spec.bind_address, spec.bind_port), wait=True)
+            except Exception as e:
+                self.logger.debug(f"Cancelling remote forward failed: {e}")
+        else:
+            with self._lock:
+                listener = self._listeners.pop(id(spec), None)
+            if listener:
+                self.relay.remove_listener(listener)
+        if spec in self.forwards:
+            self.forwards.remove(spec)
+
+    def close(self) -> None:
+        """Stop every forward and close its connections."""
+        self._closed = True
+        for spec in list(self.forwards):
+            self.stop(spec)
+        with self._lock:
+            pipes = list(self._pipes)
+        for pipe in pipes:
+            self.relay.close_pipe(pipe)
+
+    @property
+    def connection_count(self) -> int:
+        with self._lock:
+            return len(self._pipes)
+
+    # -- connection setup ---------------------------------------------------
+
+    def _relay(self, sock: socket.socket, channel, description: str) -> None:
+        if self._closed:
+            sock.close()
+            channel.close()
+            return
+
+        def on_close(pipe) -> None:
+            with self._lock:
+                self._pipes.discard(pipe)
+
+        with self._lock:
+            pipe = self.relay.add_pipe(sock, channel, description, on_close)
+            self._pipes.add(pipe)
+
+    def _open_channel(self, host: str, port: int, origin: Tuple) -> Any:
+        return self.transport.open_channel("direct-tcpip", (host, port), origin[:2])
+
+    def _accept_local(self, spec: ForwardSpec, conn: socket.socket, address: Tuple) -> None:
+        def connect() -> None:
+            try:
+                channel = self._open_channel(spec.dest_host, spec.dest_port, address)
+            except Exception as e:
+                self.logger.error(f"{self.label}: forward to {spec.dest_host}:{spec.dest_port} failed: {e}")
+                conn.close()
+                return
+            self._relay(conn, channel, f"{address[0]}:{address[1]} -> {spec.dest_host}:{spec.dest_port}")
+        self.relay.submit(connect)
+
+    def _accept_dynamic(self, conn: socket.socket, address: Tuple) -> None:
+        self.relay.submit(self._socks_connect, conn, address)
+
+    def _socks_connect(self, conn: socket.socket, address: Tuple) -> None:
+        """Answer a SOCKS4, SOCKS4a or SOCKS5 CONNECT request and relay the connection."""
+        conn.setblocking(True)
+        conn.settimeout(SOCKS_TIMEOUT)
+        try:
+            version = _recv_exact(conn, 1)[0]
+            if version == 5:
+                host, port = _socks5_request(conn)
+            elif version == 4:
+                host, port = _socks4_request(conn)
+            else:
+                raise ValueError(f"unsupported SOCKS version {version}")
+        except Exception as e:
+            self.logger.warning(f"{self.label}: bad SOCKS request from {address[0]}: {e}")
+            conn.close()
+            return
+
+        try:
+            channel = self._open_channel(host, port, address)
+        except Exception as e:
+            self.logger.error(f"{self.label}: SOCKS connect to {host}:{port} failed: {e}")
+            try:
+                conn.sendall(b"\x05\x05\x00\x01" + b"\0" * 6 if version == 5 else b"\x00\x5b" + b"\0" * 6)
+            except OSError:
+                pass
+            conn.close()
+            return
+
+        try:
+            conn.sendall(b"\x05\x00\x00\x01" + b"\0" * 6 if version == 5 else b"\x00\x5a" + b"\0" * 6)
+        except OSError:
+            conn.close()
+            channel.close()
+            return
+        self._relay(conn, channel, f"{address[0]}:{address[1]} -> {host}:{port} (SOCKS)")
+
+    def _start_remote(self, spec: ForwardSpec) -> None:
+        def on_channel(channel, origin) -> None:
+            # Called on the transport thread; connecting may block, so it goes to the pool
+            def connect() -> None:
+                try:
+                    sock = socket.create_connection((spec.dest_host, spec.dest_port), timeout=SOCKS_TIMEOUT)
+                except OSError as e:
+                    self.logger.error(f"{self.label}: remote forward to {spec.dest_host}:{spec.dest_port} failed: {e}")
+                    channel.close()
+                    return
+                self._relay(sock, channel, f"remote {origin[0]}:{origin[1]} -> {spec.dest_host}:{spec.dest_port}")
+            self.relay.submit(connect)
+
+        # A fixed port is routed before the request so no early connection is lost
+        if spec.bind_port:
+            with _remote_handlers_lock:
+                _remote_handlers.setdefault(self.transport, {})[spec.bind_port] = on_channel
+        try:
+            # paramiko keeps a single handler per transport; it dispatches to every remote forward by port
+            bound_port = self.transport.request_port_forward(
+                spec.bind_address, spec.bind_port, handler=_dispatch_remote(self.transport)
+            )
+        except Exception:
+            with _remote_handlers_lock:
+                _remote_handlers.get(self.transport, {}).pop(spec.bind_port, None)
+            raise
+        spec.bind_port = bound_port
+        with _remote_handlers_lock:
+            _remote_handlers.setdefault(self.transport, {})[bound_port] = on_channel
+
+
+def _recv_exact(conn: socket.socket, count: int) -> bytes:
+    data = b""
+    while len(data) < count:
+        chunk = conn.recv(count - len(data))
+        if not chunk:
+            raise ConnectionError("client closed during SOCKS handshake")
+        data += chunk
+    return data
+
+
+def _recv_until_null(conn: socket.socket, limit: int = 256) -> bytes:
+    data = b""
+    while not data.endswith(b"\0"):
+        data += _recv_exact(conn, 1)
+        if len(data) > limit:
+            raise ValueError("SOCKS field too long")
+    return data[:-1]
+
+
+def _socks5_request(conn: socket.socket) -> Tuple[str, int]:
+    methods = _recv_exact(conn, _recv_exact(conn, 1)[0])
+    if 0 not in methods:
+        conn.sendall(b"\x05\xff")
+        raise ValueError("client requires authentication")
+    conn.sendall(b"\x05\x00")
+
+    _, command, _, address_type = _recv_exact(conn, 4)
+    if address_type == 1:
+        host = str(ipaddress.IPv4Address(_recv_exact(conn, 4)))
+    elif address_type == 3:
+        host = _recv_exact(conn, _recv_exact(conn, 1)[0]).decode("idna")
+    elif address_type == 4:
+        host = str(ipaddress.IPv6Address(_recv_exact(conn, 16)))
+    else:
+        raise ValueError(f"unknown address type {address_type}")
+    port = struct.unpack("!H", _recv_exact(conn, 2))[0]
+    if command != 1:
+        conn.sendall(b"\x05\x07\x00\x01" + b"\0" * 6)
+        raise ValueError("only CONNECT is supported")
+    return host, port
+
+
+def _socks4_request(conn: socket.socket) -> Tuple[str, int]:
+    command, port, address = struct.unpack("!BH4s", _recv_exact(conn, 7))
+    _recv_until_null(conn)  # User id, ignored
+    if command != 1:
+        conn.sendall(b"\x00\x5b" + b"\0" * 6)
+        raise ValueError("only CONNECT is supported")
+    if address.startswith(b"\0\0\0") and address != b"\0\0\0\0":
+        host = _recv_until_null(conn).decode("idna")  # SOCKS4a: the client sends a hostname
+    else:
+        host = str(ipaddress.IPv4Address(address))
+    return host, port
@@ -0,0 +1,317 @@
+import json
+import logging
+import os
+import sqlite3
+from collections.abc import ItemsView, ValuesView
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from session_store import (
+    SAVE_DELAY,
+    Ciphertext,
+    SessionStore,
+    _snapshot,
+    decrypt_value,
+    encrypt_value,
+    read_sessions,
+    session_tags
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    host TEXT NOT NULL DEFAULT '',
+    username TEXT NOT NULL DEFAULT '',
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_position ON sessions(position);
+CREATE INDEX IF NOT EXISTS sessions_host ON sessions(host);
+CREATE INDEX IF NOT EXISTS sessions_username ON sessions(username);
+CREATE TABLE IF NOT EXISTS session_tags (
+    tag TEXT NOT NULL,
+    name TEXT NOT NULL REFERENCES sessions(name) ON DELETE CASCADE,
+    PRIMARY KEY (tag, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS session_tags_name ON session_tags(name);
+"""
+
+UPSERT = """
+INSERT INTO sessions (name, position, host, username, record) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET host = excluded.host, username = excluded.username, record = excluded.record
+"""
+
+
+def open_database(database_file: str) -> sqlite3.Connection:
+    """Open the session database, creating its tables if needed."""
+    connection = sqlite3.connect(database_file, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def read_database(database_file: str) -> Dict[str, Dict[str, Any]]:
+    """Read every stored session record in display order, with passwords still encrypted."""
+    connection = open_database(database_file)
+    try:
+        rows = connection.execute("SELECT name, record FROM sessions ORDER BY position")
+        return {name: json.loads(record) for name, record in rows}
+    finally:
+        connection.close()
+
+
+def _write_sessions(connection: sqlite3.Connection, rows: List[Tuple[str, Dict[str, Any], int]]) -> None:
+    """
+    Insert or update session rows and their tags; existing sessions keep their position.
+
+    Args:
+        connection: Database, inside a transaction
+        rows: (name, stored record, position for a new session) per session
+    """
+    connection.executemany(UPSERT, [
+        (name, position, str(stored.get("host", "")), str(stored.get("username", "")), json.dumps(stored))
+        for name, stored, position in rows
+    ])
+    connection.executemany("DELETE FROM session_tags WHERE name = ?", [(name,) for name, _, _ in rows])
+    connection.executemany("INSERT OR IGNORE INTO session_tags (tag, name) VALUES (?, ?)",
+                           [(tag, name) for name, stored, _ in rows for tag in session_tags(stored)])
+
+
+class SessionDatabase(SessionStore):
+    """
+    Saved sessions in a SQLite database, read on demand.
+
+    Works like SessionStore, but load() only reads the session names in
+    display order. A record is read the first time it is used, so at startup
+    only the rows the sidebar binds are read, however many sessions there
+    are. Host, username and tags are also stored in indexed columns, which
+    back summaries() for the search index and the tag lookups.
+
+    save() writes behind as in SessionStore; flush() writes the added,
+    changed and deleted sessions in one transaction. On first use an
+    existing sessions.json is imported and renamed to sessions.json.migrated.
+    """
+
+    def __init__(self, database_file: str, fernet, json_file: Optional[str] = None, delay: float = SAVE_DELAY,
+                 on_saved: Optional[Callable[[Optional[Exception]], None]] = None):
+        """
+        Args:
+            database_file (str): Path of sessions.db
+            fernet: Cipher for passwords (see make_fernet())
+            json_file (str, optional): sessions.json to migrate from
+            delay (float): Seconds to coalesce changes before writing
+            on_saved: Called from the writer thread after each write-behind,
+                with the exception if it failed
+        """
+        super().__init__(json_file or "", fernet, delay, on_saved)
+        self.database_file = database_file
+        self._names: Dict[str, None] = {}  # Every session name, in display order
+        self._deleted: Set[str] = set()    # Names to delete at the next flush
+        self._next_position = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        # Host, username and tags per stored session, read once by summaries()
+        self._summaries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def load(self) -> None:
+        """Read the session names, migrating sessions.json first if there is one. Records are read later."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = open_database(self.database_file)
+                self._migrate()
+            rows = self._connection.execute("SELECT name FROM sessions ORDER BY position")
+            self._names = dict.fromkeys(name for name, in rows)
+            self._next_position = self._connection.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM sessions").fetchone()[0]
+            self._records = {}
+            self._written = {}
+            self._deleted = set()
+            self._summaries = None
+
+    def _migrate(self) -> None:
+        if not self.session_file or not os.path.exists(self.session_file):
+            return
+        if self._connection.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is not None:
+            logger.warning(f"Not migrating {self.session_file}: the session database already has sessions")
+            return
+        stored_sessions = read_sessions(self.session_file)
+        with self._connection:
+            _write_sessions(self._connection, [(name, stored, position)
+                                               for position, (name, stored) in enumerate(stored_sessions.items())])
+        os.replace(self.session_file, self.session_file + ".migrated")
+        logger.info(f"Migrated {len(stored_sessions)} sessions from {self.session_file} to {self.database_file}")
+
+    def _database(self) -> sqlite3.Connection:
+        """The open connection; raises sqlite3.ProgrammingError before load() or after close()."""
+        if self._connection is None:
+            raise sqlite3.ProgrammingError(f"Session database {self.database_file} is closed")
+        return self._connection
+
+    def _read(self, name: str) -> Dict[str, Any]:
+        row = self._database().execute("SELECT record FROM sessions WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        session = json.loads(row[0])
+        if session.get("password"):
+            session["password"] = Ciphertext(session["password"])
+        return session
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Host, username and tags of every session, in display order, for the
+        search index. The columns are read once; records that have been
+        read since stand in for their rows, as they may have changed.
+        """
+        with self._lock:
+            if self._summaries is None:
+                rows = self._database().execute("SELECT name, host, username FROM sessions")
+                self._summaries = {name: {"host": host, "username": username, "tags": []}
+                                   for name, host, username in rows}
+                for tag, name in self._connection.execute("SELECT tag, name FROM session_tags"):
+                    self._summaries[name]["tags"].append(tag)
+            stored = self._summaries
+            return {name: self._records[name] if name in self._records else stored[name] for name in self._names}
+
+    def tags(self) -> List[str]:
+        """Every tag in use, sorted."""
+        with self._lock:
+            self.flush()
+            return [tag for tag, in self._database().execute("SELECT DISTINCT tag FROM session_tags ORDER BY tag")]
+
+    def names_with_tag(self, tag: str) -> List[str]:
+        """Names of the sessions carrying ``tag``, in display order."""
+        with self._lock:
+            self.flush()
+            rows = self._database().execute(
+                "SELECT s.name FROM session_tags t JOIN sessions s ON s.name = t.name "
+                "WHERE t.tag = ? ORDER BY s.position", (tag.strip().lower(),))
+            return [name for name, in rows]
+
+    def write_batch(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Add or replace many sessions in one transaction, e.g. during an import.
+
+        Unlike assignment, the records are not kept in memory; they are read
+        back when used like any other. Plaintext passwords are encrypted.
+        """
+        with self._lock:
+            connection = self._database()
+            self.flush()  # Pending edits and deletions go first
+            rows = []
+            for name, session in sessions.items():
+                password = session.get("password")
+                if password and not isinstance(password, Ciphertext):
+                    session = dict(session, password=Ciphertext(encrypt_value(self.fernet, password)))
+                    self.encryptions += 1
+                rows.append((name, session, self._next_position + len(rows)))
+            with connection:
+                _write_sessions(connection, rows)
+            self._next_position += len(rows)
+            for name, session, _ in rows:
+                self._names.setdefault(name, None)
+                self._records.pop(name, None)
+                self._written.pop(name, None)
+                if self._summaries is not None:
+                    self._summaries[name] = {"host": str(session.get("host", "")),
+                                             "username": str(session.get("username", "")),
+                                             "tags": session_tags(session)}
+
+    def plaintext_record(self, name: str) -> Dict[str, Any]:
+        """Copy of a session with its password decrypted, e.g. for export. Neither cached nor kept loaded."""
+        with self._lock:
+            if name not in self._names:
+                raise KeyError(name)
+            session = dict(self._records[name] if name in self._records else self._read(name))
+        password = session.get("password")
+        session["password"] = decrypt_value(self.fernet, password) if isinstance(password, Ciphertext) else password or ""
+        return session
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self._records.get(name)
+            if session is None:
+                if name not in self._names:
+                    raise KeyError(name)
+                session = self._read(name)
+                self._records[name] = session
+                self._written[name] = (_snapshot(session), None)
+            return session
+
+    def __setitem__(self, name: str, session: Dict[str, Any]) -> None:
+        super().__setitem__(name, session)
+        with self._lock:
+            self._names.setdefault(name, None)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            del self._names[name]
+            self._records.pop(name, None)
+            self._written.pop(name, None)
+            self._deleted.add(name)
+
+    def __iter__(self) -> Iterator[str]:
+        # A snapshot: an import adds names from its worker thread while the GUI iterates
+        with self._lock:
+            return iter(list(self._names))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        with self._lock:
+            return name in self._names
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def clear(self) -> None:
+        """Remove every session without reading their records."""
+        with self._lock:
+            self._deleted.update(self._names)
+            self._names = {}
+            self._records = {}
+            self._written = {}
+
+    def flush(self) -> bool:
+        """
+        Write changes now instead of waiting for the timer.
+
+        Returns:
+            bool: True if the database was written, False if nothing had changed
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            changed = [(name, session) for name, session in self._records.items()
+                       if name not in self._written or self._written[name][0] != session]
+            if not changed and not self._deleted:
+                return False
+
+            # Deleted first, so a name deleted and added again moves to the end as it does in memory
+            connection = self._database()
+            with connection:
+                connection.executemany("DELETE FROM sessions WHERE name = ?", [(name,) for name in self._deleted])
+                _write_sessions(connection, [(name, session, self._next_position + i)
+                                                   for i, (name, session) in enumerate(changed)])
+            self._next_position += len(changed)
+            for name, session in changed:
+                self._written[name] = (_snapshot(session), None)
+            self._deleted.clear()
+            self.last_written = len(changed)
+            return True
+
+    def close(self) -> None:
+        """Write any pending changes, forget decrypted passwords and close the database."""
+        with self._lock:
+            if self._connection is None:
+                return
+            super().close()
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,496 @@
+import csv
+import fnmatch
+import glob
+import json
+import logging
+import os
+import re
+import shlex
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from port_forwarding import ForwardSpec
+from session_store import session_tags
+
+# Characters read from a JSON file at a time
+CHUNK_SIZE = 64 * 1024
+
+# Characters from the end of the JSON buffer within which a token may have been cut short
+# (longer than "false", a \uXXXX escape or "-Infinity")
+TRUNCATION_MARGIN = 16
+
+# Sessions written per transaction
+BATCH_SIZE = 500
+
+# Problems listed in an ImportReport; further ones are only counted
+MAX_REPORTED = 100
+
+# CSV headers understood for each session field, compared lowercased with spaces and dashes as underscores
+CSV_COLUMNS = {
+    "name": ("name", "session", "alias", "label", "display_name"),
+    "host": ("host", "hostname", "host_name", "address", "ip", "ip_address", "fqdn"),
+    "port": ("port", "ssh_port"),
+    "username": ("username", "user", "login", "ssh_user"),
+    "ssh_key_path": ("ssh_key_path", "key_file", "identity_file", "ssh_key"),
+    "tags": ("tags", "tag", "groups", "group"),
+    "proxy_jump": ("proxy_jump", "jump_host", "jump_hosts", "bastion"),
+}
+
+FORMATS = ("json", "csv", "ssh_config")
+
+# Keyword and arguments of an ssh_config line; "Keyword value", "Keyword=value" and "Keyword = value" are all allowed
+SSH_CONFIG_LINE = re.compile(r"(\S+?)\s*(?:=\s*|\s+|$)(.*)")
+
+# An imported session: where it came from (for messages), its name and its raw record
+Entry = Tuple[str, str, Any]
+
+logger = logging.getLogger(__name__)
+
+
+class ImportReport:
+    """Outcome of importing one file."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.added = 0
+        self.updated = 0      # Existing sessions overwritten with the same host and username
+        self.conflicts = 0    # Existing sessions overwritten with a different host or username
+        self.duplicates = 0   # Repeated names in the input; the first one is kept
+        self.invalid = 0
+        self.removed = 0      # Sessions not in the input, when replacing
+        self.cancelled = False
+        self.problems: List[str] = []
+
+    @property
+    def imported(self) -> int:
+        return self.added + self.updated + self.conflicts
+
+    def note(self, message: str) -> None:
+        if len(self.problems) < MAX_REPORTED:
+            self.problems.append(message)
+
+    def summary(self) -> str:
+        lines = [
+            f"{os.path.basename(self.source)}: {self.added} added, {self.updated + self.conflicts} updated "
+            f"({self.conflicts} with a different host or user), {self.duplicates} duplicates skipped, "
+            f"{self.invalid} invalid" + (f", {self.removed} removed" if self.removed else "") +
+            (" (cancelled)" if self.cancelled else "")
+        ]
+        if self.problems:
+            lines.append("")
+            lines.extend(self.problems)
+            hidden = self.duplicates + self.invalid + self.conflicts - len(self.problems)
+            if hidden > 0:
+                lines.append(f"... and {hidden} more")
+        return "\n".join(lines)
+
+
+def detect_format(path: str) -> str:
+    """Guess the format of a file to import from its name: json, csv or ssh_config."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        return "json"
+    if extension in (".csv", ".tsv"):
+        return "csv"
+    return "ssh_config"
+
+
+def iter_json(f) -> Iterator[Entry]:
+    """
+    Read sessions from a JSON export without loading the whole document.
+
+    Accepts the format written by Export Sessions, an object mapping names to
+    records, or a list of records that carry their name under ``"name"``.
+    One record at a time is decoded from a buffer of about CHUNK_SIZE.
+
+    Raises:
+        ValueError: If the file is not valid JSON
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def skip_space() -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return ""
+
+    def decode() -> Any:
+        nonlocal position
+        skip_space()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # Only an error at the end of the buffer, or a string that runs off it, can be
+                # caused by the chunk boundary; anything else is a syntax error however much is read
+                truncated = e.pos >= len(buffer) - TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+                if truncated and fill():
+                    continue
+                raise ValueError(f"Invalid JSON: {e}") from None
+            # A number may continue in the next chunk
+            if end == len(buffer) and fill():
+                continue
+            position = end
+            return value
+
+    def expect(*allowed: str) -> str:
+        nonlocal position
+        char = skip_space()
+        if char not in allowed:
+            raise ValueError(f"Invalid JSON: expected {' or '.join(allowed)}, found {char or 'end of file'!r}")
+        position += 1
+        return char
+
+    opening = expect("{", "[")
+    closing = "}" if opening == "{" else "]"
+    if skip_space() == closing:
+        return
+    index = 0
+    while True:
+        index += 1
+        if opening == "{":
+            name = decode()
+            expect(":")
+            record = decode()
+        else:
+            record = decode()
+            name = record.get("name") if isinstance(record, dict) else None
+            name = name or (record.get("host") if isinstance(record, dict) else None) or ""
+        yield f"entry {index}", str(name), record
+        if expect(",", closing) == closing:
+            return
+
+
+def iter_csv(f) -> Iterator[Entry]:
+    """
+    Read sessions from a CSV file with a header row, e.g. a CMDB export.
+
+    Columns are matched by the names in CSV_COLUMNS; other columns are
+    ignored. Without a name column a session is named after its host. Tags
+    may be separated by commas, semicolons or pipes.
+    """
+    sample = f.read(4096)
+    f.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(f, dialect)
+    header = next(reader, None)
+    if header is None:
+        return
+    aliases = {alias: field for field, names in CSV_COLUMNS.items() for alias in names}
+    columns = {}
+    for index, title in enumerate(header):
+        field = aliases.get(re.sub(r"[\s-]+", "_", title.strip().lower()))
+        if field and field not in columns:
+            columns[field] = index
+    if "host" not in columns:
+        raise ValueError(f"No host column in CSV header: {', '.join(header)}")
+
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        record = {field: row[index].strip() for field, index in columns.items() if index < len(row)}
+        name = record.pop("name", "") or record.get("host", "")
+        if record.get("tags"):
+            record["tags"] = [tag for tag in re.split(r"[,;|]", record["tags"]) if tag.strip()]
+        if record.get("proxy_jump"):
+            record["proxy_jump"] = [hop.strip() for hop in record["proxy_jump"].split(",") if hop.strip()]
+        yield f"line {reader.line_num}", name, record
+
+
+def _ssh_config_lines(path: str, depth: int = 0) -> Iterator[Tuple[str, str, List[str]]]:
+    """Keyword (lowercased) and arguments of each line of an ssh_config, following Include."""
+    filename = os.path.basename(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            keyword, rest = SSH_CONFIG_LINE.match(line).groups()
+            if '"' in rest or "'" in rest:
+                try:
+                    args = shlex.split(rest, comments=True)
+                except ValueError:
+                    args = rest.split()
+            else:
+                args = rest.split("#", 1)[0].split()
+            keyword = keyword.lower()
+            if keyword == "include" and depth < 16:
+                for pattern in args:
+                    pattern = os.path.expanduser(pattern)
+                    if not os.path.isabs(pattern):
+                        # Relative includes are relative to ~/.ssh for a user's config
+                        pattern = os.path.join(os.path.dirname(os.path.abspath(path)), pattern)
+                    for included in sorted(glob.glob(pattern)):
+                        yield from _ssh_config_lines(included, depth + 1)
+                continue
+            yield f"{filename}:{number}", keyword, args
+
+
+def _host_matches(patterns: List[str], alias: str) -> bool:
+    matched = False
+    for pattern in patterns:
+        if pattern.startswith("!"):
+            if fnmatch.fnmatchcase(alias, pattern[1:]):
+                return False
+        elif fnmatch.fnmatchcase(alias, pattern):
+            matched = True
+    return matched
+
+
+def iter_ssh_config(path: str) -> Iterator[Entry]:
+    """
+    Read sessions from an OpenSSH client config such as ``~/.ssh/config``.
+
+    Every concrete alias on a ``Host`` line becomes a session. Options are
+    resolved as ssh does, the first value found wins, including values from
+    wildcard blocks (``Host *``, ``Host *.prod``) that match the alias.
+    HostName (with ``%h``), Port, User, IdentityFile, ProxyJump and
+    Local/Remote/DynamicForward are imported; ``Match`` blocks are skipped.
+    Blocks are grouped by alias as the file is read, so the whole config is
+    held in memory, but only as the few options listed above.
+    """
+    blocks: List[Tuple[str, List[str], Dict[str, Any]]] = []   # (location, patterns, options)
+    by_alias: Dict[str, List[int]] = {}
+    wildcards: List[int] = []
+    options: Optional[Dict[str, Any]] = {}   # Options before the first Host line apply to all
+    blocks.append(("", ["*"], options))
+    wildcards.append(0)
+    for location, keyword, args in _ssh_config_lines(path):
+        if keyword == "host":
+            options = {}
+            blocks.append((location, args, options))
+            for pattern in args:
+                if any(char in pattern for char in "*?!"):
+                    wildcards.append(len(blocks) - 1)
+                    break
+            else:
+                for alias in args:
+                    by_alias.setdefault(alias, []).append(len(blocks) - 1)
+        elif keyword == "match":
+            options = None
+        elif options is not None and args:
+            if keyword in ("localforward", "remoteforward", "dynamicforward"):
+                options.setdefault(keyword, []).append(args)
+            elif keyword in ("hostname", "port", "user", "identityfile", "proxyjump"):
+                options.setdefault(keyword, args[0])
+
+    for alias, indexes in by_alias.items():
+        matching = sorted(set(indexes) | {i for i in wildcards if _host_matches(blocks[i][1], alias)})
+        resolved: Dict[str, Any] = {}
+        forwards = []
+        for i in matching:
+            for keyword, value in blocks[i][2].items():
+                if keyword.endswith("forward"):
+                    forwards.extend((keyword[0].upper(), args) for args in value)
+                else:
+                    resolved.setdefault(keyword, value)
+        record: Dict[str, Any] = {"host": resolved.get("hostname", alias).replace("%h", alias)}
+        if "port" in resolved:
+            record["port"] = resolved["port"]
+        if "user" in resolved:
+            record["username"] = resolved["user"]
+        if "identityfile" in resolved:
+            record["ssh_key_path"] = os.path.expanduser(resolved["identityfile"])
+        if resolved.get("proxyjump", "none").lower() != "none":
+            record["proxy_jump"] = [hop.strip() for hop in resolved["proxyjump"].split(",") if hop.strip()]
+        if forwards:
+            # "LocalForward 8080 db:5432" is "L 8080:db:5432" in a session
+            record["forwards"] = [f"{kind} {':'.join(args)}" for kind, args in forwards]
+        yield blocks[indexes[0]][0], alias, record
+
+
+def iter_sessions(path: str, fmt: Optional[str] = None) -> Iterator[Entry]:
+    """
+    Read the sessions in a file one at a time.
+
+    Args:
+        path (str): File to read
+        fmt (str, optional): json, csv or ssh_config; guessed from the name if omitted
+
+    Returns:
+        Iterator of (location, name, raw record)
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "ssh_config":
+        yield from iter_ssh_config(path)
+        return
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format '{fmt}'")
+    with open(path, "r", encoding="utf-8-sig", newline="" if fmt == "csv" else None) as f:
+        yield from (iter_json(f) if fmt == "json" else iter_csv(f))
+
+
+def validate_session(name: str, record: Any) -> Dict[str, Any]:
+    """
+    Check an imported session and return it normalized: port as an int,
+    tags and forwards as lists. Fields this client does not know are kept.
+
+    Raises:
+        ValueError: If the session cannot be used
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a session record")
+    if not name.strip():
+        raise ValueError("no session name")
+    session = dict(record)
+    session.pop("name", None)
+
+    host = str(session.get("host") or "").strip()
+    if host.split() != [host]:
+        raise ValueError(f"invalid host {host!r}")
+    session["host"] = host
+
+    try:
+        port = int(session.get("port") or 22)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid port {session.get('port')!r}") from None
+    if not 1 <= port <= 65535:
+        raise ValueError(f"port {port} out of range")
+    session["port"] = port
+
+    session["username"] = str(session.get("username") or "")
+    session["password"] = str(session.get("password") or "")
+    session["ssh_key_path"] = str(session.get("ssh_key_path") or "")
+    for key in ("connect_timeout", "auth_timeout"):
+        if session.get(key) not in (None, ""):
+            try:
+                session[key] = float(session[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid {key} {session[key]!r}") from None
+        else:
+            session.pop(key, None)
+
+    tags = session_tags(session)
+    if tags:
+        session["tags"] = tags
+    else:
+        session.pop("tags", None)
+
+    forwards = session.get("forwards") or []
+    if isinstance(forwards, str):
+        forwards = forwards.split(",")
+    forwards = [str(forward).strip() for forward in forwards if str(forward).strip()]
+    for forward in forwards:
+        ForwardSpec.parse(forward)  # Raises ValueError with a readable message
+    if forwards:
+        session["forwards"] = forwards
+    else:
+        session.pop("forwards", None)
+
+    proxy_jump = session.get("proxy_jump") or []
+    if isinstance(proxy_jump, str):
+        proxy_jump = proxy_jump.split(",")
+    proxy_jump = [str(hop).strip() for hop in proxy_jump if str(hop).strip()]
+    if proxy_jump:
+        session["proxy_jump"] = proxy_jump
+    else:
+        session.pop("proxy_jump", None)
+    return session
+
+
+def import_entries(store, entries: Iterable[Entry], source: str, replace: bool = False,
+                    batch_size: int = BATCH_SIZE, progress: Optional[Callable[[ImportReport], None]] = None,
+                    cancel: Optional[threading.Event] = None) -> ImportReport:
+    """
+    Validate sessions and write them to a SessionDatabase in batches.
+
+    Meant to run on a worker thread: entries are read lazily, so memory use
+    depends on ``batch_size`` rather than on the size of the input, and each
+    batch is one transaction. A session that already exists is overwritten;
+    one with a different host or username is reported as a conflict.
+
+    Args:
+        store: SessionDatabase to write to
+        entries: (location, name, record) as produced by iter_sessions()
+        source (str): Name of the input, for the report
+        replace (bool): Remove sessions that are not in the input once all are written
+        batch_size (int): Sessions per transaction
+        progress: Called after every batch with the report so far
+        cancel: Stops the import before the next batch when set; nothing is removed
+
+    Returns:
+        ImportReport
+    """
+    report = ImportReport(source)
+    existing = store.summaries()
+    seen = set()
+    # Sessions to write next, each with the report counter it goes to once written
+    batch: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    conflicts: List[str] = []
+
+    def commit() -> None:
+        store.write_batch({name: session for name, (session, _) in batch.items()})
+        # Counted only once written, so a batch dropped by a cancel or an error is not reported as imported
+        for _, counter in batch.values():
+            setattr(report, counter, getattr(report, counter) + 1)
+        for message in conflicts:
+            report.note(message)
+        batch.clear()
+        conflicts.clear()
+        if progress is not None:
+            progress(report)
+
+    for location, name, record in entries:
+        name = str(name).strip()
+        try:
+            session = validate_session(name, record)
+        except ValueError as e:
+            report.invalid += 1
+            report.note(f"INVALID   {location} {name}: {e}")
+            continue
+        if name in seen:
+            report.duplicates += 1
+            report.note(f"DUPLICATE {location} {name}: already imported above, skipped")
+            continue
+        seen.add(name)
+
+        current = existing.get(name)
+        if current is None:
+            counter = "added"
+        elif (str(current.get("host", "")), str(current.get("username", ""))) == (session["host"], session["username"]):
+            counter = "updated"
+        else:
+            counter = "conflicts"
+            conflicts.append(f"CONFLICT  {location} {name}: {current.get('username') or ''}@{current.get('host')} "
+                             f"replaced by {session['username']}@{session['host']}")
+        batch[name] = (session, counter)
+        if len(batch) >= batch_size:
+            if cancel is not None and cancel.is_set():
+                report.cancelled = True
+                return report
+            commit()
+    if cancel is not None and cancel.is_set():
+        report.cancelled = True
+        return report
+    if batch:
+        commit()
+
+    if replace:
+        for name in [name for name in store if name not in seen]:
+            del store[name]
+            report.removed += 1
+        store.flush()
+    logger.info(report.summary().splitlines()[0])
+    return report
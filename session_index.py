@@ -0,0 +1,209 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from session_store import session_tags
+
+# Terms shorter than a trigram are matched by scanning the candidate texts
+TRIGRAM_LENGTH = 3
+
+# Below this many candidates, checking each text directly beats intersecting posting lists
+SCAN_THRESHOLD = 256
+
+Fields = Tuple[str, str, str, Tuple[str, ...]]
+
+
+class SessionIndex:
+    """
+    In-memory search index over session name, host, username and tags.
+
+    Queries use the sidebar syntax: every whitespace-separated term must
+    match, a plain term is a case-insensitive substring of the name, host,
+    username or a tag, and ``tag:<name>`` requires that exact tag. Terms of
+    three or more characters are looked up through trigram posting lists and
+    confirmed against the text; shorter ones are checked by scanning the
+    candidates left by the other terms. While the user types, a query that
+    extends the previous one only searches within its results.
+
+    Results come in saved order, with sessions whose name starts with the
+    first plain term ranked first.
+    """
+
+    def __init__(self, sessions: Optional[Mapping[str, Dict[str, Any]]] = None):
+        self._fields: Dict[str, Fields] = {}
+        self._text: Dict[str, str] = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._tags: Dict[str, Set[str]] = defaultdict(set)
+        self._order: Dict[str, int] = {}
+        self._last: Optional[Tuple[str, List[str]]] = None  # Previous query and its results
+        self._ordered: Optional[List[str]] = None  # All names in display order, rebuilt on demand
+        if sessions:
+            self.sync(sessions)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._fields
+
+    def sync(self, sessions: Mapping[str, Dict[str, Any]]) -> int:
+        """
+        Bring the index in line with ``sessions``, re-indexing only the
+        sessions whose searchable fields changed.
+
+        Returns:
+            int: Number of sessions added, updated or removed
+        """
+        changed = 0
+        for name in [name for name in self._fields if name not in sessions]:
+            self._unindex(name)
+            self._order.pop(name, None)
+            changed += 1
+        for position, (name, session) in enumerate(sessions.items()):
+            fields = self._fields_for(name, session)
+            if self._fields.get(name) != fields:
+                self._unindex(name)
+                self._index(name, fields)
+                changed += 1
+            self._order[name] = position
+        self._last = None
+        self._ordered = None
+        return changed
+
+    def add(self, name: str, session: Dict[str, Any]) -> None:
+        """Index a new session after the existing ones, or re-index one that changed in place."""
+        fields = self._fields_for(name, session)
+        if name not in self._order:
+            self._order[name] = max(self._order.values(), default=-1) + 1
+        if self._fields.get(name) != fields:
+            self._unindex(name)
+            self._index(name, fields)
+        self._last = None
+        self._ordered = None
+
+    def remove(self, name: str) -> None:
+        self._unindex(name)
+        self._order.pop(name, None)
+        self._last = None
+        self._ordered = None
+
+    def search(self, query: str) -> List[str]:
+        """
+        Return the names of the sessions matching ``query``.
+
+        Args:
+            query (str): Sidebar search text
+
+        Returns:
+            List of session names in display order
+        """
+        query = " ".join(query.lower().split())
+        terms = query.split()
+        if not terms:
+            return list(self._display_order())
+        if self._last is not None and self._last[0] == query:
+            return list(self._last[1])
+
+        candidates = None
+        if self._last is not None and self._narrows(self._last[0], query):
+            candidates = set(self._last[1])
+
+        # Exact tags first, then indexed terms, then short terms as a filter over what is left
+        for term in sorted(terms, key=lambda t: (not t.startswith("tag:"), len(t) < TRIGRAM_LENGTH)):
+            candidates = self._match(term, candidates)
+            if not candidates:
+                break
+
+        candidates = candidates or set()
+        if len(candidates) * 8 < len(self._order):
+            results = sorted(candidates, key=self._order.__getitem__)
+        else:
+            # Large result sets: filtering the saved order is cheaper than sorting
+            results = [name for name in self._display_order() if name in candidates]
+
+        plain = [term for term in terms if not term.startswith("tag:")]
+        if plain:
+            first = plain[0]
+            prefixed = [name for name in results if self._fields[name][0].startswith(first)]
+            if prefixed and len(prefixed) < len(results):
+                prefixed_set = set(prefixed)
+                results = prefixed + [name for name in results if name not in prefixed_set]
+        self._last = (query, results)
+        return list(results)
+
+    def _display_order(self) -> List[str]:
+        if self._ordered is None:
+            self._ordered = sorted(self._fields, key=self._order.__getitem__)
+        return self._ordered
+
+    @staticmethod
+    def _narrows(previous: str, query: str) -> bool:
+        """
+        Whether every result of ``query`` must also be a result of ``previous``,
+        i.e. characters were only appended. Tag terms match exactly, so
+        extending one is not narrowing.
+        """
+        if not query.startswith(previous):
+            return False
+        return all(old == new or not new.startswith("tag:")
+                   for old, new in zip(previous.split(), query.split()))
+
+    def _match(self, term: str, candidates: Optional[Set[str]]) -> Set[str]:
+        if term.startswith("tag:"):
+            tagged = self._tags.get(term[4:], set())
+            return tagged & candidates if candidates is not None else set(tagged)
+
+        if len(term) < TRIGRAM_LENGTH or (candidates is not None and len(candidates) <= SCAN_THRESHOLD):
+            pool = candidates if candidates is not None else self._text
+            return {name for name in pool if term in self._text[name]}
+
+        postings = []
+        for i in range(len(term) - TRIGRAM_LENGTH + 1):
+            posting = self._trigrams.get(term[i:i + TRIGRAM_LENGTH])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        found = set(postings[0]) if candidates is None else postings[0] & candidates
+        for posting in postings[1:]:
+            found &= posting
+            if not found:
+                return found
+        # Trigrams can all occur without the term itself; confirm against the text
+        return {name for name in found if term in self._text[name]}
+
+    @staticmethod
+    def _fields_for(name: str, session: Dict[str, Any]) -> Fields:
+        return (
+            name.lower(),
+            str(session.get("host", "")).lower(),
+            str(session.get("username", "")).lower(),
+            tuple(session_tags(session))
+        )
+
+    def _index(self, name: str, fields: Fields) -> None:
+        # Fields are joined by a newline, which no search term can contain
+        text = "\n".join(fields[:3] + fields[3])
+        self._fields[name] = fields
+        self._text[name] = text
+        for trigram in {text[i:i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}:
+            self._trigrams[trigram].add(name)
+        for tag in fields[3]:
+            self._tags[tag].add(name)
+
+    def _unindex(self, name: str) -> None:
+        fields = self._fields.pop(name, None)
+        if fields is None:
+            return
+        text = self._text.pop(name)
+        for trigram in {text[i:i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}:
+            posting = self._trigrams.get(trigram)
+            if posting is not None:
+                posting.discard(name)
+                if not posting:
+                    del self._trigrams[trigram]
+        for tag in fields[3]:
+            posting = self._tags.get(tag)
+            if posting is not None:
+                posting.discard(name)
+                if not posting:
+                    del self._tags[tag]
@@ -0,0 +1,458 @@
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SESSIONS_FILENAME = "sessions.json"
+DATABASE_FILENAME = "sessions.db"
+KEY_FILENAME = "encryption.key"
+PREFERENCES_FILENAME = "preferences.json"
+
+# Seconds SessionStore waits after a change so that changes close together are written once
+SAVE_DELAY = 1.0
+
+# How long a decrypted password is kept after its last use, and how many are kept at most
+SECRET_TTL = 30.0
+SECRET_CACHE_SIZE = 16
+
+logger = logging.getLogger(__name__)
+
+
+def make_fernet(key: bytes):
+    """Create the cipher used for stored passwords. cryptography is only imported when needed."""
+    from cryptography.fernet import Fernet
+    return Fernet(key)
+
+
+def load_key(key_file: str) -> Optional[bytes]:
+    """Return the encryption key stored in ``key_file``, or None if there is none."""
+    if not os.path.exists(key_file):
+        return None
+    with open(key_file, "rb") as f:
+        return f.read()
+
+
+def get_or_create_key(key_file: str) -> bytes:
+    """
+    Get or create an encryption key for secure data storage.
+
+    Args:
+        key_file (str): Path of the key file
+
+    Returns:
+        bytes: Encryption key for Fernet encryption
+    """
+    key = load_key(key_file)
+    if key is not None:
+        return key
+
+    from cryptography.fernet import Fernet
+    key = Fernet.generate_key()
+    with open(key_file, "wb") as f:
+        f.write(key)
+
+    # Set secure permissions if possible
+    try:
+        os.chmod(key_file, stat.S_IRUSR | stat.S_IWUSR)
+    except Exception as perm_error:
+        logger.warning(f"Could not set secure permissions on key file: {perm_error}")
+    return key
+
+
+def encrypt_value(fernet, data: str) -> str:
+    """Encrypt a secret for storage; empty values stay empty."""
+    try:
+        if not data:
+            return ""
+        return fernet.encrypt(data.encode()).decode()
+    except Exception as e:
+        logger.error(f"Encryption error: {e}")
+        return ""
+
+
+def decrypt_value(fernet, encrypted_data: str) -> str:
+    """Decrypt a stored secret, returning an empty string if it cannot be decrypted."""
+    try:
+        if not encrypted_data or fernet is None:
+            return ""
+        return fernet.decrypt(encrypted_data.encode()).decode()
+    except Exception as e:
+        logger.error(f"Decryption error: {e}")
+        return ""
+
+
+def read_sessions(session_file: str) -> Dict[str, Dict[str, Any]]:
+    """Read stored session records as saved, with passwords still encrypted."""
+    if not os.path.exists(session_file):
+        return {}
+    with open(session_file, 'r') as f:
+        return json.load(f)
+
+
+def write_atomic(path: str, data: str) -> None:
+    """
+    Replace a file so that a crash leaves either the old or the new contents.
+
+    The data goes to a temporary file in the same directory, which is synced
+    to disk and then renamed over ``path``. The new file is readable only by
+    its owner.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Sync the directory too so the rename itself survives a crash (not possible on Windows)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def write_sessions(session_file: str, stored_sessions: Dict[str, Dict[str, Any]]) -> None:
+    """Write session records that already have their passwords encrypted."""
+    write_atomic(session_file, json.dumps(stored_sessions, indent=4))
+
+
+def encrypt_session(session: Dict[str, Any], fernet) -> Dict[str, Any]:
+    """Return a copy of one session record with its password encrypted for storage."""
+    stored = dict(session)  # Keep optional per-session settings
+    stored.update({
+        "password": encrypt_value(fernet, session.get("password", "")),
+        "ssh_key_path": session.get("ssh_key_path", "")
+    })
+    return stored
+
+
+def encrypt_sessions(sessions: Dict[str, Dict[str, Any]], fernet) -> Dict[str, Dict[str, Any]]:
+    """Return copies of the session records with their passwords encrypted for storage."""
+    return {name: encrypt_session(session, fernet) for name, session in sessions.items()}
+
+
+def decrypt_sessions(stored_sessions: Dict[str, Dict[str, Any]], fernet) -> Dict[str, Dict[str, Any]]:
+    """Return copies of stored session records with their passwords decrypted."""
+    sessions = {}
+    for name, session in stored_sessions.items():
+        sessions[name] = dict(session)  # Keep optional per-session settings
+        sessions[name].update({
+            "password": decrypt_value(fernet, session.get("password", "")),
+            "ssh_key_path": session.get("ssh_key_path", "")
+        })
+    return sessions
+
+
+def _snapshot(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a record deeply enough that later in-place edits (tags, forwards) do not show in the copy."""
+    return {key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+            for key, value in session.items()}
+
+
+def _fragment(name: str, stored: Dict[str, Any]) -> str:
+    """One session as it appears in sessions.json."""
+    return f"{json.dumps(name)}: {json.dumps(stored)}"
+
+
+class Ciphertext(str):
+    """A password as stored: Fernet ciphertext, kept encrypted in memory until it is needed."""
+
+
+class SecretCache:
+    """
+    Decrypts stored passwords on demand and keeps the plaintexts briefly.
+
+    At most ``max_entries`` plaintexts are held, each for ``ttl`` seconds
+    after it was last used; a timer drops expired ones even if the cache is
+    not used again.
+    """
+
+    def __init__(self, fernet, ttl: float = SECRET_TTL, max_entries: int = SECRET_CACHE_SIZE):
+        self.fernet = fernet
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()  # Ciphertext -> (plaintext, expiry)
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reveal(self, value: Optional[str]) -> str:
+        """
+        Return the plaintext of a stored password.
+
+        Values that are not Ciphertext (e.g. a password typed into a dialog
+        that has not been stored yet) are returned unchanged.
+        """
+        if not value:
+            return ""
+        if not isinstance(value, Ciphertext):
+            return value
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.pop(value, None)
+            plaintext = entry[0] if entry is not None else decrypt_value(self.fernet, value)
+            self._entries[value] = (plaintext, now + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._arm_timer()
+        return plaintext
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _purge(self, now: float) -> None:
+        for key in [key for key, (_, expiry) in self._entries.items() if expiry <= now]:
+            del self._entries[key]
+
+    def _arm_timer(self) -> None:
+        if self._timer is not None or not self._entries:
+            return
+        delay = max(0.0, min(expiry for _, expiry in self._entries.values()) - time.monotonic())
+        self._timer = threading.Timer(delay + 0.01, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._purge(time.monotonic())
+            self._arm_timer()
+
+
+class SessionStore(MutableMapping):
+    """
+    Saved sessions, kept encrypted in memory and persisted write-behind.
+
+    Acts as the dict of session records that the GUI edits. Passwords stay
+    in their stored, encrypted form (Ciphertext); a record assigned with a
+    plaintext password has it encrypted on assignment, and ``password()``
+    decrypts one through a short-lived SecretCache when it is needed to
+    connect. Loading therefore only parses the file. Change a password by
+    assigning a new record rather than editing the old one in place.
+
+    ``save()`` does not write straight away: changes within ``delay`` seconds
+    are written together by a background timer, and ``flush()`` writes
+    immediately. A write only serializes records that differ from what was
+    last written, and the file is replaced atomically.
+    """
+
+    def __init__(self, session_file: str, fernet, delay: float = SAVE_DELAY,
+                 on_saved: Optional[Callable[[Optional[Exception]], None]] = None):
+        """
+        Args:
+            session_file (str): Path of sessions.json
+            fernet: Cipher for passwords (see make_fernet())
+            delay (float): Seconds to coalesce changes before writing
+            on_saved: Called from the writer thread after each write-behind,
+                with the exception if it failed
+        """
+        self.session_file = session_file
+        self.fernet = fernet
+        self.delay = delay
+        self.on_saved = on_saved
+        self.secrets = SecretCache(fernet)
+        self.encryptions = 0    # Passwords encrypted since the store was created
+        self.last_written = 0   # Records serialized by the last write
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # Per session: a copy of the record as last written and its JSON text (None until needed)
+        self._written: Dict[str, Tuple[Dict[str, Any], Optional[str]]] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def load(self) -> None:
+        """Replace the contents with the sessions in the file. Passwords are not decrypted."""
+        stored_sessions = read_sessions(self.session_file)
+        with self._lock:
+            self._records = {}
+            self._written = {}
+            for name, session in stored_sessions.items():
+                if session.get("password"):
+                    session["password"] = Ciphertext(session["password"])
+                self._records[name] = session
+                # JSON text is produced by the first write, off the startup path
+                self._written[name] = (_snapshot(session), None)
+
+    def password(self, name: str) -> str:
+        """Decrypted password of a session, or an empty string if it has none."""
+        return self.secrets.reveal(self[name].get("password"))
+
+    def plaintext_record(self, name: str) -> Dict[str, Any]:
+        """Copy of a session with its password decrypted, e.g. for export. Not cached."""
+        session = dict(self._records[name])
+        password = session.get("password")
+        session["password"] = decrypt_value(self.fernet, password) if isinstance(password, Ciphertext) else password or ""
+        return session
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self._records[name]
+
+    def __setitem__(self, name: str, session: Dict[str, Any]) -> None:
+        password = session.get("password")
+        if password and not isinstance(password, Ciphertext):
+            session["password"] = Ciphertext(encrypt_value(self.fernet, password))
+            self.encryptions += 1
+        with self._lock:
+            self._records[name] = session
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            del self._records[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._records
+
+    def items(self):
+        return self._records.items()
+
+    def values(self):
+        return self._records.values()
+
+    def save(self) -> None:
+        """Write the sessions shortly; calls made before that write are served by it."""
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._write_behind)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> bool:
+        """
+        Write changes now instead of waiting for the timer.
+
+        Returns:
+            bool: True if the file was written, False if nothing had changed
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            written = {}
+            changed = 0
+            for name, session in self._records.items():
+                previous = self._written.get(name)
+                if previous is not None and previous[0] == session:
+                    written[name] = previous if previous[1] is not None else (previous[0], _fragment(name, session))
+                else:
+                    written[name] = (_snapshot(session), _fragment(name, session))
+                    changed += 1
+            if not changed and list(written) == list(self._written):
+                return False
+
+            write_atomic(self.session_file, "{\n" + ",\n".join(text for _, text in written.values()) + "\n}\n")
+            self._written = written
+            self.last_written = changed
+            return True
+
+    def close(self) -> None:
+        """Write any pending changes and forget decrypted passwords."""
+        self.flush()
+        self.secrets.clear()
+
+    def _write_behind(self) -> None:
+        error = None
+        try:
+            with self._lock:
+                self._timer = None
+                self.flush()
+        except Exception as e:
+            logger.error(f"Error saving sessions: {e}")
+            error = e
+        if self.on_saved is not None:
+            self.on_saved(error)
+
+
+def load_saved_sessions(data_dir: str, decrypt: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the sessions saved by the GUI.
+
+    Args:
+        data_dir (str): Directory holding sessions.db (or sessions.json) and encryption.key
+        decrypt (bool): Decrypt passwords; when False they are left out, and
+            neither the key nor cryptography is loaded
+
+    Returns:
+        Dict mapping session names to session records
+    """
+    database_file = os.path.join(data_dir, DATABASE_FILENAME)
+    if os.path.exists(database_file):
+        from session_db import read_database  # session_db builds on this module
+        stored_sessions = read_database(database_file)
+    else:
+        # Not migrated yet: the GUI moves sessions.json into the database on its next start
+        stored_sessions = read_sessions(os.path.join(data_dir, SESSIONS_FILENAME))
+    if not decrypt:
+        return {name: dict(session, password="") for name, session in stored_sessions.items()}
+
+    key = load_key(os.path.join(data_dir, KEY_FILENAME))
+    fernet = make_fernet(key) if key else None
+    return decrypt_sessions(stored_sessions, fernet)
+
+
+def load_preferences(data_dir: str) -> Dict[str, Any]:
+    """Read the GUI's saved preferences, or an empty dict if there are none."""
+    preferences_file = os.path.join(data_dir, PREFERENCES_FILENAME)
+    if not os.path.exists(preferences_file):
+        return {}
+    with open(preferences_file, 'r') as f:
+        return json.load(f)
+
+
+def session_tags(session: Dict[str, Any]) -> List[str]:
+    """Return a session's tags as a list of lowercase strings."""
+    tags = session.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return [tag.strip().lower() for tag in tags if tag.strip()]
+
+
+def select_sessions(sessions: Dict[str, Dict[str, Any]], names: List[str],
+                    tags: List[str], select_all: bool) -> List[str]:
+    """
+    Resolve session names, tags or "all" to session names, keeping the saved order.
+
+    Raises:
+        KeyError: If a requested session name does not exist
+    """
+    missing = [name for name in names if name not in sessions]
+    if missing:
+        raise KeyError(f"Unknown session(s): {', '.join(missing)}")
+
+    wanted_tags = {tag.strip().lower() for tag in tags}
+    return [
+        name for name, session in sessions.items()
+        if select_all or name in names or wanted_tags & set(session_tags(session))
+    ]
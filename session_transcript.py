@@ -0,0 +1,353 @@
+import codecs
+import gzip
+import importlib.util
+import io
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from output_sinks import OutputSink
+
+TRANSCRIPT_DIRNAME = "session_logs"
+
+# "asciicast" records asciinema v2 files for timed replay; "raw" records the bytes as received
+FORMATS = ("asciicast", "raw")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# The writer thread wakes up when this much output is waiting, or after FLUSH_INTERVAL
+WRITE_BATCH = 256 * 1024
+FLUSH_INTERVAL = 1.0
+
+# Output waiting for the writer beyond this is dropped (and counted) rather than slowing the reader
+MAX_PENDING = 32 * 1024 * 1024
+
+# Buffer between the encoder and the file, so the disk sees large writes
+FILE_BUFFER = 1024 * 1024
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Fastest gzip level: terminal output still compresses about 7:1, and the writer keeps up with the channel
+GZIP_LEVEL = 1
+
+logger = logging.getLogger(__name__)
+
+
+def transcript_extension(fmt: str, compression: str) -> str:
+    """File extension of a transcript part, e.g. ``.cast.gz``."""
+    extension = ".cast" if fmt == "asciicast" else ".log"
+    return extension + {"none": "", "gzip": ".gz", "zstd": ".zst"}[compression]
+
+
+def zstd_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def _open_compressed(path: str, mode: str, compression: str):
+    """Open a transcript file for binary reading ("rb") or writing ("wb") with its compression."""
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+    if compression == "zstd":
+        # Optional dependency: pip install zstandard
+        import zstandard
+        if mode == "wb":
+            return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), FILE_BUFFER)
+    return open(path, mode, buffering=FILE_BUFFER)
+
+
+class TranscriptSink(OutputSink):
+    """
+    Record a session's output to disk from a background writer thread.
+
+    write() only stamps the chunk with the time and queues it, so the reader
+    never waits on the disk, an encoder or a compressor. The writer thread
+    takes everything queued at once, decodes and encodes it, and writes it
+    through a large buffer.
+
+    The recording is split into parts: a new file is started once a part
+    holds ``max_bytes`` of output or is ``max_age`` seconds old, and only the
+    newest ``keep`` parts are kept (0 keeps all). Each asciicast part has its
+    own header and starts at time 0, so every part replays on its own, e.g.
+    with ``asciinema play`` or ``main.py replay``.
+    """
+
+    def __init__(self, directory: str, prefix: str, fmt: str = "asciicast", compression: str = "none",
+                 size: Tuple[int, int] = (80, 24), title: str = "", max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = 0.0, keep: int = 0, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Args:
+            directory (str): Directory for the transcript files
+            prefix (str): Start of each file name; a timestamp and extension are added
+            fmt (str): "asciicast" or "raw"
+            compression (str): "none", "gzip" or "zstd" (needs the zstandard package)
+            size (tuple): Terminal columns and rows when recording starts; see resize()
+            title (str): Title in the asciicast header
+            max_bytes (int): Output per part before rotating, 0 for no limit
+            max_age (float): Seconds per part before rotating, 0 for no limit
+            keep (int): Parts to keep, oldest deleted first; 0 keeps all
+            flush_interval (float): Longest time output waits before it is written
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown transcript format: {fmt}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown transcript compression: {compression}")
+        if compression == "zstd" and not zstd_available():
+            raise ValueError("zstd compression needs the zstandard package")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.fmt = fmt
+        self.compression = compression
+        self.size = size
+        self.title = title
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.flush_interval = flush_interval
+        self.paths: List[str] = []  # Parts written so far, oldest first
+        self.dropped = 0            # Bytes dropped because the writer fell behind
+        self.error: Optional[Exception] = None
+
+        # (monotonic time, output bytes or (columns, rows) for a resize)
+        self._queue: List[Tuple[float, Union[bytes, Tuple[int, int]]]] = []
+        self._queued_bytes = 0
+        self._closed = False
+        self._wakeup = threading.Condition()
+
+        # Current part; used by the writer thread only
+        self._file = None
+        self._part_started = 0.0
+        self._part_bytes = 0
+        self._decoder = None
+        self._stem = ""          # File name of the last part without its number and extension
+        self._stem_number = 0
+
+        self._writer = threading.Thread(target=self._run, name=f"transcript-{prefix}", daemon=True)
+        self._writer.start()
+
+    @property
+    def path(self) -> Optional[str]:
+        """The part being written."""
+        return self.paths[-1] if self.paths else None
+
+    def write(self, data: bytes) -> None:
+        chunk = bytes(data)
+        with self._wakeup:
+            if self._closed or self.error is not None:
+                return
+            if self._queued_bytes > MAX_PENDING:
+                self.dropped += len(chunk)
+                return
+            self._queue.append((time.monotonic(), chunk))
+            self._queued_bytes += len(chunk)
+            if self._queued_bytes >= WRITE_BATCH:
+                self._wakeup.notify()
+
+    def resize(self, columns: int, rows: int) -> None:
+        """Record a terminal resize (an asciicast "r" event)."""
+        with self._wakeup:
+            if not self._closed:
+                self._queue.append((time.monotonic(), (columns, rows)))
+
+    def close(self) -> None:
+        """Write what is queued, finish the current part and stop the writer thread."""
+        with self._wakeup:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._writer.join()
+        if self.dropped:
+            logger.warning(f"Transcript {self.prefix}: {self.dropped} bytes dropped, the writer fell behind")
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                if not self._closed and self._queued_bytes < WRITE_BATCH:
+                    self._wakeup.wait(self.flush_interval)
+                events, self._queue = self._queue, []
+                self._queued_bytes = 0
+                closing = self._closed
+            try:
+                if events:
+                    self._write_events(events)
+                if self._file is not None:
+                    if self.max_age and time.monotonic() - self._part_started >= self.max_age:
+                        self._close_part()
+                    elif self.compression == "none":
+                        # Compressed streams are only flushed at the end of a part to keep their ratio
+                        self._file.flush()
+                if closing:
+                    self._close_part()
+                    return
+            except Exception as e:
+                logger.error(f"Error writing transcript {self.path}: {e}")
+                with self._wakeup:
+                    self.error = e
+                    self._queue = []
+                self._abandon_part()
+                return
+
+    def _write_events(self, events: List[Tuple[float, Union[bytes, Tuple[int, int]]]]) -> None:
+        """Encode queued events and write them to the current part in as few writes as possible."""
+        encoded: List[Any] = []  # Output bytes (raw) or event lines (asciicast) not yet written
+
+        def write_encoded() -> None:
+            if encoded:
+                self._file.write(b"".join(encoded) if self.fmt == "raw" else "".join(encoded).encode("utf-8"))
+                encoded.clear()
+
+        for timestamp, event in events:
+            if isinstance(event, tuple):
+                self.size = event  # Header size of the parts that follow
+            if self._file is None or self._rotation_due(timestamp):
+                write_encoded()
+                self._close_part()
+                self._open_part(timestamp)
+            if isinstance(event, tuple):
+                if self.fmt == "asciicast":
+                    encoded.append(json.dumps([round(timestamp - self._part_started, 6), "r",
+                                               f"{event[0]}x{event[1]}"]) + "\n")
+                continue
+            self._part_bytes += len(event)
+            if self.fmt == "raw":
+                encoded.append(event)
+                continue
+            text = self._decoder.decode(event)
+            if text:
+                encoded.append(json.dumps([round(timestamp - self._part_started, 6), "o", text],
+                                          ensure_ascii=False) + "\n")
+        write_encoded()
+
+    def _rotation_due(self, timestamp: float) -> bool:
+        return bool((self.max_bytes and self._part_bytes >= self.max_bytes)
+                    or (self.max_age and timestamp - self._part_started >= self.max_age))
+
+    def _open_part(self, started: float) -> None:
+        wall_clock = time.time() - (time.monotonic() - started)
+        stem = f"{self.prefix}-{datetime.fromtimestamp(wall_clock):%Y%m%d-%H%M%S}"
+        extension = transcript_extension(self.fmt, self.compression)
+        # Parts started within the same second are numbered, never reusing the name of a deleted part
+        number = self._stem_number + 1 if stem == self._stem else 1
+        path = os.path.join(self.directory, stem + extension if number == 1 else f"{stem}-{number}{extension}")
+        while os.path.exists(path):
+            number += 1
+            path = os.path.join(self.directory, f"{stem}-{number}{extension}")
+        self._stem, self._stem_number = stem, number
+
+        self._file = _open_compressed(path, "wb", self.compression)
+        self._part_started = started
+        self._part_bytes = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.paths.append(path)
+        if self.fmt == "asciicast":
+            header = {"version": 2, "width": self.size[0], "height": self.size[1],
+                      "timestamp": int(wall_clock), "env": {"TERM": "xterm-256color"}}
+            if self.title:
+                header["title"] = self.title
+            self._file.write((json.dumps(header) + "\n").encode("utf-8"))
+
+        # Drop the oldest parts beyond the limit
+        while self.keep and len(self.paths) > self.keep:
+            try:
+                os.remove(self.paths.pop(0))
+            except OSError as e:
+                logger.error(f"Error removing old transcript: {e}")
+
+    def _close_part(self) -> None:
+        if self._file is None:
+            return
+        if self.fmt == "asciicast":
+            # A character split at the very end of the output
+            text = self._decoder.decode(b"", final=True)
+            if text:
+                self._file.write((json.dumps([round(time.monotonic() - self._part_started, 6), "o", text],
+                                             ensure_ascii=False) + "\n").encode("utf-8"))
+        file, self._file = self._file, None
+        file.close()
+
+    def _abandon_part(self) -> None:
+        file, self._file = self._file, None
+        if file is not None:
+            try:
+                file.close()
+            except Exception:
+                pass
+
+
+def _compression_of(path: str) -> str:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def read_asciicast(path: str) -> Tuple[Dict[str, Any], Iterator[list]]:
+    """
+    Open an asciicast v2 file, compressed or not.
+
+    Returns:
+        Tuple of the header and an iterator over the events ([time, code, data])
+    """
+    stream = io.TextIOWrapper(_open_compressed(path, "rb", _compression_of(path)), encoding="utf-8")
+    try:
+        header = json.loads(stream.readline() or "null")
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("version") != 2:
+        stream.close()
+        raise ValueError(f"{path} is not an asciicast v2 recording")
+
+    def events() -> Iterator[list]:
+        with stream:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+    return header, events()
+
+
+def replay(path: str, out: TextIO, speed: float = 1.0, max_idle: Optional[float] = None) -> None:
+    """
+    Play a transcript to a terminal stream with its original timing.
+
+    Args:
+        path (str): Transcript part (.cast, optionally .gz or .zst); raw
+            .log parts have no timing and are written out at once
+        out: Text stream to write to, e.g. sys.stdout
+        speed (float): Playback speed factor, greater than 0
+        max_idle (float, optional): Cap on the pause between two events, in seconds
+
+    Raises:
+        ValueError: If speed is not a number greater than 0
+    """
+    if not (0 < speed < math.inf):
+        raise ValueError(f"Invalid playback speed {speed}: expected a number greater than 0")
+    if ".cast" not in os.path.basename(path):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with _open_compressed(path, "rb", _compression_of(path)) as f:
+            for block in iter(lambda: f.read(FILE_BUFFER), b""):
+                out.write(decoder.decode(block))
+        out.write(decoder.decode(b"", final=True))
+        out.flush()
+        return
+
+    _, events = read_asciicast(path)
+    previous = 0.0
+    lag = 0.0  # Idle time cut from the recording so far
+    started = time.monotonic()
+    for timestamp, code, data in events:
+        if max_idle is not None and timestamp - lag - previous > max_idle:
+            lag = timestamp - previous - max_idle
+        previous = timestamp - lag
+        delay = previous / speed - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+        if code == "o":
+            out.write(data)
+            out.flush()
@@ -0,0 +1,335 @@
+import hashlib
+import logging
+import os
+import posixpath
+import shlex
+import stat
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sftp_transfer import PARTIAL_SUFFIX, DONE, TransferManager, format_bytes
+
+# Upper bound on the length of one remote sha256sum command line
+CHECKSUM_BATCH_BYTES = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class SyncAction:
+    """One change needed to make the remote tree match the local one."""
+
+    def __init__(self, kind: str, path: str, size: int = 0, reason: str = ""):
+        self.kind = kind        # "upload", "mkdir" or "delete"
+        self.path = path        # Relative to the synced directories, always "/"-separated
+        self.size = size
+        self.reason = reason    # Why an upload is needed: new, size, mtime or checksum
+
+    def __str__(self) -> str:
+        if self.kind == "upload":
+            return f"upload  {self.path} ({format_bytes(self.size)}, {self.reason})"
+        return f"{self.kind:<7} {self.path}"
+
+
+class SyncPlan:
+    """Differences between a local directory and a remote directory."""
+
+    def __init__(self, local_dir: str, remote_dir: str):
+        self.local_dir = local_dir
+        self.remote_dir = remote_dir
+        self.actions: List[SyncAction] = []
+        self.unchanged = 0
+        self.scan_seconds = 0.0
+        self.skipped: List[str] = []  # Local entries that could not be synced, with the reason
+        self.errors: List[str] = []   # Remote deletions that failed, with the error
+
+    @property
+    def uploads(self) -> List[SyncAction]:
+        return [action for action in self.actions if action.kind == "upload"]
+
+    @property
+    def upload_bytes(self) -> int:
+        return sum(action.size for action in self.uploads)
+
+    def summary(self) -> str:
+        counts = {kind: sum(1 for action in self.actions if action.kind == kind) for kind in ("upload", "mkdir", "delete")}
+        return (f"{counts['upload']} to upload ({format_bytes(self.upload_bytes)}), {counts['mkdir']} directories "
+                f"to create, {counts['delete']} to delete, {self.unchanged} unchanged")
+
+
+def scan_local(local_dir: str, skipped: Optional[List[str]] = None) -> Tuple[Dict[str, Tuple[int, int]], Set[str]]:
+    """
+    List a local tree.
+
+    Symlinks to files are followed. Entries that cannot be read, such as
+    broken symlinks or unreadable directories, and entries that are not
+    regular files (sockets, FIFOs, devices) are skipped with a warning
+    instead of stopping the scan.
+
+    Args:
+        local_dir (str): Directory to list
+        skipped (list, optional): Receives "path: reason" for each skipped entry
+
+    Returns:
+        Tuple of {relative path: (size, mtime)} for files and the set of relative directory paths
+    """
+    files = {}
+    dirs = set()
+
+    def skip(path: str, reason: str) -> None:
+        logger.warning(f"Skipping {path}: {reason}")
+        if skipped is not None:
+            skipped.append(f"{path}: {reason}")
+
+    def walk_error(error: OSError) -> None:
+        path = os.path.relpath(error.filename, local_dir).replace(os.sep, "/") if error.filename else local_dir
+        skip(path, error.strerror or str(error))
+
+    for root, dirnames, filenames in os.walk(local_dir, onerror=walk_error):
+        relative = os.path.relpath(root, local_dir)
+        prefix = "" if relative == "." else relative.replace(os.sep, "/") + "/"
+        for dirname in dirnames:
+            dirs.add(prefix + dirname)
+        for filename in filenames:
+            if filename.endswith(PARTIAL_SUFFIX):
+                continue
+            try:
+                attributes = os.stat(os.path.join(root, filename))
+            except OSError as e:
+                skip(prefix + filename, "broken symlink" if os.path.islink(os.path.join(root, filename))
+                     else e.strerror or str(e))
+                continue
+            if not stat.S_ISREG(attributes.st_mode):
+                skip(prefix + filename, "not a regular file")
+                continue
+            files[prefix + filename] = (attributes.st_size, int(attributes.st_mtime))
+    return files, dirs
+
+
+def scan_remote(client, sftp, remote_dir: str) -> Tuple[Dict[str, Tuple[int, int]], Set[str], bool]:
+    """
+    List a remote tree in the same form as scan_local().
+
+    The tree is listed with one ``find`` command on an exec channel when the
+    server has GNU find, which costs a single round trip however many
+    directories there are; otherwise it is walked over SFTP.
+
+    Returns:
+        Tuple of files, directories and whether the remote directory exists
+    """
+    try:
+        attributes = sftp.stat(remote_dir)
+    except IOError:
+        return {}, set(), False
+    if not stat.S_ISDIR(attributes.st_mode):
+        raise NotADirectoryError(f"Remote path is not a directory: {remote_dir}")
+
+    listing = _find_remote(client, remote_dir)
+    if listing is not None:
+        return listing[0], listing[1], True
+
+    files = {}
+    dirs = set()
+    pending = [""]
+    while pending:
+        relative = pending.pop()
+        for entry in sftp.listdir_attr(posixpath.join(remote_dir, relative) if relative else remote_dir):
+            path = relative + entry.filename
+            if stat.S_ISDIR(entry.st_mode):
+                dirs.add(path)
+                pending.append(path + "/")
+            elif stat.S_ISREG(entry.st_mode):
+                files[path] = (entry.st_size, int(entry.st_mtime or 0))
+    return files, dirs, True
+
+
+def _find_remote(client, remote_dir: str) -> Optional[Tuple[Dict[str, Tuple[int, int]], Set[str]]]:
+    """List a remote tree with GNU find, or return None if that is not available."""
+    if client is None:
+        return None
+    command = (f"find {shlex.quote(remote_dir)} -mindepth 1 \\( -type f -o -type d \\) "
+               f"-printf '%y %s %T@ %P\\0'")
+    try:
+        status, stdout, _ = client.run_command(command)
+    except Exception as e:
+        logger.debug(f"Remote find failed, walking over SFTP instead: {e}")
+        return None
+    if status != 0:
+        return None
+
+    files = {}
+    dirs = set()
+    for record in stdout.split(b"\0"):
+        if not record:
+            continue
+        kind, size, mtime, path = record.split(b" ", 3)
+        path = path.decode("utf-8", errors="surrogateescape")
+        if kind == b"d":
+            dirs.add(path)
+        else:
+            files[path] = (int(size), int(float(mtime)))
+    return files, dirs
+
+
+def local_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remote_checksums(client, remote_dir: str, paths: List[str]) -> Dict[str, str]:
+    """
+    Hash files on the remote host with sha256sum, a batch of files per command.
+
+    Files the command could not hash are left out, so callers treat them as changed.
+    """
+    checksums = {}
+    batch: List[str] = []
+    length = 0
+
+    def run(batch: List[str]) -> None:
+        command = f"cd {shlex.quote(remote_dir)} && sha256sum -- " + " ".join(shlex.quote(path) for path in batch)
+        _, stdout, stderr = client.run_command(command)
+        if not stdout and stderr:
+            raise RuntimeError(f"sha256sum failed: {stderr.decode(errors='replace').strip()}")
+        for line in stdout.decode("utf-8", errors="surrogateescape").splitlines():
+            # Names with unusual characters are escaped and start with a backslash; skip them
+            digest, _, path = line.partition("  ")
+            if path and not digest.startswith("\\"):
+                checksums[path] = digest
+
+    for path in paths:
+        batch.append(path)
+        length += len(path) + 3
+        if length >= CHECKSUM_BATCH_BYTES:
+            run(batch)
+            batch, length = [], 0
+    if batch:
+        run(batch)
+    return checksums
+
+
+def plan_sync(client, sftp, local_dir: str, remote_dir: str, checksum: bool = False,
+              delete: bool = False) -> SyncPlan:
+    """
+    Compare a local directory with a remote one.
+
+    Files are uploaded when they are missing remotely or differ in size or
+    modification time. With ``checksum``, files of equal size are compared by
+    SHA-256 instead of time, hashed on each side so file data never crosses
+    the network just to be compared.
+
+    Args:
+        client: Connected ModernSSHClient, used for remote find and sha256sum (may be None)
+        sftp: SFTPClient on the same connection
+        local_dir (str): Source directory
+        remote_dir (str): Destination directory
+        checksum (bool): Compare contents instead of modification times
+        delete (bool): Also plan deleting remote files and directories that do not exist locally
+
+    Returns:
+        SyncPlan: Actions needed, in an order that can be applied directly
+    """
+    started = time.monotonic()
+    plan = SyncPlan(local_dir, remote_dir)
+    local_files, local_dirs = scan_local(local_dir, plan.skipped)
+    remote_files, remote_dirs, exists = scan_remote(client, sftp, remote_dir)
+
+    if not exists:
+        plan.actions.append(SyncAction("mkdir", ""))
+    for path in sorted(local_dirs - remote_dirs, key=lambda p: p.count("/")):
+        plan.actions.append(SyncAction("mkdir", path))
+
+    candidates = []
+    for path in sorted(local_files):
+        size, mtime = local_files[path]
+        if path not in remote_files:
+            plan.actions.append(SyncAction("upload", path, size, "new"))
+        elif remote_files[path][0] != size:
+            plan.actions.append(SyncAction("upload", path, size, "size"))
+        elif checksum:
+            candidates.append(path)
+        elif remote_files[path][1] != mtime:
+            plan.actions.append(SyncAction("upload", path, size, "mtime"))
+        else:
+            plan.unchanged += 1
+
+    if candidates:
+        if client is None:
+            raise ValueError("Checksum comparison needs a client that can run remote commands")
+        remote_sums = remote_checksums(client, remote_dir, candidates)
+        for path in candidates:
+            if remote_sums.get(path) != local_checksum(os.path.join(local_dir, *path.split("/"))):
+                plan.actions.append(SyncAction("upload", path, local_files[path][0], "checksum"))
+            else:
+                plan.unchanged += 1
+
+    if delete:
+        for path in sorted(set(remote_files) - set(local_files)):
+            if not path.endswith(PARTIAL_SUFFIX):
+                plan.actions.append(SyncAction("delete", path))
+        # Deepest directories first so each one is empty when it is removed
+        for path in sorted(remote_dirs - local_dirs, key=lambda p: p.count("/"), reverse=True):
+            plan.actions.append(SyncAction("delete", path + "/"))
+
+    plan.scan_seconds = time.monotonic() - started
+    return plan
+
+
+def apply_plan(plan: SyncPlan, sftp, manager: TransferManager) -> List:
+    """
+    Create directories, queue the uploads on ``manager`` and delete extra
+    remote files once every upload has finished. A deletion that fails, e.g.
+    a directory still holding partial uploads, is recorded in
+    ``plan.errors`` and the rest go ahead.
+
+    Returns:
+        List of the TransferJobs that were queued
+    """
+    for action in plan.actions:
+        if action.kind == "mkdir" and action.path:
+            sftp.mkdir(posixpath.join(plan.remote_dir, action.path))
+        elif action.kind == "mkdir":
+            _makedirs_remote(sftp, plan.remote_dir)
+
+    jobs = []
+    for action in plan.uploads:
+        local_path = os.path.join(plan.local_dir, *action.path.split("/"))
+        remote_path = posixpath.join(plan.remote_dir, action.path)
+        # Keeping the source time is what lets the next run skip unchanged files
+        jobs += manager.upload(local_path, remote_path, resume=True, preserve_times=True)
+
+    deletes = [action for action in plan.actions if action.kind == "delete"]
+    if deletes:
+        wait_for(jobs)
+        for action in deletes:
+            remote_path = posixpath.join(plan.remote_dir, action.path.rstrip("/"))
+            try:
+                if action.path.endswith("/"):
+                    sftp.rmdir(remote_path)
+                else:
+                    sftp.remove(remote_path)
+            except IOError as e:
+                logger.warning(f"Could not delete {remote_path}: {e}")
+                plan.errors.append(f"{remote_path}: {e}")
+    return jobs
+
+
+def wait_for(jobs: List, poll_interval: float = 0.05) -> bool:
+    """Block until every job has finished. Returns True if all of them succeeded."""
+    while any(job.active for job in jobs):
+        time.sleep(poll_interval)
+    return all(job.state == DONE for job in jobs)
+
+
+def _makedirs_remote(sftp, remote_dir: str) -> None:
+    if not remote_dir or remote_dir in ("/", "."):
+        return
+    try:
+        sftp.stat(remote_dir)
+        return
+    except IOError:
+        pass
+    _makedirs_remote(sftp, posixpath.dirname(remote_dir.rstrip("/")))
+    sftp.mkdir(remote_dir)
@@ -0,0 +1,469 @@
+import logging
+import os
+import posixpath
+import queue
+import stat
+import threading
+import time
+from typing import Callable, List, Optional
+
+# Bytes moved per read()/write() call; paramiko splits these into 32 KiB SFTP requests
+TRANSFER_BLOCK_SIZE = 1024 * 1024
+
+# Outstanding read requests per download; keeps the link busy on high-latency connections
+PREFETCH_REQUESTS = 64
+
+# Files up to this size skip what only pays off for large ones: downloads are not prefetched,
+# and uploads are not pipelined and go straight to the destination, as resuming them saves
+# nothing and the .part rename would cost another round trip
+SMALL_FILE_SIZE = 256 * 1024
+
+# Suffix of partially transferred files, kept so an interrupted transfer can resume
+PARTIAL_SUFFIX = ".part"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class TransferCancelled(Exception):
+    """Raised inside a worker when its job was cancelled."""
+
+
+class TransferJob:
+    """One file being uploaded or downloaded."""
+
+    def __init__(self, direction: str, local_path: str, remote_path: str, size: Optional[int] = None,
+                 resume: bool = True, preserve_times: bool = False):
+        self.direction = direction  # "upload" or "download"
+        self.local_path = local_path
+        self.remote_path = remote_path
+        self.size = size
+        self.resume = resume
+        self.preserve_times = preserve_times  # Copy the source's modification time to the destination
+        self.state = QUEUED
+        self.error: Optional[str] = None
+        self.transferred = 0      # Bytes present at the destination, including resumed ones
+        self.resumed_from = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._cancelled = threading.Event()
+
+    @property
+    def name(self) -> str:
+        path = self.local_path if self.direction == "upload" else self.remote_path
+        return os.path.basename(path.rstrip("/"))
+
+    @property
+    def active(self) -> bool:
+        return self.state in (QUEUED, RUNNING)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, (self.size or 0) - self.transferred)
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self.state == QUEUED:
+            self.state = CANCELLED
+
+    def bytes_per_second(self) -> float:
+        if not self.started:
+            return 0.0
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return (self.transferred - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+
+    def _advance(self, count: int) -> None:
+        if self._cancelled.is_set():
+            raise TransferCancelled()
+        self.transferred += count
+
+
+class BandwidthLimit:
+    """
+    Token bucket shared by every worker that should stay under one rate.
+
+    A worker asks for the bytes it is about to send and sleeps until the
+    bucket has refilled enough. Up to ``burst`` seconds' worth of unused
+    bandwidth is kept, so short pauses do not lower the average rate.
+    """
+
+    def __init__(self, bytes_per_second: float, burst: float = 0.5):
+        self.rate = float(bytes_per_second)
+        self.capacity = self.rate * burst
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, count: int) -> None:
+        """Take ``count`` bytes from the bucket, blocking while it is overdrawn."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going into debt lets one request exceed the bucket size; later callers wait it off
+            self._tokens -= count
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TransferStats:
+    """Aggregate progress of a transfer manager at one point in time."""
+
+    def __init__(self, running: int, queued: int, done: int, failed: int,
+                 bytes_per_second: float, remaining_bytes: int, total_bytes: int, transferred_bytes: int):
+        self.running = running
+        self.queued = queued
+        self.done = done
+        self.failed = failed
+        self.bytes_per_second = bytes_per_second
+        self.remaining_bytes = remaining_bytes
+        self.total_bytes = total_bytes
+        self.transferred_bytes = transferred_bytes
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds until the queue drains at the current rate, or None if unknown."""
+        if self.bytes_per_second <= 0:
+            return None
+        return self.remaining_bytes / self.bytes_per_second
+
+    @property
+    def fraction(self) -> float:
+        return self.transferred_bytes / self.total_bytes if self.total_bytes else 0.0
+
+
+class TransferManager:
+    """
+    Queue of SFTP uploads and downloads served by a few parallel workers.
+
+    Every worker opens its own SFTP channel on the session's transport, so
+    files move in parallel without extra logins. Downloads prefetch many read
+    requests ahead and uploads are pipelined (writes are not acknowledged one
+    by one), which keeps throughput close to the link rate even with high
+    latency. Data goes to a ``.part`` file that is renamed when complete; a
+    later transfer of the same file continues from the partial file. Files up
+    to SMALL_FILE_SIZE are moved with plain requests, and small uploads are
+    written in place, which is cheaper than any of that for them.
+    """
+
+    def __init__(self, open_sftp: Callable[[], object], max_parallel: int = 4,
+                 on_change: Optional[Callable[[TransferJob], None]] = None,
+                 bandwidth_limit: Optional[BandwidthLimit] = None):
+        """
+        Args:
+            open_sftp: Returns a new paramiko SFTPClient, e.g. ``client.open_sftp``
+            max_parallel (int): Files transferred at the same time
+            on_change: Called from a worker thread when a job changes state
+            bandwidth_limit (BandwidthLimit, optional): Rate cap, which may be shared with other managers
+        """
+        self.logger = logging.getLogger(__name__)
+        self.open_sftp = open_sftp
+        self.max_parallel = max(1, max_parallel)
+        self.on_change = on_change
+        self.bandwidth_limit = bandwidth_limit
+
+        self._queue: "queue.Queue[Optional[TransferJob]]" = queue.Queue()
+        self._jobs: List[TransferJob] = []
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+        self._remote_dirs = set()  # Remote directories known to exist
+
+        # Throughput sampling for snapshot()
+        self._last_sample: Optional[float] = None
+        self._last_bytes = 0
+        self._rate = 0.0
+
+    # -- queueing ---------------------------------------------------------
+
+    def upload(self, local_path: str, remote_path: str, resume: bool = True,
+               preserve_times: bool = False) -> List[TransferJob]:
+        """Queue a file, or every file below a directory, for upload. Returns the queued jobs."""
+        jobs = []
+        if os.path.isdir(local_path):
+            for root, _, files in os.walk(local_path):
+                relative = os.path.relpath(root, local_path)
+                target_dir = remote_path if relative == "." else posixpath.join(remote_path, *relative.split(os.sep))
+                for filename in sorted(files):
+                    path = os.path.join(root, filename)
+                    jobs.append(TransferJob("upload", path, posixpath.join(target_dir, filename),
+                                            os.path.getsize(path), resume, preserve_times))
+        else:
+            jobs.append(TransferJob("upload", local_path, remote_path, os.path.getsize(local_path), resume,
+                                    preserve_times))
+        self._submit(jobs)
+        return jobs
+
+    def download(self, remote_path: str, local_path: str, resume: bool = True, sftp=None) -> List[TransferJob]:
+        """
+        Queue a remote file, or every file below a remote directory, for download.
+
+        Listing a remote directory takes network round trips, so call this off the UI thread.
+        """
+        owned = sftp is None
+        sftp = sftp or self.open_sftp()
+        try:
+            jobs = []
+            attributes = sftp.stat(remote_path)
+            if stat.S_ISDIR(attributes.st_mode):
+                for path, size in self._walk_remote(sftp, remote_path):
+                    relative = posixpath.relpath(path, remote_path)
+                    jobs.append(TransferJob("download", os.path.join(local_path, *relative.split("/")),
+                                            path, size, resume))
+            else:
+                jobs.append(TransferJob("download", local_path, remote_path, attributes.st_size, resume))
+        finally:
+            if owned:
+                sftp.close()
+        self._submit(jobs)
+        return jobs
+
+    def _walk_remote(self, sftp, remote_dir: str):
+        for entry in sftp.listdir_attr(remote_dir):
+            path = posixpath.join(remote_dir, entry.filename)
+            if stat.S_ISDIR(entry.st_mode):
+                yield from self._walk_remote(sftp, path)
+            elif stat.S_ISREG(entry.st_mode):
+                yield path, entry.st_size
+
+    def _submit(self, jobs: List[TransferJob]) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Transfer manager is closed")
+            self._jobs.extend(jobs)
+            self._start_workers()
+        for job in jobs:
+            self._queue.put(job)
+            self._notify(job)
+
+    # -- status -----------------------------------------------------------
+
+    def jobs(self) -> List[TransferJob]:
+        with self._lock:
+            return list(self._jobs)
+
+    def clear_finished(self) -> None:
+        """Forget jobs that are no longer queued or running."""
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.active]
+
+    def cancel_all(self) -> None:
+        for job in self.jobs():
+            job.cancel()
+
+    def snapshot(self) -> TransferStats:
+        """
+        Summarise every job. The transfer rate is smoothed between calls,
+        so call this at a steady interval (e.g. from a UI timer).
+        """
+        jobs = self.jobs()
+        states = [job.state for job in jobs]
+        active = [job for job in jobs if job.active]
+        moved = sum(job.transferred - job.resumed_from for job in jobs)
+
+        now = time.monotonic()
+        if self._last_sample is not None and now > self._last_sample:
+            instant = max(0, moved - self._last_bytes) / (now - self._last_sample)
+            self._rate = instant if self._rate == 0 else 0.3 * instant + 0.7 * self._rate
+        if not active:
+            self._rate = 0.0
+        self._last_sample, self._last_bytes = now, moved
+
+        return TransferStats(
+            running=states.count(RUNNING),
+            queued=states.count(QUEUED),
+            done=states.count(DONE),
+            failed=states.count(FAILED),
+            bytes_per_second=self._rate,
+            remaining_bytes=sum(job.remaining for job in active),
+            total_bytes=sum(job.size or 0 for job in active),
+            transferred_bytes=sum(job.transferred for job in active)
+        )
+
+    def close(self) -> None:
+        """Cancel outstanding jobs and stop the workers."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        self.cancel_all()
+        for _ in workers:
+            self._queue.put(None)
+
+    # -- workers ----------------------------------------------------------
+
+    def _start_workers(self) -> None:
+        """Start workers up to max_parallel. Caller holds the lock."""
+        while len(self._workers) < self.max_parallel:
+            worker = threading.Thread(target=self._worker, name=f"sftp-transfer-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _worker(self) -> None:
+        sftp = None
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                if job.state == CANCELLED:
+                    continue
+                try:
+                    if sftp is None:
+                        sftp = self.open_sftp()
+                    self._run(sftp, job)
+                except TransferCancelled:
+                    job.state = CANCELLED
+                except Exception as e:
+                    self.logger.error(f"Transfer of {job.remote_path} failed: {e}")
+                    job.state = FAILED
+                    job.error = str(e)
+                    # The channel may be broken; open a fresh one for the next job
+                    if sftp is not None:
+                        try:
+                            sftp.close()
+                        except Exception:
+                            pass
+                        sftp = None
+                job.finished = time.monotonic()
+                self._notify(job)
+        finally:
+            if sftp is not None:
+                try:
+                    sftp.close()
+                except Exception:
+                    pass
+
+    def _run(self, sftp, job: TransferJob) -> None:
+        job.state = RUNNING
+        job.started = time.monotonic()
+        self._notify(job)
+        if job.direction == "upload":
+            self._upload(sftp, job)
+        else:
+            self._download(sftp, job)
+        job.state = DONE
+
+    def _download(self, sftp, job: TransferJob) -> None:
+        # The size listed when the job was queued saves a round trip per file
+        size = job.size if job.size is not None else sftp.stat(job.remote_path).st_size
+        job.size = size
+        partial_path = job.local_path + PARTIAL_SUFFIX
+        os.makedirs(os.path.dirname(os.path.abspath(job.local_path)), exist_ok=True)
+
+        offset = 0
+        if job.resume and os.path.exists(partial_path):
+            offset = os.path.getsize(partial_path)
+            if offset > size:
+                offset = 0  # The remote file changed; start over
+        job.transferred = job.resumed_from = offset
+
+        with sftp.open(job.remote_path, "rb") as remote, open(partial_path, "ab" if offset else "wb") as local:
+            if offset < size:
+                remote.seek(offset)
+                if size - offset > SMALL_FILE_SIZE:
+                    remote.prefetch(size, max_concurrent_requests=PREFETCH_REQUESTS)
+                while True:
+                    data = remote.read(TRANSFER_BLOCK_SIZE)
+                    if not data:
+                        break
+                    self._throttle(len(data))
+                    local.write(data)
+                    job._advance(len(data))
+
+        if os.path.getsize(partial_path) != size:
+            raise IOError(f"Size mismatch after download ({os.path.getsize(partial_path)} of {size} bytes)")
+        os.replace(partial_path, job.local_path)
+        if job.preserve_times:
+            attributes = sftp.stat(job.remote_path)
+            os.utime(job.local_path, (attributes.st_atime, attributes.st_mtime))
+
+    def _upload(self, sftp, job: TransferJob) -> None:
+        size = os.path.getsize(job.local_path)
+        job.size = size
+        small = size <= SMALL_FILE_SIZE
+        partial_path = job.remote_path if small else job.remote_path + PARTIAL_SUFFIX
+        self._makedirs_remote(sftp, posixpath.dirname(job.remote_path))
+
+        offset = 0
+        if job.resume and not small:
+            try:
+                offset = sftp.stat(partial_path).st_size
+            except IOError:
+                offset = 0
+            if offset > size:
+                offset = 0
+        job.transferred = job.resumed_from = offset
+
+        with open(job.local_path, "rb") as local, sftp.open(partial_path, "ab" if offset else "wb") as remote:
+            remote.set_pipelined(not small)
+            local.seek(offset)
+            while True:
+                data = local.read(TRANSFER_BLOCK_SIZE)
+                if not data:
+                    break
+                self._throttle(len(data))
+                remote.write(data)
+                job._advance(len(data))
+
+        # Closing a pipelined file waited for every write acknowledgement and raised on errors
+        if not small:
+            try:
+                sftp.posix_rename(partial_path, job.remote_path)
+            except IOError:
+                # Server without the posix-rename extension: plain rename refuses to overwrite
+                try:
+                    sftp.remove(job.remote_path)
+                except IOError:
+                    pass
+                sftp.rename(partial_path, job.remote_path)
+        if job.preserve_times:
+            local_stat = os.stat(job.local_path)
+            sftp.utime(job.remote_path, (local_stat.st_atime, local_stat.st_mtime))
+
+    def _throttle(self, count: int) -> None:
+        if self.bandwidth_limit is not None:
+            self.bandwidth_limit.consume(count)
+
+    def _makedirs_remote(self, sftp, remote_dir: str) -> None:
+        if not remote_dir or remote_dir == "/" or remote_dir in self._remote_dirs:
+            return
+        try:
+            sftp.stat(remote_dir)
+        except IOError:
+            self._makedirs_remote(sftp, posixpath.dirname(remote_dir))
+            try:
+                sftp.mkdir(remote_dir)
+            except IOError:
+                # Another worker may have created it meanwhile
+                sftp.stat(remote_dir)
+        self._remote_dirs.add(remote_dir)
+
+    def _notify(self, job: TransferJob) -> None:
+        if self.on_change:
+            try:
+                self.on_change(job)
+            except Exception as e:
+                self.logger.error(f"Error in transfer callback: {e}")
+
+
+def format_bytes(count: float) -> str:
+    """Human-readable byte count, e.g. ``12.3 MB``."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1000:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1000
+    return f"{count:.1f} TB"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """ETA as ``m:ss`` or ``h:mm:ss``; ``--:--`` when unknown."""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -0,0 +1,468 @@
+import codecs
+import logging
+import select
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import paramiko
+
+from output_sinks import OutputFanout, TerminalSink
+from port_forwarding import ForwardRelay, ForwardSpec, PortForwarder
+from terminal_screen import TerminalScreen
+from transport_pool import TransportPool
+
+
+class ModernSSHClient(paramiko.SSHClient):
+    """A modern SSH client wrapper around paramiko.SSHClient."""
+    
+    def __init__(self):
+        """Initialize the SSH client with auto-add policy."""
+        super().__init__()
+        self.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.channel = None
+        self.logger = logging.getLogger(__name__)
+        self.screen = TerminalScreen()  # VT100/xterm screen model fed by the channel output
+        self.terminal_sink = TerminalSink(self.screen)
+        self.output = OutputFanout([self.terminal_sink])  # Log file and local mirror sinks are added on demand
+        self.pool: Optional[TransportPool] = None  # Set when the transport is shared through a pool
+        self.pool_key = None
+        self.reused_transport = False
+        self.forwarder: Optional[PortForwarder] = None  # Port forwards running over this connection
+        
+    def connect_ssh(self, host: str, username: str, password: str = None, 
+                   key_filename: str = None, port: int = 22) -> bool:
+        """Connect to SSH server with improved error handling."""
+        try:
+            self.connect(
+                hostname=host,
+                username=username,
+                password=password,
+                key_filename=key_filename,
+                port=port,
+                timeout=10
+            )
+            
+            self.channel = self.invoke_shell()
+            self.channel.settimeout(0.1)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"SSH connection failed: {str(e)}")
+            return False
+
+    def connect_pooled(self, pool: TransportPool, hostname: str, username: str,
+                       password: str = None, key_filename: str = None, port: int = 22,
+                       jump_hosts: Optional[List[Dict[str, Any]]] = None, **kwargs) -> bool:
+        """
+        Connect through a transport pool, reusing a live transport to the same host and identity.
+
+        With ``jump_hosts`` the connection is tunnelled through each jump host in
+        turn (like ssh -J). Jump host transports are pooled too, so every target
+        behind a bastion shares one bastion handshake.
+
+        Args:
+            pool (TransportPool): Pool to take the transport from
+            hostname (str): SSH server hostname or IP address
+            username (str): Username for authentication
+            password (str, optional): Password for authentication
+            key_filename (str, optional): Path to private key file
+            port (int, optional): SSH server port. Defaults to 22.
+            jump_hosts (list, optional): Connection parameters of each jump host, first hop
+                first, as returned by jump_host_params()
+            **kwargs: Passed to paramiko's connect() when a new transport is needed
+
+        Returns:
+            bool: True if an existing transport was reused
+        """
+        via = None
+        for hop in jump_hosts or ():
+            # The pool takes over the reference on the previous hop, and releases it if this hop fails
+            via = _acquire_jump_host(pool, hop, via)
+        key = pool.key_for(hostname, port, username, password, key_filename, via=via[0] if via else None)
+
+        def open_transport():
+            sock = None
+            if via is not None:
+                sock = open_tunnel(via[1], hostname, port, kwargs.get("timeout"))
+            self.connect(
+                hostname=hostname,
+                username=username,
+                password=password,
+                key_filename=key_filename,
+                port=port,
+                sock=sock,
+                **kwargs
+            )
+            return self._transport
+
+        transport, reused = pool.acquire(key, open_transport, parent=via)
+        self._transport = transport
+        self.pool = pool
+        self.pool_key = key
+        self.reused_transport = reused
+        return reused
+
+    def stream_command(self, command: str, timeout: Optional[float] = None,
+                       get_pty: bool = False, environment: Optional[Dict[str, str]] = None) -> "CommandStream":
+        """
+        Run a command on a new exec channel without touching the interactive shell.
+
+        Args:
+            command (str): Command line to execute
+            timeout (float, optional): Seconds the command may run before CommandTimeout is raised
+            get_pty (bool): Request a pseudo-terminal for the command
+            environment (dict, optional): Environment variables to pass (the server may ignore them)
+
+        Returns:
+            CommandStream: Streams stdout and stderr and reports the exit status
+        """
+        transport = self.get_transport()
+        if transport is None or not transport.is_active():
+            raise paramiko.SSHException("Not connected")
+
+        channel = transport.open_session(timeout=timeout)
+        try:
+            if get_pty:
+                channel.get_pty()
+            if environment:
+                channel.update_environment(environment)
+            channel.exec_command(command)
+        except Exception:
+            channel.close()
+            raise
+        return CommandStream(channel, command, timeout)
+
+    def run_command(self, command: str, timeout: Optional[float] = None) -> Tuple[int, bytes, bytes]:
+        """
+        Run a command to completion and collect its output.
+
+        Returns:
+            Tuple of exit status, stdout and stderr
+        """
+        with self.stream_command(command, timeout=timeout) as stream:
+            stdout = b"".join(stream.stdout())
+            stderr = b"".join(stream.stderr())
+            return stream.wait(), stdout, stderr
+
+    def start_forwards(self, specs: List[ForwardSpec], relay: ForwardRelay,
+                       label: str = "") -> List[Tuple[ForwardSpec, Exception]]:
+        """
+        Start port forwards over this connection. Remote forwards wait for the
+        server's reply, so call this off the UI thread.
+
+        Args:
+            specs (list): Forwards to start, e.g. from port_forwarding.session_forwards()
+            relay (ForwardRelay): Relay shared by all connections that copies the bytes
+            label (str): Name used in log messages, e.g. the session name
+
+        Returns:
+            List of (spec, error) for the forwards that could not be started
+        """
+        transport = self.get_transport()
+        if transport is None or not transport.is_active():
+            raise paramiko.SSHException("Not connected")
+        if self.forwarder is None:
+            self.forwarder = PortForwarder(transport, relay, label=label)
+
+        failed = []
+        for spec in specs:
+            try:
+                self.forwarder.start(spec)
+            except Exception as e:
+                self.logger.error(f"Could not start forward {spec}: {e}")
+                failed.append((spec, e))
+        return failed
+
+    def _process_terminal_output(self, data: bytes) -> None:
+        """
+        Deliver raw channel output to every attached output sink.
+        
+        Args:
+            data (bytes): Raw output as read from the channel (bytes or memoryview)
+        """
+        try:
+            self.output.write(data)
+        except Exception as e:
+            self.logger.error(f"Error processing terminal output: {e}")
+
+    def close(self):
+        """Close SSH connection and cleanup."""
+        try:
+            if self.channel:
+                self.channel.close()
+            if self.forwarder:
+                self.forwarder.close()
+                self.forwarder = None
+            self.output.close()
+            if self.pool is not None:
+                # Other clients may share the transport; the pool decides when it closes
+                transport, self._transport = self._transport, None
+                self.pool.release(self.pool_key, transport)
+                self.pool = None
+            super().close()
+        except:
+            pass
+
+
+class CommandTimeout(Exception):
+    """Raised when a remote command runs past its timeout."""
+
+
+class CommandStream:
+    """
+    Output and exit status of a command running on an exec channel.
+
+    stdout() and stderr() are generators of raw byte chunks. Data that arrives
+    on one stream while the other is being read is buffered, so they can be
+    consumed one after the other without stalling the channel. lines() yields
+    decoded lines from both streams as they arrive. A stream is meant to be
+    read from a single thread.
+    """
+
+    def __init__(self, channel, command: str, timeout: Optional[float] = None, read_size: int = 32768):
+        self.channel = channel
+        self.command = command
+        self.timeout = timeout
+        self.read_size = read_size
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout else None
+        self._buffers = {"stdout": deque(), "stderr": deque()}
+        self._eof = False
+
+    def __enter__(self) -> "CommandStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the channel, abandoning the command if it is still running."""
+        self.channel.close()
+
+    def _remaining(self) -> Optional[float]:
+        """Seconds left before the deadline; closes the channel and raises once it has passed."""
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            self.close()
+            raise CommandTimeout(f"Command timed out after {self.timeout:g}s: {self.command}")
+        return remaining
+
+    def _pump(self) -> bool:
+        """Wait for output and buffer it. Returns False once the command sent EOF."""
+        channel = self.channel
+        while not self._eof:
+            received = False
+            while channel.recv_ready():
+                data = channel.recv(self.read_size)
+                if not data:
+                    break
+                self._buffers["stdout"].append(data)
+                received = True
+            while channel.recv_stderr_ready():
+                data = channel.recv_stderr(self.read_size)
+                if not data:
+                    break
+                self._buffers["stderr"].append(data)
+                received = True
+            if received:
+                return True
+            if channel.eof_received or channel.closed:
+                self._eof = True
+                break
+            # The channel's fileno becomes readable on stdout, stderr or EOF
+            select.select([channel], [], [], self._remaining())
+        return False
+
+    def _iter(self, name: str):
+        buffer = self._buffers[name]
+        while True:
+            while buffer:
+                yield buffer.popleft()
+            if not self._pump() and not buffer:
+                return
+
+    def stdout(self):
+        """Yield stdout chunks (bytes) until the command closes its output."""
+        return self._iter("stdout")
+
+    def stderr(self):
+        """Yield stderr chunks (bytes) until the command closes its output."""
+        return self._iter("stderr")
+
+    def lines(self, encoding: str = "utf-8"):
+        """Yield ``(stream_name, line)`` pairs from stdout and stderr in arrival order."""
+        decoders = {name: codecs.getincrementaldecoder(encoding)(errors="replace") for name in self._buffers}
+        partial = {name: "" for name in self._buffers}
+        while True:
+            more = self._pump()
+            for name, buffer in self._buffers.items():
+                while buffer:
+                    text = partial[name] + decoders[name].decode(buffer.popleft())
+                    *complete, partial[name] = text.split("\n")
+                    for line in complete:
+                        yield name, line.rstrip("\r")
+            if not more:
+                break
+        for name in self._buffers:
+            tail = partial[name] + decoders[name].decode(b"", final=True)
+            if tail:
+                yield name, tail
+
+    def wait(self) -> int:
+        """
+        Wait for the command to exit, buffering any unread output.
+
+        Returns:
+            int: Exit status, or -1 if the server did not report one
+        """
+        while self._pump():
+            pass
+        # The status event is also set when the channel closes without a status
+        while not self.channel.status_event.wait(self._remaining()):
+            pass
+        return self.channel.exit_status
+
+    @property
+    def exit_status(self) -> int:
+        return self.wait()
+
+
+def open_tunnel(transport: paramiko.Transport, host: str, port: int,
+                timeout: Optional[float] = None) -> paramiko.Channel:
+    """Open a direct-tcpip channel to host:port through an authenticated transport, for use as a socket."""
+    try:
+        return transport.open_channel("direct-tcpip", (host, int(port)), ("127.0.0.1", 0), timeout=timeout)
+    except paramiko.ChannelException as e:
+        raise paramiko.SSHException(f"Jump host could not connect to {host}:{port}: {e}") from e
+
+
+def _acquire_jump_host(pool: TransportPool, hop: Dict[str, Any], via) -> Tuple[Any, paramiko.Transport]:
+    """Acquire a pooled transport to one jump host, tunnelled through ``via`` if given. Returns (key, transport)."""
+    key = pool.key_for(hop["host"], hop["port"], hop["username"], hop["password"], hop["key_file"],
+                       via=via[0] if via else None)
+
+    def open_transport():
+        sock = None
+        if via is not None:
+            sock = open_tunnel(via[1], hop["host"], hop["port"], hop["connect_timeout"])
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=hop["host"],
+            username=hop["username"],
+            password=hop["password"],
+            key_filename=hop["key_file"],
+            port=hop["port"],
+            sock=sock,
+            timeout=hop["connect_timeout"],
+            banner_timeout=hop["connect_timeout"],
+            auth_timeout=hop["auth_timeout"]
+        )
+        return client.get_transport()
+
+    transport, _ = pool.acquire(key, open_transport, parent=via)
+    return key, transport
+
+
+def parse_jump_host(entry: str) -> Tuple[Optional[str], str, int]:
+    """
+    Parse one ``[user@]host[:port]`` hop; IPv6 addresses go in brackets.
+
+    Returns:
+        Tuple of username (None if not given), host and port
+    """
+    username, _, address = entry.strip().rpartition("@")
+    if address.startswith("["):
+        host, bracket, rest = address[1:].partition("]")
+        if not bracket or (rest and not rest.startswith(":")):
+            host = ""
+        port = rest[1:]
+    elif address.count(":") == 1:
+        host, port = address.split(":")
+    else:
+        host, port = address, ""
+    if not host or (port and not port.isdigit()):
+        raise ValueError(f"Invalid jump host '{entry}': expected [user@]host[:port]")
+    return username or None, host, int(port or 22)
+
+
+def parse_timeout(text: str, name: str) -> Optional[float]:
+    """
+    Parse a timeout field in seconds.
+
+    Returns:
+        The timeout, or None for an empty field (use the default)
+
+    Raises:
+        ValueError: If the value is not a number greater than 0
+    """
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        seconds = float(text)
+    except ValueError:
+        seconds = 0.0
+    # "nan" and "inf" parse as floats but are no use as a socket timeout
+    if not 0 < seconds < float("inf"):
+        raise ValueError(f"Invalid {name} timeout '{text}': expected a number of seconds greater than 0")
+    return seconds
+
+
+def jump_host_params(session: Dict[str, Any], sessions: Dict[str, Dict[str, Any]],
+                     build_params: Callable[[Dict[str, Any]], Dict[str, Any]],
+                     _seen: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+    """
+    Resolve a session's ``proxy_jump`` chain into connection parameters for each hop.
+
+    ``proxy_jump`` is a comma-separated string or a list, first hop first. A hop
+    naming a saved session uses that session's credentials, and its own
+    proxy_jump comes before it. Any other hop is ``[user@]host[:port]`` and logs
+    in as the session's user (unless given) with the SSH agent or default keys.
+
+    Args:
+        session (dict): Session record being connected
+        sessions (dict): All saved sessions, to resolve hops by name
+        build_params: Turns a session record into connection parameters (see connection_params())
+
+    Returns:
+        List of connection parameter dicts, empty for a direct connection
+
+    Raises:
+        ValueError: If a hop is malformed or the chain loops back on itself
+    """
+    chain = session.get("proxy_jump") or []
+    if isinstance(chain, str):
+        chain = chain.split(",")
+
+    hops = []
+    for entry in (str(entry).strip() for entry in chain):
+        if not entry:
+            continue
+        if entry in sessions:
+            if entry in _seen:
+                raise ValueError(f"Jump host chain loops back to '{entry}'")
+            hops += jump_host_params(sessions[entry], sessions, build_params, _seen + (entry,))
+            hops.append(build_params(sessions[entry]))
+            continue
+        username, host, port = parse_jump_host(entry)
+        hop = dict(build_params(session))
+        hop.update(host=host, port=port, username=username or hop["username"], password=None, key_file=None)
+        hops.append(hop)
+    return hops
+
+
+def connection_params(session: Dict[str, Any], preferences: Dict[str, Any]) -> Dict[str, Any]:
+    """Build connection parameters from a session record, applying the default timeouts from preferences."""
+    return {
+        "host": session.get('host'),
+        "username": session.get('username'),
+        "password": session.get('password') or None,
+        "key_file": session.get('ssh_key_path') or session.get('key_file') or None,
+        "port": int(session.get('port') or 22),
+        "connect_timeout": float(session.get('connect_timeout') or preferences.get("connect_timeout", 10)),
+        "auth_timeout": float(session.get('auth_timeout') or preferences.get("auth_timeout", 30))
+    }
@@ -0,0 +1,603 @@
+import re
+import threading
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# One token per match: a run of printable text, a complete escape sequence or a single control character
+_TOKEN = re.compile(
+    r"(?P<text>[^\x00-\x1f\x7f]+)"
+    r"|\x1b\[(?P<csi_params>[0-?]*)(?P<csi_inter>[ -/]*)(?P<csi_final>[@-~])"
+    r"|\x1b\](?P<osc>[^\x07\x1b]*)(?:\x07|\x1b\\)"
+    r"|\x1b[P_^X][^\x1b]*\x1b\\"
+    r"|\x1b(?P<esc_inter>[ -/]*)(?P<esc_final>[0-OQ-WYZ\\`-~])"
+    r"|(?P<ctrl>[\x00-\x1f\x7f])"
+)
+
+# SGR (colour/attribute) sequences; attributes are not rendered, so they are removed in one C-level pass
+_SGR = re.compile(r"\x1b\[[0-9;:]*m")
+
+# A trailing escape sequence that was cut off at a read boundary
+_INCOMPLETE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?|[P_^X][^\x1b]*\x1b?|[ -/]*)?\Z")
+
+# Longest partial sequence carried over to the next feed. A longer control sequence is treated
+# as garbage; a longer string sequence (OSC, DCS, ...) is cut to this length and the rest skipped
+_MAX_PENDING = 4096
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """Terminal cells taken by a character: 2 for wide (CJK, emoji), 0 for combining marks, else 1."""
+    if unicodedata.combining(char) or unicodedata.category(char) in ("Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+@lru_cache(maxsize=1024)
+def _parse_params(raw_params: str) -> Tuple[str, Tuple[int, ...]]:
+    """Split CSI parameters into a private-mode marker and integers (missing values are 0)."""
+    private = ""
+    if raw_params and raw_params[0] in "<=>?":
+        private, raw_params = raw_params[0], raw_params[1:]
+    params = []
+    for value in raw_params.split(";") if raw_params else ():
+        try:
+            params.append(int(value.split(":")[0] or 0))
+        except ValueError:
+            params.append(0)
+    return private, tuple(params)
+
+
+class ScreenUpdate(NamedTuple):
+    """Changes accumulated since the last call to TerminalScreen.take_updates()."""
+
+    scrolled_lines: List[str]
+    dirty_rows: Dict[int, str]
+    rows: int
+
+
+class TerminalScreen:
+    """
+    Incremental VT100/xterm terminal emulator.
+
+    Output is parsed once, token by token, into a grid of ``rows`` x ``columns``
+    cells plus a bounded scrollback. Escape sequences cut off at a read boundary
+    are kept until the rest arrives. Renderers call ``take_updates()`` to get the
+    lines that scrolled off the top and the rows that changed since the last call,
+    so only dirty regions need to be redrawn.
+
+    Wide characters take two cells: the second holds "" so that a row still
+    joins into the text shown. Combining marks are added to the previous cell.
+    String sequences (OSC, DCS, ...) longer than 4096 characters are cut to
+    that length; the rest is skipped up to the terminator.
+
+    Text attributes (colours, bold, ...) are parsed and ignored.
+    """
+
+    def __init__(self, columns: int = 80, rows: int = 24, scrollback_lines: int = 1000):
+        self.columns = max(1, columns)
+        self.rows = max(1, rows)
+        self.scrollback: Deque[str] = deque(maxlen=scrollback_lines)
+        self.title = ""
+        self._lock = threading.Lock()
+        self._pending = ""
+        self._long_string = ""        # Start of a string sequence too long to keep whole
+        self._long_string_esc = False  # Its last read ended in ESC, maybe half of the terminator
+        self._scrolled_out: Deque[str] = deque(maxlen=scrollback_lines)
+        self._csi_handlers = {
+            "A": self._csi_cursor_up,
+            "B": self._csi_cursor_down,
+            "e": self._csi_cursor_down,
+            "C": self._csi_cursor_forward,
+            "a": self._csi_cursor_forward,
+            "D": self._csi_cursor_back,
+            "E": self._csi_next_line,
+            "F": self._csi_previous_line,
+            "G": self._csi_column,
+            "`": self._csi_column,
+            "H": self._csi_position,
+            "f": self._csi_position,
+            "d": self._csi_row,
+            "J": self._csi_erase_display,
+            "K": self._csi_erase_line,
+            "L": self._csi_insert_lines,
+            "M": self._csi_delete_lines,
+            "@": self._csi_insert_chars,
+            "P": self._csi_delete_chars,
+            "X": self._csi_erase_chars,
+            "S": self._csi_scroll_up,
+            "T": self._csi_scroll_down,
+            "r": self._csi_scroll_region,
+            "s": self._csi_save_cursor,
+            "u": self._csi_restore_cursor,
+            "h": self._csi_set_mode,
+            "l": self._csi_reset_mode,
+        }
+        self._reset()
+
+    def _reset(self) -> None:
+        """Return to the power-on state, keeping the scrollback."""
+        self.lines: List[List[str]] = [[" "] * self.columns for _ in range(self.rows)]
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.scroll_top = 0
+        self.scroll_bottom = self.rows - 1
+        self.autowrap = True
+        self._wrap_pending = False
+        self._saved_cursor = (0, 0)
+        self._alternate: Optional[tuple] = None
+        self._dirty: Set[int] = set(range(self.rows))
+
+    # ------------------------------------------------------------------ public API
+
+    def feed(self, data: str) -> None:
+        """Parse a chunk of terminal output and apply it to the screen."""
+        with self._lock:
+            if self._long_string:
+                data = self._skip_long_string(data)
+                if data is None:
+                    return
+            if self._pending:
+                data = self._pending + data
+                self._pending = ""
+            if "\x1b[" in data:
+                data = _SGR.sub("", data)
+
+            match = _TOKEN.match
+            pos = 0
+            end = len(data)
+            while pos < end:
+                token = match(data, pos)
+                kind = token.lastgroup
+                if kind == "text":
+                    self._write_text(token.group(kind))
+                elif kind == "csi_final":
+                    final = token.group(kind)
+                    if final != "m":  # Private SGR variants that survived the bulk removal
+                        self._dispatch_csi(token.group("csi_params"), token.group("csi_inter"), final)
+                elif kind == "ctrl":
+                    char = token.group(kind)
+                    if char == "\x1b" and _INCOMPLETE.match(data, pos):
+                        # Sequence split across reads; finish it on the next feed
+                        if end - pos <= _MAX_PENDING:
+                            self._pending = data[pos:]
+                        elif data[pos + 1:pos + 2] in ("]", "P", "_", "^", "X"):
+                            # Keep the start of a long OSC/DCS string, skip the rest up to its terminator
+                            self._long_string = data[pos:pos + _MAX_PENDING]
+                            self._long_string_esc = data.endswith("\x1b")
+                        break
+                    self._control(char)
+                elif kind == "esc_final":
+                    self._escape(token.group("esc_inter"), token.group("esc_final"))
+                elif kind == "osc":
+                    self._osc(token.group("osc"))
+                pos = token.end()
+
+    def _skip_long_string(self, data: str) -> Optional[str]:
+        """
+        Drop data up to the terminator of a long string sequence.
+
+        Returns:
+            The kept start of the sequence, terminated, followed by the data
+            after it; None if the terminator has not arrived yet
+        """
+        osc = self._long_string[1] == "]"
+        probe = ("\x1b" if self._long_string_esc else "") + data
+        ends = [(probe.find("\x1b\\"), 2)]
+        if osc:
+            ends.append((probe.find("\x07"), 1))
+        ends = [(index, length) for index, length in ends if index >= 0]
+        if not ends:
+            self._long_string_esc = probe.endswith("\x1b")
+            return None
+        index, length = min(ends)
+        start, self._long_string = self._long_string, ""
+        return start + ("\x07" if osc else "\x1b\\") + probe[index + length:]
+
+    def take_updates(self, full: bool = False) -> Optional[ScreenUpdate]:
+        """
+        Collect the lines scrolled into the scrollback and the rows changed since the last call.
+
+        Args:
+            full (bool): Return every row, not only the dirty ones
+
+        Returns:
+            ScreenUpdate or None if nothing changed
+        """
+        with self._lock:
+            if full:
+                self._dirty = set(range(self.rows))
+            if not self._dirty and not self._scrolled_out:
+                return None
+            dirty_rows = {row: "".join(self.lines[row]).rstrip() for row in sorted(self._dirty)}
+            scrolled_lines = list(self._scrolled_out)
+            self._scrolled_out.clear()
+            self._dirty = set()
+            return ScreenUpdate(scrolled_lines, dirty_rows, self.rows)
+
+    def resize(self, columns: int, rows: int) -> None:
+        """Change the screen size, pushing rows that no longer fit into the scrollback."""
+        columns = max(1, columns)
+        rows = max(1, rows)
+        with self._lock:
+            if columns == self.columns and rows == self.rows:
+                return
+
+            if rows < self.rows:
+                # Keep the cursor row visible: drop from the top only as far as needed
+                from_top = max(0, self.cursor_y - (rows - 1))
+                for _ in range(from_top):
+                    line = self.lines.pop(0)
+                    if self._alternate is None:
+                        self._record_scrolled(line)
+                del self.lines[rows:]
+                self.cursor_y -= from_top
+            else:
+                self.lines.extend([" "] * self.columns for _ in range(rows - self.rows))
+
+            if columns != self.columns:
+                for line in self.lines:
+                    if columns < self.columns:
+                        del line[columns:]
+                    else:
+                        line.extend(" " * (columns - self.columns))
+
+            if self._alternate is not None:
+                saved_lines, saved_x, saved_y = self._alternate
+                saved_lines = [(line + [" "] * columns)[:columns] for line in saved_lines[-rows:]]
+                saved_lines.extend([" "] * columns for _ in range(rows - len(saved_lines)))
+                self._alternate = (saved_lines, min(saved_x, columns - 1), min(saved_y, rows - 1))
+
+            self.columns = columns
+            self.rows = rows
+            self.cursor_x = min(self.cursor_x, columns - 1)
+            self.cursor_y = min(self.cursor_y, rows - 1)
+            self.scroll_top = 0
+            self.scroll_bottom = rows - 1
+            self._wrap_pending = False
+            self._dirty = set(range(rows))
+
+    def display(self) -> List[str]:
+        """Return the visible rows as strings with trailing blanks removed."""
+        with self._lock:
+            return ["".join(line).rstrip() for line in self.lines]
+
+    @property
+    def alternate_screen(self) -> bool:
+        """True while a full-screen program has switched to the alternate buffer."""
+        return self._alternate is not None
+
+    # ------------------------------------------------------------------ text and controls
+
+    def _write_text(self, text: str) -> None:
+        if not text.isascii() and any(char_width(char) != 1 for char in text):
+            self._write_wide_text(text)
+            return
+        columns = self.columns
+        while text:
+            if self._wrap_pending:
+                self._wrap_pending = False
+                if self.autowrap:
+                    self.cursor_x = 0
+                    self._line_feed()
+            line = self.lines[self.cursor_y]
+            x = self.cursor_x
+            chunk = text[:columns - x]
+            width = len(chunk)
+            if line[x] == "" and x:
+                line[x - 1] = " "  # Overwriting the right half of a wide character
+            line[x:x + width] = chunk
+            if x + width < columns and line[x + width] == "":
+                line[x + width] = " "  # ... or its left half
+            self._dirty.add(self.cursor_y)
+            text = text[width:]
+            if x + width >= columns:
+                self.cursor_x = columns - 1
+                if self.autowrap:
+                    self._wrap_pending = True
+                elif text:
+                    # Without autowrap the rest of the run overwrites the last column
+                    line[-1] = text[-1]
+                    text = ""
+            else:
+                self.cursor_x = x + width
+
+    def _write_wide_text(self, text: str) -> None:
+        """Write text containing wide characters or combining marks, one character at a time."""
+        columns = self.columns
+        for char in text:
+            width = char_width(char)
+            if width == 0:
+                # Combining mark: joins the character written last
+                x = self.cursor_x if self._wrap_pending else self.cursor_x - 1
+                line = self.lines[self.cursor_y]
+                if x >= 0:
+                    if line[x] == "" and x:
+                        x -= 1
+                    line[x] += char
+                    self._dirty.add(self.cursor_y)
+                continue
+            if self._wrap_pending:
+                self._wrap_pending = False
+                if self.autowrap:
+                    self.cursor_x = 0
+                    self._line_feed()
+            if width == 2 and self.cursor_x == columns - 1:
+                # A wide character that does not fit in the last column goes to the next line
+                if not self.autowrap or columns < 2:
+                    continue
+                self._blank(self.cursor_y, self.cursor_x, columns)
+                self.cursor_x = 0
+                self._line_feed()
+            line = self.lines[self.cursor_y]
+            x = self.cursor_x
+            if line[x] == "" and x:
+                line[x - 1] = " "
+            line[x] = char
+            if width == 2:
+                line[x + 1] = ""
+            if x + width < columns and line[x + width] == "":
+                line[x + width] = " "
+            self._dirty.add(self.cursor_y)
+            if x + width >= columns:
+                self.cursor_x = columns - 1
+                self._wrap_pending = self.autowrap
+            else:
+                self.cursor_x = x + width
+
+    def _control(self, char: str) -> None:
+        if char == "\r":
+            self.cursor_x = 0
+            self._wrap_pending = False
+        elif char in "\n\x0b\x0c":
+            self._line_feed()
+        elif char == "\b":
+            if self.cursor_x > 0:
+                self.cursor_x -= 1
+            self._wrap_pending = False
+        elif char == "\t":
+            self.cursor_x = min(self.columns - 1, (self.cursor_x // 8 + 1) * 8)
+        # BEL, SO/SI and the remaining C0 controls have no effect on the grid
+
+    def _line_feed(self) -> None:
+        self._wrap_pending = False
+        if self.cursor_y == self.scroll_bottom:
+            self._scroll_up(1)
+        elif self.cursor_y < self.rows - 1:
+            self.cursor_y += 1
+
+    def _reverse_index(self) -> None:
+        self._wrap_pending = False
+        if self.cursor_y == self.scroll_top:
+            self._scroll_down(1)
+        elif self.cursor_y > 0:
+            self.cursor_y -= 1
+
+    def _scroll_up(self, count: int, top: Optional[int] = None) -> None:
+        """Scroll the region [top, scroll_bottom] up, recording lines that leave the real top."""
+        top = self.scroll_top if top is None else top
+        bottom = self.scroll_bottom
+        count = min(count, bottom - top + 1)
+        keep = top == 0 and self._alternate is None
+        for _ in range(count):
+            line = self.lines.pop(top)
+            if keep:
+                self._record_scrolled(line)
+            self.lines.insert(bottom, [" "] * self.columns)
+        self._dirty.update(range(top, bottom + 1))
+
+    def _scroll_down(self, count: int, top: Optional[int] = None) -> None:
+        top = self.scroll_top if top is None else top
+        bottom = self.scroll_bottom
+        count = min(count, bottom - top + 1)
+        for _ in range(count):
+            del self.lines[bottom]
+            self.lines.insert(top, [" "] * self.columns)
+        self._dirty.update(range(top, bottom + 1))
+
+    def _record_scrolled(self, line: List[str]) -> None:
+        text = "".join(line).rstrip()
+        self.scrollback.append(text)
+        self._scrolled_out.append(text)
+
+    def _blank(self, row: int, start: int, stop: int) -> None:
+        line = self.lines[row]
+        start = max(0, start)
+        stop = min(self.columns, stop)
+        if start < stop:
+            line[start:stop] = " " * (stop - start)
+            self._dirty.add(row)
+
+    # ------------------------------------------------------------------ escape sequences
+
+    def _escape(self, intermediate: str, final: str) -> None:
+        if intermediate:
+            return  # Character set designation, DECALN and friends
+        if final == "7":
+            self._saved_cursor = (self.cursor_x, self.cursor_y)
+        elif final == "8":
+            self._csi_restore_cursor((), "")
+        elif final == "D":
+            self._line_feed()
+        elif final == "E":
+            self.cursor_x = 0
+            self._line_feed()
+        elif final == "M":
+            self._reverse_index()
+        elif final == "c":
+            self._reset()
+
+    def _osc(self, payload: str) -> None:
+        command, _, value = payload.partition(";")
+        if command in ("0", "2"):
+            self.title = value
+
+    def _dispatch_csi(self, raw_params: str, intermediate: str, final: str) -> None:
+        if intermediate:
+            return  # e.g. DECSCUSR cursor style
+        handler = self._csi_handlers.get(final)
+        if handler is None:
+            return  # Device reports and other sequences without a visible effect
+        private, params = _parse_params(raw_params)
+        handler(params, private)
+
+    @staticmethod
+    def _param(params: Tuple[int, ...], index: int = 0, default: int = 1) -> int:
+        if index < len(params) and params[index]:
+            return params[index]
+        return default
+
+    def _move_to(self, x: int, y: int) -> None:
+        self.cursor_x = min(max(x, 0), self.columns - 1)
+        self.cursor_y = min(max(y, 0), self.rows - 1)
+        self._wrap_pending = False
+
+    def _csi_cursor_up(self, params, private):
+        top = self.scroll_top if self.cursor_y >= self.scroll_top else 0
+        self._move_to(self.cursor_x, max(top, self.cursor_y - self._param(params)))
+
+    def _csi_cursor_down(self, params, private):
+        bottom = self.scroll_bottom if self.cursor_y <= self.scroll_bottom else self.rows - 1
+        self._move_to(self.cursor_x, min(bottom, self.cursor_y + self._param(params)))
+
+    def _csi_cursor_forward(self, params, private):
+        self._move_to(self.cursor_x + self._param(params), self.cursor_y)
+
+    def _csi_cursor_back(self, params, private):
+        self._move_to(self.cursor_x - self._param(params), self.cursor_y)
+
+    def _csi_next_line(self, params, private):
+        self._move_to(0, self.cursor_y + self._param(params))
+
+    def _csi_previous_line(self, params, private):
+        self._move_to(0, self.cursor_y - self._param(params))
+
+    def _csi_column(self, params, private):
+        self._move_to(self._param(params) - 1, self.cursor_y)
+
+    def _csi_row(self, params, private):
+        self._move_to(self.cursor_x, self._param(params) - 1)
+
+    def _csi_position(self, params, private):
+        self._move_to(self._param(params, 1) - 1, self._param(params, 0) - 1)
+
+    def _csi_erase_display(self, params, private):
+        mode = self._param(params, default=0)
+        if mode == 0:
+            self._blank(self.cursor_y, self.cursor_x, self.columns)
+            for row in range(self.cursor_y + 1, self.rows):
+                self._blank(row, 0, self.columns)
+        elif mode == 1:
+            for row in range(self.cursor_y):
+                self._blank(row, 0, self.columns)
+            self._blank(self.cursor_y, 0, self.cursor_x + 1)
+        elif mode in (2, 3):
+            for row in range(self.rows):
+                self._blank(row, 0, self.columns)
+            if mode == 3:
+                self.scrollback.clear()
+
+    def _csi_erase_line(self, params, private):
+        mode = self._param(params, default=0)
+        if mode == 0:
+            self._blank(self.cursor_y, self.cursor_x, self.columns)
+        elif mode == 1:
+            self._blank(self.cursor_y, 0, self.cursor_x + 1)
+        elif mode == 2:
+            self._blank(self.cursor_y, 0, self.columns)
+
+    def _csi_insert_lines(self, params, private):
+        if self.scroll_top <= self.cursor_y <= self.scroll_bottom:
+            self._scroll_down(self._param(params), top=self.cursor_y)
+            self.cursor_x = 0
+
+    def _csi_delete_lines(self, params, private):
+        if self.scroll_top <= self.cursor_y <= self.scroll_bottom:
+            count = min(self._param(params), self.scroll_bottom - self.cursor_y + 1)
+            for _ in range(count):
+                del self.lines[self.cursor_y]
+                self.lines.insert(self.scroll_bottom, [" "] * self.columns)
+            self._dirty.update(range(self.cursor_y, self.scroll_bottom + 1))
+            self.cursor_x = 0
+
+    def _csi_insert_chars(self, params, private):
+        line = self.lines[self.cursor_y]
+        count = min(self._param(params), self.columns - self.cursor_x)
+        line[self.cursor_x:self.cursor_x] = " " * count
+        del line[self.columns:]
+        self._dirty.add(self.cursor_y)
+
+    def _csi_delete_chars(self, params, private):
+        line = self.lines[self.cursor_y]
+        count = min(self._param(params), self.columns - self.cursor_x)
+        del line[self.cursor_x:self.cursor_x + count]
+        line.extend(" " * count)
+        self._dirty.add(self.cursor_y)
+
+    def _csi_erase_chars(self, params, private):
+        self._blank(self.cursor_y, self.cursor_x, self.cursor_x + self._param(params))
+
+    def _csi_scroll_up(self, params, private):
+        self._scroll_up(self._param(params))
+
+    def _csi_scroll_down(self, params, private):
+        self._scroll_down(self._param(params))
+
+    def _csi_scroll_region(self, params, private):
+        if private:
+            return
+        top = self._param(params, 0) - 1
+        bottom = self._param(params, 1, self.rows) - 1
+        if 0 <= top < bottom < self.rows:
+            self.scroll_top = top
+            self.scroll_bottom = bottom
+            self._move_to(0, 0)
+
+    def _csi_save_cursor(self, params, private):
+        if not params and not private:
+            self._saved_cursor = (self.cursor_x, self.cursor_y)
+
+    def _csi_restore_cursor(self, params, private):
+        if not params and not private:
+            x, y = self._saved_cursor
+            self._move_to(x, y)
+
+    def _csi_set_mode(self, params, private):
+        if private != "?":
+            return
+        for mode in params:
+            if mode == 7:
+                self.autowrap = True
+            elif mode in (47, 1047, 1049):
+                if mode == 1049:
+                    self._saved_cursor = (self.cursor_x, self.cursor_y)
+                self._enter_alternate_screen()
+
+    def _csi_reset_mode(self, params, private):
+        if private != "?":
+            return
+        for mode in params:
+            if mode == 7:
+                self.autowrap = False
+            elif mode in (47, 1047, 1049):
+                self._leave_alternate_screen()
+                if mode == 1049:
+                    self._csi_restore_cursor((), "")
+
+    def _enter_alternate_screen(self) -> None:
+        if self._alternate is not None:
+            return
+        self._alternate = (self.lines, self.cursor_x, self.cursor_y)
+        self.lines = [[" "] * self.columns for _ in range(self.rows)]
+        self._dirty = set(range(self.rows))
+
+    def _leave_alternate_screen(self) -> None:
+        if self._alternate is None:
+            return
+        self.lines, self.cursor_x, self.cursor_y = self._alternate
+        self._alternate = None
+        self.scroll_top = 0
+        self.scroll_bottom = self.rows - 1
+        self._wrap_pending = False
+        self._dirty = set(range(self.rows))
@@ -0,0 +1,171 @@
+import socket
+import threading
+import unittest
+
+from broadcast import Broadcast, fold_names, format_report, natural_key
+
+
+class FakeChannel:
+    """Exec channel backed by a socket pair; the test plays the server on ``peer``."""
+
+    def __init__(self, script=None):
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        self.script = script
+        self.command = None
+        self.combine_stderr = False
+        self.closed = False
+        self.eof_received = False
+        self.exit_status = -1
+        self.status_event = threading.Event()
+        self._buffer = b""
+
+    def set_combine_stderr(self, combine):
+        self.combine_stderr = combine
+
+    def exec_command(self, command):
+        self.command = command
+        if self.script is not None:
+            self.script(self)
+
+    def finish(self, stdout=b"", stderr=b"", status=0):
+        """Send the command's output and exit status, then close the server side."""
+        self.peer.sendall(stdout + (stderr if self.combine_stderr else b""))
+        self.exit_status = status
+        self.status_event.set()
+        self.peer.close()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def recv_ready(self):
+        if not self._buffer and not self.eof_received:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                return False
+            except OSError:
+                data = b""
+            self._buffer = data
+            self.eof_received = not data
+        return bool(self._buffer)
+
+    def recv(self, size):
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def exit_status_ready(self):
+        return self.status_event.is_set()
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+        self.peer.close()
+
+
+class FakeTransport:
+    def __init__(self, script=None, error=None):
+        self.script = script
+        self.error = error
+        self.channels = []
+
+    def open_session(self, timeout=None):
+        if self.error is not None:
+            raise self.error
+        self.channels.append(FakeChannel(self.script))
+        return self.channels[-1]
+
+
+def run(transports, timeout=10.0, cancel=False):
+    done = threading.Event()
+    broadcast = Broadcast("uptime", transports, timeout=timeout, on_complete=lambda b: done.set())
+    broadcast.start()
+    if cancel:
+        broadcast.cancel()
+    if not done.wait(10):
+        raise AssertionError("broadcast did not complete")
+    return broadcast
+
+
+class FoldNamesTest(unittest.TestCase):
+    def test_trailing_numbers_fold_into_ranges(self):
+        self.assertEqual(fold_names(["web1", "web2", "web3", "web7", "db"]), "db,web[1-3,7]")
+
+    def test_single_and_repeated_names(self):
+        self.assertEqual(fold_names([]), "")
+        self.assertEqual(fold_names(["web10"]), "web10")
+        self.assertEqual(fold_names(["web2", "web1", "web2"]), "web[1-2]")
+
+    def test_zero_padding_is_kept(self):
+        self.assertEqual(fold_names(["node01", "node02", "node03"]), "node[01-03]")
+        # Unpadded numbers of the same width join the padded group; shorter ones do not
+        self.assertEqual(fold_names(["n01", "n02", "n3", "n10", "n11"]), "n3,n[01-02,10-11]")
+
+    def test_prefixes_fold_separately(self):
+        self.assertEqual(fold_names(["10.0.0.1", "10.0.0.2", "10.0.1.1"]), "10.0.0.[1-2],10.0.1.1")
+
+    def test_natural_key(self):
+        self.assertEqual(sorted(["web10", "web2", "db1"], key=natural_key), ["db1", "web2", "web10"])
+
+
+
+class BroadcastTest(unittest.TestCase):
+    def test_results_are_collected_per_host(self):
+        transports = {
+            "web1": FakeTransport(lambda channel: channel.finish(b"up 3 days\n")),
+            "web2": FakeTransport(lambda channel: channel.finish(b"up 3 days\n")),
+            "db1": FakeTransport(lambda channel: channel.finish(b"", b"load too high\n", status=2)),
+        }
+        broadcast = run(transports)
+        self.assertTrue(broadcast.done)
+        results = broadcast.results
+        self.assertEqual(transports["web1"].channels[0].command, "uptime")
+        self.assertEqual((results["web1"].output, results["web1"].exit_status, results["web1"].ok),
+                         ("up 3 days\n", 0, True))
+        # stderr arrives with the output; the exit status is kept apart from both
+        self.assertTrue(transports["db1"].channels[0].combine_stderr)
+        self.assertEqual((results["db1"].output, results["db1"].exit_status, results["db1"].ok),
+                         ("load too high\n", 2, False))
+        self.assertEqual(results["db1"].status_text(), "exit 2")
+        self.assertTrue(all(channel.closed for t in transports.values() for channel in t.channels))
+
+    def test_failed_open_is_reported(self):
+        broadcast = run({"web1": FakeTransport(error=OSError("channel refused"))})
+        result = broadcast.results["web1"]
+        self.assertEqual(result.error, "Error: channel refused")
+        self.assertFalse(result.ok)
+
+    def test_timeout_abandons_unfinished_hosts(self):
+        transports = {"fast": FakeTransport(lambda channel: channel.finish(b"ok\n")), "hung": FakeTransport()}
+        broadcast = run(transports, timeout=0.3)
+        self.assertTrue(broadcast.results["fast"].ok)
+        self.assertEqual(broadcast.results["hung"].error, "Timed out after 0.3s")
+        self.assertTrue(transports["hung"].channels[0].closed)
+
+    def test_cancel(self):
+        broadcast = run({"hung": FakeTransport()}, cancel=True)
+        self.assertEqual(broadcast.results["hung"].error, "Cancelled")
+
+    def test_no_sessions_completes_at_once(self):
+        self.assertTrue(run({}).done)
+
+    def test_report_groups_identical_output(self):
+        transports = {
+            "web1": FakeTransport(lambda channel: channel.finish(b"same\n")),
+            "web2": FakeTransport(lambda channel: channel.finish(b"same\n")),
+            "db1": FakeTransport(lambda channel: channel.finish(b"other\n", status=1)),
+            "down": FakeTransport(error=OSError("refused")),
+        }
+        report = format_report(run(transports))
+        lines = report.splitlines()
+        self.assertEqual(lines[0], "$ uptime")
+        self.assertTrue(lines[1].startswith("4 hosts: 2 succeeded, 1 non-zero exit, 1 failed in "))
+        self.assertIn("web[1-2] (2)\n" + "-" * 12 + "\nsame\n", report)
+        self.assertIn("db1 (1)\n" + "-" * 7 + "\nother\n", report)
+        self.assertNotIn("down (1)", report)
+        self.assertIn("  exit 0: web[1-2]", lines)
+        self.assertIn("  Error: refused: down", lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
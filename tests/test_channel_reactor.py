@@ -0,0 +1,159 @@
+import socket
+import threading
+import time
+import unittest
+
+from channel_reactor import ChannelReactor
+
+
+class FakeChannel:
+    """Channel backed by a socket pair; the test plays the server on ``peer``."""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        self.closed = False
+        self.eof_received = False
+        self.status_ready = False
+        self._buffer = b""
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def recv_ready(self):
+        if not self._buffer and not self.eof_received:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                return False
+            if data == b"\0" and self.status_ready:
+                return False  # Only the exit status arrived
+            self._buffer = data
+            self.eof_received = not data
+        return bool(self._buffer)
+
+    def recv(self, size):
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def send_exit_status(self):
+        """Make the channel readable with no data pending, as an exit status does."""
+        self.status_ready = True
+        self.peer.sendall(b"\0")
+
+    def exit_status_ready(self):
+        return self.status_ready
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+        self.peer.close()
+
+
+class Recorder:
+    def __init__(self):
+        self.data = []
+        self.closed = []
+        self.received = threading.Event()
+        self.closed_event = threading.Event()
+
+    def on_data(self, name, data):
+        self.data.append((name, bytes(data)))
+        self.received.set()
+
+    def on_close(self, name):
+        self.closed.append(name)
+        self.closed_event.set()
+
+    def output(self, name):
+        return b"".join(data for key, data in self.data if key == name)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met")
+        time.sleep(0.01)
+
+
+class ChannelReactorTest(unittest.TestCase):
+    def setUp(self):
+        self.reactor = ChannelReactor(read_size=4)
+        self.reactor.start()
+        self.recorder = Recorder()
+        self.channels = []
+
+    def tearDown(self):
+        self.reactor.stop()
+        for channel in self.channels:
+            channel.close()
+
+    def register(self, name):
+        channel = FakeChannel()
+        self.channels.append(channel)
+        self.reactor.register(name, channel, self.recorder.on_data, self.recorder.on_close)
+        return channel
+
+    def test_output_is_dispatched_per_session(self):
+        web, db = self.register("web"), self.register("db")
+        self.assertEqual(len(self.reactor), 2)
+        web.peer.sendall(b"hello web")
+        db.peer.sendall(b"hi db")
+        wait_for(lambda: self.recorder.output("web") == b"hello web" and self.recorder.output("db") == b"hi db")
+        # Reads of read_size bytes from one wakeup are handed over together
+        self.assertIn(("web", b"hello web"), self.recorder.data)
+
+    def test_register_wakes_the_sleeping_thread(self):
+        # The thread is already asleep in select() with nothing but the self-pipe registered
+        time.sleep(0.05)
+        channel = self.register("web")
+        channel.peer.sendall(b"data")
+        self.assertTrue(self.recorder.received.wait(5))
+
+    def test_stop_wakes_the_thread(self):
+        thread = self.reactor._thread
+        time.sleep(0.05)
+        self.reactor.stop()
+        self.assertFalse(thread.is_alive())
+
+    def test_unregister_stops_callbacks(self):
+        channel = self.register("web")
+        self.reactor.unregister("web")
+        self.reactor.unregister("web")
+        self.assertEqual(len(self.reactor), 0)
+        channel.peer.sendall(b"late")
+        channel.peer.close()
+        time.sleep(0.1)
+        self.assertEqual(self.recorder.data, [])
+        self.assertEqual(self.recorder.closed, [])
+
+    def test_eof_closes_the_entry_once(self):
+        channel = self.register("web")
+        channel.peer.sendall(b"bye")
+        channel.peer.close()
+        self.assertTrue(self.recorder.closed_event.wait(5))
+        self.assertEqual(self.recorder.output("web"), b"bye")
+        time.sleep(0.05)
+        self.assertEqual(self.recorder.closed, ["web"])
+        self.assertEqual(len(self.reactor), 0)
+
+    def test_exit_status_closes_the_entry(self):
+        channel = self.register("web")
+        channel.send_exit_status()
+        self.assertTrue(self.recorder.closed_event.wait(5))
+
+    def test_failing_callback_closes_the_entry(self):
+        def broken(name, data):
+            raise RuntimeError("boom")
+
+        channel = FakeChannel()
+        self.channels.append(channel)
+        self.reactor.register("web", channel, broken, self.recorder.on_close)
+        channel.peer.sendall(b"data")
+        self.assertTrue(self.recorder.closed_event.wait(5))
+        self.assertEqual(len(self.reactor), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+
+from command_history import CommandHistory, HistoryStore, ReverseSearch, history_key
+
+
+class CommandHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "history", "me@host_22.history")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_repeated_commands_move_to_the_newest_position(self):
+        history = CommandHistory()
+        for command in ("ls", "cd /tmp", "ls", "ls", "  "):
+            history.add(command)
+        self.assertEqual(history.commands(), ["cd /tmp", "ls"])
+        self.assertEqual(len(history), 2)
+
+    def test_oldest_commands_are_dropped_beyond_the_limit(self):
+        history = CommandHistory(max_entries=3)
+        for i in range(5):
+            history.add(f"echo {i}")
+        self.assertEqual(history.commands(), ["echo 2", "echo 3", "echo 4"])
+        self.assertIsNone(history.search("echo 1"))
+
+    def test_navigation_skips_superseded_entries(self):
+        history = CommandHistory()
+        for command in ("a", "b", "c", "a"):
+            history.add(command)
+        position, command = history.older(history.end)
+        self.assertEqual(command, "a")
+        position, command = history.older(position)
+        self.assertEqual(command, "c")
+        position, command = history.older(position)
+        self.assertEqual(command, "b")
+        self.assertIsNone(history.older(position))
+        self.assertEqual(history.newer(position)[1], "c")
+
+    def test_search_newest_first_and_before_a_position(self):
+        history = CommandHistory()
+        for command in ("git status", "make", "git log", "git status"):
+            history.add(command)
+        position, command = history.search("git")
+        self.assertEqual(command, "git status")
+        position, command = history.search("git", before=position)
+        self.assertEqual(command, "git log")
+        self.assertIsNone(history.search("git", before=history.search("git log")[0]))
+        self.assertIsNone(history.search("Git"))
+        self.assertIsNone(history.search(""))
+        # A match never spans two commands
+        self.assertIsNone(history.search("makegit"))
+
+    def test_search_after_adding_and_compacting(self):
+        history = CommandHistory(max_entries=10)
+        history.search("x")
+        for i in range(1000):
+            history.add(f"cmd {i % 20}")
+        self.assertEqual(history.search("cmd 17")[1], "cmd 17")
+        self.assertEqual(history.search("cmd 1")[1], "cmd 19")
+        self.assertIsNone(history.search("cmd 5"))  # Dropped: only the 10 newest are kept
+        self.assertEqual(history.commands(), [f"cmd {i}" for i in range(10, 20)])
+
+    def test_file_round_trip_with_multiline_commands(self):
+        history = CommandHistory(self.path)
+        for command in ("echo one", "printf 'a\\nb'\nline two", "echo one"):
+            history.add(command)
+        history.close()
+        reloaded = CommandHistory(self.path)
+        self.assertEqual(reloaded.commands(), ["printf 'a\\nb'\nline two", "echo one"])
+        self.assertEqual(reloaded.search("two")[1], "printf 'a\\nb'\nline two")
+
+    def test_file_is_compacted(self):
+        history = CommandHistory(self.path, max_entries=5)
+        for i in range(2000):
+            history.add(f"cmd {i % 7}")
+        history.close()
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        self.assertLess(len(lines), 400)
+        self.assertEqual(CommandHistory(self.path, max_entries=5).commands(), history.commands())
+
+    def test_clear_deletes_the_file(self):
+        history = CommandHistory(self.path)
+        history.add("secret")
+        history.clear()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(history.commands(), [])
+
+
+class ReverseSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.history = CommandHistory()
+        for command in ("ssh web1", "scp a web2:", "ls", "ssh db1", "ssh web3"):
+            self.history.add(command)
+
+    def test_typing_keeps_the_current_match_when_it_still_matches(self):
+        search = ReverseSearch(self.history)
+        self.assertEqual(search.update("s"), "ssh web3")
+        self.assertEqual(search.update("ss"), "ssh web3")
+        self.assertEqual(search.update("ssh d"), "ssh db1")
+        self.assertFalse(search.failing)
+
+    def test_older_steps_through_matches(self):
+        search = ReverseSearch(self.history)
+        search.update("web")
+        self.assertEqual(search.older(), "scp a web2:")
+        self.assertEqual(search.older(), "ssh web1")
+        self.assertEqual(search.older(), "ssh web1")
+        self.assertTrue(search.failing)
+
+    def test_failing_query_keeps_the_last_match(self):
+        search = ReverseSearch(self.history)
+        search.update("ssh")
+        self.assertEqual(search.update("sshx"), "ssh web3")
+        self.assertTrue(search.failing)
+        self.assertEqual(search.update("sshxy"), "ssh web3")
+        self.assertTrue(search.failing)
+        # Deleting back to a matching query searches again
+        self.assertEqual(search.update("ssh w"), "ssh web3")
+        self.assertFalse(search.failing)
+        self.assertIsNone(search.update(""))
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def test_one_history_per_host(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = HistoryStore(directory)
+            key = history_key({"username": "me", "host": "example.com"})
+            self.assertEqual(key, "me@example.com:22")
+            history = store.open(key)
+            self.assertIs(store.open(key), history)
+            history.add("uptime")
+            self.assertTrue(store.path_for(key).endswith("me@example.com_22.history"))
+            store.close_all()
+            self.assertTrue(os.path.exists(store.path_for(key)))
+            store.clear_all()
+            self.assertEqual(os.listdir(directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import output_sinks
+from output_sinks import LocalMirrorSink, OutputFanout, OutputSink, TerminalSink
+from terminal_screen import TerminalScreen
+
+
+class RecordingSink(OutputSink):
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+    def close(self):
+        self.closed = True
+
+
+class FailingSink(OutputSink):
+    def write(self, data):
+        raise RuntimeError("broken")
+
+
+class OutputFanoutTest(unittest.TestCase):
+    def test_every_sink_gets_the_output(self):
+        first, second = RecordingSink(), RecordingSink()
+        fanout = OutputFanout([first])
+        fanout.add(second)
+        fanout.write(b"data")
+        self.assertEqual(first.chunks, [b"data"])
+        self.assertEqual(second.chunks, [b"data"])
+
+    def test_a_failing_sink_does_not_stop_the_others(self):
+        sink = RecordingSink()
+        fanout = OutputFanout([FailingSink(), sink])
+        with self.assertLogs("output_sinks", level="ERROR"):
+            fanout.write(b"x")
+        self.assertEqual(sink.chunks, [b"x"])
+
+    def test_remove_and_close(self):
+        first, second = RecordingSink(), RecordingSink()
+        fanout = OutputFanout([first, second])
+        fanout.remove(first)
+        self.assertTrue(first.closed)
+        self.assertEqual(fanout.sinks, (second,))
+        fanout.close()
+        self.assertTrue(second.closed)
+        self.assertEqual(fanout.sinks, ())
+
+
+class TerminalSinkTest(unittest.TestCase):
+    def test_character_split_across_reads(self):
+        screen = TerminalScreen(10, 1)
+        updates = []
+        sink = TerminalSink(screen, on_update=lambda: updates.append(1))
+        data = "é€".encode("utf-8")
+        sink.write(data[:1])
+        self.assertEqual(updates, [])
+        sink.write(data[1:4])
+        sink.write(data[4:])
+        self.assertEqual(screen.display(), ["é€"])
+        self.assertEqual(len(updates), 2)
+
+
+class LocalMirrorSinkTest(unittest.TestCase):
+    def test_writes_to_the_given_stream(self):
+        stream = io.BytesIO()
+        sink = LocalMirrorSink(stream)
+        sink.write(b"abc")
+        sink.close()
+        self.assertEqual(stream.getvalue(), b"abc")
+        self.assertFalse(stream.closed)
+
+    def test_default_is_the_preserved_stdout(self):
+        read_end, write_end = os.pipe()
+        try:
+            with mock.patch.object(output_sinks, "_original_stdout_fd", write_end):
+                sink = LocalMirrorSink()
+                sink.write(b"mirrored")
+                sink.close()
+            self.assertEqual(os.read(read_end, 100), b"mirrored")
+        finally:
+            os.close(read_end)
+            os.close(write_end)
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.out")
+            sink = LocalMirrorSink(path=path)
+            sink.write(b"x")
+            sink.close()
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"x")
+
+    def test_stops_when_the_stream_goes_away(self):
+        stream = io.BytesIO()
+        sink = LocalMirrorSink(stream)
+        stream.close()
+        sink.write(b"lost")
+        sink.close()
+        sink.write(b"ignored")
+        self.assertEqual(sink.dropped, len(b"lostignored"))
+
+    def test_a_stalled_stream_does_not_block_the_writer(self):
+        release = threading.Event()
+
+        class StalledStream(io.BytesIO):
+            def write(self, data):
+                release.wait(5)
+                return super().write(data)
+
+        stream = StalledStream()
+        sink = LocalMirrorSink(stream)
+        with mock.patch.object(output_sinks, "MIRROR_MAX_PENDING", 10):
+            for chunk in (b"first ", b"second ", b"third ", b"dropped"):
+                sink.write(chunk)
+        self.assertFalse(release.is_set())
+        release.set()
+        sink.close()
+        # The first chunk was taken by the writer thread before it stalled, or queued with the others
+        self.assertIn(stream.getvalue(), (b"first second third ", b"first second "))
+        self.assertEqual(len(stream.getvalue()) + sink.dropped, len(b"first second third dropped"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import select
+import socket
+import threading
+import unittest
+
+from port_forwarding import ForwardRelay, ForwardSpec, session_forwards
+
+
+class FakeChannel:
+    """SSH channel backed by a socket pair; the test plays the far end on ``peer``."""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.peer.settimeout(5)
+        self.closed = False
+        self.eof_received = False
+        self.write_shut = False
+        self._buffer = b""
+
+    def setblocking(self, blocking):
+        self.sock.setblocking(blocking)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def recv_ready(self):
+        if not self._buffer and not self.eof_received and not self.closed:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                return False
+            self._buffer = data
+            self.eof_received = not data
+        return bool(self._buffer)
+
+    def recv(self, size):
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def send_ready(self):
+        # Stands in for the channel's send window
+        return bool(select.select([], [self.sock], [], 0)[1])
+
+    def send(self, data):
+        return self.sock.send(data)
+
+    def shutdown_write(self):
+        self.write_shut = True
+        self.sock.shutdown(socket.SHUT_WR)
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+def read_all(sock):
+    chunks = []
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            return b"".join(chunks)
+        chunks.append(data)
+
+
+class ForwardSpecParseTest(unittest.TestCase):
+    def test_local(self):
+        spec = ForwardSpec.parse("L 8080:db:5432")
+        self.assertEqual((spec.kind, spec.bind_address, spec.bind_port, spec.dest_host, spec.dest_port),
+                         ("L", "127.0.0.1", 8080, "db", 5432))
+        self.assertEqual(str(spec), "L 127.0.0.1:8080:db:5432")
+        self.assertEqual(spec.describe(), "127.0.0.1:8080 -> db:5432")
+
+    def test_remote_binds_to_the_server_loopback(self):
+        spec = ForwardSpec.parse("-R 9000:localhost:3000")
+        self.assertEqual((spec.kind, spec.bind_address, spec.bind_port), ("R", "localhost", 9000))
+        self.assertEqual(spec.describe(), "remote localhost:9000 -> localhost:3000")
+
+    def test_dynamic(self):
+        spec = ForwardSpec.parse("d 0.0.0.0:1080")
+        self.assertEqual((spec.kind, spec.bind_address, spec.bind_port, spec.dest_host), ("D", "0.0.0.0", 1080, None))
+        self.assertEqual(str(spec), "D 0.0.0.0:1080")
+
+    def test_ipv6_addresses(self):
+        spec = ForwardSpec.parse("L [::1]:8080:[2001:db8::5]:443")
+        self.assertEqual((spec.bind_address, spec.dest_host), ("::1", "2001:db8::5"))
+        self.assertEqual(ForwardSpec.parse(str(spec)).dest_host, "2001:db8::5")
+
+    def test_invalid(self):
+        for text in ("", "8080:db:5432", "X 8080:db:5432", "L 8080:db", "D", "D 1:2:3",
+                     "L 70000:db:5432", "L http:db:80", "L [::1:8080:db:5432"):
+            with self.subTest(text=text), self.assertRaisesRegex(ValueError, "Invalid forward"):
+                ForwardSpec.parse(text)
+
+    def test_session_forwards(self):
+        forwards = session_forwards({"forwards": "L 8080:db:5432, D 1080,"})
+        self.assertEqual([str(spec) for spec in forwards], ["L 127.0.0.1:8080:db:5432", "D 127.0.0.1:1080"])
+        self.assertEqual(session_forwards({}), [])
+
+
+
+class ForwardRelayTest(unittest.TestCase):
+    def setUp(self):
+        self.relay = ForwardRelay(read_size=4096, high_water=8192)
+        self.addCleanup(self.relay.stop)
+        self.closed = threading.Event()
+
+    def connect(self):
+        """Relay a new local connection; returns the application's end of it and the channel."""
+        app, local = socket.socketpair()
+        app.settimeout(5)
+        channel = FakeChannel()
+        self.addCleanup(app.close)
+        self.addCleanup(channel.peer.close)
+        pipe = self.relay.add_pipe(local, channel, label="test", on_close=lambda pipe: self.closed.set())
+        return app, channel, pipe
+
+    def test_relays_both_directions(self):
+        app, channel, pipe = self.connect()
+        app.sendall(b"GET / HTTP/1.0\r\n\r\n")
+        self.assertEqual(channel.peer.recv(1024), b"GET / HTTP/1.0\r\n\r\n")
+        channel.peer.sendall(b"HTTP/1.0 200 OK\r\n")
+        self.assertEqual(app.recv(1024), b"HTTP/1.0 200 OK\r\n")
+
+    def test_large_transfers_pass_the_high_water_mark(self):
+        app, channel, pipe = self.connect()
+        upload, download = bytes(range(256)) * 400, b"x" * 150000
+        received = {}
+        threads = [
+            threading.Thread(target=lambda: received.update(server=read_all(channel.peer))),
+            threading.Thread(target=lambda: received.update(app=read_all(app))),
+        ]
+        for thread in threads:
+            thread.start()
+        app.sendall(upload)
+        app.shutdown(socket.SHUT_WR)
+        channel.peer.sendall(download)
+        channel.peer.shutdown(socket.SHUT_WR)
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(received, {"server": upload, "app": download})
+        self.assertTrue(self.closed.wait(5))
+        self.assertEqual((pipe.sent, pipe.received), (len(upload), len(download)))
+
+    def test_half_close(self):
+        app, channel, pipe = self.connect()
+        app.sendall(b"request")
+        app.shutdown(socket.SHUT_WR)
+        # The server sees the request and then EOF, but can still answer
+        self.assertEqual(read_all(channel.peer), b"request")
+        self.assertTrue(channel.write_shut)
+        self.assertFalse(self.closed.is_set())
+        channel.peer.sendall(b"response")
+        self.assertEqual(app.recv(1024), b"response")
+        channel.peer.shutdown(socket.SHUT_WR)
+        self.assertEqual(app.recv(1024), b"")
+        self.assertTrue(self.closed.wait(5))
+        self.assertTrue(channel.closed)
+        self.assertEqual(len(self.relay), 0)
+
+    def test_stop_tears_down_open_connections(self):
+        app, channel, pipe = self.connect()
+        app.sendall(b"ping")
+        self.assertEqual(channel.peer.recv(1024), b"ping")
+        self.assertEqual(len(self.relay), 1)
+        self.relay.stop()
+        self.assertTrue(self.closed.is_set())
+        self.assertTrue(pipe.closed)
+        self.assertTrue(channel.closed)
+        self.assertEqual(len(self.relay), 0)
+        self.assertEqual(app.recv(1024), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from cryptography.fernet import Fernet
+
+from session_db import SessionDatabase, read_database
+from session_store import Ciphertext, encrypt_value
+
+
+class SessionDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.fernet = Fernet(Fernet.generate_key())
+        self.database_file = os.path.join(self.directory, "sessions.db")
+        self.json_file = os.path.join(self.directory, "sessions.json")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def open(self, json_file=None):
+        database = SessionDatabase(self.database_file, self.fernet, json_file=json_file, delay=60)
+        database.load()
+        self.addCleanup(database.close)
+        return database
+
+    def test_migrates_sessions_json_once(self):
+        stored = {
+            "web": {"host": "web.example.com", "username": "deploy", "tags": ["Prod"],
+                    "password": encrypt_value(self.fernet, "secret")},
+            "db": {"host": "db.example.com", "username": "postgres"},
+        }
+        with open(self.json_file, "w") as f:
+            json.dump(stored, f)
+
+        database = self.open(self.json_file)
+        self.assertEqual(list(database), ["web", "db"])
+        self.assertFalse(os.path.exists(self.json_file))
+        self.assertTrue(os.path.exists(self.json_file + ".migrated"))
+        self.assertIsInstance(database["web"]["password"], Ciphertext)
+        self.assertEqual(database.password("web"), "secret")
+        self.assertEqual(database.names_with_tag("prod"), ["web"])
+
+    def test_existing_database_is_not_overwritten_by_migration(self):
+        database = self.open()
+        database["kept"] = {"host": "kept"}
+        database.close()
+        with open(self.json_file, "w") as f:
+            json.dump({"other": {"host": "other"}}, f)
+
+        with self.assertLogs("session_db", level="WARNING"):
+            database = self.open(self.json_file)
+        self.assertEqual(list(database), ["kept"])
+        self.assertTrue(os.path.exists(self.json_file))
+
+    def test_flush_writes_changes_and_deletions(self):
+        database = self.open()
+        database["a"] = {"host": "a", "password": "pw"}
+        database["b"] = {"host": "b"}
+        self.assertTrue(database.flush())
+        self.assertEqual(database.last_written, 2)
+        self.assertFalse(database.flush())
+
+        database["b"]["host"] = "b2"
+        del database["a"]
+        self.assertTrue(database.flush())
+        self.assertEqual(database.last_written, 1)
+
+        stored = read_database(self.database_file)
+        self.assertEqual(list(stored), ["b"])
+        self.assertEqual(stored["b"]["host"], "b2")
+
+    def test_records_are_read_on_demand(self):
+        database = self.open()
+        database.write_batch({name: {"host": f"{name}.example.com", "password": "pw"} for name in "xyz"})
+        reopened = SessionDatabase(self.database_file, self.fernet)
+        reopened.load()
+        self.addCleanup(reopened.close)
+        self.assertEqual(list(reopened), ["x", "y", "z"])
+        self.assertEqual(reopened._records, {})
+        self.assertEqual(reopened["y"]["host"], "y.example.com")
+        self.assertEqual(list(reopened._records), ["y"])
+        self.assertEqual(reopened.plaintext_record("z")["password"], "pw")
+
+    def test_iteration_is_a_snapshot(self):
+        database = self.open()
+        database.write_batch({"a": {"host": "a"}})
+        names = iter(database)
+        database.write_batch({"b": {"host": "b"}})
+        self.assertEqual(list(names), ["a"])
+        self.assertEqual(len(database), 2)
+        self.assertIn("b", database)
+
+    def test_closed_database_raises_a_clear_error(self):
+        database = self.open()
+        database.close()
+        with self.assertRaisesRegex(sqlite3.ProgrammingError, "is closed"):
+            database.write_batch({"a": {"host": "a"}})
+        with self.assertRaisesRegex(sqlite3.ProgrammingError, "is closed"):
+            database.tags()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from cryptography.fernet import Fernet
+
+import session_import
+from session_db import SessionDatabase
+from session_import import import_entries, iter_csv, iter_json, iter_sessions, iter_ssh_config, validate_session
+
+
+class IterJsonTest(unittest.TestCase):
+    def test_object_of_records(self):
+        text = '{"web": {"host": "web", "port": 2222}, "db": {"host": "db"}}'
+        self.assertEqual(list(iter_json(io.StringIO(text))), [
+            ("entry 1", "web", {"host": "web", "port": 2222}),
+            ("entry 2", "db", {"host": "db"}),
+        ])
+
+    def test_list_of_records_named_by_name_or_host(self):
+        text = '[{"name": "web", "host": "w"}, {"host": "db"}, 7]'
+        self.assertEqual([(name, record) for _, name, record in iter_json(io.StringIO(text))],
+                         [("web", {"name": "web", "host": "w"}), ("db", {"host": "db"}), ("", 7)])
+
+    def test_records_split_across_chunks(self):
+        sessions = {f"host-{i}": {"host": f"10.0.{i // 256}.{i % 256}", "port": 22000 + i} for i in range(300)}
+        text = "{" + ", ".join(f'"{name}": {{"host": "{record["host"]}", "port": {record["port"]}}}'
+                               for name, record in sessions.items()) + "}"
+        original = session_import.CHUNK_SIZE
+        session_import.CHUNK_SIZE = 37
+        try:
+            entries = list(iter_json(io.StringIO(text)))
+        finally:
+            session_import.CHUNK_SIZE = original
+        self.assertEqual({name: record for _, name, record in entries}, sessions)
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(list(iter_json(io.StringIO(" { } "))), [])
+        with self.assertRaisesRegex(ValueError, "Invalid JSON"):
+            list(iter_json(io.StringIO('{"a": {"host": }')))
+        with self.assertRaisesRegex(ValueError, "Invalid JSON"):
+            list(iter_json(io.StringIO('"just a string"')))
+
+    def test_syntax_error_stops_reading(self):
+        class CountingReader(io.StringIO):
+            reads = 0
+
+            def read(self, size=-1):
+                self.reads += 1
+                return super().read(size)
+
+        text = '{"web": {"host": "w", "port": 22,, "user": "x"}, ' + ", ".join(
+            f'"host-{i}": {{"host": "h{i}"}}' for i in range(5000)) + "}"
+        f = CountingReader(text)
+        with mock.patch.object(session_import, "CHUNK_SIZE", 1024), self.assertRaisesRegex(ValueError, "Invalid JSON"):
+            list(iter_json(f))
+        self.assertLessEqual(f.reads, 2)
+
+    def test_long_strings_span_chunks(self):
+        text = '{"web": {"host": "w", "notes": "' + "x" * 5000 + '"}}'
+        with mock.patch.object(session_import, "CHUNK_SIZE", 100):
+            self.assertEqual(len(list(iter_json(io.StringIO(text)))[0][2]["notes"]), 5000)
+
+
+class IterCsvTest(unittest.TestCase):
+    def test_columns_are_matched_by_alias(self):
+        text = ("Hostname;SSH User;Port;Groups;Owner\n"
+                "web1.example.com;deploy;2222;prod|web;team-a\n"
+                "\n"
+                "db1.example.com;postgres;;prod;team-b\n")
+        entries = list(iter_csv(io.StringIO(text)))
+        self.assertEqual(entries[0], ("line 2", "web1.example.com", {
+            "host": "web1.example.com", "username": "deploy", "port": "2222", "tags": ["prod", "web"]}))
+        self.assertEqual(entries[1][0], "line 4")
+        self.assertEqual(entries[1][2]["port"], "")
+
+    def test_no_host_column(self):
+        with self.assertRaisesRegex(ValueError, "No host column"):
+            list(iter_csv(io.StringIO("name,user\nweb,root\n")))
+
+
+class IterSshConfigTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_options_resolve_first_value_wins(self):
+        self.write("extra.conf", "Host extra\n    HostName extra.example.com\n")
+        path = self.write("config", (
+            "Include extra.conf\n"
+            "Host web web2\n"
+            "    HostName %h.example.com\n"
+            "    User deploy\n"
+            "    LocalForward 8080 localhost:80\n"
+            "Host db\n"
+            "    HostName=db.internal\n"
+            "    ProxyJump web\n"
+            "Match host foo\n"
+            "    User ignored\n"
+            "Host *.internal db\n"
+            "    Port 2222\n"
+            "Host *\n"
+            "    User fallback\n"
+        ))
+        sessions = {name: record for _, name, record in iter_ssh_config(path)}
+        self.assertEqual(list(sessions), ["extra", "web", "web2", "db"])
+        self.assertEqual(sessions["web"], {"host": "web.example.com", "username": "deploy",
+                                           "forwards": ["L 8080:localhost:80"]})
+        self.assertEqual(sessions["web2"]["host"], "web2.example.com")
+        self.assertEqual(sessions["db"], {"host": "db.internal", "port": "2222", "username": "fallback",
+                                          "proxy_jump": ["web"]})
+        self.assertEqual(sessions["extra"]["host"], "extra.example.com")
+
+    def test_format_is_guessed_from_the_name(self):
+        path = self.write("hosts.csv", "host\nweb\n")
+        self.assertEqual([name for _, name, _ in iter_sessions(path)], ["web"])
+
+
+class ValidateSessionTest(unittest.TestCase):
+    def test_normalizes(self):
+        session = validate_session("web", {"name": "web", "host": " web ", "port": "2222", "tags": "Prod, web",
+                                           "forwards": "L 8080:db:5432, D 1080", "proxy_jump": "bastion",
+                                           "connect_timeout": "5", "auth_timeout": "", "custom": 1})
+        self.assertEqual(session, {
+            "host": "web", "port": 2222, "username": "", "password": "", "ssh_key_path": "",
+            "connect_timeout": 5.0, "tags": ["prod", "web"], "forwards": ["L 8080:db:5432", "D 1080"],
+            "proxy_jump": ["bastion"], "custom": 1,
+        })
+
+    def test_rejects_unusable_sessions(self):
+        for name, record, message in (
+            ("a", "host", "not a session record"),
+            (" ", {"host": "a"}, "no session name"),
+            ("a", {"host": "two words"}, "invalid host"),
+            ("a", {"host": "a", "port": "ssh"}, "invalid port"),
+            ("a", {"host": "a", "port": 70000}, "out of range"),
+            ("a", {"host": "a", "connect_timeout": "soon"}, "invalid connect_timeout"),
+            ("a", {"host": "a", "forwards": ["X 1"]}, ""),
+        ):
+            with self.subTest(record=record), self.assertRaisesRegex(ValueError, message):
+                validate_session(name, record)
+
+
+class ImportEntriesTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.store = SessionDatabase(os.path.join(self._directory.name, "sessions.db"), Fernet(Fernet.generate_key()))
+        self.store.load()
+
+    def tearDown(self):
+        self.store.close()
+        self._directory.cleanup()
+
+    def test_report(self):
+        self.store.write_batch({"same": {"host": "a", "username": "u"}, "moved": {"host": "old", "username": "u"},
+                                "stale": {"host": "s"}})
+        entries = [
+            ("entry 1", "new", {"host": "n"}),
+            ("entry 2", "same", {"host": "a", "username": "u"}),
+            ("entry 3", "moved", {"host": "new", "username": "u"}),
+            ("entry 4", "new", {"host": "again"}),
+            ("entry 5", "bad", {"host": "a", "port": 99999}),
+        ]
+        report = import_entries(self.store, entries, "sessions.json", replace=True, batch_size=2)
+        self.assertEqual((report.added, report.updated, report.conflicts, report.duplicates, report.invalid,
+                          report.removed), (1, 1, 1, 1, 1, 1))
+        self.assertEqual(list(self.store), ["same", "moved", "new"])
+        self.assertEqual(self.store["moved"]["host"], "new")
+        self.assertEqual(len(report.problems), 3)
+
+    def test_cancel_counts_only_written_batches(self):
+        cancel = threading.Event()
+
+        def progress(report):
+            cancel.set()
+
+        entries = [(f"entry {i}", f"host-{i}", {"host": f"h{i}"}) for i in range(5)]
+        report = import_entries(self.store, entries, "hosts.csv", batch_size=2, progress=progress, cancel=cancel)
+        self.assertTrue(report.cancelled)
+        self.assertEqual(report.added, 2)
+        self.assertEqual(len(self.store), 2)
+        self.assertIn("(cancelled)", report.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from session_index import SessionIndex
+
+
+def make_sessions():
+    return {
+        "web-prod-1": {"host": "10.0.0.1", "username": "deploy", "tags": ["prod", "web"]},
+        "db-prod": {"host": "db.internal", "username": "postgres", "tags": ["prod"]},
+        "staging-web": {"host": "web.staging.example.com", "username": "deploy", "tags": ["staging"]},
+        "laptop": {"host": "localhost", "username": "me"},
+    }
+
+
+class SessionIndexSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SessionIndex(make_sessions())
+
+    def test_empty_query_lists_everything_in_saved_order(self):
+        self.assertEqual(self.index.search("  "), ["web-prod-1", "db-prod", "staging-web", "laptop"])
+
+    def test_substring_of_any_field(self):
+        self.assertEqual(self.index.search("DEPLOY"), ["web-prod-1", "staging-web"])
+        self.assertEqual(self.index.search("internal"), ["db-prod"])
+        self.assertEqual(self.index.search("10.0"), ["web-prod-1"])
+
+    def test_short_terms_are_scanned(self):
+        self.assertEqual(self.index.search("me"), ["laptop"])
+        self.assertEqual(self.index.search("db"), ["db-prod"])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.index.search("prod deploy"), ["web-prod-1"])
+        self.assertEqual(self.index.search("prod nothing"), [])
+
+    def test_tag_terms_match_exactly(self):
+        self.assertEqual(self.index.search("tag:prod"), ["web-prod-1", "db-prod"])
+        self.assertEqual(self.index.search("tag:pro"), [])
+
+    def test_name_prefix_ranks_first(self):
+        self.assertEqual(self.index.search("web"), ["web-prod-1", "staging-web"])
+        self.assertEqual(self.index.search("staging"), ["staging-web"])
+        self.assertEqual(self.index.search("st"), ["staging-web", "db-prod", "laptop"])
+
+    def test_typing_narrows_without_losing_results(self):
+        for query in ("d", "de", "dep", "depl", "deploy", "deploy w", "deploy web"):
+            fresh = SessionIndex(make_sessions())
+            self.assertEqual(self.index.search(query), fresh.search(query), query)
+
+    def test_extending_a_tag_is_searched_again(self):
+        self.index.search("tag:pro")
+        self.assertEqual(self.index.search("tag:prod"), ["web-prod-1", "db-prod"])
+
+    def test_narrows(self):
+        self.assertTrue(SessionIndex._narrows("we", "web"))
+        self.assertTrue(SessionIndex._narrows("web", "web db"))
+        self.assertTrue(SessionIndex._narrows("tag:a b", "tag:a bc"))
+        self.assertFalse(SessionIndex._narrows("web", "we"))
+        self.assertFalse(SessionIndex._narrows("web", "db"))
+        self.assertFalse(SessionIndex._narrows("tag:pro", "tag:prod"))
+        self.assertFalse(SessionIndex._narrows("x ta", "x tag:p"))
+
+
+class SessionIndexUpdateTest(unittest.TestCase):
+    def test_sync_reindexes_only_changes(self):
+        sessions = make_sessions()
+        index = SessionIndex(sessions)
+        self.assertEqual(index.sync(sessions), 0)
+        sessions["laptop"] = {"host": "workstation", "username": "me"}
+        del sessions["db-prod"]
+        self.assertEqual(index.sync(sessions), 2)
+        self.assertEqual(index.search("workstation"), ["laptop"])
+        self.assertEqual(index.search("postgres"), [])
+        self.assertNotIn("db-prod", index)
+
+    def test_add_and_remove_invalidate_the_last_query(self):
+        index = SessionIndex(make_sessions())
+        self.assertEqual(index.search("deploy"), ["web-prod-1", "staging-web"])
+        index.add("deploy-box", {"host": "build", "username": "ci"})
+        self.assertEqual(index.search("deploy"), ["deploy-box", "web-prod-1", "staging-web"])
+        index.remove("web-prod-1")
+        self.assertEqual(index.search("deploy"), ["deploy-box", "staging-web"])
+        self.assertEqual(index.search(""), ["db-prod", "staging-web", "laptop", "deploy-box"])
+        self.assertEqual(len(index), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from cryptography.fernet import Fernet
+
+import session_store
+from session_store import Ciphertext, SecretCache, SessionStore, encrypt_value, write_atomic
+
+
+def record(host, password="", **extra):
+    return dict({"host": host, "port": 22, "username": "admin", "password": password}, **extra)
+
+
+class WriteAtomicTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.path = os.path.join(self.directory, "sessions.json")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_replaces_the_file(self):
+        write_atomic(self.path, "old")
+        write_atomic(self.path, "new")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(os.listdir(self.directory), ["sessions.json"])
+        if os.name == "posix":
+            self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_failed_rename_keeps_the_old_contents(self):
+        write_atomic(self.path, "old")
+        with mock.patch.object(os, "replace", side_effect=OSError("disk full")) as replace:
+            with self.assertRaises(OSError):
+                write_atomic(self.path, "new")
+        # The new contents went to a temporary file next to the target, which is cleaned up
+        temp_path, target = replace.call_args.args
+        self.assertEqual(target, self.path)
+        self.assertEqual(os.path.dirname(temp_path), self.directory)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.directory), ["sessions.json"])
+
+
+class SecretCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.fernet = Fernet(Fernet.generate_key())
+
+    def cache(self, **kwargs):
+        cache = SecretCache(self.fernet, **kwargs)
+        self.addCleanup(cache.clear)
+        return cache
+
+    def encrypt(self, password):
+        return Ciphertext(encrypt_value(self.fernet, password))
+
+    def test_plaintext_is_cached(self):
+        cache = self.cache()
+        secret = self.encrypt("secret")
+        with mock.patch.object(session_store, "decrypt_value", wraps=session_store.decrypt_value) as decrypt:
+            self.assertEqual(cache.reveal(secret), "secret")
+            self.assertEqual(cache.reveal(secret), "secret")
+        self.assertEqual(decrypt.call_count, 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_values_that_are_not_ciphertext_pass_through(self):
+        cache = self.cache()
+        with mock.patch.object(session_store, "decrypt_value") as decrypt:
+            self.assertEqual(cache.reveal("typed-in"), "typed-in")
+            self.assertEqual(cache.reveal(""), "")
+            self.assertEqual(cache.reveal(None), "")
+        decrypt.assert_not_called()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache._timer)
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = self.cache(ttl=0.1)
+        cache.reveal(self.encrypt("secret"))
+        self.assertEqual(len(cache), 1)
+        # The timer drops the plaintext without the cache being used again
+        deadline = time.monotonic() + 5
+        while len(cache) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache._timer)
+
+    def test_use_extends_the_ttl(self):
+        cache = self.cache(ttl=60)
+        first, second = self.encrypt("one"), self.encrypt("two")
+        with mock.patch.object(time, "monotonic", return_value=1000.0):
+            cache.reveal(first)
+        with mock.patch.object(time, "monotonic", return_value=1050.0):
+            cache.reveal(second)
+            cache.reveal(first)
+        with mock.patch.object(time, "monotonic", return_value=1100.0):
+            cache._purge(time.monotonic())
+        self.assertEqual(list(cache._entries), [second, first])
+        with mock.patch.object(time, "monotonic", return_value=1110.0):
+            cache._purge(time.monotonic())
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entries_are_dropped_beyond_max_entries(self):
+        cache = self.cache(max_entries=2)
+        secrets = [self.encrypt(f"secret{index}") for index in range(3)]
+        cache.reveal(secrets[0])
+        cache.reveal(secrets[1])
+        cache.reveal(secrets[0])
+        cache.reveal(secrets[2])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(list(cache._entries), [secrets[0], secrets[2]])
+        self.assertEqual(cache.reveal(secrets[1]), "secret1")
+
+    def test_clear(self):
+        cache = self.cache()
+        cache.reveal(self.encrypt("secret"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache._timer)
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.session_file = os.path.join(self._directory.name, "sessions.json")
+        self.fernet = Fernet(Fernet.generate_key())
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def open(self, **kwargs):
+        store = SessionStore(self.session_file, self.fernet, **kwargs)
+        store.load()
+        self.addCleanup(store.close)
+        return store
+
+    def read(self):
+        with open(self.session_file) as f:
+            return json.load(f)
+
+    def test_changes_close_together_are_written_once(self):
+        saved = threading.Event()
+        errors = []
+
+        def on_saved(error):
+            errors.append(error)
+            saved.set()
+
+        store = self.open(delay=0.2, on_saved=on_saved)
+        with mock.patch.object(session_store, "write_atomic", wraps=write_atomic) as write:
+            for index in range(3):
+                store[f"web{index}"] = record(f"10.0.0.{index}")
+                store.save()
+            self.assertFalse(os.path.exists(self.session_file))
+            self.assertTrue(saved.wait(5))
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(errors, [None])
+        self.assertEqual(sorted(self.read()), ["web0", "web1", "web2"])
+
+    def test_flush_writes_pending_changes_at_once(self):
+        store = self.open(delay=60)
+        store["web"] = record("10.0.0.1")
+        store.save()
+        self.assertTrue(store.flush())
+        self.assertIsNone(store._timer)
+        self.assertEqual(self.read()["web"]["host"], "10.0.0.1")
+        self.assertFalse(store.flush())
+
+    def test_passwords_are_encrypted_once(self):
+        store = self.open()
+        store["web"] = record("10.0.0.1", "secret")
+        stored = store["web"]["password"]
+        self.assertIsInstance(stored, Ciphertext)
+        self.assertEqual(store.encryptions, 1)
+        # Reassigning the stored record keeps the ciphertext
+        store["web"] = dict(store["web"], port=2222)
+        self.assertEqual(store.encryptions, 1)
+        self.assertEqual(store.password("web"), "secret")
+        store.flush()
+        self.assertEqual(self.read()["web"]["password"], stored)
+
+    def test_only_changed_records_are_serialized(self):
+        store = self.open()
+        for index in range(3):
+            store[f"web{index}"] = record(f"10.0.0.{index}", "secret")
+        self.assertTrue(store.flush())
+        self.assertEqual(store.last_written, 3)
+
+        store["web1"]["tags"] = ["prod"]
+        self.assertTrue(store.flush())
+        self.assertEqual(store.last_written, 1)
+        self.assertEqual(store.encryptions, 3)
+        self.assertEqual(self.read()["web1"]["tags"], ["prod"])
+
+        # In-place edits of nested values are noticed too
+        store["web1"]["tags"].append("eu")
+        self.assertTrue(store.flush())
+        self.assertEqual(store.last_written, 1)
+
+        del store["web2"]
+        self.assertTrue(store.flush())
+        self.assertEqual(store.last_written, 0)
+        self.assertEqual(sorted(self.read()), ["web0", "web1"])
+
+    def test_loading_does_not_rewrite_or_decrypt(self):
+        store = self.open()
+        store["web"] = record("10.0.0.1", "secret")
+        store.flush()
+
+        reopened = self.open()
+        self.assertIsInstance(reopened["web"]["password"], Ciphertext)
+        self.assertEqual(len(reopened.secrets), 0)
+        self.assertFalse(reopened.flush())
+        self.assertEqual(reopened.encryptions, 0)
+        self.assertEqual(reopened.plaintext_record("web")["password"], "secret")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import session_transcript
+from session_transcript import TranscriptSink, read_asciicast, replay
+
+
+class TranscriptSinkTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def read_lines(self, path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_asciicast_header_and_events(self):
+        sink = TranscriptSink(self.directory, "web", size=(100, 30), title="web")
+        data = "héllo\r\n".encode("utf-8")
+        sink.write(data[:2])  # Splits the é
+        sink.write(data[2:])
+        sink.resize(120, 40)
+        sink.close()
+        self.assertEqual(len(sink.paths), 1)
+        self.assertTrue(sink.path.endswith(".cast"))
+        header, *events = self.read_lines(sink.path)
+        self.assertEqual((header["version"], header["width"], header["height"], header["title"]),
+                         (2, 100, 30, "web"))
+        self.assertEqual("".join(data for _, code, data in events if code == "o"), "héllo\r\n")
+        self.assertEqual(events[-1][1:], ["r", "120x40"])
+
+    def test_raw_gzip(self):
+        sink = TranscriptSink(self.directory, "raw", fmt="raw", compression="gzip")
+        sink.write(b"\x1b[31mred\x1b[0m")
+        sink.write(memoryview(b" plain"))
+        sink.close()
+        self.assertTrue(sink.path.endswith(".log.gz"))
+        with gzip.open(sink.path, "rb") as f:
+            self.assertEqual(f.read(), b"\x1b[31mred\x1b[0m plain")
+
+    def test_rotation_by_size_keeps_the_newest_parts(self):
+        with mock.patch.object(session_transcript, "WRITE_BATCH", 1):
+            sink = TranscriptSink(self.directory, "big", fmt="raw", max_bytes=10, keep=2)
+            written = []
+            for i in range(5):
+                chunk = f"chunk {i:04d}\n".encode()
+                written.append(chunk)
+                sink.write(chunk)
+            sink.close()
+        self.assertEqual(len(sink.paths), 2)
+        # Part names sort in recording order
+        self.assertEqual(sorted(os.listdir(self.directory)), [os.path.basename(path) for path in sink.paths])
+        contents = []
+        for path in sink.paths:
+            with open(path, "rb") as f:
+                contents.append(f.read())
+        self.assertEqual(b"".join(contents), b"".join(written)[-len(b"".join(contents)):])
+        self.assertTrue(contents[-1].endswith(b"chunk 0004\n"))
+
+    def test_every_asciicast_part_has_a_header(self):
+        with mock.patch.object(session_transcript, "WRITE_BATCH", 1):
+            sink = TranscriptSink(self.directory, "parts", max_bytes=4, size=(80, 24))
+            sink.write(b"1234")
+            sink.resize(90, 20)
+            sink.write(b"5678")
+            sink.close()
+        self.assertGreaterEqual(len(sink.paths), 2)
+        headers = [self.read_lines(path)[0] for path in sink.paths]
+        self.assertTrue(all(header["version"] == 2 for header in headers))
+        self.assertEqual((headers[-1]["width"], headers[-1]["height"]), (90, 20))
+
+    def test_output_is_dropped_when_the_writer_falls_behind(self):
+        # The writer sleeps until close(), so everything written stays queued
+        with mock.patch.object(session_transcript, "MAX_PENDING", 10), \
+                mock.patch.object(session_transcript, "WRITE_BATCH", 1 << 30):
+            sink = TranscriptSink(self.directory, "slow", fmt="raw", flush_interval=60)
+            sink.write(b"x" * 11)
+            sink.write(b"dropped")
+            with self.assertLogs("session_transcript", level="WARNING"):
+                sink.close()
+        self.assertEqual(sink.dropped, 7)
+        with open(sink.path, "rb") as f:
+            self.assertEqual(f.read(), b"x" * 11)
+
+    def test_unknown_options(self):
+        with self.assertRaises(ValueError):
+            TranscriptSink(self.directory, "x", fmt="mp4")
+        with self.assertRaises(ValueError):
+            TranscriptSink(self.directory, "x", compression="bz2")
+
+
+class ReplayTest(unittest.TestCase):
+    def test_replay_caps_idle_time(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "session.cast.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                f.write(json.dumps({"version": 2, "width": 80, "height": 24}) + "\n")
+                f.write(json.dumps([0.0, "o", "one "]) + "\n")
+                f.write(json.dumps([30.0, "r", "100x30"]) + "\n")
+                f.write(json.dumps([60.0, "o", "two"]) + "\n")
+            header, events = read_asciicast(path)
+            self.assertEqual(header["width"], 80)
+            self.assertEqual(len(list(events)), 3)
+
+            out = io.StringIO()
+            with mock.patch.object(session_transcript.time, "sleep") as sleep:
+                replay(path, out, speed=2.0, max_idle=1.0)
+            self.assertEqual(out.getvalue(), "one two")
+            # Delays count from the start: 60 s of recording play in 2 s of capped time at double speed
+            self.assertAlmostEqual(max(call.args[0] for call in sleep.call_args_list), 1.0, places=2)
+
+    def test_not_a_recording(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bad.cast")
+            with open(path, "w") as f:
+                f.write("hello\n")
+            with self.assertRaises(ValueError):
+                read_asciicast(path)
+
+    def test_speed_must_be_positive(self):
+        for speed in (0, -1.0, float("nan"), float("inf")):
+            with self.subTest(speed=speed), self.assertRaisesRegex(ValueError, "playback speed"):
+                replay("missing.cast", io.StringIO(), speed=speed)
+
+    def test_cli_rejects_bad_speeds(self):
+        from cli import positive_float, run_cli
+
+        self.assertEqual(positive_float("2.5"), 2.5)
+        for text in ("0", "-2", "nan", "inf", "fast"):
+            with self.subTest(text=text), mock.patch("sys.stderr", io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    run_cli(["replay", "--speed", text, "missing.cast"])
+                self.assertIn("expected a number greater than 0", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
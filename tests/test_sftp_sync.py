@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from sftp_sync import SyncAction, SyncPlan, apply_plan, scan_local
+
+
+class ScanLocalTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.root = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write(self, path, data=b"x"):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_files_and_directories(self):
+        self.write("a.txt", b"abc")
+        self.write("sub/deeper/b.txt")
+        self.write("sub/upload.bin.part")
+        files, dirs = scan_local(self.root)
+        self.assertEqual(sorted(files), ["a.txt", "sub/deeper/b.txt"])
+        self.assertEqual(files["a.txt"][0], 3)
+        self.assertEqual(dirs, {"sub", "sub/deeper"})
+
+    @unittest.skipUnless(hasattr(os, "symlink") and hasattr(os, "mkfifo"), "needs symlinks and FIFOs")
+    def test_unreadable_entries_are_skipped(self):
+        target = self.write("real.txt", b"data")
+        os.symlink(target, os.path.join(self.root, "link.txt"))
+        os.symlink(os.path.join(self.root, "missing"), os.path.join(self.root, "broken"))
+        os.mkfifo(os.path.join(self.root, "pipe"))
+        skipped = []
+        with self.assertLogs("sftp_sync", level="WARNING"):
+            files, _ = scan_local(self.root, skipped)
+        self.assertEqual(sorted(files), ["link.txt", "real.txt"])
+        self.assertEqual(sorted(skipped), ["broken: broken symlink", "pipe: not a regular file"])
+
+
+class FakeSFTP:
+    def __init__(self, failing):
+        self.failing = failing
+        self.calls = []
+
+    def rmdir(self, path):
+        self.calls.append(("rmdir", path))
+        if path in self.failing:
+            raise IOError("Directory not empty")
+
+    def remove(self, path):
+        self.calls.append(("remove", path))
+        if path in self.failing:
+            raise IOError("Permission denied")
+
+
+class FakeManager:
+    def upload(self, *args, **kwargs):
+        return []
+
+
+class ApplyPlanTest(unittest.TestCase):
+    def test_failed_deletions_are_reported_per_path(self):
+        plan = SyncPlan("/local", "/remote")
+        plan.actions = [SyncAction("delete", "old/locked.txt"), SyncAction("delete", "old/stale.txt"),
+                        SyncAction("delete", "old/"), SyncAction("delete", "tmp/")]
+        sftp = FakeSFTP({"/remote/old/locked.txt", "/remote/old"})
+        with self.assertLogs("sftp_sync", level="WARNING"):
+            apply_plan(plan, sftp, FakeManager())
+        self.assertEqual(sftp.calls, [("remove", "/remote/old/locked.txt"), ("remove", "/remote/old/stale.txt"),
+                                      ("rmdir", "/remote/old"), ("rmdir", "/remote/tmp")])
+        self.assertEqual(plan.errors, ["/remote/old/locked.txt: Permission denied",
+                                       "/remote/old: Directory not empty"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from sftp_transfer import DONE, PARTIAL_SUFFIX, SMALL_FILE_SIZE, TransferManager
+
+
+class FakeFile(io.BytesIO):
+    def __init__(self, sftp, path, data=b""):
+        super().__init__(data)
+        self.sftp = sftp
+        self.path = path
+        self.pipelined = False
+        self.prefetched = False
+
+    def set_pipelined(self, pipelined=True):
+        self.pipelined = pipelined
+
+    def prefetch(self, file_size=None, max_concurrent_requests=None):
+        self.prefetched = True
+
+    def close(self):
+        self.sftp.files[self.path] = self.getvalue()
+        super().close()
+
+
+class FakeAttributes:
+    def __init__(self, size):
+        self.st_size = size
+        self.st_mode = 0o100644
+
+
+class FakeSFTP:
+    """In-memory SFTP client recording the files it opened."""
+
+    def __init__(self):
+        self.files = {"/": None}
+        self.opened = []
+
+    def stat(self, path):
+        if path not in self.files:
+            raise IOError(f"No such file: {path}")
+        return FakeAttributes(len(self.files[path] or b""))
+
+    def mkdir(self, path):
+        self.files[path] = None
+
+    def open(self, path, mode):
+        data = self.files.get(path, b"") if "a" in mode or "r" in mode else b""
+        handle = FakeFile(self, path, data)
+        if "a" in mode:
+            handle.seek(0, io.SEEK_END)
+        self.opened.append(handle)
+        return handle
+
+    def posix_rename(self, old, new):
+        self.files[new] = self.files.pop(old)
+
+    def close(self):
+        pass
+
+
+class TransferManagerTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.sftp = FakeSFTP()
+        self.manager = TransferManager(lambda: self.sftp, max_parallel=1)
+
+    def tearDown(self):
+        self.manager.close()
+        self._directory.cleanup()
+
+    def write(self, name, size):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        return path
+
+    def run_jobs(self, jobs):
+        deadline = time.monotonic() + 10
+        while any(job.active for job in jobs) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([(job.state, job.error) for job in jobs], [(DONE, None)] * len(jobs))
+
+    def test_small_upload_goes_straight_to_the_destination(self):
+        path = self.write("small.txt", 1000)
+        self.run_jobs(self.manager.upload(path, "/small.txt"))
+        self.assertEqual([handle.path for handle in self.sftp.opened], ["/small.txt"])
+        self.assertFalse(self.sftp.opened[0].pipelined)
+        with open(path, "rb") as f:
+            self.assertEqual(self.sftp.files["/small.txt"], f.read())
+
+    def test_large_upload_is_pipelined_through_a_partial_file(self):
+        path = self.write("large.bin", SMALL_FILE_SIZE + 1)
+        self.run_jobs(self.manager.upload(path, "/large.bin"))
+        self.assertEqual([handle.path for handle in self.sftp.opened], ["/large.bin" + PARTIAL_SUFFIX])
+        self.assertTrue(self.sftp.opened[0].pipelined)
+        self.assertNotIn("/large.bin" + PARTIAL_SUFFIX, self.sftp.files)
+        self.assertEqual(len(self.sftp.files["/large.bin"]), SMALL_FILE_SIZE + 1)
+
+    def test_large_upload_resumes(self):
+        path = self.write("large.bin", SMALL_FILE_SIZE * 2)
+        with open(path, "rb") as f:
+            data = f.read()
+        self.sftp.files["/large.bin" + PARTIAL_SUFFIX] = data[:1000]
+        jobs = self.manager.upload(path, "/large.bin")
+        self.run_jobs(jobs)
+        self.assertEqual(jobs[0].resumed_from, 1000)
+        self.assertEqual(self.sftp.files["/large.bin"], data)
+
+    def test_only_large_downloads_are_prefetched(self):
+        self.sftp.files["/small"] = b"s" * 10
+        self.sftp.files["/large"] = b"l" * (SMALL_FILE_SIZE + 1)
+        jobs = self.manager.download("/small", os.path.join(self.directory, "small"))
+        jobs += self.manager.download("/large", os.path.join(self.directory, "large"))
+        self.run_jobs(jobs)
+        self.assertEqual([(handle.path, handle.prefetched) for handle in self.sftp.opened],
+                         [("/small", False), ("/large", True)])
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, "large")), SMALL_FILE_SIZE + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+import socket
+import threading
+import time
+import unittest
+from collections import deque
+from unittest import mock
+
+import paramiko
+
+import ssh_connection
+from ssh_connection import (
+    CommandStream, CommandTimeout, ModernSSHClient, jump_host_params, parse_jump_host, parse_timeout,
+)
+from transport_pool import TransportPool
+
+
+class FakeTransport:
+    def __init__(self):
+        self.closed = False
+
+    def is_active(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class FakeExecChannel:
+    """
+    Exec channel with separate stdout and stderr buffers. A socket pair makes
+    fileno() readable whenever output or EOF arrives, as on a paramiko channel.
+    """
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        self.command = None
+        self.closed = False
+        self.eof_received = False
+        self.exit_status = -1
+        self.status_event = threading.Event()
+        self._stdout, self._stderr = deque(), deque()
+
+    def exec_command(self, command):
+        self.command = command
+
+    def send_output(self, stdout=b"", stderr=b""):
+        if stdout:
+            self._stdout.append(stdout)
+        if stderr:
+            self._stderr.append(stderr)
+        self.peer.send(b"!")
+
+    def finish(self, status):
+        self.eof_received = True
+        self.exit_status = status
+        self.status_event.set()
+        self.peer.send(b"!")
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def _clear_wakeups(self):
+        try:
+            while self.sock.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def recv_ready(self):
+        self._clear_wakeups()
+        return bool(self._stdout)
+
+    def recv(self, size):
+        return self._stdout.popleft()
+
+    def recv_stderr_ready(self):
+        return bool(self._stderr)
+
+    def recv_stderr(self, size):
+        return self._stderr.popleft()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.sock.close()
+            self.peer.close()
+
+
+class ExecTransport(FakeTransport):
+    def __init__(self, channel):
+        super().__init__()
+        self.channel = channel
+
+    def open_session(self, timeout=None):
+        return self.channel
+
+
+def hop_params(host, port=22):
+    return {"host": host, "port": port, "username": "admin", "password": None, "key_file": None,
+            "connect_timeout": 5.0, "auth_timeout": 5.0}
+
+
+class ParseTimeoutTest(unittest.TestCase):
+    def test_empty_means_the_default(self):
+        self.assertIsNone(parse_timeout("  ", "connect"))
+
+    def test_seconds(self):
+        self.assertEqual(parse_timeout(" 2.5 ", "connect"), 2.5)
+
+    def test_rejects_values_that_are_not_positive_numbers(self):
+        for text in ("0", "-1", "soon", "nan", "inf"):
+            with self.subTest(text=text), self.assertRaisesRegex(ValueError, "auth timeout"):
+                parse_timeout(text, "auth")
+
+
+
+class ParseJumpHostTest(unittest.TestCase):
+    def test_forms(self):
+        self.assertEqual(parse_jump_host("bastion"), (None, "bastion", 22))
+        self.assertEqual(parse_jump_host(" ops@bastion:2222 "), ("ops", "bastion", 2222))
+        self.assertEqual(parse_jump_host("[2001:db8::1]:2200"), (None, "2001:db8::1", 2200))
+        self.assertEqual(parse_jump_host("2001:db8::1"), (None, "2001:db8::1", 22))
+
+    def test_malformed(self):
+        for entry in ("", "host:port", "user@", "[::1"):
+            with self.subTest(entry=entry), self.assertRaises(ValueError):
+                parse_jump_host(entry)
+
+
+class JumpHostParamsTest(unittest.TestCase):
+    @staticmethod
+    def build(session):
+        return hop_params(session["host"], int(session.get("port") or 22))
+
+    def test_saved_sessions_and_addresses(self):
+        sessions = {
+            "edge": {"host": "edge.example.com"},
+            "bastion": {"host": "bastion.internal", "proxy_jump": "edge"},
+        }
+        session = {"host": "db", "username": "app", "proxy_jump": "bastion, ops@10.0.0.5:2222"}
+        hops = jump_host_params(session, sessions, self.build)
+        self.assertEqual([(hop["host"], hop["port"]) for hop in hops],
+                         [("edge.example.com", 22), ("bastion.internal", 22), ("10.0.0.5", 2222)])
+        self.assertEqual(hops[2]["username"], "ops")
+
+    def test_direct_connection(self):
+        self.assertEqual(jump_host_params({"host": "db"}, {}, self.build), [])
+
+    def test_loop_is_rejected(self):
+        sessions = {
+            "a": {"host": "a", "proxy_jump": ["b"]},
+            "b": {"host": "b", "proxy_jump": ["a"]},
+        }
+        with self.assertRaisesRegex(ValueError, "loops back"):
+            jump_host_params({"host": "db", "proxy_jump": ["a"]}, sessions, self.build)
+
+
+class ConnectPooledTest(unittest.TestCase):
+    def test_failed_second_hop_releases_the_first_hop_once(self):
+        pool = TransportPool(idle_timeout=0)
+        first, second = hop_params("edge"), hop_params("bastion")
+        # Another session already holds the first hop
+        first_key = pool.key_for("edge", 22, "admin")
+        bastion, _ = pool.acquire(first_key, FakeTransport)
+
+        def refuse(*args):
+            raise paramiko.SSHException("Jump host could not connect")
+
+        client = ModernSSHClient()
+        with mock.patch.object(ssh_connection, "open_tunnel", side_effect=refuse):
+            with self.assertRaises(paramiko.SSHException):
+                client.connect_pooled(pool, "db", "app", jump_hosts=[first, second])
+
+        self.assertEqual(pool._entries[first_key].refcount, 1)
+        self.assertFalse(bastion.closed)
+        pool.release(first_key, bastion)
+        self.assertTrue(bastion.closed)
+        self.assertEqual(len(pool), 0)
+        pool.close_all()
+
+
+
+class CommandStreamTest(unittest.TestCase):
+    def run_command(self, channel, timeout=None):
+        client = ModernSSHClient()
+        with mock.patch.object(client, "get_transport", return_value=ExecTransport(channel)):
+            return client.run_command("make test", timeout=timeout)
+
+    def test_stdout_and_stderr_are_kept_apart(self):
+        channel = FakeExecChannel()
+        channel.send_output(b"compiling\n", b"warning: unused\n")
+        channel.send_output(b"done\n")
+        channel.finish(0)
+        status, stdout, stderr = self.run_command(channel)
+        self.assertEqual(channel.command, "make test")
+        self.assertEqual((status, stdout, stderr), (0, b"compiling\ndone\n", b"warning: unused\n"))
+        self.assertTrue(channel.closed)
+
+    def test_exit_status_arrives_after_output(self):
+        channel = FakeExecChannel()
+
+        def server():
+            time.sleep(0.05)
+            channel.send_output(b"1 failed\n")
+            time.sleep(0.05)
+            channel.finish(2)
+
+        threading.Thread(target=server, daemon=True).start()
+        self.assertEqual(self.run_command(channel, timeout=10), (2, b"1 failed\n", b""))
+
+    def test_lines_interleave_both_streams(self):
+        channel = FakeExecChannel()
+        channel.send_output(b"a\nparti", b"oops\n")
+        channel.send_output(b"al")
+        channel.finish(0)
+        with CommandStream(channel, "cmd") as stream:
+            self.assertEqual(list(stream.lines()), [("stdout", "a"), ("stderr", "oops"), ("stdout", "partial")])
+            self.assertEqual(stream.exit_status, 0)
+
+    def test_timeout_closes_the_channel(self):
+        channel = FakeExecChannel()
+        channel.send_output(b"still running\n")
+        started = time.monotonic()
+        with self.assertRaisesRegex(CommandTimeout, r"timed out after 0.2s: make test"):
+            self.run_command(channel, timeout=0.2)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(channel.closed)
+
+    def test_timeout_waiting_for_exit_status(self):
+        channel = FakeExecChannel()
+        channel.eof_received = True
+        with CommandStream(channel, "cmd", timeout=0.1) as stream:
+            self.assertEqual(list(stream.stdout()), [])
+            with self.assertRaises(CommandTimeout):
+                stream.wait()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import unittest
+
+from terminal_screen import TerminalScreen, char_width
+
+
+class TerminalScreenTextTest(unittest.TestCase):
+    def test_text_and_newlines(self):
+        screen = TerminalScreen(20, 3)
+        screen.feed("hello\r\nworld")
+        self.assertEqual(screen.display(), ["hello", "world", ""])
+        self.assertEqual((screen.cursor_x, screen.cursor_y), (5, 1))
+
+    def test_autowrap_waits_for_the_next_character(self):
+        screen = TerminalScreen(5, 3)
+        screen.feed("abcde")
+        self.assertEqual((screen.cursor_x, screen.cursor_y), (4, 0))
+        screen.feed("f")
+        self.assertEqual(screen.display(), ["abcde", "f", ""])
+
+    def test_without_autowrap_the_last_column_is_overwritten(self):
+        screen = TerminalScreen(5, 2)
+        screen.feed("\x1b[?7labcdefg")
+        self.assertEqual(screen.display(), ["abcdg", ""])
+
+    def test_lines_scrolled_off_the_top_reach_the_scrollback(self):
+        screen = TerminalScreen(10, 2)
+        screen.take_updates()
+        screen.feed("one\r\ntwo\r\nthree\r\nfour")
+        self.assertEqual(list(screen.scrollback), ["one", "two"])
+        update = screen.take_updates()
+        self.assertEqual(update.scrolled_lines, ["one", "two"])
+        self.assertEqual(update.dirty_rows, {0: "three", 1: "four"})
+        self.assertIsNone(screen.take_updates())
+
+    def test_tab_stops(self):
+        screen = TerminalScreen(20, 1)
+        screen.feed("a\tb")
+        self.assertEqual(screen.display(), ["a       b"])
+
+
+class TerminalScreenEscapeTest(unittest.TestCase):
+    def test_colours_are_removed(self):
+        screen = TerminalScreen(20, 1)
+        screen.feed("\x1b[1;31mred\x1b[0m plain")
+        self.assertEqual(screen.display(), ["red plain"])
+
+    def test_csi_split_across_reads(self):
+        screen = TerminalScreen(20, 3)
+        screen.feed("abc\x1b[")
+        screen.feed("2")
+        screen.feed(";5Hx")
+        self.assertEqual(screen.display(), ["abc", "    x", ""])
+
+    def test_cursor_movement_and_erase(self):
+        screen = TerminalScreen(10, 2)
+        screen.feed("0123456789\x1b[1;4H\x1b[K")
+        self.assertEqual(screen.display(), ["012", ""])
+        screen.feed("\x1b[2J")
+        self.assertEqual(screen.display(), ["", ""])
+
+    def test_insert_and_delete_characters(self):
+        screen = TerminalScreen(6, 1)
+        screen.feed("abcdef\x1b[1;2H\x1b[2@")
+        self.assertEqual(screen.display(), ["a  bcd"])
+        screen.feed("\x1b[3P")
+        self.assertEqual(screen.display(), ["acd"])
+
+    def test_scroll_region_keeps_rows_outside_it(self):
+        screen = TerminalScreen(10, 4)
+        screen.feed("top\x1b[2;3r\x1b[2;1Ha\r\nb\r\nc")
+        self.assertEqual(screen.display(), ["top", "b", "c", ""])
+        self.assertEqual(list(screen.scrollback), [])
+
+    def test_reverse_index_at_the_top_scrolls_down(self):
+        screen = TerminalScreen(10, 3)
+        screen.feed("a\r\nb\x1b[H\x1bM")
+        self.assertEqual(screen.display(), ["", "a", "b"])
+
+    def test_alternate_screen_restores_the_main_screen(self):
+        screen = TerminalScreen(10, 2)
+        screen.feed("shell$ ")
+        screen.feed("\x1b[?1049h")
+        self.assertTrue(screen.alternate_screen)
+        screen.feed("vim\r\n~\r\n~")
+        self.assertEqual(list(screen.scrollback), [])
+        screen.feed("\x1b[?1049l")
+        self.assertFalse(screen.alternate_screen)
+        self.assertEqual(screen.display(), ["shell$", ""])
+        self.assertEqual(screen.cursor_x, 7)
+
+    def test_osc_title(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("\x1b]0;my title\x07x")
+        self.assertEqual(screen.title, "my title")
+        self.assertEqual(screen.display(), ["x"])
+
+    def test_osc_split_inside_its_terminator(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("\x1b]2;name\x1b")
+        screen.feed("\\x")
+        self.assertEqual(screen.title, "name")
+        self.assertEqual(screen.display(), ["x"])
+
+    def test_long_osc_is_truncated_and_its_tail_skipped(self):
+        screen = TerminalScreen(10, 1)
+        payload = "A" * 10000
+        screen.feed("\x1b]52;c;" + payload[:6000])
+        screen.feed(payload[6000:])
+        screen.feed("\x07ok")
+        self.assertEqual(screen.display(), ["ok"])
+
+    def test_long_osc_title_ending_with_st(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("\x1b]0;" + "t" * 5000 + "\x1b")
+        screen.feed("\\ok")
+        self.assertTrue(screen.title.startswith("ttt"))
+        self.assertLess(len(screen.title), 4096)
+        self.assertEqual(screen.display(), ["ok"])
+
+    def test_long_dcs_is_skipped(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("\x1bP" + "q" * 8000)
+        screen.feed("\x07still inside\x1b\\ok")
+        self.assertEqual(screen.display(), ["ok"])
+
+
+class TerminalScreenWideCharacterTest(unittest.TestCase):
+    def test_char_width(self):
+        self.assertEqual(char_width("a"), 1)
+        self.assertEqual(char_width("é"), 1)
+        self.assertEqual(char_width("漢"), 2)
+        self.assertEqual(char_width("́"), 0)
+
+    def test_wide_characters_take_two_cells(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("漢字ab")
+        self.assertEqual(screen.display(), ["漢字ab"])
+        self.assertEqual(screen.cursor_x, 6)
+
+    def test_wide_character_wraps_instead_of_splitting(self):
+        screen = TerminalScreen(5, 2)
+        screen.feed("abcd漢")
+        self.assertEqual(screen.display(), ["abcd", "漢"])
+        self.assertEqual((screen.cursor_x, screen.cursor_y), (2, 1))
+
+    def test_combining_mark_joins_the_previous_character(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("éx")
+        self.assertEqual(screen.display(), ["éx"])
+        self.assertEqual(screen.cursor_x, 2)
+
+    def test_overwriting_half_of_a_wide_character_blanks_the_other_half(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("漢字\x1b[1;2Hx")
+        self.assertEqual(screen.display(), [" x字"])
+        screen.feed("\x1b[1;3Hy")
+        self.assertEqual(screen.display(), [" xy"])
+
+
+class TerminalScreenResizeTest(unittest.TestCase):
+    def test_shrinking_keeps_the_cursor_row(self):
+        screen = TerminalScreen(10, 4)
+        screen.feed("1\r\n2\r\n3\r\n4")
+        screen.resize(10, 2)
+        self.assertEqual(screen.display(), ["3", "4"])
+        self.assertEqual(list(screen.scrollback), ["1", "2"])
+        self.assertEqual(screen.cursor_y, 1)
+
+    def test_narrowing_cuts_rows(self):
+        screen = TerminalScreen(10, 1)
+        screen.feed("0123456789")
+        screen.resize(4, 1)
+        self.assertEqual(screen.display(), ["0123"])
+        self.assertEqual(screen.cursor_x, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import threading
+import time
+import unittest
+
+from transport_pool import TransportPool
+
+
+class FakeTransport:
+    def __init__(self):
+        self.closed = False
+
+    def is_active(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class TransportPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = TransportPool(idle_timeout=60)
+        self.key = TransportPool.key_for("Host", 22, "user", password="secret")
+
+    def tearDown(self):
+        self.pool.close_all()
+
+    def test_key_identity(self):
+        self.assertEqual(self.key[0], "host")
+        self.assertNotIn("secret", self.key[3])
+        self.assertNotEqual(self.key, TransportPool.key_for("host", 22, "user", password="other"))
+        self.assertEqual(TransportPool.key_for("host", 22, "user", "pw", key_filename="/k")[3], "key:/k")
+        via = TransportPool.key_for("bastion", 22, "ops")
+        self.assertNotEqual(TransportPool.key_for("host", 22, "user", "secret", via=via), self.key)
+
+    def test_second_acquire_reuses_the_transport(self):
+        first, reused = self.pool.acquire(self.key, FakeTransport)
+        self.assertFalse(reused)
+        second, reused = self.pool.acquire(self.key, self.fail)
+        self.assertIs(second, first)
+        self.assertTrue(reused)
+        self.assertEqual(self.pool._entries[self.key].refcount, 2)
+
+    def test_release_keeps_the_transport_until_idle_too_long(self):
+        transport, _ = self.pool.acquire(self.key, FakeTransport)
+        self.pool.acquire(self.key, self.fail)
+        self.pool.release(self.key, transport)
+        self.pool.release(self.key, transport)
+        self.assertFalse(transport.closed)
+        self.assertEqual(self.pool.reap(), 0)
+        self.pool._entries[self.key].idle_since -= 61
+        self.assertEqual(self.pool.reap(), 1)
+        self.assertTrue(transport.closed)
+        self.assertEqual(len(self.pool), 0)
+
+    def test_zero_idle_timeout_closes_on_last_release(self):
+        pool = TransportPool(idle_timeout=0)
+        transport, _ = pool.acquire(self.key, FakeTransport)
+        pool.acquire(self.key, self.fail)
+        pool.release(self.key, transport)
+        self.assertFalse(transport.closed)
+        pool.release(self.key, transport)
+        self.assertTrue(transport.closed)
+        self.assertEqual(len(pool), 0)
+
+    def test_dead_transport_is_replaced(self):
+        dead, _ = self.pool.acquire(self.key, FakeTransport)
+        dead.closed = True
+        fresh, reused = self.pool.acquire(self.key, FakeTransport)
+        self.assertIsNot(fresh, dead)
+        self.assertFalse(reused)
+
+    def test_concurrent_callers_share_one_handshake(self):
+        opened = []
+        gate = threading.Event()
+
+        def slow_open():
+            gate.wait(5)
+            opened.append(FakeTransport())
+            return opened[-1]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.pool.acquire(self.key, slow_open)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(sorted(reused for _, reused in results), [False, True, True, True])
+        self.assertEqual(self.pool._entries[self.key].refcount, 4)
+
+    def test_failed_handshake_is_not_pooled(self):
+        with self.assertRaises(OSError):
+            self.pool.acquire(self.key, self.fail)
+        transport, reused = self.pool.acquire(self.key, FakeTransport)
+        self.assertFalse(reused)
+
+    def test_parent_reference_follows_the_child(self):
+        bastion_key = TransportPool.key_for("bastion", 22, "ops")
+        bastion, _ = self.pool.acquire(bastion_key, FakeTransport)
+        # A second acquire of the bastion reference is handed to the child
+        self.pool.acquire(bastion_key, self.fail)
+        target, _ = self.pool.acquire(self.key, FakeTransport, parent=(bastion_key, bastion))
+        self.assertEqual(self.pool._entries[bastion_key].refcount, 2)
+
+        # Reusing the child gives the extra parent reference straight back
+        self.pool.acquire(bastion_key, self.fail)
+        self.pool.acquire(self.key, self.fail, parent=(bastion_key, bastion))
+        self.assertEqual(self.pool._entries[bastion_key].refcount, 2)
+
+        # A failed child releases the parent it was given
+        other = TransportPool.key_for("other", 22, "user")
+        self.pool.acquire(bastion_key, self.fail)
+        with self.assertRaises(OSError):
+            self.pool.acquire(other, self.fail, parent=(bastion_key, bastion))
+        self.assertEqual(self.pool._entries[bastion_key].refcount, 2)
+
+        # Closing the child drops its reference on the parent
+        self.pool.release(bastion_key, bastion)
+        self.pool._entries[self.key].transport.closed = True
+        self.pool.reap()
+        self.assertEqual(self.pool._entries[bastion_key].refcount, 0)
+        self.assertTrue(target.closed)
+
+    @staticmethod
+    def fail():
+        raise OSError("handshake failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from virtual_list import visible_window
+
+
+class VisibleWindowTest(unittest.TestCase):
+    def test_empty_list(self):
+        self.assertEqual(visible_window(0, 30, 300, 0), (0, 0, 0, 0))
+        self.assertEqual(visible_window(0, 30, 300, 500), (0, 0, 0, 0))
+
+    def test_top(self):
+        # Ten rows fit exactly
+        self.assertEqual(visible_window(100, 30, 300, 0), (0, 0, 10, 0))
+
+    def test_partly_scrolled_rows(self):
+        # Row 3 is 15px out of view at the top, and row 13 is partly in view at the bottom
+        self.assertEqual(visible_window(100, 30, 300, 105), (105, 3, 14, 15))
+
+    def test_scrolling_past_the_end_stops_at_the_last_row(self):
+        self.assertEqual(visible_window(100, 30, 300, 10**6), (2700, 90, 100, 0))
+        self.assertEqual(visible_window(100, 30, 310, 10**6), (2690, 89, 100, 20))
+
+    def test_scrolling_above_the_top(self):
+        self.assertEqual(visible_window(100, 30, 300, -50), (0, 0, 10, 0))
+
+    def test_fewer_items_than_fit(self):
+        self.assertEqual(visible_window(4, 30, 300, 60), (0, 0, 4, 0))
+
+    def test_resizing(self):
+        y, first, last, offset = visible_window(100, 30, 300, 2700)
+        self.assertEqual((first, last), (90, 100))
+        # A taller view at the same position pulls the scroll position back so the last row stays at the bottom
+        self.assertEqual(visible_window(100, 30, 600, y), (2400, 80, 100, 0))
+        # A shorter one keeps the position and shows fewer rows
+        self.assertEqual(visible_window(100, 30, 150, y), (2700, 90, 95, 0))
+        # Items removed while scrolled to the end
+        self.assertEqual(visible_window(20, 30, 300, y), (300, 10, 20, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# Seconds an unused transport stays open for reuse
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+# Upper bound on how often the reaper thread wakes up
+REAP_INTERVAL = 30.0
+
+PoolKey = Tuple[str, int, str, str]
+
+
+class _PoolEntry:
+    """A shared transport and the number of clients currently using it."""
+
+    __slots__ = ("transport", "refcount", "idle_since", "ready", "error", "parent")
+
+    def __init__(self):
+        self.transport = None
+        self.refcount = 0
+        self.idle_since: Optional[float] = None
+        self.ready = threading.Event()  # Set once the first handshake finished
+        self.error: Optional[BaseException] = None
+        self.parent: Optional[Tuple[PoolKey, object]] = None  # Jump host transport this one tunnels through
+
+
+class TransportPool:
+    """
+    Share authenticated paramiko transports between clients of the same host.
+
+    Transports are keyed by (host, port, user, auth identity). The first
+    ``acquire`` for a key runs the full handshake; later ones get the live
+    transport and only need to open a new channel on it. Released transports
+    stay open for ``idle_timeout`` seconds before a background thread closes
+    them.
+
+    A transport opened through a jump host keeps a reference on the jump
+    host's pooled transport until it is closed itself, so every target behind
+    one bastion shares a single bastion handshake.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            idle_timeout (float): Seconds to keep an unused transport, 0 to close it on release
+        """
+        self.logger = logging.getLogger(__name__)
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._entries: Dict[PoolKey, _PoolEntry] = {}
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    @staticmethod
+    def key_for(host: str, port: int, username: str, password: Optional[str] = None,
+                key_filename: Optional[str] = None, via: Optional[PoolKey] = None) -> PoolKey:
+        """
+        Build the pool key for a set of credentials.
+
+        The identity is the key file path when one is used, otherwise a hash of
+        the password, so a different password never reuses a transport and the
+        password itself is not kept in the key. Connections made through a jump
+        host (``via``, the jump host's key) are pooled apart from direct ones.
+        """
+        if key_filename:
+            identity = f"key:{key_filename}"
+        elif password:
+            identity = "password:" + hashlib.sha256(password.encode("utf-8")).hexdigest()
+        else:
+            identity = "default"
+        if via is not None:
+            identity += f" via {via[2]}@{via[0]}:{via[1]} {via[3]}"
+        return (str(host).lower(), int(port), username, identity)
+
+    def acquire(self, key: PoolKey, open_transport: Callable[[], object],
+                parent: Optional[Tuple[PoolKey, object]] = None) -> Tuple[object, bool]:
+        """
+        Return a live transport for ``key``, opening one if needed.
+
+        Concurrent callers for a key that is still handshaking wait for that
+        handshake instead of starting their own.
+
+        Args:
+            key (PoolKey): Result of key_for()
+            open_transport: Connects and authenticates, returning the new Transport
+            parent (tuple, optional): (key, transport) of an acquired jump host transport that
+                open_transport tunnels through. The pool takes over that reference and releases
+                it when the new transport closes, or right away if none is opened.
+
+        Returns:
+            Tuple of the transport and whether an existing one was reused
+        """
+        try:
+            transport, reused = self._acquire(key, open_transport, parent)
+        except BaseException:
+            if parent is not None:
+                self.release(*parent)
+            raise
+        if reused and parent is not None:
+            self.release(*parent)
+        return transport, reused
+
+    def _acquire(self, key: PoolKey, open_transport: Callable[[], object],
+                 parent: Optional[Tuple[PoolKey, object]]) -> Tuple[object, bool]:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = _PoolEntry()
+                    self._entries[key] = entry
+                    break
+                if entry.ready.is_set():
+                    if entry.transport is not None and entry.transport.is_active():
+                        entry.refcount += 1
+                        entry.idle_since = None
+                        return entry.transport, True
+                    # The shared connection died; replace it
+                    self._entries.pop(key, None)
+                    self._discard(entry)
+                    continue
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+
+        try:
+            transport = open_transport()
+        except BaseException as e:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.error = e
+            entry.ready.set()
+            raise
+
+        with self._lock:
+            entry.transport = transport
+            entry.refcount = 1
+            entry.parent = parent
+        entry.ready.set()
+        self._ensure_reaper()
+        return transport, False
+
+    def release(self, key: PoolKey, transport) -> None:
+        """Give a transport back; it is closed once idle for longer than idle_timeout."""
+        with self._lock:
+            entry = self._entries.get(key)
+            pooled = entry is not None and entry.transport is transport
+            stale = None
+            if pooled:
+                entry.refcount = max(0, entry.refcount - 1)
+                if entry.refcount == 0:
+                    if self.idle_timeout <= 0 or not transport.is_active():
+                        del self._entries[key]
+                        stale = entry
+                    else:
+                        entry.idle_since = time.monotonic()
+        if not pooled:
+            # Not pooled (or already replaced); nobody else can be using it
+            self._close(transport)
+        elif stale is not None:
+            self._discard(stale)
+
+    def reap(self) -> int:
+        """Close transports that have been idle too long or have died. Returns how many were closed."""
+        now = time.monotonic()
+        stale = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if not entry.ready.is_set():
+                    continue
+                dead = entry.transport is None or not entry.transport.is_active()
+                expired = entry.refcount == 0 and entry.idle_since is not None and \
+                    now - entry.idle_since >= self.idle_timeout
+                if dead or expired:
+                    del self._entries[key]
+                    stale.append((key, entry))
+        for key, entry in stale:
+            self.logger.info(f"Closing idle transport to {key[2]}@{key[0]}:{key[1]}")
+            self._discard(entry)
+        return len(stale)
+
+    def close_all(self) -> None:
+        """Close every pooled transport and stop the reaper thread."""
+        self._stop.set()
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._discard(entry)
+        if self._reaper and self._reaper is not threading.current_thread():
+            self._reaper.join(timeout=2.0)
+        self._reaper = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _ensure_reaper(self) -> None:
+        with self._lock:
+            if self._reaper is not None or self._stop.is_set():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="TransportReaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(min(REAP_INTERVAL, max(1.0, self.idle_timeout / 2))):
+            try:
+                self.reap()
+            except Exception as e:
+                self.logger.error(f"Error reaping idle transports: {e}")
+
+    def _discard(self, entry: _PoolEntry) -> None:
+        """Close an entry's transport, then drop its reference on the jump host it went through."""
+        self._close(entry.transport)
+        if entry.parent is not None:
+            parent, entry.parent = entry.parent, None
+            self.release(*parent)
+
+    def _close(self, transport) -> None:
+        if transport is None:
+            return
+        try:
+            transport.close()
+        except Exception as e:
+            self.logger.error(f"Error closing transport: {e}")
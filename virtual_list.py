@@ -0,0 +1,153 @@
+import math
+import sys
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import customtkinter as ctk
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+
+def visible_window(count: int, row_height: int, view_height: int, y: int) -> Tuple[int, int, int, int]:
+    """
+    Work out which items are in view of a list scrolled to pixel ``y``.
+
+    Args:
+        count (int): Number of items
+        row_height (int): Height of one row in pixels
+        view_height (int): Height of the viewport in pixels
+        y (int): Requested scroll position in pixels from the top
+
+    Returns:
+        Tuple of the scroll position clamped to the content, the first and
+        one-past-last visible item indexes, and how many pixels of the first
+        row are scrolled out of view
+    """
+    y = min(max(0, y), max(0, count * row_height - view_height))
+    first = y // row_height
+    last = min(count, math.ceil((y + view_height) / row_height))
+    return y, first, last, y - first * row_height
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only has widgets for the rows in view.
+
+    A fixed pool of row widgets, just enough to fill the viewport, is made by
+    ``create_row(parent)`` and pointed at items with ``bind_row(row, item)``.
+    Rows are placed ``row_height`` apart and should not be taller than that.
+    Item ``i`` always uses pool slot ``i % pool size``, so scrolling by one row
+    re-binds a single row and only moves the others. Build time and memory
+    depend on the viewport height, not on the number of items.
+    """
+
+    def __init__(self, master, row_height: int, create_row: Callable[[Any], Any],
+                 bind_row: Callable[[Any, Any], None], **kwargs):
+        """
+        Args:
+            master: Parent widget
+            row_height (int): Height of every row in pixels
+            create_row: Creates one empty row widget inside the given parent
+            bind_row: Makes a row widget show an item
+            **kwargs: Passed to CTkFrame
+        """
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._items: List[Any] = []
+        self._rows: List[Any] = []
+        self._bound: Dict[int, Any] = {}  # Pool slot -> item it currently shows
+        self._y = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._body.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+        self._body.bind("<Configure>", lambda event: self._render())
+
+        if "linux" in sys.platform:
+            self.bind_all("<Button-4>", self._on_mouse_wheel, add=True)
+            self.bind_all("<Button-5>", self._on_mouse_wheel, add=True)
+        else:
+            self.bind_all("<MouseWheel>", self._on_mouse_wheel, add=True)
+
+    @property
+    def items(self) -> List[Any]:
+        return list(self._items)
+
+    def set_items(self, items: Sequence[Any]) -> None:
+        """Show ``items``, keeping the scroll position where it is still valid."""
+        self._items = list(items)
+        self._render()
+
+    def refresh(self) -> None:
+        """Re-bind every visible row, e.g. after the data behind the items changed."""
+        self._bound.clear()
+        self._render()
+
+    def scroll_to(self, index: int) -> None:
+        """Scroll so the item at ``index`` is at the top of the view."""
+        self._y = index * self.row_height
+        self._render()
+
+    def _view_height(self) -> int:
+        # place() scales its arguments by the widget scaling, so work in unscaled units
+        return int(self._body.winfo_height() / self._get_widget_scaling())
+
+    def _render(self) -> None:
+        view_height = self._view_height()
+        if view_height <= 1:
+            return  # Not laid out yet; <Configure> renders again
+
+        pool_size = view_height // self.row_height + 2
+        while len(self._rows) < pool_size:
+            self._rows.append(self._create_row(self._body))
+
+        self._y, first, last, offset = visible_window(len(self._items), self.row_height, view_height, self._y)
+        shown = set()
+        for index in range(first, last):
+            slot = index % len(self._rows)
+            row = self._rows[slot]
+            item = self._items[index]
+            if slot not in self._bound or self._bound[slot] != item:
+                self._bind_row(row, item)
+                self._bound[slot] = item
+            row.place(x=0, y=(index - first) * self.row_height - offset, relwidth=1.0)
+            shown.add(slot)
+        for slot, row in enumerate(self._rows):
+            if slot not in shown:
+                row.place_forget()
+                self._bound.pop(slot, None)
+
+        total = len(self._items) * self.row_height
+        if total > view_height:
+            self._scrollbar.set(self._y / total, (self._y + view_height) / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "") -> None:
+        view_height = self._view_height()
+        if action == "moveto":
+            self._y = int(float(amount) * len(self._items) * self.row_height)
+        elif unit == "pages":
+            self._y += int(amount) * max(self.row_height, view_height - self.row_height)
+        else:
+            self._y += int(amount) * self.row_height
+        self._render()
+
+    def _on_mouse_wheel(self, event) -> None:
+        # Only scroll when the pointer is over this list
+        body = str(self._body)
+        if str(event.widget) != body and not str(event.widget).startswith(body + "."):
+            return
+        if getattr(event, "num", None) in (4, 5):
+            steps = -1 if event.num == 4 else 1
+        elif sys.platform == "darwin":
+            steps = -event.delta
+        else:
+            steps = -int(event.delta / 120)
+        self._y += steps * WHEEL_ROWS * self.row_height
+        self._render()